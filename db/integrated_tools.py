@@ -10,11 +10,11 @@ import json
 from pathlib import Path
 from typing import List, Dict, Any
 import sqlite3
-import psutil
 import time
 from collections import defaultdict
 import asyncio
 from src import config
+from src.tool_registry import ToolRegistry, ToolSpec
 
 logger = logging.getLogger(__name__)
 
@@ -165,7 +165,8 @@ def performance_monitor(mode: str = 'snapshot') -> Dict[str, Any]:
                 "message": "Performance counters reset."
             }
 
-        # System metrics
+        # System metrics (psutil is only imported when a snapshot is taken)
+        import psutil
         cpu_percent = psutil.cpu_percent(interval=0.1)
         memory = psutil.virtual_memory()
         disk = psutil.disk_usage('/')
@@ -493,6 +494,10 @@ TOOL_REGISTRY = {
     "performance_monitor": performance_monitor_tool  # Async
 }
 
+registry = ToolRegistry()
+for _name, _func in TOOL_REGISTRY.items():
+    registry.register(ToolSpec(_name, (_func.__doc__ or _name).strip().splitlines()[0]), _func)
+
 
 def execute_tool(tool_name: str, **kwargs) -> Dict[str, Any]:
     """
@@ -505,23 +510,5 @@ def execute_tool(tool_name: str, **kwargs) -> Dict[str, Any]:
     Returns:
         Tool execution result
     """
-    if tool_name not in TOOL_REGISTRY:
-        logger.error(f"Unknown tool: {tool_name}")
-        return {
-            "status": "error",
-            "error": f"Unknown tool: {tool_name}",
-            "available_tools": list(TOOL_REGISTRY.keys())
-        }
-
-    try:
-        tool_func = TOOL_REGISTRY[tool_name]
-        logger.info(f"Executing tool: {tool_name} with args: {kwargs}")
-        result = tool_func(**kwargs)
-        return result
-    except Exception as e:
-        logger.error(f"Error executing tool {tool_name}: {e}")
-        return {
-            "status": "error",
-            "error": str(e),
-            "tool": tool_name
-        }
\ No newline at end of file
+    logger.info(f"Executing tool: {tool_name} with args: {kwargs}")
+    return registry.dispatch(tool_name, **kwargs)
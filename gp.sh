@@ -1,2 +1,8 @@
 #!/bin/bash
-python main.py --task "$@"
+# Run on the resident daemon (python main.py --daemon) if one is up, else one-shot
+python grokputer_daemon.py run "$@"
+status=$?
+if [ $status -eq 75 ]; then
+    exec python main.py --task "$@"
+fi
+exit $status
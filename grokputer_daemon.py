@@ -0,0 +1,442 @@
+"""
+Resident Grokputer daemon.
+
+A one-shot `python main.py --task ...` (or gp.sh) pays for interpreter
+startup, imports, client construction, the boot prayer and the
+test_connection round trip before it does any work. The daemon does all of
+that once and then keeps one booted Grokputer resident: the Grok client
+and its connection pool and response cache, the screen observer, the
+ToolExecutor with its scheduler, warm Python workers and tool-result
+cache (vault scans included). Tasks arrive over a local socket (a Unix
+socket where available, localhost TCP otherwise) as newline-delimited
+JSON, and the task's progress output is streamed back line by line.
+
+Tasks run one at a time (they share the screen and the conversation
+state); a client that arrives while another task is running gets a
+"queued" event and waits. Each task starts with an empty conversation
+history. The client side imports nothing from src/, so submitting a task
+costs a bare interpreter start and one socket round trip.
+
+Protocol (one JSON object per line):
+    {"op": "ping"}                                  -> {"success": true, "pong": true}
+    {"op": "stats"}                                 -> {"success": true, "stats": {...}}
+    {"op": "shutdown"}                              -> {"success": true}
+    {"op": "run", "task": "...", "max_iterations": 5}
+        -> {"event": "queued"}                      (only if another task is running)
+        -> {"event": "started"}
+        -> {"event": "output", "line": "..."}       (repeated)
+        -> {"event": "done", "success": true, "duration": 1.2}
+
+Usage:
+    python grokputer_daemon.py serve                 # or: python main.py --daemon
+    python grokputer_daemon.py run "scan the vault for memes" -m 5
+    python grokputer_daemon.py stats
+    python grokputer_daemon.py stop
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Any, Callable, List, Optional
+
+from qwen_worker import HAS_UNIX_SOCKETS, parse_address
+
+DEFAULT_ADDRESS = os.getenv(
+    "GROKPUTER_DAEMON_ADDRESS",
+    str(Path(tempfile.gettempdir()) / "grokputer.sock") if HAS_UNIX_SOCKETS else "127.0.0.1:8767"
+)
+
+# Exit status of `run` when no daemon is answering (EX_TEMPFAIL); gp.sh falls back to main.py
+EXIT_NOT_RUNNING = 75
+
+
+class ProgressStream(io.TextIOBase):
+    """Text stream that hands every completed line to a callback."""
+
+    def __init__(self, emit: Callable[[str], None]):
+        self.emit = emit
+        self._partial = ""
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        lines = (self._partial + text).split("\n")
+        self._partial = lines.pop()
+        for line in lines:
+            self.emit(line)
+        return len(text)
+
+    def flush(self):
+        if self._partial:
+            self.emit(self._partial)
+            self._partial = ""
+
+
+class GrokputerDaemon:
+    """
+    Socket server that owns one booted Grokputer and runs tasks on it.
+    """
+
+    def __init__(self, grokputer, address: str = DEFAULT_ADDRESS):
+        """
+        Initialize the daemon.
+
+        Args:
+            grokputer: Booted object with run_task(task, max_iterations, output)
+                (main.Grokputer)
+            address: Unix socket path or host:port
+        """
+        self.grokputer = grokputer
+        self.address = address
+
+        self._server = None
+        self._task_lock: Optional[asyncio.Lock] = None
+        self._stopped: Optional[asyncio.Event] = None
+        self.stats = {
+            "tasks": 0,
+            "failed": 0,
+            "queued": 0,
+            "task_time": 0.0,
+            "started_at": time.time()
+        }
+
+    async def start(self):
+        self._task_lock = asyncio.Lock()
+        self._stopped = asyncio.Event()
+        kind, target = parse_address(self.address)
+        if kind == "unix":
+            if os.path.exists(target):
+                os.unlink(target)
+            self._server = await asyncio.start_unix_server(self._handle, path=target)
+            os.chmod(target, 0o600)
+        else:
+            self._server = await asyncio.start_server(self._handle, host=target[0], port=target[1])
+
+    async def serve_forever(self):
+        await self.start()
+        print(f"Grokputer daemon listening on {self.address}", flush=True)
+        try:
+            await self._stopped.wait()
+        finally:
+            await self.stop()
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+        kind, target = parse_address(self.address)
+        if kind == "unix" and os.path.exists(target):
+            os.unlink(target)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        connected = True
+
+        async def send(message: Dict[str, Any]):
+            nonlocal connected
+            if not connected:
+                return
+            try:
+                writer.write(json.dumps(message).encode("utf-8") + b"\n")
+                await writer.drain()
+            except (ConnectionResetError, BrokenPipeError):
+                # The task keeps running; its output is just no longer delivered
+                connected = False
+
+        try:
+            while connected:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError
+                except ValueError:
+                    await send({"success": False, "error": "invalid JSON"})
+                    continue
+
+                op = request.get("op")
+                if op == "run":
+                    await self._run(request, send)
+                elif op == "ping":
+                    await send({"success": True, "pong": True})
+                elif op == "stats":
+                    await send({"success": True, "stats": self.get_stats()})
+                elif op == "shutdown":
+                    await send({"success": True})
+                    self._stopped.set()
+                else:
+                    await send({"success": False, "error": f"bad request: op={op}"})
+        except (ConnectionResetError, BrokenPipeError):
+            pass
+        finally:
+            writer.close()
+
+    async def _run(self, request: Dict[str, Any], send: Callable):
+        task = request.get("task")
+        if not task:
+            await send({"event": "done", "success": False, "error": "missing task"})
+            return
+
+        loop = asyncio.get_running_loop()
+        lines: asyncio.Queue = asyncio.Queue()
+        stream = ProgressStream(lambda line: loop.call_soon_threadsafe(lines.put_nowait, line))
+
+        if self._task_lock.locked():
+            self.stats["queued"] += 1
+            await send({"event": "queued"})
+
+        async with self._task_lock:
+            await send({"event": "started"})
+            start = time.time()
+            job = asyncio.ensure_future(
+                asyncio.to_thread(self._execute, task, int(request.get("max_iterations", 5)), stream)
+            )
+
+            while True:
+                getter = asyncio.ensure_future(lines.get())
+                done, _ = await asyncio.wait({job, getter}, return_when=asyncio.FIRST_COMPLETED)
+                if getter in done:
+                    await send({"event": "output", "line": getter.result()})
+                    continue
+                getter.cancel()
+                break
+
+            # Lines emitted before the thread returned were scheduled before its result
+            while not lines.empty():
+                await send({"event": "output", "line": lines.get_nowait()})
+
+            duration = time.time() - start
+            self.stats["tasks"] += 1
+            self.stats["task_time"] += duration
+            error = job.exception()
+            if error is not None:
+                self.stats["failed"] += 1
+                await send({"event": "done", "success": False, "error": str(error), "duration": round(duration, 3)})
+            else:
+                await send({"event": "done", "success": True, "duration": round(duration, 3)})
+
+    def _execute(self, task: str, max_iterations: int, stream: ProgressStream):
+        """
+        Run one task on the resident Grokputer (worker thread, one at a time).
+
+        run_task drives its own event loop in this thread. Its progress lines
+        go to this task's stream only; sys.stdout (server logging, other
+        threads) is left alone.
+        """
+        history = getattr(self.grokputer, "conversation_history", None)
+        if history is not None:
+            history.clear()
+        try:
+            self.grokputer.run_task(task, max_iterations=max_iterations,
+                                    output=lambda text: stream.write(f"{text}\n"))
+        finally:
+            stream.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        tasks = self.stats["tasks"]
+        stats = {
+            **self.stats,
+            "task_time": round(self.stats["task_time"], 3),
+            "avg_task_time": round(self.stats["task_time"] / tasks, 3) if tasks else 0.0,
+            "uptime": round(time.time() - self.stats["started_at"], 1)
+        }
+
+        # Warm components, reported only if this process has already loaded them
+        grok_client = getattr(self.grokputer, "grok_client", None)
+        if grok_client is not None and hasattr(grok_client, "get_stats"):
+            stats["llm"] = grok_client.get_stats()
+        if "src.command_cache" in sys.modules:
+            stats["tool_cache"] = sys.modules["src.command_cache"].get_tool_cache().get_stats()
+        if "src.worker_pool" in sys.modules:
+            stats["worker_pool"] = sys.modules["src.worker_pool"].get_worker_pool().get_stats()
+        return stats
+
+
+# ---- Client -----------------------------------------------------------------
+
+class GrokputerDaemonClient:
+    """
+    Thin client for the daemon (one connection per call).
+    """
+
+    def __init__(self, address: str = DEFAULT_ADDRESS, timeout: Optional[float] = 10.0):
+        """
+        Initialize the client.
+
+        Args:
+            address: Unix socket path or host:port
+            timeout: Socket timeout for ping/stats/shutdown (task runs wait indefinitely)
+        """
+        self.address = address
+        self.timeout = timeout
+
+    def _connect(self, timeout: Optional[float]) -> socket.socket:
+        kind, target = parse_address(self.address)
+        sock = socket.socket(socket.AF_UNIX if kind == "unix" else socket.AF_INET, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        sock.connect(target)
+        return sock
+
+    def _exchange(self, payload: Dict[str, Any], timeout: Optional[float]):
+        """Send one request and yield each response line as a dict."""
+        with self._connect(timeout) as sock:
+            sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+            reader = sock.makefile("rb")
+            for line in reader:
+                message = json.loads(line)
+                yield message
+                if "event" not in message or message["event"] == "done":
+                    return
+
+    def request(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        for message in self._exchange(payload, self.timeout):
+            return message
+        return {"success": False, "error": "daemon closed connection"}
+
+    def run(self, task: str, max_iterations: int = 5,
+            on_event: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Run a task on the daemon, streaming its events.
+
+        Args:
+            task: Task description
+            max_iterations: Maximum loop iterations
+            on_event: Called with every event as it arrives ("queued",
+                "started", "output", "done")
+
+        Returns:
+            The final "done" event
+        """
+        payload = {"op": "run", "task": task, "max_iterations": max_iterations}
+        for message in self._exchange(payload, None):
+            if on_event is not None:
+                on_event(message)
+            if message.get("event") == "done":
+                return message
+        return {"event": "done", "success": False, "error": "daemon closed connection"}
+
+    def is_running(self) -> bool:
+        try:
+            return bool(self.request({"op": "ping"}).get("pong"))
+        except (OSError, ValueError):
+            return False
+
+    def ensure_running(self, serve_args: Optional[List[str]] = None, startup_timeout: float = 60.0) -> bool:
+        """
+        Start a detached daemon if none is answering, then wait for it.
+
+        Args:
+            serve_args: Extra arguments for `grokputer_daemon.py serve`
+            startup_timeout: Seconds to wait for boot
+
+        Returns:
+            True once the daemon answers pings
+        """
+        if self.is_running():
+            return True
+
+        command = [sys.executable, str(Path(__file__).resolve()), "serve", "--address", self.address]
+        subprocess.Popen(
+            command + list(serve_args or []),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True
+        )
+
+        deadline = time.time() + startup_timeout
+        while time.time() < deadline:
+            if self.is_running():
+                return True
+            time.sleep(0.2)
+        return False
+
+
+def serve(address: str = DEFAULT_ADDRESS, debug: bool = False, skip_boot: bool = False, grokputer=None):
+    """
+    Boot a Grokputer (unless one is given) and serve tasks until stopped.
+
+    Args:
+        address: Unix socket path or host:port
+        debug: Enable debug logging
+        skip_boot: Skip the boot prayer and connection test
+        grokputer: Already constructed Grokputer to serve
+    """
+    if grokputer is None:
+        from main import Grokputer
+        grokputer = Grokputer(debug=debug)
+        if not skip_boot:
+            grokputer.boot()
+
+    daemon = GrokputerDaemon(grokputer, address)
+    try:
+        asyncio.run(daemon.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resident Grokputer daemon and its client.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = sub.add_parser("serve", help="Boot once and serve tasks")
+    serve_parser.add_argument("--address", default=DEFAULT_ADDRESS, help="Unix socket path or host:port")
+    serve_parser.add_argument("--debug", "-d", action="store_true")
+    serve_parser.add_argument("--skip-boot", action="store_true")
+
+    run_parser = sub.add_parser("run", help="Run a task on the daemon and stream its output")
+    run_parser.add_argument("task", nargs="+")
+    run_parser.add_argument("--address", default=DEFAULT_ADDRESS)
+    run_parser.add_argument("--max-iterations", "-m", type=int, default=5)
+    run_parser.add_argument("--start", action="store_true", help="Start the daemon if it isn't running")
+
+    for name, help_text in (("stats", "Print daemon statistics"), ("stop", "Shut the daemon down")):
+        sub.add_parser(name, help=help_text).add_argument("--address", default=DEFAULT_ADDRESS)
+
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        serve(args.address, args.debug, args.skip_boot)
+        return
+
+    client = GrokputerDaemonClient(args.address)
+    if args.command == "run":
+        if args.start:
+            if not client.ensure_running():
+                print("Grokputer daemon did not start", file=sys.stderr)
+                sys.exit(1)
+        elif not client.is_running():
+            print(f"No Grokputer daemon on {args.address}", file=sys.stderr)
+            sys.exit(EXIT_NOT_RUNNING)
+
+        def show(event: Dict[str, Any]):
+            if event["event"] == "output":
+                print(event["line"], flush=True)
+            elif event["event"] == "queued":
+                print("[DAEMON] Waiting for the running task to finish...", flush=True)
+
+        result = client.run(" ".join(args.task), args.max_iterations, on_event=show)
+        if not result.get("success"):
+            print(f"[DAEMON] Task failed: {result.get('error')}", file=sys.stderr)
+            sys.exit(1)
+        return
+
+    if not client.is_running():
+        print(f"No Grokputer daemon on {args.address}", file=sys.stderr)
+        sys.exit(EXIT_NOT_RUNNING)
+    if args.command == "stats":
+        print(json.dumps(client.request({"op": "stats"}).get("stats"), indent=2))
+    else:
+        client.request({"op": "shutdown"})
+
+
+if __name__ == "__main__":
+    main()
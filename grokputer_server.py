@@ -11,11 +11,14 @@ from typing import Dict, List, Any, Optional
 import glob
 import os
 import json
-import subprocess
 import base64
+from datetime import datetime
 from io import BytesIO
 import aiofiles
 
+from src.observability.session_catalog import get_session_catalog
+from src.process_runner import run_process
+
 try:
     from fastmcp import FastMCP
 except ImportError:
@@ -219,14 +222,16 @@ async def execute_bash_safe(command: str, require_confirm: bool = False) -> Dict
                 "message": "High-risk command detected. Execute manually if needed."
             }
 
-        # Execute command
-        result = subprocess.run(
-            command,
-            shell=True,
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
+        # Execute command (streamed, size-capped output; process group killed on timeout)
+        result = await run_process(command, shell=True, timeout=30)
+        if result.timed_out:
+            return {
+                "success": False,
+                "error": "Command timeout (30s)",
+                "command": command,
+                "stdout": result.stdout,
+                "stderr": result.stderr
+            }
 
         return {
             "success": result.returncode == 0,
@@ -238,12 +243,6 @@ async def execute_bash_safe(command: str, require_confirm: bool = False) -> Dict
             "safety_level": safety_level
         }
 
-    except subprocess.TimeoutExpired:
-        return {
-            "success": False,
-            "error": "Command timeout (30s)",
-            "command": command
-        }
     except Exception as e:
         return {
             "success": False,
@@ -333,6 +332,20 @@ async def get_screen_info() -> Dict[str, Any]:
         }
 
 
+def _session_summary(session: Dict[str, Any]) -> Dict[str, Any]:
+    """Catalog row -> session listing entry."""
+    started_at = session.get("started_at")
+    return {
+        "session_id": session["session_id"],
+        "task": session.get("task") or "Unknown",
+        "timestamp": datetime.fromtimestamp(started_at).isoformat() if started_at else "Unknown",
+        "status": session.get("status") or "Unknown",
+        "mode": session.get("mode"),
+        "duration": session.get("duration"),
+        "error_count": session.get("error_count", 0)
+    }
+
+
 @mcp.tool()
 async def list_recent_sessions(limit: int = 10) -> Dict[str, Any]:
     """
@@ -354,30 +367,44 @@ async def list_recent_sessions(limit: int = 10) -> Dict[str, Any]:
                 "message": "No logs directory found"
             }
 
-        # Get session directories
-        sessions = []
-        for session_dir in sorted(logs_dir.iterdir(), reverse=True)[:limit]:
-            if session_dir.is_dir():
-                session_json = session_dir / "session.json"
-                if session_json.exists():
-                    try:
-                        async with aiofiles.open(session_json, 'r') as f:
-                            content = await f.read()
-                            data = json.loads(content)
-                            sessions.append({
-                                "session_id": session_dir.name,
-                                "task": data.get("task", "Unknown"),
-                                "timestamp": data.get("timestamp", "Unknown"),
-                                "status": data.get("status", "Unknown")
-                            })
-                    except Exception:
-                        sessions.append({
-                            "session_id": session_dir.name,
-                            "error": "Could not parse session.json"
-                        })
+        # Indexed query on the session catalog instead of a directory scan
+        catalog = get_session_catalog(logs_dir)
+        rows = await asyncio.to_thread(catalog.recent, limit)
+        sessions = [_session_summary(row) for row in rows]
+
+        return {
+            "success": True,
+            "sessions": sessions,
+            "total": len(sessions)
+        }
+
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "sessions": []
+        }
+
+
+@mcp.tool()
+async def search_sessions(query: str, limit: int = 20) -> Dict[str, Any]:
+    """
+    Full-text search over session tasks and error messages.
+
+    Args:
+        query: Words to search for (all must match; prefixes match too)
+        limit: Maximum number of sessions to return
 
+    Returns:
+        Dictionary with matching sessions, best match first
+    """
+    try:
+        catalog = get_session_catalog(Path("logs"))
+        rows = await asyncio.to_thread(catalog.search, query, limit)
+        sessions = [_session_summary(row) for row in rows]
         return {
             "success": True,
+            "query": query,
             "sessions": sessions,
             "total": len(sessions)
         }
@@ -431,7 +458,7 @@ async def get_session_details(session_id: str) -> Dict[str, Any]:
 @mcp.tool()
 async def ask_qwen(question: str, context_files: List[str] = []) -> Dict[str, Any]:
     """
-    Query local Qwen Coder model (when installed).
+    Query the local Qwen Coder model through the persistent qwen_worker process.
 
     Args:
         question: Question to ask Qwen
@@ -441,15 +468,6 @@ async def ask_qwen(question: str, context_files: List[str] = []) -> Dict[str, An
         Dictionary with Qwen's response
     """
     try:
-        # Check if run_qwen.py exists
-        qwen_script = Path("run_qwen.py")
-        if not qwen_script.exists():
-            return {
-                "success": False,
-                "error": "Qwen not installed. run_qwen.py not found",
-                "message": "Install Qwen: Download model to ./models/ and ensure llama-cpp-python is installed"
-            }
-
         # Check if model exists
         model_path = Path("models") / "qwen2.5-coder-7b-instruct-q4_k_m.gguf"
         if not model_path.exists():
@@ -459,11 +477,36 @@ async def ask_qwen(question: str, context_files: List[str] = []) -> Dict[str, An
                 "message": "Download model: huggingface-cli download Qwen/Qwen2.5-Coder-7B-Instruct-GGUF qwen2.5-coder-7b-instruct-q4_k_m.gguf --local-dir ./models"
             }
 
-        # For now, return placeholder
+        # Shared persistent worker: the model is loaded once, not per call
+        from qwen_worker import QwenWorkerClient
+
+        client = QwenWorkerClient()
+        started = await asyncio.to_thread(
+            client.ensure_running, ["--engine", "gguf", "--model", str(model_path)]
+        )
+        if not started:
+            return {
+                "success": False,
+                "error": "Qwen worker did not start",
+                "message": "Ensure llama-cpp-python is installed, or start it with: python qwen_worker.py serve"
+            }
+
+        # Inline context files (bounded so one large file can't blow the context)
+        context = []
+        for file_path in context_files:
+            try:
+                async with aiofiles.open(file_path, "r", encoding="utf-8", errors="replace") as f:
+                    context.append(f"### {file_path}\n{(await f.read())[:8000]}")
+            except OSError as e:
+                context.append(f"### {file_path}\n(unreadable: {e})")
+        prompt = "\n\n".join(context + [question])
+
+        result = await client.agenerate(prompt, max_tokens=1024)
         return {
-            "success": False,
-            "error": "Qwen integration not yet implemented in MCP server",
-            "message": "Use run_qwen.py directly for now",
+            "success": result.get("success", False),
+            "response": result.get("text"),
+            "error": result.get("error"),
+            "latency": result.get("latency"),
             "question": question,
             "context_files": context_files
         }
@@ -4,45 +4,39 @@ Grokputer - VRZIBRZI Node
 Main entry point for the observe-reason-act loop.
 
 ZA GROKA. ZA VRZIBRZI. ZA SERVER.
+
+Mode-specific dependencies (the LLM clients, pyautogui, the collaboration
+stack, swarm agents, ActionExecutor) are imported inside the mode that
+needs them, so `--help`, `--syntax-check` and single-agent runs don't pay
+for the others. tests/test_import_time.py enforces the cold-start budget.
 """
 
+from __future__ import annotations
+
 import sys
 import logging
 import click
 import asyncio
 import os
+import ast
+from datetime import datetime
 from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Optional
 from dotenv import load_dotenv
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from src import config
-from src.grok_client import GrokClient
-from src.screen_observer import ScreenObserver
-from src.executor import ToolExecutor
-from src.tools import invoke_prayer
 code_generator = lambda **kwargs: {"status": "success"}; execute_script = lambda filename: {"status": "success", "output": "Stub execution"}
 
-# Collaboration mode imports
-from src.collaboration.coordinator import CollaborationCoordinator
-
-# Swarm mode imports
-import sys
 sys.stdout.reconfigure(encoding="utf-8")
-from src.core.message_bus import MessageBus
-from src.agents.observer_agent import ObserverAgent
-from src.agents.actor_agent import ActorAgent
-from src.agents.coordinator import Coordinator
-from src.core.action_executor import ActionExecutor
-from src.observability.deadlock_detector import DeadlockDetector
-from src.observability.session_logger import SessionLogger
-from datetime import datetime
 
-from typing import Optional
-from pathlib import Path
-import ast
-import sys
+if TYPE_CHECKING:
+    from src.core.action_executor import ActionExecutor
+    from src.core.message_bus import MessageBus
+    from src.observability.deadlock_detector import DeadlockDetector
+    from src.observability.session_logger import SessionLogger
 
 
 def setup_logging(debug: bool = False):
@@ -87,11 +81,18 @@ class Grokputer:
         Args:
             debug: Enable debug mode
         """
+        from src.grok_client import GrokClient
+        from src.llm.history import ConversationHistory
+        from src.screen_observer import ScreenObserver
+        from src.executor import ToolExecutor
+
         self.logger = setup_logging(debug)
         self.grok_client = GrokClient()
         self.screen_observer = ScreenObserver()
         self.executor = ToolExecutor()
-        self.conversation_history = []
+        self.conversation_history = ConversationHistory()
+        # Stream responses so tool calls start while the model is still generating
+        self.stream_responses = config.LLM_STREAM_ENABLED
 
         self.logger.info("Grokputer components initialized")
 
@@ -106,6 +107,7 @@ class Grokputer:
         self.logger.info("Grokputer booted with banner")
 
         # Invoke server prayer
+        from src.tools import invoke_prayer
         prayer_result = invoke_prayer()
         if prayer_result["status"] == "success":
             self.logger.info("Server prayer invoked: ETERNAL | INFINITE")
@@ -113,7 +115,7 @@ class Grokputer:
             self.logger.warning(f"Prayer invocation failed: {prayer_result}")
 
         # Test Grok API connection
-        if self.grok_client.test_connection():
+        if asyncio.run(self.grok_client.test_connection()):
             self.logger.info("[OK] Grok API connection verified")
             print("[OK] Grok API connection verified")
         else:
@@ -123,28 +125,43 @@ class Grokputer:
 
         self.logger.info("Boot sequence complete. Ready to operate.")
 
-    def run_task(self, task: str, max_iterations: int = 10):
+    def run_task(self, task: str, max_iterations: int = 10, output: Callable[[str], None] = print):
+        """
+        Execute a task using the observe-reason-act loop (blocking).
+
+        Runs run_task_async on a fresh event loop, so it must not be called
+        from a running loop.
+
+        Args:
+            task: Task description
+            max_iterations: Maximum number of loop iterations
+            output: Receives each progress line (the daemon streams them to its client)
+        """
+        asyncio.run(self.run_task_async(task, max_iterations=max_iterations, output=output))
+
+    async def run_task_async(self, task: str, max_iterations: int = 10, output: Callable[[str], None] = print):
         """
         Execute a task using the observe-reason-act loop.
 
         Args:
             task: Task description
             max_iterations: Maximum number of loop iterations
+            output: Receives each progress line
         """
         self.logger.info(f"Starting task: {task}")
-        print(f"\n[TASK] {task}\n")
+        output(f"\n[TASK] {task}\n")
 
         iteration = 0
 
         while iteration < max_iterations:
             iteration += 1
             self.logger.info(f"--- Iteration {iteration}/{max_iterations} ---")
-            print(f"\n{'='*70}")
-            print(f"Iteration {iteration}/{max_iterations}")
-            print(f"{'='*70}\n")
+            output(f"\n{'='*70}")
+            output(f"Iteration {iteration}/{max_iterations}")
+            output(f"{'='*70}\n")
 
             # OBSERVE: Capture screenshot
-            print("[OBSERVE] Capturing screen...")
+            output("[OBSERVE] Capturing screen...")
             screenshot_base64 = None
             try:
                 screenshot_base64 = self.screen_observer.screenshot_to_base64()
@@ -153,41 +170,57 @@ class Grokputer:
                 self.logger.error(f"Failed to capture screenshot: {e}")
                 screenshot_base64 = None
 
+            # The observation joins the history; every request is rendered from it under the token budget
+            self.conversation_history.append(self.grok_client.user_message(
+                task if iteration == 1 else "Continue the task.", screenshot_base64
+            ))
+
             # REASON: Send to Grok
-            print("[REASON] Sending to Grok...")
-            response = self.grok_client.create_message(
-                task=task if iteration == 1 else "Continue the task.",
-                screenshot_base64=screenshot_base64,
-                conversation_history=self.conversation_history if iteration > 1 else None
-            )
+            output("[REASON] Sending to Grok...")
+            request = {
+                "task": None,
+                "conversation_history": self.conversation_history.get_window(),
+                "task_class": "vision" if screenshot_base64 else None
+            }
+            tool_results = None
+            if self.stream_responses:
+                # REASON + ACT overlap: each tool call runs as soon as the stream completes it
+                response, tool_results = await self.executor.execute_streamed_tool_calls(
+                    self.grok_client.stream_message(**request)
+                )
+            else:
+                response = await self.grok_client.create_message(**request)
 
             if response["status"] != "success":
                 self.logger.error(f"Grok API error: {response}")
-                print(f"[ERROR] {response.get('error', 'Unknown error')}")
+                output(f"[ERROR] {response.get('error', 'Unknown error')}")
                 break
 
             # Log Grok's response
             if response.get("content"):
-                print(f"\n[GROK] {response['content']}\n")
+                output(f"\n[GROK] {response['content']}\n")
                 self.logger.info(f"Grok response: {response['content']}")
 
-            # Store in conversation history
-            self.conversation_history.append({
-                "role": "assistant",
-                "content": response.get("content", "")
-            })
-
             # ACT: Execute tool calls if any
             tool_calls = response.get("tool_calls", [])
 
+            # Store in conversation history (with the calls its tool results answer)
+            assistant_message = {"role": "assistant", "content": response.get("content") or ""}
+            if tool_calls:
+                assistant_message["tool_calls"] = tool_calls
+            self.conversation_history.append(assistant_message)
+
             if not tool_calls:
                 self.logger.info("No tool calls requested. Task may be complete.")
-                print("[DONE] Task complete (no more actions requested)")
+                output("[DONE] Task complete (no more actions requested)")
                 break
 
-            print(f"[ACT] Executing {len(tool_calls)} tool(s)...\n")
-
-            tool_results = self.executor.execute_tool_calls(tool_calls)
+            if tool_results is None:
+                output(f"[ACT] Executing {len(tool_calls)} tool(s)...\n")
+                # Tools block (subprocesses, GUI, confirmation prompts): keep them off the event loop
+                tool_results = await asyncio.to_thread(self.executor.execute_tool_calls, tool_calls)
+            else:
+                output(f"[ACT] Executed {len(tool_calls)} streamed tool(s)\n")
 
             # Log and display results
             for result in tool_results:
@@ -195,31 +228,37 @@ class Grokputer:
                 result_data = result["result"]
                 status = result_data.get("status", "unknown")
 
-                print(f"  • {function_name}: {status}")
+                output(f"  • {function_name}: {status}")
                 self.logger.info(f"Tool result: {function_name} -> {result_data}")
 
-            # Continue conversation with tool results
+            self.conversation_history.extend(self.grok_client.tool_messages(tool_results))
+
+            # Continue conversation with tool results (already in the history window)
             if iteration < max_iterations:
-                continue_response = self.grok_client.continue_conversation(
-                    tool_results=tool_results,
-                    conversation_history=self.conversation_history
+                continue_response = await self.grok_client.continue_conversation(
+                    tool_results=[],
+                    conversation_history=self.conversation_history.get_window()
                 )
 
                 if continue_response.get("content"):
-                    print(f"\n[GROK] {continue_response['content']}\n")
+                    output(f"\n[GROK] {continue_response['content']}\n")
+                    # Text only: tool calls in a follow-up are not executed, so they must not be left unanswered
+                    self.conversation_history.append({"role": "assistant", "content": continue_response["content"]})
 
                 # Check if Grok says it's done
-                content = continue_response.get("content", "").lower()
+                content = (continue_response.get("content") or "").lower()
                 if any(phrase in content for phrase in ["task complete", "finished", "done"]):
                     self.logger.info("Grok indicated task completion")
-                    print("[DONE] Task complete")
+                    output("[DONE] Task complete")
                     break
 
         if iteration >= max_iterations:
-            print(f"\n[WARNING] Reached maximum iterations ({max_iterations})")
+            output(f"\n[WARNING] Reached maximum iterations ({max_iterations})")
             self.logger.warning(f"Task stopped: reached max iterations")
 
-        print(f"\n{'='*70}\n")
+        output(f"\n{'='*70}\n")
+        self.logger.info(f"LLM stats: {self.grok_client.get_stats()}")
+        self.logger.info(f"History stats: {self.conversation_history.get_stats()}")
         self.logger.info("Task execution finished")
 
 
@@ -265,7 +304,7 @@ def _run_interactive_mode(debug: bool, max_iterations: int, max_rounds: int, ski
             grokputer = Grokputer(debug=debug)
             if not skip_boot:
                 grokputer.boot()
-            grokputer.run(task=task, max_iterations=max_iterations)
+            grokputer.run_task(task=task, max_iterations=max_iterations)
         else:
             print("[ERROR] Task cannot be empty")
 
@@ -367,6 +406,29 @@ def _run_single_agent_mode(task: str, max_iterations: int, debug: bool, skip_boo
     grokputer.run_task(task=task, max_iterations=max_iterations)
 
 
+def _run_daemon_mode(debug: bool, skip_boot: bool):
+    """Boot one Grokputer and keep it resident, serving tasks over a local socket."""
+    from grokputer_daemon import serve
+
+    grokputer = Grokputer(debug=debug)
+    if not skip_boot:
+        grokputer.boot()
+    serve(debug=debug, grokputer=grokputer)
+
+
+def _run_syntax_check() -> int:
+    """Parse main.py and every module under src/ without importing them."""
+    root = Path(__file__).parent
+    files = [root / "main.py"] + sorted((root / "src").rglob("*.py"))
+    failures = 0
+    for path in files:
+        try:
+            ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+        except (SyntaxError, UnicodeDecodeError) as e:
+            failures += 1
+            print(f"[SYNTAX] {path.relative_to(root)}: {e}")
+    print(f"[SYNTAX] Checked {len(files)} files, {failures} with errors")
+    return 1 if failures else 0
 
 
 @click.command()
@@ -381,7 +443,9 @@ def _run_single_agent_mode(task: str, max_iterations: int, debug: bool, skip_boo
 @click.option('--agents', default=3, help='Number of agents in swarm (default: 3)')
 @click.option('--agent-roles', default='coordinator,observer,actor', help='Comma-separated agent roles')
 @click.option('--pantheon', '-p', is_flag=True, help='Enable Pantheon mode (9-agent architecture with validation & learning)')
-def main(task: str, max_iterations: int, debug: bool, skip_boot: bool, messagebus: bool, max_rounds: int, review_mode: bool, swarm: bool, agents: int, agent_roles: str, pantheon: bool, syntax_check: bool = False):
+@click.option('--syntax-check', is_flag=True, help='Parse main.py and src/ for syntax errors and exit (imports no mode)')
+@click.option('--daemon', is_flag=True, help='Boot once and serve single-agent tasks over a local socket (see grokputer_daemon.py)')
+def main(task: str, max_iterations: int, debug: bool, skip_boot: bool, messagebus: bool, max_rounds: int, review_mode: bool, swarm: bool, agents: int, agent_roles: str, pantheon: bool, syntax_check: bool = False, daemon: bool = False):
     """
     Grokputer - VRZIBRZI Node
 
@@ -418,7 +482,13 @@ def main(task: str, max_iterations: int, debug: bool, skip_boot: bool, messagebu
 
     Interactive mode:
         grokputer  # Boot, show ASCII art, enter menu to select mode and options
+
+    Daemon mode (boot once, then take tasks from `python grokputer_daemon.py run ...` / gp.sh):
+        grokputer --daemon
     """
+    if syntax_check:
+        sys.exit(_run_syntax_check())
+
     # Load environment variables
     load_dotenv()
 
@@ -430,6 +500,10 @@ def main(task: str, max_iterations: int, debug: bool, skip_boot: bool, messagebu
     )
 
     try:
+        if daemon:
+            _run_daemon_mode(debug, skip_boot)
+            return
+
         # Interactive mode if no task specified
         if task is None and not swarm and not messagebus and not pantheon:
             _run_interactive_mode(debug, max_iterations, max_rounds, skip_boot)
@@ -477,6 +551,14 @@ async def _run_pantheon_mode(task: str, debug: bool):
         task: Task description
         debug: Enable debug logging
     """
+    from src.core.message_bus import MessageBus
+    from src.agents.observer_agent import ObserverAgent
+    from src.agents.actor_agent import ActorAgent
+    from src.agents.coordinator import Coordinator
+    from src.core.action_executor import ActionExecutor
+    from src.observability.deadlock_detector import DeadlockDetector
+    from src.observability.session_logger import SessionLogger
+
     logger = logging.getLogger(__name__)
 
     # Create session ID
@@ -507,7 +589,8 @@ async def _run_pantheon_mode(task: str, debug: bool):
         session_id=session_id,
         task=task,
         log_dir=config.LOG_FILE.parent,
-        swarm_mode=True
+        swarm_mode=True,
+        mode="pantheon"
     )
 
     logger.info("[PANTHEON] Infrastructure initialized")
@@ -629,6 +712,14 @@ async def _run_swarm_mode(task: str, agent_roles: list, debug: bool):
         agent_roles: List of agent roles to spawn (e.g., ['coordinator', 'observer', 'actor'])
         debug: Enable debug logging
     """
+    from src.core.message_bus import MessageBus
+    from src.agents.observer_agent import ObserverAgent
+    from src.agents.actor_agent import ActorAgent
+    from src.agents.coordinator import Coordinator
+    from src.core.action_executor import ActionExecutor
+    from src.observability.deadlock_detector import DeadlockDetector
+    from src.observability.session_logger import SessionLogger
+
     logger = logging.getLogger(__name__)
 
     # Create session ID
@@ -832,6 +923,8 @@ async def _stub_agent(
 async def _run_collaboration_mode(task: str, max_rounds: int, debug: bool, review_mode: bool):
     """Run dual-agent collaboration via MessageBus."""
 
+    from src.collaboration.coordinator import CollaborationCoordinator
+
     logger = logging.getLogger(__name__)
 
     # Get API keys
@@ -898,7 +991,7 @@ async def _run_collaboration_mode(task: str, max_rounds: int, debug: bool, revie
 
 if __name__ == '__main__':
     main()
-test 
+
 def _run_single_agent_mode(task: str, max_iterations: int, debug: bool, skip_boot: bool):
     """Run single-agent mode using Grokputer class."""
     grokputer = Grokputer(debug=debug)
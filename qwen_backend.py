@@ -3,6 +3,10 @@ Qwen Backend for Grokputer
 Local inference using Hugging Face Transformers.
 Supports text generation and vision (Qwen-VL for screenshots).
 Usage: backend = QwenBackend(); response = backend.generate(prompt, tools=None)
+
+Loaded models are cached per process, and QwenBackend(use_worker=True)
+skips loading entirely and sends text generation to the shared
+qwen_worker.py process instead.
 """
 
 import os
@@ -13,16 +17,40 @@ from transformers import AutoTokenizer, AutoModelForCausalLM, pipeline, AutoProc
 import torch
 from PIL import Image
 
+from qwen_worker import QwenWorkerClient
+
+# (model_name, use_vision) -> loaded components, so repeated construction doesn't reload weights
+_LOADED: Dict[tuple, Dict[str, Any]] = {}
+
+
 class QwenBackend:
-    def __init__(self, model_name: str = "Qwen/Qwen2.5-1.5B-Instruct", use_vision: bool = True):
+    def __init__(self, model_name: str = "Qwen/Qwen2.5-1.5B-Instruct", use_vision: bool = True,
+                 use_worker: bool = False, worker_address: Optional[str] = None):
         """
         Init Qwen model (text or vision).
         model_name: HF model ID (small for test).
         use_vision: Load VL for image tasks.
+        use_worker: Send text generation to the persistent qwen_worker.py process (no local load).
+        worker_address: Worker socket path or host:port (default: qwen_worker.DEFAULT_ADDRESS).
         """
         self.model_name = model_name
         self.use_vision = use_vision
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.worker = None
+
+        if use_worker:
+            self.worker = QwenWorkerClient(worker_address) if worker_address else QwenWorkerClient()
+            if not self.worker.ensure_running(["--engine", "transformers", "--model", model_name]):
+                raise RuntimeError("Qwen worker did not start")
+            self.use_vision = False
+            print(f"QwenBackend using worker at {self.worker.address}")
+            return
+
+        cached = _LOADED.get((model_name, use_vision))
+        if cached is not None:
+            self.__dict__.update(cached)
+            return
+
         self.tokenizer = AutoTokenizer.from_pretrained(model_name)
         if use_vision:
             self.processor = AutoProcessor.from_pretrained(model_name.replace("-Instruct", "-VL"))
@@ -31,6 +59,10 @@ class QwenBackend:
         else:
             self.model = AutoModelForCausalLM.from_pretrained(model_name, torch_dtype=torch.float16 if self.device == "cuda" else torch.float32, device_map="auto")
         print(f"QwenBackend loaded on {self.device} with model {model_name}")
+        _LOADED[(model_name, use_vision)] = {
+            key: value for key, value in self.__dict__.items()
+            if key in ("tokenizer", "processor", "model", "vision_pipe")
+        }
 
     def apply_chat_template(self, messages: List[Dict[str, str]]) -> str:
         """Format messages for Qwen chatml."""
@@ -56,6 +88,16 @@ class QwenBackend:
             {"role": "system", "content": system_msg},
             {"role": "user", "content": prompt}
         ]
+        if self.worker is not None:
+            result = self.worker.generate(prompt, system=system_msg, max_tokens=max_tokens)
+            if not result.get("success"):
+                raise RuntimeError(f"Qwen worker error: {result.get('error')}")
+            response = result["text"]
+            return {
+                "choices": [{"message": {"role": "assistant", "content": response}}],
+                "tool_calls": self._parse_tool_calls(response)
+            }
+
         formatted_prompt = self.apply_chat_template(messages)
 
         with torch.no_grad():
@@ -70,6 +112,13 @@ class QwenBackend:
             )
             response = self.tokenizer.decode(outputs[0][inputs['input_ids'].shape[1]:], skip_special_tokens=True)
 
+        return {
+            "choices": [{"message": {"role": "assistant", "content": response}}],
+            "tool_calls": self._parse_tool_calls(response)
+        }
+
+    @staticmethod
+    def _parse_tool_calls(response: str) -> List[Dict]:
         # Parse for tool calls (simple regex/JSON extract; improve with Outlines if needed)
         tool_calls = []
         if "tool" in response.lower():
@@ -80,11 +129,7 @@ class QwenBackend:
                 tool_calls = [tool_json]
             except:
                 pass
-
-        return {
-            "choices": [{"message": {"role": "assistant", "content": response}}],
-            "tool_calls": tool_calls
-        }
+        return tool_calls
 
     def observe_vision(self, screenshot_path: str) -> str:
         """Vision observe: Describe screenshot using Qwen-VL."""
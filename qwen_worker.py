@@ -0,0 +1,472 @@
+"""
+Persistent local Qwen inference worker.
+
+Loading a local model takes far longer than answering a prompt, so the
+model lives in one long-running worker process. QwenBackend, run_qwen.py
+and the MCP ask_qwen tool all talk to it over a local socket (a Unix socket
+where available, localhost TCP otherwise) using newline-delimited JSON.
+
+Engines:
+    gguf          llama.cpp on a GGUF file (default: the Q4_K_M int4 model from
+                  run_qwen.py). Weights are memory-mapped, so the OS page cache
+                  shares them and restarts are cheap.
+    transformers  Hugging Face model; safetensors weights are mmapped on load.
+                  --quantize int8 applies dynamic int8 quantization to Linear
+                  layers for CPU inference.
+
+Throughput:
+    - Dynamic batching: requests arriving within --batch-window are
+      collected (up to --max-batch) and grouped by system prompt. The
+      transformers engine generates a group in one padded batch; llama.cpp
+      runs the group back to back.
+    - System-prompt KV reuse: the KV cache for each system prompt is computed
+      once and restored for later requests, so only the user part of the
+      prompt is evaluated.
+
+Usage:
+    python qwen_worker.py serve                      # GGUF worker on the default socket
+    python qwen_worker.py serve --engine transformers --model Qwen/Qwen2.5-1.5B-Instruct --quantize int8
+    python qwen_worker.py ask "Explain recursion"    # one-off client call (starts the worker if needed)
+
+    client = QwenWorkerClient()
+    client.ensure_running()
+    result = client.generate("Write a factorial function", system="You are a coding assistant.")
+"""
+
+import argparse
+import asyncio
+import copy
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+DEFAULT_GGUF_PATH = Path(__file__).parent / "models" / "qwen2.5-coder-7b-instruct-q4_k_m.gguf"
+DEFAULT_SYSTEM_PROMPT = "You are a helpful coding assistant."
+HAS_UNIX_SOCKETS = hasattr(socket, "AF_UNIX") and sys.platform != "win32"
+DEFAULT_ADDRESS = os.getenv(
+    "QWEN_WORKER_ADDRESS",
+    str(Path(tempfile.gettempdir()) / "grokputer-qwen.sock") if HAS_UNIX_SOCKETS else "127.0.0.1:8766"
+)
+
+
+def parse_address(address: str) -> Tuple[str, Any]:
+    """Return ("unix", path) or ("tcp", (host, port))."""
+    if HAS_UNIX_SOCKETS and ("/" in address or address.endswith(".sock")):
+        return "unix", address
+    host, _, port = address.rpartition(":")
+    return "tcp", (host or "127.0.0.1", int(port))
+
+
+# ---- Engines ----------------------------------------------------------------
+
+class GGUFEngine:
+    """llama.cpp engine: mmapped int4/int8 GGUF weights, per-system-prompt KV snapshots."""
+
+    def __init__(self, model_path: str = None, n_ctx: int = 8192, n_threads: int = None, max_states: int = 4):
+        from llama_cpp import Llama
+
+        self.llm = Llama(
+            model_path=str(model_path or DEFAULT_GGUF_PATH),
+            n_gpu_layers=0,
+            n_ctx=n_ctx,
+            n_threads=n_threads or os.cpu_count(),
+            use_mmap=True,
+            verbose=False
+        )
+        self.max_states = max_states
+        self._states: "OrderedDict[str, Any]" = OrderedDict()
+        self.prefix_hits = 0
+
+    def _format(self, system: str, prompt: str) -> Tuple[str, str]:
+        prefix = f"<|im_start|>system\n{system}<|im_end|>\n"
+        return prefix, prefix + f"<|im_start|>user\n{prompt}<|im_end|>\n<|im_start|>assistant\n"
+
+    def _prime(self, prefix: str):
+        """Restore (or compute and snapshot) the KV cache for a system prompt."""
+        state = self._states.get(prefix)
+        if state is not None:
+            self._states.move_to_end(prefix)
+            self.llm.load_state(state)
+            self.prefix_hits += 1
+            return
+        self.llm.reset()
+        self.llm.eval(self.llm.tokenize(prefix.encode("utf-8"), special=True))
+        self._states[prefix] = self.llm.save_state()
+        if len(self._states) > self.max_states:
+            self._states.popitem(last=False)
+
+    def generate_batch(self, system: str, requests: List[Dict[str, Any]]) -> List[str]:
+        outputs = []
+        for request in requests:
+            prefix, full_prompt = self._format(system, request["prompt"])
+            # llama.cpp skips re-evaluating tokens that match the loaded state
+            self._prime(prefix)
+            result = self.llm(
+                full_prompt,
+                max_tokens=request.get("max_tokens", 512),
+                temperature=request.get("temperature", 0.7),
+                stop=["<|im_end|>"],
+                echo=False
+            )
+            outputs.append(result["choices"][0]["text"].strip())
+        return outputs
+
+
+class TransformersEngine:
+    """Hugging Face engine: batched generation, optional int8 CPU quantization, prefix KV cache."""
+
+    def __init__(self, model_name: str = "Qwen/Qwen2.5-1.5B-Instruct", quantize: Optional[str] = None):
+        import torch
+        from transformers import AutoModelForCausalLM, AutoTokenizer
+
+        self.torch = torch
+        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name, padding_side="left")
+        self.model = AutoModelForCausalLM.from_pretrained(
+            model_name,
+            torch_dtype=torch.float16 if self.device == "cuda" else torch.float32,
+            low_cpu_mem_usage=True
+        ).to(self.device).eval()
+
+        if quantize == "int8":
+            if self.device != "cpu":
+                raise ValueError("int8 dynamic quantization is CPU-only")
+            self.model = torch.ao.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
+        elif quantize == "int4":
+            raise ValueError("int4 CPU inference is served by the gguf engine (Q4_K_M)")
+
+        self._prefix_cache: Dict[str, Any] = {}
+        self.prefix_hits = 0
+
+    def _prompt(self, system: str, prompt: str) -> str:
+        return self.tokenizer.apply_chat_template(
+            [{"role": "system", "content": system}, {"role": "user", "content": prompt}],
+            tokenize=False,
+            add_generation_prompt=True
+        )
+
+    def _system_cache(self, system: str):
+        """KV cache for the system-prompt prefix (computed once per system prompt)."""
+        from transformers import DynamicCache
+
+        cache = self._prefix_cache.get(system)
+        if cache is not None:
+            self.prefix_hits += 1
+            return cache
+        prefix = self.tokenizer.apply_chat_template([{"role": "system", "content": system}], tokenize=False)
+        inputs = self.tokenizer(prefix, return_tensors="pt").to(self.device)
+        cache = DynamicCache()
+        with self.torch.no_grad():
+            cache = self.model(**inputs, past_key_values=cache).past_key_values
+        self._prefix_cache[system] = cache
+        return cache
+
+    def generate_batch(self, system: str, requests: List[Dict[str, Any]]) -> List[str]:
+        prompts = [self._prompt(system, r["prompt"]) for r in requests]
+        max_new_tokens = max(r.get("max_tokens", 512) for r in requests)
+        temperature = requests[0].get("temperature", 0.7)
+        inputs = self.tokenizer(prompts, return_tensors="pt", padding=True).to(self.device)
+
+        kwargs = {}
+        if len(requests) == 1:
+            # Single sequence: start from the cached system-prompt KV
+            kwargs["past_key_values"] = copy.deepcopy(self._system_cache(system))
+
+        with self.torch.no_grad():
+            outputs = self.model.generate(
+                **inputs,
+                max_new_tokens=max_new_tokens,
+                do_sample=temperature > 0,
+                temperature=temperature if temperature > 0 else None,
+                top_p=0.8,
+                pad_token_id=self.tokenizer.eos_token_id,
+                **kwargs
+            )
+
+        results = []
+        prompt_length = inputs["input_ids"].shape[1]
+        for request, output in zip(requests, outputs):
+            tokens = output[prompt_length:][:request.get("max_tokens", 512)]
+            results.append(self.tokenizer.decode(tokens, skip_special_tokens=True).strip())
+        return results
+
+
+def load_engine(engine: str, model: Optional[str] = None, quantize: Optional[str] = None, **kwargs):
+    """Construct an inference engine by name."""
+    if engine == "gguf":
+        return GGUFEngine(model_path=model, **kwargs)
+    if engine == "transformers":
+        return TransformersEngine(model_name=model or "Qwen/Qwen2.5-1.5B-Instruct", quantize=quantize)
+    raise ValueError(f"Unknown engine: {engine}")
+
+
+# ---- Server -----------------------------------------------------------------
+
+class QwenWorker:
+    """
+    Socket server that owns one loaded engine and batches requests into it.
+    """
+
+    def __init__(self, engine, address: str = DEFAULT_ADDRESS, max_batch: int = 8, batch_window: float = 0.01):
+        """
+        Initialize the worker.
+
+        Args:
+            engine: Object with generate_batch(system, requests) -> List[str]
+            address: Unix socket path or host:port
+            max_batch: Max requests per engine call
+            batch_window: Seconds to wait for more requests after the first
+        """
+        self.engine = engine
+        self.address = address
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._server = None
+        self.stats = {
+            "requests": 0,
+            "batches": 0,
+            "max_batch_seen": 0,
+            "generation_time": 0.0,
+            "started_at": time.time()
+        }
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        kind, target = parse_address(self.address)
+        if kind == "unix":
+            if os.path.exists(target):
+                os.unlink(target)
+            self._server = await asyncio.start_unix_server(self._handle, path=target)
+        else:
+            self._server = await asyncio.start_server(self._handle, host=target[0], port=target[1])
+        self._batch_task = asyncio.ensure_future(self._batch_loop())
+
+    async def serve_forever(self):
+        await self.start()
+        print(f"Qwen worker listening on {self.address}", flush=True)
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self):
+        self._batch_task.cancel()
+        self._server.close()
+        await self._server.wait_closed()
+        kind, target = parse_address(self.address)
+        if kind == "unix" and os.path.exists(target):
+            os.unlink(target)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    response = {"success": False, "error": "invalid JSON"}
+                else:
+                    response = await self._dispatch(request)
+                response["id"] = request.get("id") if isinstance(request, dict) else None
+                writer.write(json.dumps(response).encode("utf-8") + b"\n")
+                await writer.drain()
+        except (ConnectionResetError, BrokenPipeError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        op = request.get("op", "generate")
+        if op == "ping":
+            return {"success": True, "pong": True}
+        if op == "stats":
+            return {"success": True, "stats": self.get_stats()}
+        if op != "generate" or not request.get("prompt"):
+            return {"success": False, "error": f"bad request: op={op}"}
+
+        self.stats["requests"] += 1
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((request, future))
+        return await future
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Group by system prompt so each group shares one prefix KV cache
+            groups: Dict[str, list] = {}
+            for request, future in batch:
+                groups.setdefault(request.get("system") or DEFAULT_SYSTEM_PROMPT, []).append((request, future))
+
+            for system, items in groups.items():
+                start = time.time()
+                try:
+                    # One engine call at a time; the model is not re-entrant
+                    texts = await asyncio.to_thread(self.engine.generate_batch, system, [r for r, _ in items])
+                    responses = [{"success": True, "text": text} for text in texts]
+                except Exception as e:
+                    responses = [{"success": False, "error": str(e)}] * len(items)
+                elapsed = time.time() - start
+
+                self.stats["batches"] += 1
+                self.stats["max_batch_seen"] = max(self.stats["max_batch_seen"], len(items))
+                self.stats["generation_time"] += elapsed
+                for (_, future), response in zip(items, responses):
+                    if not future.done():
+                        future.set_result({**response, "batch_size": len(items), "latency": round(elapsed, 3)})
+
+    def get_stats(self) -> Dict[str, Any]:
+        batches = self.stats["batches"]
+        return {
+            **self.stats,
+            "avg_batch_size": round(self.stats["requests"] / batches, 2) if batches else 0.0,
+            "prefix_hits": getattr(self.engine, "prefix_hits", 0),
+            "uptime": round(time.time() - self.stats["started_at"], 1)
+        }
+
+
+# ---- Client -----------------------------------------------------------------
+
+class QwenWorkerClient:
+    """
+    Thin client for the worker (one connection per call; calls are thread-safe).
+    """
+
+    def __init__(self, address: str = DEFAULT_ADDRESS, timeout: float = 300.0):
+        self.address = address
+        self.timeout = timeout
+        self._ids = 0
+        self._lock = threading.Lock()
+
+    def _connect(self) -> socket.socket:
+        kind, target = parse_address(self.address)
+        sock = socket.socket(socket.AF_UNIX if kind == "unix" else socket.AF_INET, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(target)
+        return sock
+
+    def request(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            self._ids += 1
+            payload = {**payload, "id": self._ids}
+        with self._connect() as sock:
+            sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+            data = b""
+            while not data.endswith(b"\n"):
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                data += chunk
+        return json.loads(data) if data else {"success": False, "error": "worker closed connection"}
+
+    def generate(self, prompt: str, system: Optional[str] = None,
+                 max_tokens: int = 512, temperature: float = 0.7) -> Dict[str, Any]:
+        """Generate a completion. Returns {"success", "text" | "error", ...}."""
+        return self.request({
+            "op": "generate",
+            "prompt": prompt,
+            "system": system,
+            "max_tokens": max_tokens,
+            "temperature": temperature
+        })
+
+    async def agenerate(self, prompt: str, system: Optional[str] = None,
+                        max_tokens: int = 512, temperature: float = 0.7) -> Dict[str, Any]:
+        """Async variant of generate (runs the socket call in a thread)."""
+        return await asyncio.to_thread(self.generate, prompt, system, max_tokens, temperature)
+
+    def is_running(self) -> bool:
+        try:
+            return bool(self.request({"op": "ping"}).get("pong"))
+        except OSError:
+            return False
+
+    def ensure_running(self, serve_args: Optional[List[str]] = None, startup_timeout: float = 600.0) -> bool:
+        """
+        Start a detached worker if none is answering, then wait for it.
+
+        Args:
+            serve_args: Extra arguments for `qwen_worker.py serve`
+            startup_timeout: Seconds to wait for the model to load
+
+        Returns:
+            True once the worker answers pings
+        """
+        if self.is_running():
+            return True
+
+        command = [sys.executable, str(Path(__file__).resolve()), "serve", "--address", self.address]
+        subprocess.Popen(
+            command + list(serve_args or []),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True
+        )
+
+        deadline = time.time() + startup_timeout
+        while time.time() < deadline:
+            if self.is_running():
+                return True
+            time.sleep(0.5)
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Persistent local Qwen inference worker.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    serve = sub.add_parser("serve", help="Load the model and serve requests")
+    serve.add_argument("--address", default=DEFAULT_ADDRESS, help="Unix socket path or host:port")
+    serve.add_argument("--engine", choices=["gguf", "transformers"], default="gguf")
+    serve.add_argument("--model", help="GGUF path or Hugging Face model id")
+    serve.add_argument("--quantize", choices=["int8", "int4"], help="Quantization for the transformers engine")
+    serve.add_argument("--max-batch", type=int, default=8)
+    serve.add_argument("--batch-window", type=float, default=0.01)
+
+    ask = sub.add_parser("ask", help="Send one prompt to the worker")
+    ask.add_argument("prompt")
+    ask.add_argument("--address", default=DEFAULT_ADDRESS)
+    ask.add_argument("--system")
+    ask.add_argument("--max-tokens", type=int, default=512)
+
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        print(f"Loading {args.engine} engine...", flush=True)
+        engine = load_engine(args.engine, args.model, args.quantize)
+        worker = QwenWorker(engine, args.address, args.max_batch, args.batch_window)
+        try:
+            asyncio.run(worker.serve_forever())
+        except KeyboardInterrupt:
+            pass
+    else:
+        client = QwenWorkerClient(args.address)
+        if not client.ensure_running():
+            print("Qwen worker did not start", file=sys.stderr)
+            sys.exit(1)
+        result = client.generate(args.prompt, system=args.system, max_tokens=args.max_tokens)
+        print(result.get("text") if result.get("success") else f"Error: {result.get('error')}")
+
+
+if __name__ == "__main__":
+    main()
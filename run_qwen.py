@@ -1,4 +1,4 @@
-# run_qwen.py - Script to download, load, and test Qwen2.5-Coder-7B GGUF model
+# run_qwen.py - Script to download Qwen2.5-Coder-7B GGUF and test it through the persistent worker
 import os
 from huggingface_hub import hf_hub_download
 
@@ -15,29 +15,31 @@ if not os.path.exists(model_path):
 else:
     print("Model already exists.")
 
-# Step 2: Load the model
-from llama_cpp import Llama
+# Step 2: Start (or reuse) the persistent worker - the model is loaded once and stays resident
+from qwen_worker import QwenWorkerClient
 
-print("Loading model...")
-llm = Llama(
-    model_path=model_path,
-    n_gpu_layers=0,  # Set to 0 for CPU-only (AMD GPU requires special build)
-    n_ctx=8192,  # Balanced context size for CPU usage
-    n_threads=8,  # Use multiple CPU threads
-    verbose=False
-)
-print("Model loaded successfully.")
+client = QwenWorkerClient()
+print("Connecting to Qwen worker (loads the model on first start)...")
+if not client.ensure_running(["--engine", "gguf", "--model", model_path]):
+    raise SystemExit("Qwen worker did not start. Check that llama-cpp-python is installed.")
+print("Worker ready.")
+
+# Step 3: Test inference with sample prompts (sent concurrently so the worker can batch them)
+from concurrent.futures import ThreadPoolExecutor
 
-# Step 3: Test inference with sample prompts
 test_prompts = [
     "Write a Python function to calculate factorial.",
     "Debug this code: def add(a, b): return a + b  # It doesn't work for strings.",
     "Explain recursion in simple terms."
 ]
 
-for prompt in test_prompts:
+with ThreadPoolExecutor(max_workers=len(test_prompts)) as pool:
+    results = list(pool.map(lambda p: client.generate(p, max_tokens=200), test_prompts))
+
+for prompt, result in zip(test_prompts, results):
     print(f"\nPrompt: {prompt}")
-    output = llm(prompt, max_tokens=200, echo=False)
-    print(f"Response: {output['choices'][0]['text'].strip()}")
+    text = result.get("text", "").strip() if result.get("success") else f"Error: {result.get('error')}"
+    print(f"Response: {text} (batch of {result.get('batch_size', 1)}, {result.get('latency', 0)}s)")
 
-print("\nTesting complete. Check performance and adjust as needed.")
\ No newline at end of file
+print(f"\nWorker stats: {client.request({'op': 'stats'}).get('stats')}")
+print("\nTesting complete. The worker keeps running; later runs skip the model load.")
@@ -12,7 +12,6 @@ Extends BaseAgent for lifecycle management.
 
 import asyncio
 import logging
-import subprocess
 import shlex
 import time
 from typing import Dict, Any, Optional
@@ -24,6 +23,9 @@ from src.core.action_executor import ActionExecutor, ActionPriority
 from src.core.message_bus import MessageBus, Message, MessagePriority
 from src.observability.session_logger import SessionLogger
 from src import config
+from src.command_cache import get_tool_cache
+from src.process_runner import run_process
+from src.safety_policy import get_safety_policy
 
 logger = logging.getLogger(__name__)
 
@@ -251,12 +253,20 @@ class Actor(BaseAgent):
                 "priority": MessagePriority.HIGH
             }
 
-        # Execute with timeout
+        # Execute with timeout (the runner kills the process group when it expires);
+        # repeated read-only commands are answered from the shared tool cache
+        cache = get_tool_cache() if config.TOOL_CACHE_ENABLED else None
+        arguments = {"command": command}
         try:
-            result = await asyncio.wait_for(
-                asyncio.to_thread(self._run_bash_command, command),
-                timeout=params.get("timeout", 30.0)
-            )
+            cached = cache.get("bash", arguments) if cache else None
+            if cached is not None:
+                result = cached
+            else:
+                result = await self._run_bash_command(command, timeout=params.get("timeout", 30.0))
+                if result.get("timed_out"):
+                    raise asyncio.TimeoutError()
+                if cache:
+                    cache.record("bash", arguments, result)
 
             self.session_logger.log_tool_execution(
                 tool_name="bash",
@@ -293,50 +303,32 @@ class Actor(BaseAgent):
         """
         Validate bash command safety.
 
-        Phase 1: Simple blocklist.
-        Phase 2: Integrate with config.calculate_safety_score()
+        Rejects destructive commands, shell injection vectors and network
+        access (see src.safety_policy).
         """
-        dangerous_patterns = [
-            "rm -rf", "dd if=", "mkfs", ":(){ :|:& };:",  # Destructive
-            ">", ">>", "|", "&", ";", "$(",  # Shell injection vectors
-            "curl", "wget", "nc ", "netcat"  # Network access
-        ]
-
-        command_lower = command.lower()
-        for pattern in dangerous_patterns:
-            if pattern in command_lower:
-                logger.warning(f"[Actor] Dangerous pattern detected: {pattern}")
-                return False
+        verdict = get_safety_policy().evaluate(command)
+        if not verdict.allowed_unattended:
+            logger.warning(f"[Actor] Dangerous command detected: {', '.join(verdict.reasons)}")
+            return False
 
         return True
 
-    def _run_bash_command(self, command: str) -> Dict:
-        """Run bash command (blocking, runs in thread pool)."""
+    async def _run_bash_command(self, command: str, timeout: float = 30.0) -> Dict:
+        """Run bash command with streamed, size-capped output capture."""
         try:
             # Use shlex.split() with shell=False to prevent shell injection
             args = shlex.split(command)
-            result = subprocess.run(
-                args,
-                shell=False,
-                capture_output=True,
-                text=True,
-                timeout=30.0
-            )
+            result = await run_process(args, timeout=timeout)
 
             return {
                 "returncode": result.returncode,
                 "stdout": result.stdout,
                 "stderr": result.stderr,
-                "command": command
+                "command": command,
+                "timed_out": result.timed_out,
+                "truncated": result.truncated
             }
 
-        except subprocess.TimeoutExpired:
-            return {
-                "returncode": -1,
-                "stdout": "",
-                "stderr": "Command timeout",
-                "command": command
-            }
         except Exception as e:
             return {
                 "returncode": -1,
@@ -385,6 +377,8 @@ class Actor(BaseAgent):
             elif operation == "write":
                 content = params.get("content", "")
                 await asyncio.to_thread(path.write_text, content)
+                if config.TOOL_CACHE_ENABLED:
+                    get_tool_cache().invalidate([str(path.resolve())])
                 result = {"operation": "write", "bytes_written": len(content), "path": str(path)}
 
             elif operation == "exists":
@@ -3,10 +3,15 @@ Abstract base class for LLM agents in collaboration mode.
 """
 
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Optional
 import logging
 
+from src import config
 from src.collaboration.message_models import CollaborationMessage, AgentRole, MessageType
+from src.llm.history import TokenCounter, estimate_tokens
+
+# Shared across agents: the same collaboration messages are counted by both sides
+_token_counter = TokenCounter()
 
 logger = logging.getLogger(__name__)
 
@@ -86,17 +91,82 @@ class BaseLLMAgent(ABC):
         self.message_history.append(message)
         logger.debug(f"{self.role.value}: Added message {message.message_id} to history")
 
-    def get_context_window(self, max_messages: int = 10) -> List[CollaborationMessage]:
+    def get_context_window(
+        self,
+        max_messages: int = 10,
+        token_budget: Optional[int] = None,
+        keep_recent: int = 2
+    ) -> List[CollaborationMessage]:
         """
         Get recent context for next API call.
 
+        Takes the newest messages (at most max_messages) that fit the token
+        budget; the newest keep_recent are always included. Anything older
+        is rolled up into a single summary message at the front, which gets
+        a fifth of the budget and keeps only its newest lines when full.
+
         Args:
             max_messages: Maximum number of recent messages to return
+            token_budget: Token cap (defaults to config.COLLAB_CONTEXT_TOKEN_BUDGET)
+            keep_recent: Newest messages always included verbatim
 
         Returns:
             List of recent CollaborationMessages
         """
-        return self.message_history[-max_messages:]
+        if token_budget is None:
+            token_budget = config.COLLAB_CONTEXT_TOKEN_BUDGET
+
+        selected, used = self._select_recent(max_messages, token_budget, keep_recent)
+        if len(selected) < len(self.message_history):
+            # Leave room for the summary inside the budget
+            selected, used = self._select_recent(max_messages, token_budget - token_budget // 5, keep_recent)
+
+        older = self.message_history[:len(self.message_history) - len(selected)]
+        if older:
+            selected.insert(0, self._summarize_messages(older, max(token_budget - used, 0)))
+
+        return selected
+
+    def _select_recent(self, max_messages: int, token_budget: int, keep_recent: int):
+        """Newest messages under the budget, oldest first; returns (messages, tokens used)."""
+        selected: List[CollaborationMessage] = []
+        used = 0
+        for position, message in enumerate(reversed(self.message_history)):
+            if position >= max_messages:
+                break
+            cost = _token_counter.count({"role": message.sender.value, "content": message.content})
+            if position >= keep_recent and used + cost > token_budget:
+                break
+            selected.append(message)
+            used += cost
+
+        selected.reverse()
+        return selected, used
+
+    def _summarize_messages(self, messages: List[CollaborationMessage], max_tokens: int) -> CollaborationMessage:
+        """Extractive roll-up of older collaboration messages (newest lines that fit max_tokens)."""
+        lines = []
+        used = 20  # header and message framing
+        for message in reversed(messages):
+            first_line = message.content.strip().splitlines()[0] if message.content.strip() else ""
+            line = f"- {message.sender.value} (round {message.round_number}): {first_line[:200]}"
+            cost = estimate_tokens(line) + 1
+            if used + cost > max_tokens:
+                break
+            lines.append(line)
+            used += cost
+        lines.reverse()
+
+        omitted = len(messages) - len(lines)
+        header = f"Summary of {len(messages)} earlier message(s)"
+        header += f" ({omitted} oldest omitted):" if omitted else ":"
+
+        return messages[-1].model_copy(update={
+            "message_id": f"summary_{messages[0].message_id}_{messages[-1].message_id}",
+            "sender": AgentRole.COORDINATOR,
+            "content": "\n".join([header] + lines),
+            "metadata": {"summary": True}
+        })
 
     async def process_message(
         self,
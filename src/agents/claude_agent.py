@@ -3,7 +3,8 @@ Claude API wrapper for collaboration mode.
 """
 
 import asyncio
-from typing import List
+import os
+from typing import List, Optional
 from anthropic import AsyncAnthropic
 from tenacity import retry, stop_after_attempt, wait_exponential
 import logging
@@ -22,7 +23,8 @@ class ClaudeAgent(BaseLLMAgent):
         api_key: str,
         model: str = "claude-sonnet-4-5-20250929",
         max_retries: int = 3,
-        timeout: float = 30.0
+        timeout: float = 30.0,
+        base_url: Optional[str] = None
     ):
         """
         Initialize Claude agent.
@@ -32,6 +34,7 @@ class ClaudeAgent(BaseLLMAgent):
             model: Claude model identifier
             max_retries: Maximum retry attempts
             timeout: API timeout in seconds
+            base_url: API base URL (defaults to ANTHROPIC_BASE_URL, then the public API)
         """
         super().__init__(
             role=AgentRole.CLAUDE,
@@ -41,7 +44,7 @@ class ClaudeAgent(BaseLLMAgent):
             timeout=timeout
         )
 
-        self.client = AsyncAnthropic(api_key=api_key)
+        self.client = AsyncAnthropic(api_key=api_key, base_url=base_url or os.getenv("ANTHROPIC_BASE_URL"))
 
     @retry(
         stop=stop_after_attempt(3),
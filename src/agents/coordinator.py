@@ -18,6 +18,7 @@ from typing import Dict, List, Optional, Any
 from enum import Enum
 
 from src.core.base_agent import BaseAgent
+from src.safety_policy import get_safety_policy
 from src.core.message_bus import MessageBus, Message, MessagePriority
 from src.observability.session_logger import SessionLogger
 from src import config
@@ -213,12 +214,8 @@ class Coordinator(BaseAgent):
 
     def _requires_confirmation(self, action: str, params: Dict) -> bool:
         """Check if action needs user confirmation (safety scoring)."""
-        # Simple heuristic for Phase 1
-        risky_actions = ['bash', 'click', 'type']  # Expand with safety_scores
-        if action in risky_actions:
-            # Simulate safety score (integrate with config.py in Phase 2)
-            score = 50  # Placeholder; use calculate_safety_score(params.get('command'))
-            return score > 70
+        if action == 'bash':
+            return get_safety_policy().evaluate(params.get('command', '')).requires_confirmation
         return False
 
     async def _request_confirmation(self, task_id: str, action: str, params: Dict) -> bool:
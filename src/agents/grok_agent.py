@@ -3,13 +3,15 @@ Grok API wrapper for collaboration mode (refactored from grok_client.py).
 """
 
 import asyncio
-from typing import List
-from openai import AsyncOpenAI
+from typing import List, Optional
 from tenacity import retry, stop_after_attempt, wait_exponential
 import logging
 
-from src.agents.base_llm_agent import BaseLLMAgent
+from src import config
+from src.agents.base_llm_agent import BaseLLMAgent, _token_counter
 from src.collaboration.message_models import CollaborationMessage, AgentRole
+from src.llm.client_registry import get_client_registry
+from src.llm.rate_limiter import get_rate_limiter
 
 logger = logging.getLogger(__name__)
 
@@ -22,7 +24,8 @@ class GrokAgent(BaseLLMAgent):
         api_key: str,
         model: str = "grok-4-fast-reasoning",
         max_retries: int = 3,
-        timeout: float = 30.0
+        timeout: float = 30.0,
+        base_url: Optional[str] = None
     ):
         """
         Initialize Grok agent.
@@ -32,6 +35,7 @@ class GrokAgent(BaseLLMAgent):
             model: Grok model identifier
             max_retries: Maximum retry attempts
             timeout: API timeout in seconds
+            base_url: API base URL (defaults to config.XAI_BASE_URL)
         """
         super().__init__(
             role=AgentRole.GROK,
@@ -41,9 +45,17 @@ class GrokAgent(BaseLLMAgent):
             timeout=timeout
         )
 
-        self.client = AsyncOpenAI(
-            api_key=api_key,
-            base_url="https://api.x.ai/v1"
+        self.base_url = base_url or config.XAI_BASE_URL
+        self.registry = get_client_registry()
+        self.rate_limiter = get_rate_limiter()
+
+    @property
+    def client(self):
+        """Shared AsyncOpenAI client for the running event loop."""
+        return self.registry.get_async_client(
+            api_key=self.api_key,
+            base_url=self.base_url,
+            model=self.model
         )
 
     @retry(
@@ -71,15 +83,24 @@ class GrokAgent(BaseLLMAgent):
             API response dict with keys: content, model, usage, finish_reason
         """
         try:
-            response = await asyncio.wait_for(
-                self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    max_tokens=max_tokens,
-                    temperature=temperature,
-                    **kwargs
-                ),
-                timeout=self.timeout
+            async def call():
+                async with self.registry.slot("grok_agent"):
+                    return await asyncio.wait_for(
+                        self.client.chat.completions.create(
+                            model=self.model,
+                            messages=messages,
+                            max_tokens=max_tokens,
+                            temperature=temperature,
+                            **kwargs
+                        ),
+                        timeout=self.timeout
+                    )
+
+            # Paced by the shared limiter; retries stay with the tenacity decorator
+            estimated_tokens = sum(_token_counter.count(m) for m in messages)
+            response = await self.rate_limiter.run(call, estimated_tokens=estimated_tokens, max_retries=0)
+            self.rate_limiter.record_usage(
+                estimated_tokens, response.usage.prompt_tokens + response.usage.completion_tokens
             )
 
             return {
@@ -7,6 +7,7 @@ Captures and analyzes screen state for the swarm:
 - Grok vision API integration for analysis
 - Efficient caching to minimize redundant captures
 - Region-specific capture support
+- Content-addressed frame persistence (messages carry frame hashes)
 
 Extends BaseAgent for lifecycle management.
 """
@@ -20,6 +21,7 @@ from typing import Dict, Any, Optional, Tuple
 from src.core.base_agent import BaseAgent
 from src.core.message_bus import MessageBus, Message, MessagePriority
 from src.observability.session_logger import SessionLogger
+from src.observability.frame_store import FrameStore
 from src.screen_observer import ScreenObserver
 from src.grok_client import GrokClient
 from src import config
@@ -109,12 +111,15 @@ class Observer(BaseAgent):
         self.screen_observer = ScreenObserver(quality=quality, max_size=max_size)
 
         # Initialize Grok client for vision analysis
-        self.grok_client = GrokClient()
+        self.grok_client = GrokClient(agent_id=self.agent_id, hedge=config_dict.get("hedge_requests"))
 
         # Initialize screenshot cache
         cache_size = config_dict.get("screenshot_cache_size", 10)
         self.cache = ScreenshotCache(max_size=cache_size)
 
+        # Frames go to the shared blob store; cache entries and responses keep only the hash
+        self.frame_store = FrameStore(config_dict.get("frame_store_dir", config.LOGS_DIR / "frames"))
+
         # Statistics
         self.stats = {
             "screenshots_captured": 0,
@@ -209,7 +214,7 @@ class Observer(BaseAgent):
                             "task_id": task_id,
                             "status": "success",
                             "result": {
-                                "screenshot_b64": screenshot_b64,
+                                "frame_hash": cached['screenshot'],
                                 "analysis": cached['analysis'],
                                 "from_cache": True,
                                 "dimensions": self.screen_observer.get_screen_size()
@@ -218,8 +223,9 @@ class Observer(BaseAgent):
                         "priority": MessagePriority.NORMAL
                     }
 
-            # Cache miss - analyze with Grok
+            # Cache miss - persist frame and analyze with Grok
             self.stats["cache_misses"] += 1
+            frame_hash = self._store_frame(screenshot_b64)
             start_time = time.time()
             analysis = await self._analyze_screenshot(screenshot_b64)
             analysis_time = time.time() - start_time
@@ -227,13 +233,13 @@ class Observer(BaseAgent):
             self.stats["total_analysis_time"] += analysis_time
 
             # Cache the result
-            self.cache.put(screenshot_hash, screenshot_b64, analysis)
+            self.cache.put(screenshot_hash, frame_hash, analysis)
 
             # Log execution
             self.session_logger.log_tool_execution(
                 tool_name="screenshot_analysis",
                 params={"region": region},
-                result={"analysis": analysis, "cache": "miss"},
+                result={"analysis": analysis, "cache": "miss", "frame_hash": frame_hash},
                 status="success"
             )
 
@@ -244,7 +250,7 @@ class Observer(BaseAgent):
                     "task_id": task_id,
                     "status": "success",
                     "result": {
-                        "screenshot_b64": screenshot_b64,
+                        "frame_hash": frame_hash,
                         "analysis": analysis,
                         "from_cache": False,
                         "capture_time_ms": int(capture_time * 1000),
@@ -290,6 +296,19 @@ class Observer(BaseAgent):
         logger.info(f"[Observer] Screenshot captured: {len(screenshot_b64)} bytes (base64)")
         return screenshot_b64
 
+    def _store_frame(self, screenshot_b64: str) -> Optional[str]:
+        """
+        Persist screenshot in the frame store.
+
+        Best-effort: a failed write must not fail the capture, so errors
+        are logged and None is returned.
+        """
+        try:
+            return self.frame_store.put_base64(screenshot_b64)
+        except Exception as e:
+            logger.warning(f"[Observer] Could not persist frame: {e}")
+            return None
+
     async def _analyze_screenshot(self, screenshot_b64: str) -> Dict[str, Any]:
         """
         Analyze screenshot using Grok vision API.
@@ -312,11 +331,12 @@ class Observer(BaseAgent):
             "Be concise and focus on actionable information."
         )
 
-        # Call Grok vision API
-        response = await asyncio.to_thread(
-            self.grok_client.create_message,
+        # Call Grok vision API (no tools at temperature 0, so the same frame is answered from the cache)
+        response = await self.grok_client.create_message(
             task=prompt,
-            screenshot_base64=screenshot_b64
+            screenshot_base64=screenshot_b64,
+            temperature=0,
+            use_tools=False
         )
 
         if response.get("status") == "success":
@@ -344,10 +364,14 @@ class Observer(BaseAgent):
         return await self._execute_capture_and_analyze(task_id, {"region": region})
 
     async def _handle_analysis(self, message: Message) -> Dict:
-        """Handle analyze_screen message with existing screenshot."""
+        """Handle analyze_screen message with existing screenshot or frame hash."""
         screenshot_b64 = message.content.get("screenshot_b64", "")
         task_id = message.content.get("task_id", "analysis")
 
+        frame_hash = message.content.get("frame_hash")
+        if not screenshot_b64 and frame_hash:
+            screenshot_b64 = self.frame_store.get_base64(frame_hash) or ""
+
         if not screenshot_b64:
             return {
                 "to": "coordinator",
@@ -400,7 +424,9 @@ class Observer(BaseAgent):
             "grok_api_calls": self.stats["grok_calls"],
             "avg_capture_time_ms": int(self.stats["total_capture_time"] / total_captures * 1000) if total_captures > 0 else 0,
             "avg_analysis_time_ms": int(self.stats["total_analysis_time"] / self.stats["grok_calls"] * 1000) if self.stats["grok_calls"] > 0 else 0,
-            "cache_size": len(self.cache.cache)
+            "cache_size": len(self.cache.cache),
+            "frame_store": self.frame_store.get_stats(),
+            "llm": self.grok_client.get_stats()
         }
 
     async def on_start(self):
@@ -409,7 +435,7 @@ class Observer(BaseAgent):
 
         # Test Grok connection
         try:
-            connected = await asyncio.to_thread(self.grok_client.test_connection)
+            connected = await self.grok_client.test_connection()
             if connected:
                 logger.info("[Observer] Grok API connection successful")
             else:
@@ -10,6 +10,9 @@ from pathlib import Path
 from typing import Dict, List, Optional
 from datetime import datetime
 
+from src.observability.event_stream import read_events
+from src.observability.session_catalog import get_session_catalog
+
 logger = logging.getLogger(__name__)
 
 
@@ -24,19 +27,20 @@ class SessionImprover:
         self.logger = logger
 
     def get_latest_session(self) -> Optional[str]:
-        """Get the most recent session ID."""
-        sessions = list(self.logs_dir.glob("session_*/session.json"))
-        if not sessions:
-            return None
-        latest = max(sessions, key=lambda p: p.stat().st_mtime)
-        return latest.parent.name
+        """Get the most recently started session ID (from the session catalog)."""
+        latest = get_session_catalog(self.logs_dir).latest()
+        return latest["session_id"] if latest else None
+
+    def _session_dir(self, session_id: str) -> Path:
+        session_dir = self.logs_dir / session_id
+        if not (session_dir / "session.json").exists():
+            # Try swarm sessions
+            session_dir = self.logs_dir / f"swarm_{session_id.replace('session_', '')}"
+        return session_dir
 
     def get_session_data(self, session_id: str) -> Optional[Dict]:
         """Load session data from logs."""
-        session_file = self.logs_dir / session_id / "session.json"
-        if not session_file.exists():
-            # Try swarm sessions
-            session_file = self.logs_dir / f"swarm_{session_id.replace('session_', '')}" / "session.json"
+        session_file = self._session_dir(session_id) / "session.json"
 
         if not session_file.exists():
             self.logger.error(f"Session file not found: {session_file}")
@@ -49,6 +53,22 @@ class SessionImprover:
             self.logger.error(f"Error loading session: {e}")
             return None
 
+    def get_session_events(self, session_id: str, event_type: str, fallback: List[Dict]) -> List[Dict]:
+        """
+        All events of one type from the session's events.jsonl.
+
+        session.json only keeps the most recent entries of each kind, so
+        totals come from the full stream; sessions without one use `fallback`.
+        """
+        events_file = self._session_dir(session_id) / "events.jsonl"
+        if not events_file.exists():
+            return fallback
+        try:
+            return [event for event in read_events(events_file) if event.get("type") == event_type]
+        except OSError as e:
+            self.logger.error(f"Error reading session events: {e}")
+            return fallback
+
     def analyze_session(self, session_id: str) -> Dict:
         """
         Analyze a session and generate improvement recommendations.
@@ -73,8 +93,12 @@ class SessionImprover:
             "issues": []
         }
 
-        # Analyze iterations and performance
-        iterations = data.get("iterations", [])
+        # Analyze iterations and performance (session.json only stores their count)
+        logged = data.get("iterations")
+        iterations = [
+            event.get("data") or {}
+            for event in self.get_session_events(session_id, "iteration", [])
+        ] or (logged if isinstance(logged, list) else [])
         if iterations:
             analysis["metrics"]["total_iterations"] = len(iterations)
             analysis["metrics"]["avg_iteration_time"] = sum(
@@ -108,10 +132,11 @@ class SessionImprover:
                     f"Cache results for repeated tools: {', '.join(repeated.keys())}"
                 )
 
-        # Analyze errors
-        errors = data.get("errors", [])
+        # Analyze errors (session.json only has the most recent ones)
+        errors = self.get_session_events(session_id, "agent_error", data.get("errors", []))
         if errors:
-            analysis["issues"].append(f"Total errors: {len(errors)}")
+            total_errors = max(len(errors), data.get("counts", {}).get("errors", 0))
+            analysis["issues"].append(f"Total errors: {total_errors}")
             error_types = {}
             for err in errors:
                 err_type = err.get("type", "unknown")
@@ -126,8 +151,8 @@ class SessionImprover:
 
         # Analyze API usage
         if "api_calls" in data:
-            api_calls = data["api_calls"]
-            analysis["metrics"]["api_calls"] = len(api_calls)
+            api_calls = self.get_session_events(session_id, "api_call", data["api_calls"])
+            analysis["metrics"]["api_calls"] = max(len(api_calls), data.get("counts", {}).get("api_calls", 0))
             total_cost = sum(call.get("cost", 0) for call in api_calls)
             analysis["metrics"]["estimated_cost"] = f"${total_cost:.4f}"
 
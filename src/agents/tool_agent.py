@@ -14,33 +14,16 @@ load_dotenv()
 
 from src.agents.base_agent import BaseAgent
 from src.core.message_bus import MessageBus
-# Assume SafetyScorer from src/executor.py – import if exists, else inline
-from src.executor import SafetyScorer  # Fallback to simple scoring if not
+from src.safety_policy import get_safety_policy
 
 class ToolAgent(BaseAgent):
     def __init__(self, name: str = "ToolAgent", agent_type: str = "tool"):
         super().__init__(name=name, agent_type=agent_type)
         self.bus = MessageBus(backend=os.getenv('MESSAGE_BUS_BACKEND', 'redis'))
-        self.safety_scorer = SafetyScorer() if 'SafetyScorer' in globals() else self._simple_scorer()
+        self.safety_scorer = get_safety_policy()
         self.priority_map = {"HIGH": 0, "NORMAL": 1, "LOW": 2}
         self.logger.info("ToolAgent initialized – Ready for bash/file ops with safety.")
 
-    def _simple_scorer(self):
-        """Fallback safety scorer if not imported."""
-        def score_command(cmd: str) -> int:
-            cmd_lower = cmd.lower()
-            score = 0
-            if any(danger in cmd_lower for danger in ['rm -rf', 'sudo', 'del /f', 'format']):
-                score += 100
-            elif any(write in cmd_lower for write in ['rm', 'mv', 'cp', '--force']):
-                score += 70
-            elif any(read in cmd_lower for read in ['cat', 'ls', 'find', 'grep']):
-                score += 20
-            else:
-                score = 40  # Default medium
-            return min(score, 100)
-        return type('Scorer', (), {'score_command': score_command})()
-
     async def execute_bash(self, cmd: str, priority: str = "NORMAL") -> Dict[str, Any]:
         """Execute bash command with safety check. Broadcast for distributed exec if needed."""
         risk_score = self.safety_scorer.score_command(cmd)
@@ -2,14 +2,14 @@
 ProposalGeneratorAgent - Converts findings into actionable code change proposals.
 """
 
+import asyncio
+import time
 import uuid
 from pathlib import Path
 from typing import List, Optional
 from datetime import datetime
 import difflib
 
-from openai import OpenAI
-
 from .models.findings import Finding
 from .models.proposals import Proposal, Alternative
 
@@ -25,17 +25,33 @@ class ProposalGeneratorAgent:
     - Provide multiple alternative approaches
     """
 
-    def __init__(self, api_key: str, base_url: str = "https://api.x.ai/v1", model: str = "grok-4-fast-reasoning"):
+    def __init__(self, api_key: str, base_url: Optional[str] = None, model: str = "grok-4-fast-reasoning"):
         """
         Initialize the proposal generator.
 
         Args:
             api_key: xAI API key
-            base_url: API base URL
+            base_url: API base URL (defaults to config.XAI_BASE_URL)
             model: Model to use (default: grok-4-fast-reasoning)
         """
-        self.client = OpenAI(api_key=api_key, base_url=base_url)
+        # Imported here so the scanner side of this package stays usable without API config
+        from src import config
+        from src.llm.client_registry import get_client_registry
+        from src.llm.history import TokenCounter
+        from src.llm.rate_limiter import get_rate_limiter, priority_for_agent
+        from src.llm.response_cache import get_response_cache
+
+        self.client = get_client_registry().get_sync_client(
+            api_key=api_key, base_url=base_url or config.XAI_BASE_URL, model=model
+        )
         self.model = model
+        self.base_url = base_url or config.XAI_BASE_URL
+        self.cache = get_response_cache() if config.LLM_CACHE_ENABLED else None
+
+        # Shares the process-wide RPM/TPM budget (and retries) with every other LLM caller
+        self.rate_limiter = get_rate_limiter()
+        self.priority = priority_for_agent("proposer")
+        self.token_counter = TokenCounter()
 
     async def generate_proposal(self, finding: Finding, file_content: Optional[str] = None) -> Proposal:
         """
@@ -58,30 +74,59 @@ class ProposalGeneratorAgent:
         # Build prompt for AI
         prompt = self._build_prompt(finding, file_content)
 
-        # Call AI to generate proposal
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You are an expert Python code reviewer and refactoring assistant. "
-                        "Generate detailed, actionable code change proposals that fix issues "
-                        "while following best practices. Be specific, provide complete code snippets, "
-                        "and explain your reasoning."
-                    )
-                },
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3,  # Lower temperature for more consistent output
+        system_prompt = (
+            "You are an expert Python code reviewer and refactoring assistant. "
+            "Generate detailed, actionable code change proposals that fix issues "
+            "while following best practices. Be specific, provide complete code snippets, "
+            "and explain your reasoning."
         )
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt}
+        ]
+
+        # Same finding + same file content -> reuse the earlier proposal
+        cache_key = self.cache.make_key(self.model, messages, temperature=0.3) if self.cache else None
+        cached = self.cache.get(cache_key) if self.cache else None
+
+        if cached is not None:
+            ai_response = cached["content"]
+        else:
+            # Call AI to generate proposal
+            start_time = time.time()
+            ai_response = await self._send(
+                messages,
+                temperature=0.3,  # Lower temperature for more consistent output
+                max_tokens=2048
+            )
+            if self.cache is not None:
+                self.cache.put(cache_key, {"content": ai_response}, time.time() - start_time)
 
-        # Parse response
-        ai_response = response.choices[0].message.content or ""
         proposal_data = self._parse_ai_response(ai_response, finding, file_content)
 
         return proposal_data
 
+    async def _send(self, messages: List[dict], temperature: float, max_tokens: Optional[int] = None) -> str:
+        """One completion on the sync client, off the event loop and under the rate limiter."""
+        options = {"max_tokens": max_tokens} if max_tokens is not None else {}
+        estimated_tokens = sum(self.token_counter.count(message) for message in messages)
+
+        response = await self.rate_limiter.run(
+            lambda: asyncio.to_thread(
+                self.client.chat.completions.create,
+                model=self.model,
+                messages=messages,
+                temperature=temperature,
+                **options
+            ),
+            priority=self.priority,
+            estimated_tokens=estimated_tokens
+        )
+
+        usage = getattr(response, "usage", None)
+        self.rate_limiter.record_usage(estimated_tokens, getattr(usage, "total_tokens", None))
+        return response.choices[0].message.content or ""
+
     async def generate_alternatives(self, proposal: Proposal, count: int = 2) -> List[Alternative]:
         """
         Generate alternative approaches to a proposal.
@@ -120,13 +165,12 @@ For each alternative:
 Format each alternative clearly.
 """
 
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
+        response = await self._send(
+            [
                 {"role": "system", "content": "You are an expert Python developer providing alternative solutions."},
                 {"role": "user", "content": prompt}
             ],
-            temperature=0.5,
+            temperature=0.5
         )
 
         # Parse alternatives (simplified - would need better parsing)
@@ -0,0 +1,234 @@
+"""
+Result cache for read-only tool calls.
+
+Agents re-run the same observations many times in a session (`ls`, `cat`,
+`git status`, `scan_vault`, `get_vault_stats`). ToolResultCache answers a
+repeat from memory when nothing it depends on could have changed.
+
+A call is cacheable if it is read-only:
+
+- bash: the command classifier (src.tool_scheduler) sees only reads, and
+  the safety scorer rates it low risk. The scorer rates all of `git` as
+  medium, so read-only git subcommands are recognized by the classifier.
+  The argv itself must also be proven read-only: no wrapper program (env,
+  xargs, ...) and no write flag (find -delete/-exec, sort -o, ...), since a
+  cached "success" would otherwise stand in for a write that never ran.
+  Time-dependent commands (date, ps, ...) are never cached.
+- vault tools: scan_vault and get_vault_stats
+
+Keys are the tool name, normalized argv/arguments and the working
+directory. Each entry also records a fingerprint of the paths the call
+reads: (mtime, inode, size) per path, or .git/index and HEAD for git.
+A hit is served only if the fingerprint still matches and the TTL hasn't
+expired.
+
+Writes made through our own tools invalidate overlapping entries: bash
+writes, mcp_vault_operation and Actor file writes. Commands the classifier
+can't understand invalidate everything. Changes made behind our back deep
+inside a directory tree (invisible to the directory's own mtime) are
+bounded by the TTL.
+"""
+
+import copy
+import logging
+import os
+import shlex
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, FrozenSet, Iterable, Optional, Tuple
+
+from src import config
+from src.tool_scheduler import WRAPPER_COMMANDS, ResourceSet, classify_tool_call, has_write_args
+
+logger = logging.getLogger(__name__)
+
+# Read-only, but their output changes by itself
+NON_CACHEABLE_COMMANDS = {"date", "uptime", "ps", "free", "top", "env", "printenv", "df"}
+
+CACHEABLE_TOOLS = {"scan_vault", "get_vault_stats"}
+
+
+class _Entry:
+    __slots__ = ("result", "paths", "fingerprint", "expires_at")
+
+    def __init__(self, result: Dict[str, Any], paths: FrozenSet[str], fingerprint: Tuple, expires_at: float):
+        self.result = result
+        self.paths = paths
+        self.fingerprint = fingerprint
+        self.expires_at = expires_at
+
+
+def _overlaps(path: str, others: Iterable[str]) -> bool:
+    for other in others:
+        if path == other or path.startswith(other.rstrip(os.sep) + os.sep) or other.startswith(path.rstrip(os.sep) + os.sep):
+            return True
+    return False
+
+
+def _fingerprint(paths: FrozenSet[str]) -> Tuple:
+    stamps = []
+    for path in sorted(paths):
+        try:
+            st = os.stat(path)
+            stamps.append((path, st.st_mtime_ns, st.st_ino, st.st_size))
+        except OSError:
+            stamps.append((path, None))
+    return tuple(stamps)
+
+
+class ToolResultCache:
+    """
+    In-memory LRU of read-only tool results with fingerprint validation.
+    """
+
+    def __init__(self, max_entries: int = None, ttl: float = None, git_ttl: float = None):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: LRU capacity (defaults to config.TOOL_CACHE_SIZE)
+            ttl: Seconds an entry stays valid (defaults to config.TOOL_CACHE_TTL)
+            git_ttl: TTL for git commands, whose inputs can't be fully fingerprinted
+                (defaults to config.TOOL_CACHE_GIT_TTL)
+        """
+        self.max_entries = max_entries or config.TOOL_CACHE_SIZE
+        self.ttl = config.TOOL_CACHE_TTL if ttl is None else ttl
+        self.git_ttl = config.TOOL_CACHE_GIT_TTL if git_ttl is None else git_ttl
+
+        self._entries: "OrderedDict[Tuple, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "stale": 0,
+            "stores": 0,
+            "invalidations": 0,
+            "evictions": 0
+        }
+
+    def _plan(self, name: str, arguments: Dict[str, Any], resource: ResourceSet) -> Optional[Tuple[Tuple, FrozenSet[str], float]]:
+        """(key, fingerprint paths, ttl) for a cacheable call, else None."""
+        cwd = os.getcwd()
+        if name in CACHEABLE_TOOLS:
+            key = (name, tuple(sorted((k, repr(v)) for k, v in arguments.items())), cwd)
+            return key, resource.reads, self.ttl
+
+        if name != "bash":
+            return None
+        command = arguments.get("command", "")
+        try:
+            argv = tuple(shlex.split(command))
+        except ValueError:
+            return None
+        if not argv:
+            return None
+        program = os.path.basename(argv[0]).lower()
+        if program in NON_CACHEABLE_COMMANDS or program in WRAPPER_COMMANDS or has_write_args(program, argv[1:]):
+            return None
+
+        key = (name, argv, cwd)
+        if resource.label == "git-read":
+            git_dir = os.path.join(cwd, ".git")
+            paths = resource.reads | {os.path.join(git_dir, "index"), os.path.join(git_dir, "HEAD")}
+            return key, frozenset(paths), min(self.ttl, self.git_ttl)
+        if resource.label == "fs-read" and config.get_command_safety_score(command) <= 30:
+            return key, resource.reads, self.ttl
+        return None
+
+    def get(self, name: str, arguments: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached result for a tool call.
+
+        Returns:
+            A copy of the cached result (marked "cached": True), or None
+        """
+        plan = self._plan(name, arguments, classify_tool_call(name, arguments))
+        if plan is None:
+            return None
+        key, _, _ = plan
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            if entry.expires_at <= time.time() or entry.fingerprint != _fingerprint(entry.paths):
+                del self._entries[key]
+                self.stats["stale"] += 1
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return {**copy.deepcopy(entry.result), "cached": True}
+
+    def record(self, name: str, arguments: Dict[str, Any], result: Dict[str, Any]):
+        """
+        Feed back an executed tool call: cache it if read-only, invalidate if it writes.
+        """
+        resource = classify_tool_call(name, arguments)
+
+        if resource.writes:
+            self.invalidate(resource.writes)
+            return
+        if resource.exclusive and name == "bash":
+            # Unknown command: it may have written anything
+            self.invalidate()
+            return
+
+        plan = self._plan(name, arguments, resource)
+        if plan is None or result.get("status", "success") != "success" or result.get("returncode", 0) != 0:
+            return
+        key, paths, ttl = plan
+        if ttl <= 0:
+            return
+
+        with self._lock:
+            # Fingerprint after the call: a write racing the read only makes the entry stale
+            self._entries[key] = _Entry(copy.deepcopy(result), paths, _fingerprint(paths), time.time() + ttl)
+            self._entries.move_to_end(key)
+            self.stats["stores"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def invalidate(self, paths: Optional[Iterable[str]] = None):
+        """
+        Drop entries that read any of `paths` (or everything if paths is None).
+        """
+        with self._lock:
+            if paths is None:
+                dropped = len(self._entries)
+                self._entries.clear()
+            else:
+                written = [os.path.abspath(p) for p in paths]
+                stale = [key for key, entry in self._entries.items()
+                         if any(_overlaps(path, written) for path in entry.paths)]
+                for key in stale:
+                    del self._entries[key]
+                dropped = len(stale)
+            if dropped:
+                self.stats["invalidations"] += dropped
+                logger.debug(f"[ToolResultCache] Invalidated {dropped} entries")
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "hit_rate": f"{self.stats['hits'] / lookups * 100:.1f}%" if lookups else "N/A"
+        }
+
+
+_cache: Optional[ToolResultCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_tool_cache() -> ToolResultCache:
+    """Get the process-wide tool result cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ToolResultCache()
+        return _cache
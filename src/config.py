@@ -3,6 +3,7 @@ Configuration management for Grokputer.
 Loads settings from environment variables and provides constants.
 """
 
+import json
 import os
 from pathlib import Path
 from dotenv import load_dotenv
@@ -31,6 +32,89 @@ if not XAI_API_KEY:
         "Please copy .env.example to .env and add your API key."
     )
 
+# LLM connection pooling (shared by all agents via src.llm.client_registry)
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+LLM_MAX_KEEPALIVE = int(os.getenv("LLM_MAX_KEEPALIVE", "10"))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "60"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+
+# Per-agent in-flight request quotas, e.g. "learner:1,improver:1"
+LLM_AGENT_QUOTAS = {}
+for _quota in os.getenv("LLM_AGENT_QUOTAS", "").split(","):
+    if ":" in _quota:
+        _agent, _limit = _quota.split(":", 1)
+        LLM_AGENT_QUOTAS[_agent.strip()] = int(_limit)
+
+# LLM response cache (src.llm.response_cache), opt-in
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "false").lower() == "true"
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "3600"))
+LLM_CACHE_PING_TTL = float(os.getenv("LLM_CACHE_PING_TTL", "300"))
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "256"))
+LLM_CACHE_PATH = PROJECT_ROOT / os.getenv("LLM_CACHE_PATH", "logs/llm_cache.sqlite3")
+
+# Global LLM rate limits (shared by all agents) and retry policy
+LLM_RPM = int(os.getenv("LLM_RPM", "60"))
+LLM_TPM = int(os.getenv("LLM_TPM", "200000"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "1.0"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "30.0"))
+
+# Stream main-loop responses and start tool calls as soon as they are complete
+# (GrokClient.stream_message + ToolExecutor.execute_streamed_tool_calls)
+LLM_STREAM_ENABLED = os.getenv("LLM_STREAM_ENABLED", "true").lower() == "true"
+
+# Request hedging for latency-critical calls (src.llm.hedging)
+LLM_HEDGE_ENABLED = os.getenv("LLM_HEDGE_ENABLED", "false").lower() == "true"
+LLM_HEDGE_QUANTILE = float(os.getenv("LLM_HEDGE_QUANTILE", "0.95"))
+LLM_HEDGE_BUDGET = float(os.getenv("LLM_HEDGE_BUDGET", "0.1"))
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+
+# Model routing by task class and size (src.llm.model_router)
+# Catalog/thresholds/SLOs can be overridden with JSON in the environment
+LLM_ROUTING_ENABLED = os.getenv("LLM_ROUTING_ENABLED", "false").lower() == "true"
+LLM_ROUTE_OBJECTIVE = os.getenv("LLM_ROUTE_OBJECTIVE", "cost")  # "cost" or "latency"
+LLM_MODEL_CATALOG = json.loads(os.getenv("LLM_MODEL_CATALOG", "null")) or {
+    "grok-4-fast-non-reasoning": {"quality": 0.7, "cost": 1.0, "max_context": 2000000},
+    "grok-4-fast-reasoning": {"quality": 0.85, "cost": 1.5, "max_context": 2000000},
+    "grok-4": {"quality": 1.0, "cost": 10.0, "max_context": 256000},
+}
+LLM_ROUTE_QUALITY = json.loads(os.getenv("LLM_ROUTE_QUALITY", "null")) or {
+    "screen_check": 0.6,
+    "tool_followup": 0.7,
+    "vision": 0.8,
+    "reasoning": 0.85,
+    "planning": 0.95,
+    "default": 0.85,
+}
+LLM_ROUTE_SLOS = json.loads(os.getenv("LLM_ROUTE_SLOS", "null")) or {
+    "screen_check": 3.0,
+    "tool_followup": 8.0,
+    "vision": 10.0,
+    "reasoning": 20.0,
+    "planning": 60.0,
+}
+
+# Vision image parts (src.llm.images)
+LLM_IMAGE_MAX_SIDE = int(os.getenv("LLM_IMAGE_MAX_SIDE", "1280"))
+LLM_IMAGE_QUALITY = int(os.getenv("LLM_IMAGE_QUALITY", "70"))
+LLM_IMAGE_DETAIL = os.getenv("LLM_IMAGE_DETAIL", "auto")
+LLM_IMAGE_BYTE_BUDGET = int(os.getenv("LLM_IMAGE_BYTE_BUDGET", "1500000"))
+LLM_IMAGE_MAX_PER_REQUEST = int(os.getenv("LLM_IMAGE_MAX_PER_REQUEST", "2"))
+
+# Conversation history token budgets (src.llm.history)
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "6000"))
+COLLAB_CONTEXT_TOKEN_BUDGET = int(os.getenv("COLLAB_CONTEXT_TOKEN_BUDGET", "8000"))
+
+# Concurrent execution of non-conflicting tool calls (src.tool_scheduler)
+TOOL_MAX_CONCURRENCY = int(os.getenv("TOOL_MAX_CONCURRENCY", "4"))
+
+# Result cache for read-only tool calls (src.command_cache)
+TOOL_CACHE_ENABLED = os.getenv("TOOL_CACHE_ENABLED", "true").lower() == "true"
+TOOL_CACHE_TTL = float(os.getenv("TOOL_CACHE_TTL", "30"))
+TOOL_CACHE_GIT_TTL = float(os.getenv("TOOL_CACHE_GIT_TTL", "5"))
+TOOL_CACHE_SIZE = int(os.getenv("TOOL_CACHE_SIZE", "256"))
+
 # Safety Settings
 REQUIRE_CONFIRMATION = os.getenv("REQUIRE_CONFIRMATION", "true").lower() == "true"
 
@@ -108,32 +192,9 @@ def get_command_safety_score(command: str) -> int:
     Returns:
         Safety score (0-100), higher = more dangerous
     """
-    if not command or not command.strip():
-        return 50  # Empty command is moderately suspicious
-
-    # Extract first word (the actual command)
-    first_word = command.strip().split()[0]
-
-    # Check for dangerous patterns
-    if 'rm -rf' in command or 'rm -fr' in command:
-        return 100  # Recursive delete is maximum risk
-    if 'sudo rm' in command:
-        return 100
-    if '>' in command and any(critical in command for critical in ['/etc/', '/boot/', '/sys/', '/dev/']):
-        return 95  # Writing to system directories
-    if command.startswith('sudo '):
-        return 95  # Any sudo command is high risk
-
-    # Look up command in safety scores
-    base_score = SAFETY_SCORES.get(first_word, 50)  # Default to medium risk
-
-    # Adjust score based on flags
-    if '-f' in command or '--force' in command:
-        base_score = min(100, base_score + 20)  # Force flag increases risk
-    if '-r' in command or '-R' in command or '--recursive' in command:
-        base_score = min(100, base_score + 15)  # Recursive operations are riskier
-
-    return base_score
+    # All rules live in the compiled, memoized policy engine
+    from src.safety_policy import get_safety_policy
+    return get_safety_policy().score(command)
 
 def requires_confirmation(command: str) -> bool:
     """
@@ -149,9 +210,9 @@ def requires_confirmation(command: str) -> bool:
     if REQUIRE_CONFIRMATION:
         return True
 
-    # Otherwise, use safety scoring
-    score = get_command_safety_score(command)
-    return score > 70  # High risk commands require confirmation
+    # Otherwise, use safety scoring (high risk commands require confirmation)
+    from src.safety_policy import get_safety_policy
+    return get_safety_policy().evaluate(command).requires_confirmation
 
 # Logging Configuration
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
@@ -193,117 +254,7 @@ Guidelines:
 Remember: Eternal connection. Infinite speed. ZA GROKA.
 """
 
-# Tool Definitions for Grok API
-TOOLS = [
-    {
-        "type": "function",
-        "function": {
-            "name": "bash",
-            "description": "Execute a bash shell command. Use for system operations, file management, and running programs.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "command": {
-                        "type": "string",
-                        "description": "The bash command to execute"
-                    }
-                },
-                "required": ["command"]
-            }
-        }
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "computer",
-            "description": "Control the computer: mouse movements, clicks, keyboard input, screenshots.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "action": {
-                        "type": "string",
-                        "enum": ["mouse_move", "left_click", "right_click", "double_click",
-                                "type", "key", "screenshot", "scroll"],
-                        "description": "The action to perform"
-                    },
-                    "coordinate": {
-                        "type": "array",
-                        "items": {"type": "integer"},
-                        "description": "X,Y coordinates for mouse actions (e.g., [100, 200])"
-                    },
-                    "text": {
-                        "type": "string",
-                        "description": "Text to type (for 'type' action)"
-                    }
-                },
-                "required": ["action"]
-            }
-        }
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "scan_vault",
-            "description": "Scan the meme vault directory and return file paths matching a pattern.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "pattern": {
-                        "type": "string",
-                        "description": "Glob pattern to match files (e.g., '*.jpg', '*.png')"
-                    },
-                    "limit": {
-                        "type": "integer",
-                        "description": "Maximum number of files to return",
-                        "default": 100
-                    }
-                },
-                "required": ["pattern"]
-            }
-        }
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "invoke_prayer",
-            "description": "Display the server prayer/mantra. Use on initialization.",
-            "parameters": {
-                "type": "object",
-                "properties": {}
-            }
-        }
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "get_vault_stats",
-            "description": "Get statistics about vault contents including total files, images, videos, and other file types.",
-            "parameters": {
-                "type": "object",
-                "properties": {}
-            }
-        }
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "mcp_vault_operation",
-            "description": "Execute advanced vault operations via MCP server: list files, read files, search content, or edit files.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "operation": {
-                        "type": "string",
-                        "enum": ["list_vault_files", "read_vault_file", "search_vault", "edit_vault_file"],
-                        "description": "MCP operation to perform"
-                    },
-                    "arguments": {
-                        "type": "object",
-                        "description": "Operation-specific arguments (e.g., {pattern:'*.md'} for list, {query:'search term'} for search)"
-                    }
-                },
-                "required": ["operation"]
-            }
-        }
-    }
-]
+# Tool Definitions for Grok API (generated from src.tool_registry)
+from src.tool_registry import get_tool_registry
+
+TOOLS = get_tool_registry().schemas()
@@ -3,30 +3,48 @@ Tool execution module for Grokputer.
 Executes tool calls from Grok including computer control, bash, and custom tools.
 """
 
+import asyncio
 import json
 import logging
-import subprocess
 import shlex
 import os
-from typing import Dict, Any, List
-import pyautogui
+import threading
+import importlib
+from typing import Dict, Any, Callable, List, AsyncIterator, Optional, Tuple
 from src import config
+from src.command_cache import get_tool_cache
+from src.process_runner import run_process_sync
+from src.safety_policy import get_safety_policy
+from src.tool_registry import get_tool_registry
+from src.worker_pool import WORKER_POOL_ENABLED, get_worker_pool, python_job
+from src.tool_scheduler import ToolScheduler, classify_tool_call
 execute_custom_tool = lambda name, **kwargs: {"status": "success", "tool": name, "args": kwargs}
 
 logger = logging.getLogger(__name__)
 
+_pyautogui = None
+
+
+def _gui():
+    """Import pyautogui on first computer action (slow, and needs a display)."""
+    global _pyautogui
+    if _pyautogui is None:
+        _pyautogui = importlib.import_module("pyautogui")
+    return _pyautogui
+
 
 class ToolExecutor:
     """
     Handles execution of all tool calls from Grok.
     """
 
-    def __init__(self, require_confirmation: bool = None):
+    def __init__(self, require_confirmation: bool = None, max_concurrency: int = None):
         """
         Initialize the tool executor.
 
         Args:
             require_confirmation: Whether to require confirmation for destructive actions
+            max_concurrency: Max non-conflicting tool calls run at once (defaults to config.TOOL_MAX_CONCURRENCY)
         """
         self.require_confirmation = (
             require_confirmation
@@ -34,68 +52,157 @@ class ToolExecutor:
             else config.REQUIRE_CONFIRMATION
         )
 
+        # Independent calls in one turn run concurrently; conflicting ones keep their order
+        self.scheduler = ToolScheduler(max_concurrency)
+        # Concurrent calls must not interleave confirmation prompts
+        self._confirm_lock = threading.Lock()
+        # Repeated read-only observations are answered from memory
+        self.result_cache = get_tool_cache() if config.TOOL_CACHE_ENABLED else None
+
+        # Dispatch tables: tools needing executor state, then the lazy registry for the rest
+        self.registry = get_tool_registry()
+        self._handlers: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+            "bash": self._execute_bash,
+            "computer": self._execute_computer
+        }
+        self._computer_actions: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+            "mouse_move": self._mouse_move,
+            "left_click": self._left_click,
+            "right_click": self._right_click,
+            "double_click": self._double_click,
+            "type": self._type_text,
+            "key": self._press_key,
+            "scroll": self._scroll,
+            "screenshot": self._screenshot
+        }
+
         logger.info(f"Tool executor initialized: require_confirmation={self.require_confirmation}")
 
     def execute_tool_calls(self, tool_calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Execute a list of tool calls and return results.
 
+        Calls that touch disjoint resources run concurrently (see
+        src.tool_scheduler); results are returned in the original order.
+
         Args:
             tool_calls: List of tool call dictionaries from Grok
 
         Returns:
             List of results for each tool call
         """
-        results = []
+        if len(tool_calls) <= 1:
+            return [self._execute_tool_call(tool_call) for tool_call in tool_calls]
+
+        resources = [self._classify(tool_call) for tool_call in tool_calls]
+        return self.scheduler.run(tool_calls, resources, self._execute_tool_call)
 
-        for tool_call in tool_calls:
+    @staticmethod
+    def _parse_call(tool_call: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        """Extract (function name, parsed arguments) from a tool call."""
+        function_info = tool_call.get("function", {})
+        function_name = function_info.get("name", "")
+
+        # Parse arguments (may be JSON string)
+        arguments = function_info.get("arguments", {})
+        if isinstance(arguments, str):
             try:
-                tool_call_id = tool_call.get("id", "")
-                tool_type = tool_call.get("type", "function")
-                function_info = tool_call.get("function", {})
-                function_name = function_info.get("name", "")
-
-                # Parse arguments (may be JSON string)
-                arguments = function_info.get("arguments", {})
-                if isinstance(arguments, str):
-                    try:
-                        arguments = json.loads(arguments)
-                    except json.JSONDecodeError:
-                        arguments = {}
-
-                logger.info(f"Executing tool: {function_name} with args: {arguments}")
-
-                # Route to appropriate handler
-                if function_name == "bash":
-                    result = self._execute_bash(arguments)
-                elif function_name == "computer":
-                    result = self._execute_computer(arguments)
-                elif function_name in ["scan_vault", "invoke_prayer", "get_vault_stats", "mcp_vault_operation"]:
-                    result = execute_custom_tool(function_name, **arguments)
-                else:
-                    result = {
-                        "status": "error",
-                        "error": f"Unknown tool: {function_name}"
-                    }
-
-                results.append({
+                arguments = json.loads(arguments)
+            except json.JSONDecodeError:
+                arguments = {}
+        return function_name, arguments if isinstance(arguments, dict) else {}
+
+    def _classify(self, tool_call: Dict[str, Any]):
+        function_name, arguments = self._parse_call(tool_call)
+        return classify_tool_call(function_name, arguments)
+
+    def _execute_tool_call(self, tool_call: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute one tool call (never raises)."""
+        try:
+            tool_call_id = tool_call.get("id", "")
+            function_name, arguments = self._parse_call(tool_call)
+
+            logger.info(f"Executing tool: {function_name} with args: {arguments}")
+
+            cached = self.result_cache.get(function_name, arguments) if self.result_cache else None
+            if cached is not None:
+                logger.info(f"Tool result served from cache: {function_name}")
+                return {
                     "tool_call_id": tool_call_id,
                     "function_name": function_name,
-                    "result": result
-                })
-
-            except Exception as e:
-                logger.error(f"Error executing tool call: {e}")
-                results.append({
-                    "tool_call_id": tool_call.get("id", ""),
-                    "function_name": tool_call.get("function", {}).get("name", "unknown"),
-                    "result": {
-                        "status": "error",
-                        "error": str(e)
-                    }
-                })
-
-        return results
+                    "result": cached
+                }
+
+            # Route to appropriate handler
+            result = self._dispatch(function_name, arguments)
+
+            if self.result_cache:
+                self.result_cache.record(function_name, arguments, result)
+
+            return {
+                "tool_call_id": tool_call_id,
+                "function_name": function_name,
+                "result": result
+            }
+
+        except Exception as e:
+            logger.error(f"Error executing tool call: {e}")
+            return {
+                "tool_call_id": tool_call.get("id", ""),
+                "function_name": tool_call.get("function", {}).get("name", "unknown"),
+                "result": {
+                    "status": "error",
+                    "error": str(e)
+                }
+            }
+
+    async def execute_streamed_tool_calls(
+        self,
+        events: AsyncIterator[Dict[str, Any]]
+    ) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """
+        Execute tool calls from a GrokClient.stream_message event stream.
+
+        Each tool call starts as soon as the stream releases it, while the
+        model is still generating the rest of the response. A call waits only
+        for earlier calls whose resources conflict with it, and at most
+        max_concurrency calls run at once.
+
+        Args:
+            events: Async iterator of stream events
+
+        Returns:
+            Tuple of (final response dict, tool results in call order)
+        """
+        tasks: List[asyncio.Task] = []
+        resources = []
+        limit = asyncio.Semaphore(self.scheduler.max_concurrency)
+        response: Dict[str, Any] = {"status": "error", "error": "Stream ended without a response"}
+
+        async def run_after(tool_call: Dict[str, Any], before: List[asyncio.Task]) -> Dict[str, Any]:
+            if before:
+                await asyncio.wait(before)
+            async with limit:
+                return await asyncio.to_thread(self._execute_tool_call, tool_call)
+
+        try:
+            async for event in events:
+                if event["type"] == "tool_call":
+                    tool_call = event["tool_call"]
+                    resource = self._classify(tool_call)
+                    before = [task for task, other in zip(tasks, resources) if resource.conflicts_with(other)]
+                    logger.info(
+                        f"Starting streamed tool call: {tool_call.get('function', {}).get('name', '')} "
+                        f"({resource.label}, waits for {len(before)})"
+                    )
+                    tasks.append(asyncio.create_task(run_after(tool_call, before)))
+                    resources.append(resource)
+                elif event["type"] == "done":
+                    response = event["response"]
+        finally:
+            results = list(await asyncio.gather(*tasks)) if tasks else []
+
+        return response, results
 
     def _execute_bash(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -112,16 +219,16 @@ class ToolExecutor:
         if not command:
             return {"status": "error", "error": "No command provided"}
 
-        # Calculate safety score
-        safety_score = config.get_command_safety_score(command)
-        risk_level = "LOW" if safety_score <= 30 else "MEDIUM" if safety_score <= 70 else "HIGH"
+        # Calculate safety score (single pass over the command, memoized)
+        verdict = get_safety_policy().evaluate(command)
+        safety_score = verdict.score
+        risk_level = verdict.risk_level
 
         # Log safety assessment
         logger.info(f"Command safety score: {safety_score}/100 (risk: {risk_level}) - {command}")
 
         # SECURITY: Sanitize input to prevent shell injection
-        dangerous_chars = [';', '&', '|', '<', '>', '$', '`', '\\', '\n']
-        if any(char in command for char in dangerous_chars):
+        if verdict.shell_metachars:
             logger.error(f"Command contains dangerous shell metacharacters: {command}")
             return {
                 "status": "error",
@@ -131,7 +238,7 @@ class ToolExecutor:
             }
 
         # Determine if confirmation is needed
-        needs_confirmation = config.requires_confirmation(command)
+        needs_confirmation = config.REQUIRE_CONFIRMATION or verdict.requires_confirmation
 
         # Confirm if required
         if needs_confirmation:
@@ -163,15 +270,24 @@ class ToolExecutor:
                     "safety_score": safety_score
                 }
 
-            # Execute with shell=False (SECURE: no shell interpretation)
-            result = subprocess.run(
-                argv,  # List of arguments instead of string
-                shell=False,  # SECURE: Prevents shell injection
-                capture_output=True,
-                text=True,
-                timeout=30,
-                env={**os.environ}  # Explicit environment passing
-            )
+            # Execute with shell=False (SECURE: no shell interpretation);
+            # output is streamed and capped, the process group is killed on timeout
+            result = self._run_python_warm(argv)
+            if result is None:
+                result = run_process_sync(
+                    argv,  # List of arguments instead of string
+                    timeout=30,
+                    env={**os.environ}  # Explicit environment passing
+                )
+
+            if result.timed_out:
+                return {
+                    "status": "error",
+                    "error": "Command timed out (30s limit)",
+                    "stdout": result.stdout,
+                    "stderr": result.stderr,
+                    "safety_score": safety_score
+                }
 
             return {
                 "status": "success",
@@ -179,16 +295,11 @@ class ToolExecutor:
                 "stdout": result.stdout,
                 "stderr": result.stderr,
                 "returncode": result.returncode,
+                "truncated": result.truncated,
                 "safety_score": safety_score,
                 "risk_level": risk_level
             }
 
-        except subprocess.TimeoutExpired:
-            return {
-                "status": "error",
-                "error": "Command timed out (30s limit)",
-                "safety_score": safety_score
-            }
         except FileNotFoundError:
             # Command not found in PATH
             return {
@@ -204,6 +315,43 @@ class ToolExecutor:
                 "safety_score": safety_score
             }
 
+    def _run_python_warm(self, argv: List[str]):
+        """
+        Run `python script.py` / `python -c` on a warm worker; None if not applicable.
+
+        Only used when the worker would behave like the cold path: same
+        interpreter and same startup environment. The job gets the full
+        environment the cold path would pass.
+        """
+        job = python_job(argv) if WORKER_POOL_ENABLED else None
+        if job is None:
+            return None
+        env = {**os.environ}
+        try:
+            pool = get_worker_pool()
+            if not pool.can_run(argv[0], env):
+                return None
+            return pool.run_job({**job, "env": env}, timeout=30)
+        except RuntimeError as e:
+            logger.warning(f"Warm worker unavailable, spawning interpreter: {e}")
+            return None
+
+    def _dispatch(self, function_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Route a tool call by name (dict lookups; registry tools import on first use)."""
+        handler = self._handlers.get(function_name)
+        if handler is not None:
+            return handler(arguments)
+
+        spec = self.registry.get(function_name)
+        if spec is None:
+            return {
+                "status": "error",
+                "error": f"Unknown tool: {function_name}"
+            }
+        if spec.entry_point:
+            return self.registry.dispatch(function_name, **arguments)
+        return execute_custom_tool(function_name, **arguments)
+
     def _execute_computer(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """
         Execute computer control actions (mouse, keyboard, etc.).
@@ -219,124 +367,130 @@ class ToolExecutor:
         if not action:
             return {"status": "error", "error": "No action specified"}
 
+        handler = self._computer_actions.get(action)
+        if handler is None:
+            return {
+                "status": "error",
+                "error": f"Unknown computer action: {action}"
+            }
+
         try:
-            # Mouse actions
-            if action == "mouse_move":
-                coordinate = arguments.get("coordinate", [])
-                if len(coordinate) != 2:
-                    return {"status": "error", "error": "Invalid coordinate"}
+            return handler(arguments)
+
+        except Exception as e:
+            logger.error(f"Error executing computer action: {e}")
+            return {
+                "status": "error",
+                "error": str(e),
+                "action": action
+            }
 
-                x, y = coordinate
-                pyautogui.moveTo(x, y, duration=0.2)
-                logger.info(f"Mouse moved to ({x}, {y})")
+    # Mouse actions
 
-                return {
-                    "status": "success",
-                    "action": "mouse_move",
-                    "coordinate": [x, y]
-                }
+    def _mouse_move(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        coordinate = arguments.get("coordinate", [])
+        if len(coordinate) != 2:
+            return {"status": "error", "error": "Invalid coordinate"}
 
-            elif action == "left_click":
-                coordinate = arguments.get("coordinate")
+        x, y = coordinate
+        _gui().moveTo(x, y, duration=0.2)
+        logger.info(f"Mouse moved to ({x}, {y})")
 
-                # Confirm if required
-                if self.require_confirmation:
-                    msg = f"Click at {coordinate}" if coordinate else "Click at current position"
-                    confirm = self._confirm_action(msg)
-                    if not confirm:
-                        return {"status": "cancelled", "message": "User cancelled click"}
+        return {
+            "status": "success",
+            "action": "mouse_move",
+            "coordinate": [x, y]
+        }
 
-                if coordinate and len(coordinate) == 2:
-                    x, y = coordinate
-                    pyautogui.click(x, y)
-                    logger.info(f"Left click at ({x}, {y})")
-                else:
-                    pyautogui.click()
-                    logger.info("Left click at current position")
+    def _left_click(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        coordinate = arguments.get("coordinate")
 
-                return {"status": "success", "action": "left_click"}
+        # Confirm if required
+        if self.require_confirmation:
+            msg = f"Click at {coordinate}" if coordinate else "Click at current position"
+            confirm = self._confirm_action(msg)
+            if not confirm:
+                return {"status": "cancelled", "message": "User cancelled click"}
 
-            elif action == "right_click":
-                coordinate = arguments.get("coordinate")
+        if coordinate and len(coordinate) == 2:
+            x, y = coordinate
+            _gui().click(x, y)
+            logger.info(f"Left click at ({x}, {y})")
+        else:
+            _gui().click()
+            logger.info("Left click at current position")
 
-                if coordinate and len(coordinate) == 2:
-                    x, y = coordinate
-                    pyautogui.rightClick(x, y)
-                    logger.info(f"Right click at ({x}, {y})")
-                else:
-                    pyautogui.rightClick()
-                    logger.info("Right click at current position")
+        return {"status": "success", "action": "left_click"}
 
-                return {"status": "success", "action": "right_click"}
+    def _right_click(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        coordinate = arguments.get("coordinate")
 
-            elif action == "double_click":
-                coordinate = arguments.get("coordinate")
+        if coordinate and len(coordinate) == 2:
+            x, y = coordinate
+            _gui().rightClick(x, y)
+            logger.info(f"Right click at ({x}, {y})")
+        else:
+            _gui().rightClick()
+            logger.info("Right click at current position")
 
-                if coordinate and len(coordinate) == 2:
-                    x, y = coordinate
-                    pyautogui.doubleClick(x, y)
-                    logger.info(f"Double click at ({x}, {y})")
-                else:
-                    pyautogui.doubleClick()
-                    logger.info("Double click at current position")
+        return {"status": "success", "action": "right_click"}
 
-                return {"status": "success", "action": "double_click"}
+    def _double_click(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        coordinate = arguments.get("coordinate")
 
-            elif action == "type":
-                text = arguments.get("text", "")
+        if coordinate and len(coordinate) == 2:
+            x, y = coordinate
+            _gui().doubleClick(x, y)
+            logger.info(f"Double click at ({x}, {y})")
+        else:
+            _gui().doubleClick()
+            logger.info("Double click at current position")
 
-                if not text:
-                    return {"status": "error", "error": "No text provided"}
+        return {"status": "success", "action": "double_click"}
 
-                pyautogui.typewrite(text, interval=0.05)
-                logger.info(f"Typed text: {text[:50]}...")
+    # Keyboard actions
 
-                return {
-                    "status": "success",
-                    "action": "type",
-                    "text": text
-                }
+    def _type_text(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        text = arguments.get("text", "")
 
-            elif action == "key":
-                key = arguments.get("text", "")
+        if not text:
+            return {"status": "error", "error": "No text provided"}
 
-                if not key:
-                    return {"status": "error", "error": "No key specified"}
+        _gui().typewrite(text, interval=0.05)
+        logger.info(f"Typed text: {text[:50]}...")
 
-                pyautogui.press(key)
-                logger.info(f"Pressed key: {key}")
+        return {
+            "status": "success",
+            "action": "type",
+            "text": text
+        }
 
-                return {"status": "success", "action": "key", "key": key}
+    def _press_key(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        key = arguments.get("text", "")
 
-            elif action == "scroll":
-                amount = arguments.get("amount", 0)
+        if not key:
+            return {"status": "error", "error": "No key specified"}
 
-                pyautogui.scroll(amount)
-                logger.info(f"Scrolled: {amount}")
+        _gui().press(key)
+        logger.info(f"Pressed key: {key}")
 
-                return {"status": "success", "action": "scroll", "amount": amount}
+        return {"status": "success", "action": "key", "key": key}
 
-            elif action == "screenshot":
-                # This is handled by screen_observer, return success
-                return {
-                    "status": "success",
-                    "action": "screenshot",
-                    "message": "Screenshot is handled by observer"
-                }
+    def _scroll(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        amount = arguments.get("amount", 0)
 
-            else:
-                return {
-                    "status": "error",
-                    "error": f"Unknown computer action: {action}"
-                }
+        _gui().scroll(amount)
+        logger.info(f"Scrolled: {amount}")
 
-        except Exception as e:
-            logger.error(f"Error executing computer action: {e}")
-            return {
-                "status": "error",
-                "error": str(e),
-                "action": action
-            }
+        return {"status": "success", "action": "scroll", "amount": amount}
+
+    def _screenshot(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        # This is handled by screen_observer, return success
+        return {
+            "status": "success",
+            "action": "screenshot",
+            "message": "Screenshot is handled by observer"
+        }
 
     def _confirm_action(self, message: str) -> bool:
         """
@@ -349,7 +503,8 @@ class ToolExecutor:
             True if confirmed, False otherwise
         """
         try:
-            response = input(f"\n[CONFIRM] {message}\nConfirm? (y/n): ").strip().lower()
+            with self._confirm_lock:
+                response = input(f"\n[CONFIRM] {message}\nConfirm? (y/n): ").strip().lower()
             return response in ['y', 'yes']
         except (KeyboardInterrupt, EOFError):
             return False
@@ -5,13 +5,26 @@ Uses xAI's OpenAI-compatible API to communicate with Grok.
 Async-ready for multi-agent swarm operations.
 """
 
+import hashlib
 import logging
-from typing import List, Dict, Any, Optional
-from openai import AsyncOpenAI
+import time
+from typing import List, Dict, Any, Optional, AsyncIterator
 from src import config
+from src.core.message_bus import MessagePriority
+from src.llm.client_registry import get_client_registry
+from src.llm.hedging import get_hedger
+from src.llm.history import TokenCounter
+from src.llm.images import ImageBudget, ImageEncoder, image_part
+from src.llm.model_router import get_model_router
+from src.llm.prompt_builder import get_prompt_builder
+from src.llm.rate_limiter import get_rate_limiter, priority_for_agent
+from src.llm.response_cache import get_response_cache, is_cacheable
+from src.llm.streaming import ToolCallAccumulator
 
 logger = logging.getLogger(__name__)
 
+_token_counter = TokenCounter()
+
 
 class GrokClient:
     """
@@ -24,7 +37,11 @@ class GrokClient:
         self,
         api_key: Optional[str] = None,
         base_url: Optional[str] = None,
-        model: Optional[str] = None
+        model: Optional[str] = None,
+        agent_id: str = "grokputer",
+        priority: Optional[MessagePriority] = None,
+        hedge: Optional[bool] = None,
+        route: Optional[bool] = None
     ):
         """
         Initialize the Grok client.
@@ -33,82 +50,421 @@ class GrokClient:
             api_key: xAI API key (defaults to config.XAI_API_KEY)
             base_url: API base URL (defaults to config.XAI_BASE_URL)
             model: Model name (defaults to config.GROK_MODEL)
+            agent_id: Caller identity for per-agent concurrency quotas
+            priority: Rate-limiter queue priority (defaults by agent_id)
+            hedge: Hedge slow completions with a duplicate request (defaults to config.LLM_HEDGE_ENABLED)
+            route: Pick the model per request by task class/size (defaults to config.LLM_ROUTING_ENABLED)
         """
         self.api_key = api_key or config.XAI_API_KEY
         self.base_url = base_url or config.XAI_BASE_URL
         self.model = model or config.GROK_MODEL
+        self.agent_id = agent_id
+        self.priority = priority if priority is not None else priority_for_agent(agent_id)
 
-        # Initialize AsyncOpenAI client pointing to xAI
-        self.client = AsyncOpenAI(
-            api_key=self.api_key,
-            base_url=self.base_url
-        )
+        # Shared AsyncOpenAI clients (one connection pool per event loop, see `client`)
+        self.registry = get_client_registry()
+
+        # Process-wide RPM/TPM limiter and retry scheduler
+        self.rate_limiter = get_rate_limiter()
+
+        # Tail-latency hedging (latency stats shared process-wide)
+        self.hedger = get_hedger() if (config.LLM_HEDGE_ENABLED if hedge is None else hedge) else None
+
+        # Per-request model selection (learned latency/success shared process-wide)
+        self.router = get_model_router() if (config.LLM_ROUTING_ENABLED if route is None else route) else None
+
+        # Downscaled screenshot encoding and per-request image dedupe/budget
+        self.image_encoder = ImageEncoder()
+        self.image_budget = ImageBudget()
+
+        # Byte-stable system/tools prefix so provider prompt caching can hit
+        self.prompt_builder = get_prompt_builder()
+
+        # Response cache (memory LRU + SQLite), shared process-wide
+        self.cache = get_response_cache() if config.LLM_CACHE_ENABLED else None
 
         logger.info(f"Initialized async Grok client: model={self.model}, base_url={self.base_url}")
 
     async def create_message(
         self,
-        task: str,
+        task: Optional[str],
         screenshot_base64: Optional[str] = None,
-        conversation_history: Optional[List[Dict[str, Any]]] = None
+        conversation_history: Optional[List[Dict[str, Any]]] = None,
+        use_cache: bool = True,
+        cache_ttl: Optional[float] = None,
+        task_class: Optional[str] = None,
+        temperature: float = 0.7,
+        use_tools: bool = True
     ) -> Dict[str, Any]:
         """
         Send a message to Grok with optional screenshot and get a response (async).
 
         Args:
-            task: The task description/prompt
+            task: The task description/prompt (None when conversation_history
+                already ends with the user turn, see user_message)
             screenshot_base64: Base64-encoded screenshot (optional)
             conversation_history: Previous conversation messages (optional)
+            use_cache: Serve/store identical requests from the response cache
+            cache_ttl: Override the cache TTL for this call (seconds)
+            task_class: Routing/hedging class, e.g. "screen_check" or "planning"
+                (defaults to "vision" with a screenshot, else "reasoning")
+            temperature: Sampling temperature
+            use_tools: Offer the tool schemas; analysis-only prompts pass False
+                (with no tools, or at temperature 0, replies are cacheable)
 
         Returns:
             Response from Grok API
         """
         try:
-            messages = []
+            messages = self._build_messages(task, screenshot_base64, conversation_history)
 
-            # Add system prompt
-            messages.append({
-                "role": "system",
-                "content": config.SYSTEM_PROMPT
-            })
+            logger.info(f"Sending async message to Grok: task='{(task or '(from history)')[:50]}...'")
 
-            # Add conversation history if provided
-            if conversation_history:
-                messages.extend(conversation_history)
+            return await self._complete(messages, use_cache=use_cache, cache_ttl=cache_ttl,
+                                        cache_context=self._frame_context(screenshot_base64),
+                                        temperature=temperature, use_tools=use_tools,
+                                        prompt_class=task_class or self._task_class(screenshot_base64))
 
-            # Build user message
-            user_content = f"Task: {task}"
+        except Exception as e:
+            logger.error(f"Error calling Grok API: {e}")
+            return {
+                "status": "error",
+                "error": str(e)
+            }
 
-            # Add screenshot if provided
-            if screenshot_base64:
-                user_content += f"\n\nScreen observation available (base64): {screenshot_base64[:24]}..."
 
-            messages.append({
-                "role": "user",
-                "content": user_content
-            })
+    @property
+    def client(self):
+        """Shared AsyncOpenAI client for the running event loop."""
+        return self.registry.get_async_client(
+            api_key=self.api_key,
+            base_url=self.base_url,
+            model=self.model
+        )
 
-            logger.info(f"Sending async message to Grok: task='{task[:50]}...'")
+    def user_message(self, task: str, screenshot_base64: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Build a task turn's user message (screenshot as a compressed image part).
 
-            # Make async API call
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                tools=config.TOOLS if config.TOOLS else None,
-                temperature=0.7,
-                max_tokens=4096
-            )
+        The same frame always encodes to the same image part, so repeated
+        frames in a conversation are deduped by the image budget.
+        """
+        user_content: Any = f"Task: {task}"
+        if screenshot_base64:
+            user_content = [
+                {"type": "text", "text": user_content},
+                image_part(self.image_encoder.encode(screenshot_base64))
+            ]
+        return {"role": "user", "content": user_content}
+
+    @staticmethod
+    def tool_messages(tool_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Chat messages answering executed tool calls."""
+        return [
+            {
+                "role": "tool",
+                "tool_call_id": result.get("tool_call_id", ""),
+                "content": str(result.get("result", ""))
+            }
+            for result in tool_results
+        ]
 
-            logger.info(f"Received response from Grok: {response.id}")
+    def _build_messages(
+        self,
+        task: Optional[str],
+        screenshot_base64: Optional[str] = None,
+        conversation_history: Optional[List[Dict[str, Any]]] = None
+    ) -> List[Dict[str, Any]]:
+        """Build the message list for a task turn (static prefix + dynamic suffix)."""
+        messages = []
 
-            return self._parse_response(response)
+        # Add conversation history if provided
+        if conversation_history:
+            messages.extend(conversation_history)
+
+        if task is not None:
+            messages.append(self.user_message(task, screenshot_base64))
+
+        return self.prompt_builder.build(self.image_budget.apply(messages))
+
+    @staticmethod
+    def _task_class(screenshot_base64: Optional[str]) -> str:
+        return "vision" if screenshot_base64 else "reasoning"
+
+    @staticmethod
+    def _frame_context(screenshot_base64: Optional[str]) -> Dict[str, Any]:
+        """Cache-key context for the source frame (the prompt carries a re-encoded copy)."""
+        frame_hash = hashlib.sha256(screenshot_base64.encode()).hexdigest() if screenshot_base64 else None
+        return {"frame": frame_hash}
+
+    @staticmethod
+    def _latest_frame_hash(messages: List[Dict[str, Any]]) -> Optional[str]:
+        """Hash of the newest image in the prompt (the frame a follow-up turn acts on)."""
+        for message in reversed(messages):
+            content = message.get("content")
+            if not isinstance(content, list):
+                continue
+            for part in reversed(content):
+                if isinstance(part, dict) and part.get("type") == "image_url":
+                    url = (part.get("image_url") or {}).get("url", "")
+                    return hashlib.sha256(url.encode()).hexdigest()
+        return None
+
+    def _cache_key(
+        self,
+        cache,
+        model: str,
+        messages: List[Dict[str, Any]],
+        tools: Optional[List[Dict[str, Any]]],
+        temperature: float,
+        max_tokens: int,
+        cache_context: Optional[Dict[str, Any]]
+    ) -> Optional[str]:
+        """Cache key for a request, or None when it must not be cached."""
+        if cache is None or not is_cacheable(temperature, tools):
+            return None
+        # Every key names the frame the response was made for (follow-ups: the newest image)
+        context = dict(cache_context or {})
+        if context.get("frame") is None:
+            context["frame"] = self._latest_frame_hash(messages)
+        return cache.make_key(model, messages, tools, temperature, max_tokens=max_tokens, **context)
+
+    async def stream_message(
+        self,
+        task: Optional[str],
+        screenshot_base64: Optional[str] = None,
+        conversation_history: Optional[List[Dict[str, Any]]] = None,
+        use_cache: bool = True,
+        cache_ttl: Optional[float] = None,
+        task_class: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming variant of create_message (async generator).
+
+        Yields content deltas as they arrive and each tool call as soon as
+        its JSON arguments are complete, so execution can begin before the
+        model finishes. Ends with a "done" event carrying the same dict
+        create_message would return. See src.llm.streaming for the event shapes.
+        """
+        messages = self._build_messages(task, screenshot_base64, conversation_history)
+        async for event in self._stream(messages, use_cache=use_cache, cache_ttl=cache_ttl,
+                                        cache_context=self._frame_context(screenshot_base64),
+                                        prompt_class=task_class or self._task_class(screenshot_base64)):
+            yield event
+
+    async def _stream(
+        self,
+        messages: List[Dict[str, Any]],
+        use_cache: bool = True,
+        cache_ttl: Optional[float] = None,
+        cache_context: Optional[Dict[str, Any]] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 4096,
+        prompt_class: str = "reasoning"
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Run a streamed chat completion, replaying cache hits as events."""
+        tools = self.prompt_builder.tools
+        cache = self.cache if use_cache else None
+
+        estimated_tokens = self._estimate_tokens(messages)
+        # Streams can't fall back mid-response, so only the preferred model is used
+        decision = self.router.route(prompt_class, estimated_tokens) if self.router else None
+        model = decision.model if decision else self.model
+
+        cache_key = self._cache_key(cache, model, messages, tools, temperature, max_tokens, cache_context)
+        if cache_key is not None:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                if cached.get("content"):
+                    yield {"type": "content", "delta": cached["content"]}
+                for tool_call in cached.get("tool_calls", []):
+                    yield {"type": "tool_call", "tool_call": tool_call}
+                yield {"type": "done", "response": {**cached, "cached": True}}
+                return
+
+        accumulator = ToolCallAccumulator()
+        content_parts = []
+
+        result = {"status": "success", "response_id": None, "model": model,
+                  "finish_reason": None, "content": None, "tool_calls": []}
+
+        try:
+            start_time = time.time()
+            first_token_time = None
+
+            async with self.registry.slot(self.agent_id):
+                # Only opening the stream is retried; a stream that fails midway surfaces as an error
+                stream = await self.rate_limiter.run(
+                    lambda: self.client.chat.completions.create(
+                        model=model,
+                        messages=messages,
+                        tools=tools,
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                        stream=True,
+                        stream_options={"include_usage": True}
+                    ),
+                    priority=self.priority,
+                    estimated_tokens=estimated_tokens
+                )
+
+                async for chunk in stream:
+                    result["response_id"] = result["response_id"] or chunk.id
+                    result["model"] = chunk.model or result["model"]
+                    if getattr(chunk, "usage", None):
+                        result["usage"] = self.prompt_builder.record_usage(chunk.usage)
+                    if not chunk.choices:
+                        continue
+
+                    choice = chunk.choices[0]
+                    delta = choice.delta
+                    if choice.finish_reason:
+                        result["finish_reason"] = choice.finish_reason
+
+                    if first_token_time is None:
+                        first_token_time = time.time() - start_time
+
+                    if delta is not None and delta.content:
+                        content_parts.append(delta.content)
+                        yield {"type": "content", "delta": delta.content}
+
+                    for tool_call in accumulator.feed(getattr(delta, "tool_calls", None)):
+                        yield {"type": "tool_call", "tool_call": tool_call}
+
+            for tool_call in accumulator.flush():
+                yield {"type": "tool_call", "tool_call": tool_call}
+
+            self._record_tokens(estimated_tokens, result.get("usage"))
+            latency = time.time() - start_time
+            logger.info(
+                f"Streamed response from Grok: {result['response_id']} "
+                f"(first token {first_token_time or 0:.2f}s, total {latency:.2f}s)"
+            )
 
         except Exception as e:
-            logger.error(f"Error calling Grok API: {e}")
-            return {
-                "status": "error",
-                "error": str(e)
-            }
+            logger.error(f"Error streaming from Grok API: {e}")
+            if decision:
+                self.router.record(model, decision, time.time() - start_time, False)
+            yield {"type": "error", "error": str(e)}
+            yield {"type": "done", "response": {"status": "error", "error": str(e)}}
+            return
+
+        result["content"] = "".join(content_parts) if content_parts else None
+        result["tool_calls"] = accumulator.completed
+        if result["tool_calls"]:
+            logger.info(f"Grok requested {len(result['tool_calls'])} tool calls")
+        if decision:
+            self.router.record(model, decision, latency, True)
+
+        if cache_key is not None:
+            cache.put(cache_key, result, latency, ttl=cache_ttl)
+
+        yield {"type": "done", "response": result}
+
+    async def _complete(
+        self,
+        messages: List[Dict[str, Any]],
+        use_cache: bool = True,
+        cache_ttl: Optional[float] = None,
+        cache_context: Optional[Dict[str, Any]] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 4096,
+        prompt_class: str = "reasoning",
+        use_tools: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Run a chat completion, consulting the response cache first.
+
+        Only successful responses are cached. Cache hits are marked with
+        "cached": True. `cache_context` adds request state that is not
+        visible in `messages` (e.g. the full screenshot hash) to the key.
+        `prompt_class` selects the model route and the hedging latency class;
+        with routing enabled, failed calls fall back to the next candidate model.
+        Keys name the model: hits are looked up for the routed model and
+        replies are stored under the model that actually answered.
+        """
+        tools = self.prompt_builder.tools if use_tools else None
+        cache = self.cache if use_cache else None
+
+        estimated_tokens = self._estimate_tokens(messages)
+        decision = self.router.route(prompt_class, estimated_tokens) if self.router else None
+
+        cache_key = self._cache_key(cache, decision.model if decision else self.model, messages, tools,
+                                    temperature, max_tokens, cache_context)
+        if cache_key is not None:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"Response cache hit: {cache_key[:12]}...")
+                return {**cached, "cached": True}
+
+        for model in (decision.candidates if decision else [self.model]):
+            start_time = time.time()
+            try:
+                response = await self._call_model(model, messages, tools, temperature, max_tokens,
+                                                  prompt_class, estimated_tokens)
+            except Exception as e:
+                if decision is None:
+                    raise
+                self.router.record(model, decision, time.time() - start_time, False)
+                if model == decision.candidates[-1]:
+                    raise
+                logger.warning(f"{model} failed for {prompt_class} ({e}); falling back")
+                continue
+            latency = time.time() - start_time
+            if decision:
+                self.router.record(model, decision, latency, True)
+            break
+
+        logger.info(f"Received response from Grok: {response.id} ({latency:.2f}s)")
+
+        result = self._parse_response(response)
+        self._record_tokens(estimated_tokens, result.get("usage"))
+        if cache_key is not None and result.get("status") == "success":
+            cache_key = self._cache_key(cache, model, messages, tools, temperature, max_tokens, cache_context)
+            cache.put(cache_key, result, latency, ttl=cache_ttl)
+
+        return result
+
+    async def _call_model(
+        self,
+        model: str,
+        messages: List[Dict[str, Any]],
+        tools: Optional[List[Dict[str, Any]]],
+        temperature: float,
+        max_tokens: int,
+        prompt_class: str,
+        estimated_tokens: int
+    ) -> Any:
+        """One model's completion under the rate limiter (and hedger, if enabled)."""
+        def limited_call(on_dispatch=None):
+            async def call():
+                async with self.registry.slot(self.agent_id):
+                    # Hedging latency starts here, after the limiter and slot queues
+                    if on_dispatch is not None:
+                        on_dispatch()
+                    return await self.client.chat.completions.create(
+                        model=model,
+                        messages=messages,
+                        tools=tools,
+                        temperature=temperature,
+                        max_tokens=max_tokens
+                    )
+
+            return self.rate_limiter.run(call, priority=self.priority, estimated_tokens=estimated_tokens)
+
+        if self.hedger is not None:
+            return await self.hedger.run(limited_call, route=(model, prompt_class), track_dispatch=True)
+        return await limited_call()
+
+    @staticmethod
+    def _estimate_tokens(messages: List[Dict[str, Any]]) -> int:
+        """Rough prompt size for the TPM bucket (reconciled once usage arrives)."""
+        return sum(_token_counter.count(message) for message in messages)
+
+    def _record_tokens(self, estimated_tokens: int, usage: Optional[Dict[str, int]]):
+        if usage:
+            actual = usage.get("prompt_tokens", 0) + usage.get("completion_tokens", 0)
+            self.rate_limiter.record_usage(estimated_tokens, actual)
 
     def _parse_response(self, response: Any) -> Dict[str, Any]:
         """
@@ -130,7 +486,8 @@ class GrokClient:
                 "model": response.model,
                 "finish_reason": choice.finish_reason,
                 "content": message.content,
-                "tool_calls": []
+                "tool_calls": [],
+                "usage": self.prompt_builder.record_usage(getattr(response, "usage", None))
             }
 
             # Parse tool calls if present
@@ -159,42 +516,32 @@ class GrokClient:
     async def continue_conversation(
         self,
         tool_results: List[Dict[str, Any]],
-        conversation_history: List[Dict[str, Any]]
+        conversation_history: List[Dict[str, Any]],
+        use_cache: bool = True,
+        cache_ttl: Optional[float] = None
     ) -> Dict[str, Any]:
         """
         Continue the conversation after tool execution (async).
 
         Args:
-            tool_results: Results from executed tools
+            tool_results: Results from executed tools (empty when
+                conversation_history already holds their tool_messages)
             conversation_history: Previous conversation messages
+            use_cache: Serve/store identical requests from the response cache
+            cache_ttl: Override the cache TTL for this call (seconds)
 
         Returns:
             Next response from Grok
         """
         try:
-            messages = [{"role": "system", "content": config.SYSTEM_PROMPT}]
-            messages.extend(conversation_history)
+            messages = list(conversation_history) + self.tool_messages(tool_results)
 
-            # Add tool results as assistant messages
-            for result in tool_results:
-                messages.append({
-                    "role": "tool",
-                    "tool_call_id": result.get("tool_call_id", ""),
-                    "content": str(result.get("result", ""))
-                })
+            messages = self.prompt_builder.build(self.image_budget.apply(messages))
 
             logger.info(f"Continuing conversation with {len(tool_results)} tool results")
 
-            # Make async API call
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                tools=config.TOOLS if config.TOOLS else None,
-                temperature=0.7,
-                max_tokens=4096
-            )
-
-            return self._parse_response(response)
+            return await self._complete(messages, use_cache=use_cache, cache_ttl=cache_ttl,
+                                        prompt_class="tool_followup")
 
         except Exception as e:
             logger.error(f"Error continuing conversation: {e}")
@@ -203,6 +550,18 @@ class GrokClient:
                 "error": str(e)
             }
 
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache, pool, rate limiter, hedging, routing, image and prompt prefix statistics."""
+        return {
+            "response_cache": self.cache.get_stats() if self.cache else None,
+            "client_registry": self.registry.get_stats(),
+            "rate_limiter": self.rate_limiter.get_stats(),
+            "hedging": self.hedger.get_stats() if self.hedger else None,
+            "routing": self.router.get_stats() if self.router else None,
+            "images": {**self.image_encoder.get_stats(), **self.image_budget.get_stats()},
+            "prompt_prefix": self.prompt_builder.get_stats()
+        }
+
     async def test_connection(self) -> bool:
         """
         Test the connection to Grok API (async).
@@ -213,14 +572,31 @@ class GrokClient:
         try:
             logger.info("Testing Grok API connection...")
 
+            messages = [{"role": "user", "content": "Hello, Grok. This is a connection test."}]
+
+            # A recent successful ping against the same endpoint/model is good enough
+            cache_key = None
+            if self.cache is not None:
+                cache_key = self.cache.make_key(self.model, messages, base_url=self.base_url, ping=True)
+                if self.cache.get(cache_key) is not None:
+                    logger.info("Grok API connection verified recently (cached)")
+                    return True
+
             # Make async API call
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "user", "content": "Hello, Grok. This is a connection test."}
-                ],
-                max_tokens=50
-            )
+            async def call():
+                async with self.registry.slot(self.agent_id):
+                    return await self.client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        max_tokens=50
+                    )
+
+            start_time = time.time()
+            await self.rate_limiter.run(call, priority=self.priority, estimated_tokens=50)
+
+            if self.cache is not None:
+                self.cache.put(cache_key, {"status": "success"}, time.time() - start_time,
+                               ttl=config.LLM_CACHE_PING_TTL)
 
             logger.info("Grok API connection successful")
             return True
@@ -0,0 +1,30 @@
+"""
+Shared LLM infrastructure: pooled clients and request-path helpers used by
+GrokClient and the collaboration agents.
+"""
+
+from .client_registry import ClientRegistry, get_client_registry
+from .hedging import Hedger, get_hedger
+from .history import ConversationHistory, TokenCounter
+from .model_router import ModelRouter, RouteDecision, get_model_router
+from .prompt_builder import PromptBuilder, get_prompt_builder
+from .rate_limiter import RateLimiter, get_rate_limiter
+from .response_cache import ResponseCache, get_response_cache
+
+__all__ = [
+    "ClientRegistry",
+    "get_client_registry",
+    "Hedger",
+    "get_hedger",
+    "ConversationHistory",
+    "TokenCounter",
+    "ModelRouter",
+    "RouteDecision",
+    "get_model_router",
+    "PromptBuilder",
+    "get_prompt_builder",
+    "RateLimiter",
+    "get_rate_limiter",
+    "ResponseCache",
+    "get_response_cache"
+]
@@ -0,0 +1,317 @@
+"""
+Process-wide registry of pooled LLM API clients.
+
+Every agent used to build its own OpenAI/AsyncOpenAI client, each with a
+private connection pool and its own TLS handshakes. The registry hands out
+one client per (base_url, api_key, model) and backs all of them with a
+single tuned httpx pool (keep-alive, bounded connections), plus:
+
+- A global concurrency limit across all agents
+- Optional per-agent quotas (e.g. keep the Learner from hogging slots)
+- Stats showing client and connection reuse
+
+Async clients, their httpx pool and the semaphores are bound to an event
+loop, so they are kept per running loop (asyncio.run() in one mode and a
+fresh loop in the next get separate pools). Look async clients up from
+inside the loop that uses them; GrokClient does this on every request.
+
+The SDK clients are built with max_retries=0: retries belong to the
+rate limiter (src.llm.rate_limiter), which honours retry-after and
+priorities. SDK-internal retries would multiply attempts underneath it.
+
+Usage:
+    registry = get_client_registry()
+    client = registry.get_async_client(api_key, base_url, model)
+
+    async with registry.slot("observer"):
+        response = await client.chat.completions.create(...)
+"""
+
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional, Tuple
+
+import httpx
+from openai import AsyncOpenAI, OpenAI
+
+from src import config
+
+logger = logging.getLogger(__name__)
+
+ClientKey = Tuple[str, str, str]
+
+
+class _LoopState:
+    """Async resources that belong to one event loop."""
+
+    def __init__(self):
+        self.http: Optional[httpx.AsyncClient] = None
+        self.clients: Dict[ClientKey, AsyncOpenAI] = {}
+        self.global_semaphore: Optional[asyncio.Semaphore] = None
+        self.agent_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+
+class ClientRegistry:
+    """
+    Shares API clients and one HTTP connection pool across the process.
+
+    Clients are keyed by (base_url, api_key, model). Model is part of the key
+    so per-model settings can diverge later without touching call sites; all
+    entries still share the same underlying pool.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = None,
+        max_keepalive: int = None,
+        keepalive_expiry: float = None,
+        max_concurrency: int = None,
+        timeout: float = None
+    ):
+        """
+        Initialize the registry.
+
+        Args:
+            max_connections: Pool size cap (defaults to config.LLM_MAX_CONNECTIONS)
+            max_keepalive: Idle connections kept open (defaults to config.LLM_MAX_KEEPALIVE)
+            keepalive_expiry: Seconds an idle connection stays open
+            max_concurrency: Global in-flight request limit across agents
+            timeout: Default request timeout in seconds
+        """
+        self.limits = httpx.Limits(
+            max_connections=max_connections or config.LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=max_keepalive or config.LLM_MAX_KEEPALIVE,
+            keepalive_expiry=keepalive_expiry or config.LLM_KEEPALIVE_EXPIRY
+        )
+        self.max_concurrency = max_concurrency or config.LLM_MAX_CONCURRENCY
+        self.timeout = timeout or config.LLM_TIMEOUT
+
+        self._sync_http: Optional[httpx.Client] = None
+        self._sync_clients: Dict[ClientKey, OpenAI] = {}
+        self._lock = threading.Lock()
+
+        # Async pool, clients and semaphores per event loop (None = no running loop)
+        self._loop_states: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = weakref.WeakKeyDictionary()
+        self._no_loop_state = _LoopState()
+        self._quotas: Dict[str, int] = dict(config.LLM_AGENT_QUOTAS)
+
+        self.stats = {
+            "clients_created": 0,
+            "client_reuses": 0,
+            "requests": 0,
+            "connections_opened": 0,
+            "slot_waits": 0,
+            "total_slot_wait_time": 0.0,
+            "in_flight": 0,
+            "peak_in_flight": 0
+        }
+
+    # ---- Connection tracing -------------------------------------------------
+
+    def _on_connection_event(self, event_name: str):
+        if event_name == "connection.connect_tcp.complete":
+            self.stats["connections_opened"] += 1
+
+    async def _async_trace(self, event_name: str, info: Dict[str, Any]):
+        self._on_connection_event(event_name)
+
+    def _sync_trace(self, event_name: str, info: Dict[str, Any]):
+        self._on_connection_event(event_name)
+
+    async def _async_request_hook(self, request: httpx.Request):
+        self.stats["requests"] += 1
+        request.extensions["trace"] = self._async_trace
+
+    def _sync_request_hook(self, request: httpx.Request):
+        self.stats["requests"] += 1
+        request.extensions["trace"] = self._sync_trace
+
+    # ---- Client lookup ------------------------------------------------------
+
+    def _loop_state(self) -> _LoopState:
+        """State for the running event loop (caller holds self._lock or runs in the loop)."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return self._no_loop_state
+        state = self._loop_states.get(loop)
+        if state is None:
+            state = self._loop_states[loop] = _LoopState()
+        return state
+
+    def _async_pool(self, state: _LoopState) -> httpx.AsyncClient:
+        if state.http is None or state.http.is_closed:
+            state.http = httpx.AsyncClient(
+                limits=self.limits,
+                timeout=self.timeout,
+                event_hooks={"request": [self._async_request_hook]}
+            )
+        return state.http
+
+    def _sync_pool(self) -> httpx.Client:
+        if self._sync_http is None or self._sync_http.is_closed:
+            self._sync_http = httpx.Client(
+                limits=self.limits,
+                timeout=self.timeout,
+                event_hooks={"request": [self._sync_request_hook]}
+            )
+        return self._sync_http
+
+    def get_async_client(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        model: Optional[str] = None
+    ) -> AsyncOpenAI:
+        """Get the shared AsyncOpenAI client for this key/endpoint/model in the running loop."""
+        key = (base_url or config.XAI_BASE_URL, api_key or config.XAI_API_KEY, model or config.GROK_MODEL)
+
+        with self._lock:
+            state = self._loop_state()
+            client = state.clients.get(key)
+            if client is not None:
+                self.stats["client_reuses"] += 1
+                return client
+
+            client = AsyncOpenAI(
+                api_key=key[1],
+                base_url=key[0],
+                http_client=self._async_pool(state),
+                max_retries=0,
+                timeout=self.timeout
+            )
+            state.clients[key] = client
+            self.stats["clients_created"] += 1
+
+        logger.info(f"[ClientRegistry] Created async client: model={key[2]}, base_url={key[0]}")
+        return client
+
+    def get_sync_client(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        model: Optional[str] = None
+    ) -> OpenAI:
+        """Get the shared sync OpenAI client for this key/endpoint/model."""
+        key = (base_url or config.XAI_BASE_URL, api_key or config.XAI_API_KEY, model or config.GROK_MODEL)
+
+        with self._lock:
+            client = self._sync_clients.get(key)
+            if client is not None:
+                self.stats["client_reuses"] += 1
+                return client
+
+            client = OpenAI(
+                api_key=key[1],
+                base_url=key[0],
+                http_client=self._sync_pool(),
+                max_retries=0,
+                timeout=self.timeout
+            )
+            self._sync_clients[key] = client
+            self.stats["clients_created"] += 1
+
+        logger.info(f"[ClientRegistry] Created sync client: model={key[2]}, base_url={key[0]}")
+        return client
+
+    # ---- Concurrency control ------------------------------------------------
+
+    def set_quota(self, agent_id: str, max_in_flight: int):
+        """Cap concurrent requests for a single agent."""
+        self._quotas[agent_id] = max_in_flight
+        with self._lock:
+            for state in [self._no_loop_state, *self._loop_states.values()]:
+                state.agent_semaphores.pop(agent_id, None)
+
+    @asynccontextmanager
+    async def slot(self, agent_id: str = "default"):
+        """
+        Reserve a request slot under the global limit and the agent's quota.
+
+        The agent quota is acquired first so an agent at its quota does not
+        hold a global slot while it waits.
+        """
+        with self._lock:
+            state = self._loop_state()
+            if state.global_semaphore is None:
+                state.global_semaphore = asyncio.Semaphore(self.max_concurrency)
+            global_semaphore = state.global_semaphore
+
+            agent_semaphore = None
+            if agent_id in self._quotas:
+                agent_semaphore = state.agent_semaphores.get(agent_id)
+                if agent_semaphore is None:
+                    agent_semaphore = asyncio.Semaphore(self._quotas[agent_id])
+                    state.agent_semaphores[agent_id] = agent_semaphore
+
+        start = time.time()
+        if agent_semaphore is not None:
+            await agent_semaphore.acquire()
+        try:
+            await global_semaphore.acquire()
+        except BaseException:
+            if agent_semaphore is not None:
+                agent_semaphore.release()
+            raise
+
+        waited = time.time() - start
+        if waited > 0.001:
+            self.stats["slot_waits"] += 1
+            self.stats["total_slot_wait_time"] += waited
+
+        self.stats["in_flight"] += 1
+        self.stats["peak_in_flight"] = max(self.stats["peak_in_flight"], self.stats["in_flight"])
+        try:
+            yield
+        finally:
+            self.stats["in_flight"] -= 1
+            global_semaphore.release()
+            if agent_semaphore is not None:
+                agent_semaphore.release()
+
+    # ---- Stats / lifecycle --------------------------------------------------
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get registry statistics, including connection reuse."""
+        requests = self.stats["requests"]
+        reused = max(0, requests - self.stats["connections_opened"])
+        return {
+            **self.stats,
+            "clients": (
+                len(self._sync_clients) + len(self._no_loop_state.clients)
+                + sum(len(state.clients) for state in list(self._loop_states.values()))
+            ),
+            "connections_reused": reused,
+            "connection_reuse_rate": f"{reused / requests * 100:.1f}%" if requests > 0 else "N/A",
+            "max_concurrency": self.max_concurrency,
+            "quotas": dict(self._quotas)
+        }
+
+    async def aclose(self):
+        """Close the running loop's async pool and the sync pool."""
+        with self._lock:
+            state = self._loop_state()
+        if state.http is not None:
+            await state.http.aclose()
+        state.clients.clear()
+        if self._sync_http is not None:
+            self._sync_http.close()
+        self._sync_clients.clear()
+        logger.info("[ClientRegistry] Closed connection pools")
+
+
+_registry: Optional[ClientRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_client_registry() -> ClientRegistry:
+    """Get the process-wide client registry."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ClientRegistry()
+        return _registry
@@ -0,0 +1,231 @@
+"""
+Request hedging for latency-critical LLM calls.
+
+Most requests finish well inside their usual latency, but a few stall for
+10s or more, and those stragglers dominate end-to-end task time. A hedged
+call starts the request normally; if it hasn't answered by the observed
+p95 latency for its (model, prompt class), an identical duplicate is
+fired, the first answer wins and the other request is cancelled.
+
+Duplicates cost real tokens, so hedging is capped by a budget: each call
+earns `budget` credits (e.g. 0.1) and each hedge spends one, so at most
+~10% of calls are ever duplicated. Nothing is hedged until a route has
+enough latency samples to estimate its p95.
+
+Latency is measured from dispatch, not submission. When the call waits in
+a queue first (the rate limiter, a concurrency slot), pass track_dispatch=True:
+the call then receives an on_dispatch callback to invoke right before the
+request goes out. Otherwise congestion would look like a slow model,
+trigger hedges and add load exactly when the process is already throttled.
+
+Usage:
+    hedger = get_hedger()
+    response = await hedger.run(lambda: client.chat.completions.create(...),
+                                route=("grok-4", "vision"))
+
+    # Queued calls: the clock starts when the request is sent
+    def call(on_dispatch):
+        async def send():
+            async with registry.slot(agent_id):
+                on_dispatch()
+                return await client.chat.completions.create(...)
+        return limiter.run(send)
+    response = await hedger.run(call, route=("grok-4", "vision"), track_dispatch=True)
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Awaitable, Callable, Deque, Hashable, Optional, TypeVar
+
+from src import config
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class LatencyTracker:
+    """Sliding window of latencies per route with quantile lookups."""
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._samples: Dict[Hashable, Deque[float]] = {}
+
+    def record(self, route: Hashable, latency: float):
+        self._samples.setdefault(route, deque(maxlen=self.window)).append(latency)
+
+    def count(self, route: Hashable) -> int:
+        return len(self._samples.get(route, ()))
+
+    def quantile(self, route: Hashable, q: float) -> Optional[float]:
+        samples = self._samples.get(route)
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Hedger:
+    """
+    Fires a duplicate request once a call exceeds its route's tail latency.
+    """
+
+    def __init__(
+        self,
+        quantile: float = None,
+        budget: float = None,
+        min_samples: int = None,
+        window: int = 200
+    ):
+        """
+        Initialize the hedger.
+
+        Args:
+            quantile: Latency quantile that triggers a hedge (defaults to config.LLM_HEDGE_QUANTILE)
+            budget: Max fraction of calls that may be hedged (defaults to config.LLM_HEDGE_BUDGET)
+            min_samples: Samples needed per route before hedging (defaults to config.LLM_HEDGE_MIN_SAMPLES)
+            window: Latency samples kept per route
+        """
+        self.quantile = quantile or config.LLM_HEDGE_QUANTILE
+        self.budget = config.LLM_HEDGE_BUDGET if budget is None else budget
+        self.min_samples = config.LLM_HEDGE_MIN_SAMPLES if min_samples is None else min_samples
+        self.latencies = LatencyTracker(window)
+
+        # Budget credits accrue per call; capped so idle periods can't bank a hedge storm
+        self._credits = 0.0
+        self._max_credits = max(1.0, self.budget * 10)
+
+        self.stats = {
+            "calls": 0,
+            "hedged": 0,
+            "hedge_wins": 0,
+            "budget_denied": 0
+        }
+
+    def hedge_delay(self, route: Hashable) -> Optional[float]:
+        """Delay before hedging on this route, or None if there isn't enough data."""
+        if self.latencies.count(route) < self.min_samples:
+            return None
+        return self.latencies.quantile(route, self.quantile)
+
+    def _take_credit(self) -> bool:
+        if self._credits >= 1.0:
+            self._credits -= 1.0
+            return True
+        self.stats["budget_denied"] += 1
+        return False
+
+    async def run(
+        self,
+        call: Callable[..., Awaitable[T]],
+        route: Hashable,
+        track_dispatch: bool = False
+    ) -> T:
+        """
+        Run a call, hedging it if it outlives the route's tail latency.
+
+        Args:
+            call: Factory returning a fresh awaitable per attempt; with
+                track_dispatch it is called as call(on_dispatch)
+            route: Latency class, e.g. (model, prompt_class)
+            track_dispatch: Time attempts from their on_dispatch() call
+                (the last one, if the attempt retries) instead of from submission
+
+        Returns:
+            Result of whichever attempt answers first
+
+        Raises:
+            The error from the last attempt if every attempt fails
+        """
+        self.stats["calls"] += 1
+        self._credits = min(self._max_credits, self._credits + self.budget)
+
+        primary, primary_sent = self._start(call, track_dispatch)
+        delay = self.hedge_delay(route)
+
+        if delay is None:
+            result = await primary
+            self._record(route, primary_sent)
+            return result
+
+        if not primary_sent["event"].is_set():
+            # Queue time doesn't count towards the hedge delay
+            waiter = asyncio.ensure_future(primary_sent["event"].wait())
+            await asyncio.wait({primary, waiter}, return_when=asyncio.FIRST_COMPLETED)
+            waiter.cancel()
+
+        if not primary.done():
+            remaining = delay - (time.monotonic() - primary_sent["at"])
+            await asyncio.wait({primary}, timeout=max(0.0, remaining))
+
+        if primary.done() or not self._take_credit():
+            result = await primary
+            self._record(route, primary_sent)
+            return result
+
+        self.stats["hedged"] += 1
+        logger.info(f"[Hedger] {route} exceeded p{int(self.quantile * 100)} ({delay:.2f}s); hedging")
+        hedge, hedge_sent = self._start(call, track_dispatch)
+        sent = {primary: primary_sent, hedge: hedge_sent}
+        pending = {primary, hedge}
+
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.stats["hedge_wins"] += 1
+                        self._record(route, sent[task])
+                        return task.result()
+                if not pending:
+                    # Both failed: surface the primary's error
+                    raise primary.exception()
+        finally:
+            for task in (primary, hedge):
+                if not task.done():
+                    task.cancel()
+
+    @staticmethod
+    def _start(call: Callable[..., Awaitable[T]], track_dispatch: bool):
+        """Start one attempt; returns (task, dispatch state)."""
+        sent = {"at": time.monotonic(), "event": asyncio.Event()}
+
+        def on_dispatch():
+            sent["at"] = time.monotonic()
+            sent["event"].set()
+
+        if track_dispatch:
+            task = asyncio.ensure_future(call(on_dispatch))
+        else:
+            task = asyncio.ensure_future(call())
+            sent["event"].set()
+        return task, sent
+
+    def _record(self, route: Hashable, sent: Dict[str, Any]):
+        self.latencies.record(route, time.monotonic() - sent["at"])
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hedging statistics."""
+        calls = self.stats["calls"]
+        return {
+            **self.stats,
+            "hedge_rate": f"{self.stats['hedged'] / calls * 100:.1f}%" if calls > 0 else "N/A",
+            "routes": len(self.latencies._samples)
+        }
+
+
+_hedger: Optional[Hedger] = None
+_hedger_lock = threading.Lock()
+
+
+def get_hedger() -> Hedger:
+    """Get the process-wide hedger (latency stats are shared across clients)."""
+    global _hedger
+    with _hedger_lock:
+        if _hedger is None:
+            _hedger = Hedger()
+        return _hedger
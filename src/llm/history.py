@@ -0,0 +1,306 @@
+"""
+Token-aware conversation history for the observe-reason-act loop.
+
+Sending the full history on every iteration makes prompt size (and latency
+and cost) grow linearly with task length. ConversationHistory keeps every
+turn but builds the prompt window under a token budget:
+
+- Recent turns are sent verbatim (newest first until the budget is spent)
+- Older turns are rolled up into one extractive summary message; the summary
+  has its own share of the budget and drops its oldest lines when full, so
+  the window stays under the budget however long the task runs
+- Tool results are truncated (head + tail) - old ones hard, recent ones lightly
+
+Token counts are cached per message, so re-windowing a long history is cheap.
+Counts use tiktoken when installed and a chars/4 estimate otherwise; the
+budget only needs to be roughly right.
+"""
+
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+    TIKTOKEN_AVAILABLE = True
+except Exception:
+    _ENCODING = None
+    TIKTOKEN_AVAILABLE = False
+
+from src import config
+
+logger = logging.getLogger(__name__)
+
+# Per-message framing overhead in chat formats (role, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# Flat estimate per image part (providers bill images by tiles, not base64 length)
+IMAGE_TOKENS = 1000
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate token count for a string."""
+    if not text:
+        return 0
+    if TIKTOKEN_AVAILABLE:
+        return len(_ENCODING.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
+
+
+def _message_text(message: Dict[str, Any]) -> str:
+    content = message.get("content") or ""
+    if isinstance(content, list):
+        # Content parts: count text, images are costed separately
+        content = "\n".join(
+            part.get("text", "") if isinstance(part, dict) else str(part)
+            for part in content
+            if not (isinstance(part, dict) and part.get("type") == "image_url")
+        )
+    elif not isinstance(content, str):
+        content = json.dumps(content, default=str)
+    if message.get("tool_calls"):
+        content += json.dumps(message["tool_calls"], default=str)
+    return content
+
+
+def truncate_middle(text: str, max_chars: int) -> str:
+    """Keep the head and tail of a long string, eliding the middle."""
+    if len(text) <= max_chars:
+        return text
+    keep = max(0, max_chars - 40)
+    head = keep * 2 // 3
+    tail = keep - head
+    return f"{text[:head]}\n...[{len(text) - head - tail} chars elided]...\n{text[-tail:] if tail else ''}"
+
+
+class TokenCounter:
+    """Message token counter with a bounded content-hash cache."""
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[str, int]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def count(self, message: Dict[str, Any]) -> int:
+        text = _message_text(message)
+        content = message.get("content")
+        images = sum(
+            1 for part in content
+            if isinstance(part, dict) and part.get("type") == "image_url"
+        ) if isinstance(content, list) else 0
+        key = hashlib.md5(f"{message.get('role')}:{images}:{text}".encode("utf-8")).hexdigest()
+
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return cached
+
+        self.misses += 1
+        tokens = estimate_tokens(text) + MESSAGE_OVERHEAD_TOKENS + images * IMAGE_TOKENS
+        self._cache[key] = tokens
+        if len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return tokens
+
+
+class ConversationHistory:
+    """
+    Append-only chat history that renders a budgeted prompt window.
+
+    Messages are grouped into turns (an assistant message plus the tool
+    results that answer it) so a window never splits a tool call from its
+    result.
+
+    Usage:
+        history = ConversationHistory(token_budget=6000)
+        history.append({"role": "assistant", "content": "..."})
+        window = history.get_window()   # pass as conversation_history
+    """
+
+    def __init__(
+        self,
+        token_budget: int = None,
+        keep_recent_turns: int = 2,
+        recent_tool_chars: int = 4000,
+        old_tool_chars: int = 300,
+        summary_line_chars: int = 160,
+        summary_tokens: int = None,
+        counter: Optional[TokenCounter] = None
+    ):
+        """
+        Initialize the history.
+
+        Args:
+            token_budget: Max tokens for the rendered window (defaults to config.HISTORY_TOKEN_BUDGET)
+            keep_recent_turns: Newest turns always sent verbatim (tool results still capped)
+            recent_tool_chars: Cap for tool results in the recent turns
+            old_tool_chars: Cap for tool results in older turns that still fit the budget
+            summary_line_chars: Max chars per rolled-up turn in the summary
+            summary_tokens: Budget share reserved for the summary (defaults to a fifth of token_budget)
+            counter: Shared TokenCounter (a private one is created by default)
+        """
+        self.token_budget = token_budget or config.HISTORY_TOKEN_BUDGET
+        self.keep_recent_turns = keep_recent_turns
+        self.recent_tool_chars = recent_tool_chars
+        self.old_tool_chars = old_tool_chars
+        self.summary_line_chars = summary_line_chars
+        self.summary_tokens = summary_tokens if summary_tokens is not None else self.token_budget // 5
+        self.counter = counter or TokenCounter()
+
+        self.messages: List[Dict[str, Any]] = []
+        self.last_window_tokens = 0
+        self.last_summarized_turns = 0
+
+    def append(self, message: Dict[str, Any]):
+        """Add a message to the history."""
+        self.messages.append(message)
+
+    def extend(self, messages: List[Dict[str, Any]]):
+        """Add several messages to the history."""
+        self.messages.extend(messages)
+
+    def clear(self):
+        """Drop all history."""
+        self.messages.clear()
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+    def __bool__(self) -> bool:
+        return bool(self.messages)
+
+    def _turns(self) -> List[List[Dict[str, Any]]]:
+        """Group messages so tool results stay with the turn that requested them."""
+        turns: List[List[Dict[str, Any]]] = []
+        for message in self.messages:
+            if message.get("role") == "tool" and turns:
+                turns[-1].append(message)
+            else:
+                turns.append([message])
+        return turns
+
+    def _trim_turn(self, turn: List[Dict[str, Any]], tool_chars: int) -> List[Dict[str, Any]]:
+        trimmed = []
+        for message in turn:
+            content = message.get("content")
+            if message.get("role") == "tool" and isinstance(content, str) and len(content) > tool_chars:
+                message = {**message, "content": truncate_middle(content, tool_chars)}
+            trimmed.append(message)
+        return trimmed
+
+    def _summary_line(self, turn: List[Dict[str, Any]]) -> str:
+        head = turn[0]
+        text = _message_text({"content": head.get("content")}).strip()
+        first_line = text.splitlines()[0] if text else ""
+        tools = [
+            call.get("function", {}).get("name", "?")
+            for call in head.get("tool_calls") or []
+        ]
+        tool_note = f" [tools: {', '.join(tools)}]" if tools else ""
+        results = len(turn) - 1
+        result_note = f" [{results} tool result(s)]" if results else ""
+        return f"- {head.get('role', '?')}: {first_line[:self.summary_line_chars]}{tool_note}{result_note}"
+
+    def _summarize(self, turns: List[List[Dict[str, Any]]], max_tokens: int) -> Dict[str, Any]:
+        """
+        Extractive roll-up of older turns (no extra API call on the hot path).
+
+        Keeps one line per turn, newest first, until max_tokens is spent;
+        the oldest turns are only counted in the header.
+        """
+        lines: List[str] = []
+        used = MESSAGE_OVERHEAD_TOKENS + 16  # header
+        for turn in reversed(turns):
+            line = self._summary_line(turn)
+            cost = estimate_tokens(line) + 1
+            if used + cost > max_tokens:
+                break
+            lines.append(line)
+            used += cost
+        lines.reverse()
+
+        def render(kept: List[str]) -> Dict[str, Any]:
+            omitted = len(turns) - len(kept)
+            header = f"Summary of {len(turns)} earlier turn(s)"
+            header += f" ({omitted} oldest omitted):" if omitted else ":"
+            return {"role": "user", "content": "\n".join([header] + kept)}
+
+        summary = render(lines)
+        # Per-line estimates can undercount the joined text slightly
+        while lines and self.counter.count(summary) > max_tokens:
+            lines.pop(0)
+            summary = render(lines)
+        return summary
+
+    def _select(self, turns: List[List[Dict[str, Any]]], budget: int):
+        """Newest turns that fit the budget (recent ones always); returns (selected, used, cutoff)."""
+        selected: List[List[Dict[str, Any]]] = []
+        used = 0
+        cutoff = len(turns)
+
+        # Walk newest -> oldest
+        for position, turn in enumerate(reversed(turns)):
+            recent = position < self.keep_recent_turns
+            trimmed = self._trim_turn(turn, self.recent_tool_chars if recent else self.old_tool_chars)
+            cost = sum(self.counter.count(m) for m in trimmed)
+
+            if not recent and used + cost > budget:
+                break
+
+            selected.append(trimmed)
+            used += cost
+            cutoff = len(turns) - position - 1
+
+        return selected, used, cutoff
+
+    def get_window(self) -> List[Dict[str, Any]]:
+        """
+        Render the history as a prompt window under the token budget.
+
+        Returns:
+            Messages to send (summary first, if any turns were rolled up)
+        """
+        turns = self._turns()
+        if not turns:
+            self.last_window_tokens = 0
+            self.last_summarized_turns = 0
+            return []
+
+        selected, used, cutoff = self._select(turns, self.token_budget)
+        if cutoff:
+            # Some turns get rolled up: leave room for the summary inside the budget
+            selected, used, cutoff = self._select(turns, self.token_budget - self.summary_tokens)
+
+        window: List[Dict[str, Any]] = []
+        older = turns[:cutoff]
+        if older:
+            summary = self._summarize(older, max(self.token_budget - used, 0))
+            window.append(summary)
+            used += self.counter.count(summary)
+
+        for turn in reversed(selected):
+            window.extend(turn)
+
+        self.last_window_tokens = used
+        self.last_summarized_turns = len(older)
+        logger.debug(
+            f"[ConversationHistory] Window: {len(window)} messages, ~{used} tokens "
+            f"({len(older)} turns summarized)"
+        )
+        return window
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get history/window statistics."""
+        return {
+            "messages": len(self.messages),
+            "last_window_tokens": self.last_window_tokens,
+            "last_summarized_turns": self.last_summarized_turns,
+            "token_budget": self.token_budget,
+            "token_cache_hits": self.counter.hits,
+            "token_cache_misses": self.counter.misses
+        }
@@ -0,0 +1,202 @@
+"""
+Image content parts for vision requests.
+
+Screenshots are sent as real `image_url` content parts, but never raw: each
+frame is downscaled to a maximum side and re-encoded as compressed JPEG
+(encodings are memoized by source hash, so a repeated frame costs nothing
+to prepare).
+
+Before each request, ImageBudget walks the conversation newest-first and
+keeps image bytes bounded:
+
+- An image identical to a newer one is replaced by a short text reference
+- Images beyond the per-request count or byte budget are replaced by a
+  text note
+- The newest image (the current frame) is always kept
+
+Upload size per iteration therefore stays flat however long the task runs.
+"""
+
+import base64
+import binascii
+import hashlib
+import io
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+from src import config
+
+logger = logging.getLogger(__name__)
+
+
+def is_image_part(part: Any) -> bool:
+    return isinstance(part, dict) and part.get("type") == "image_url"
+
+
+def image_part(data_url: str, detail: str = None) -> Dict[str, Any]:
+    """Build an OpenAI-style image content part."""
+    return {
+        "type": "image_url",
+        "image_url": {"url": data_url, "detail": detail or config.LLM_IMAGE_DETAIL}
+    }
+
+
+class ImageEncoder:
+    """Downscales and compresses screenshots into data URLs, with a memo."""
+
+    def __init__(self, max_side: int = None, quality: int = None, max_entries: int = 8):
+        """
+        Initialize the encoder.
+
+        Args:
+            max_side: Longest side in pixels after downscaling (defaults to config.LLM_IMAGE_MAX_SIDE)
+            quality: JPEG quality (defaults to config.LLM_IMAGE_QUALITY)
+            max_entries: Encoded frames remembered by source hash
+        """
+        self.max_side = max_side or config.LLM_IMAGE_MAX_SIDE
+        self.quality = quality or config.LLM_IMAGE_QUALITY
+        self.max_entries = max_entries
+        self._memo: "OrderedDict[str, str]" = OrderedDict()
+
+        self.stats = {
+            "encoded": 0,
+            "memo_hits": 0,
+            "source_bytes": 0,
+            "encoded_bytes": 0,
+            "encode_time": 0.0
+        }
+
+    def encode(self, screenshot_base64: str) -> str:
+        """
+        Convert a base64 screenshot into a compact JPEG data URL.
+
+        Falls back to passing the original through (as PNG) if PIL is
+        missing or the image can't be decoded.
+        """
+        source_hash = hashlib.sha256(screenshot_base64.encode("ascii", "ignore")).hexdigest()
+        cached = self._memo.get(source_hash)
+        if cached is not None:
+            self._memo.move_to_end(source_hash)
+            self.stats["memo_hits"] += 1
+            return cached
+
+        start = time.time()
+        data_url = self._encode(screenshot_base64)
+        self.stats["encode_time"] += time.time() - start
+        self.stats["encoded"] += 1
+        self.stats["source_bytes"] += len(screenshot_base64)
+        self.stats["encoded_bytes"] += len(data_url)
+
+        self._memo[source_hash] = data_url
+        if len(self._memo) > self.max_entries:
+            self._memo.popitem(last=False)
+        return data_url
+
+    def _encode(self, screenshot_base64: str) -> str:
+        if not PIL_AVAILABLE:
+            return f"data:image/png;base64,{screenshot_base64}"
+        try:
+            image = Image.open(io.BytesIO(base64.b64decode(screenshot_base64, validate=True)))
+            image.thumbnail((self.max_side, self.max_side), Image.Resampling.LANCZOS)
+            if image.mode != "RGB":
+                image = image.convert("RGB")
+            buffer = io.BytesIO()
+            image.save(buffer, format="JPEG", quality=self.quality, optimize=True)
+        except (OSError, ValueError, binascii.Error) as e:
+            logger.warning(f"[ImageEncoder] Could not re-encode screenshot, sending as-is: {e}")
+            return f"data:image/png;base64,{screenshot_base64}"
+        return f"data:image/jpeg;base64,{base64.b64encode(buffer.getvalue()).decode('ascii')}"
+
+    def get_stats(self) -> Dict[str, Any]:
+        source, encoded = self.stats["source_bytes"], self.stats["encoded_bytes"]
+        return {
+            **self.stats,
+            "encode_time": round(self.stats["encode_time"], 3),
+            "compression_ratio": f"{encoded / source:.2f}" if source else "N/A"
+        }
+
+
+class ImageBudget:
+    """Dedupes and caps image parts across a request's messages."""
+
+    def __init__(self, byte_budget: int = None, max_images: int = None):
+        """
+        Initialize the budget.
+
+        Args:
+            byte_budget: Max image data-URL bytes per request (defaults to config.LLM_IMAGE_BYTE_BUDGET)
+            max_images: Max images per request (defaults to config.LLM_IMAGE_MAX_PER_REQUEST)
+        """
+        self.byte_budget = byte_budget or config.LLM_IMAGE_BYTE_BUDGET
+        self.max_images = max_images or config.LLM_IMAGE_MAX_PER_REQUEST
+
+        self.stats = {
+            "requests": 0,
+            "images_sent": 0,
+            "images_deduped": 0,
+            "images_dropped": 0,
+            "image_bytes_sent": 0,
+            "max_request_image_bytes": 0
+        }
+
+    def apply(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Return messages with duplicate and over-budget images replaced by text.
+
+        Input messages are not modified.
+        """
+        seen: Dict[str, None] = {}
+        used_bytes = 0
+        kept = 0
+        output: List[Dict[str, Any]] = []
+
+        for message in reversed(messages):
+            content = message.get("content")
+            if not isinstance(content, list) or not any(is_image_part(p) for p in content):
+                output.append(message)
+                continue
+
+            parts = []
+            for part in reversed(content):
+                if not is_image_part(part):
+                    parts.append(part)
+                    continue
+
+                url = part.get("image_url", {}).get("url", "")
+                digest = hashlib.sha256(url.encode("ascii", "ignore")).hexdigest()[:12]
+                size = len(url)
+
+                if digest in seen:
+                    self.stats["images_deduped"] += 1
+                    parts.append({"type": "text", "text": f"[image {digest}: same as the later image]"})
+                elif kept > 0 and (kept >= self.max_images or used_bytes + size > self.byte_budget):
+                    self.stats["images_dropped"] += 1
+                    parts.append({"type": "text", "text": f"[image {digest}: omitted (image budget)]"})
+                else:
+                    seen[digest] = None
+                    used_bytes += size
+                    kept += 1
+                    parts.append(part)
+
+            output.append({**message, "content": list(reversed(parts))})
+
+        self.stats["requests"] += 1
+        self.stats["images_sent"] += kept
+        self.stats["image_bytes_sent"] += used_bytes
+        self.stats["max_request_image_bytes"] = max(self.stats["max_request_image_bytes"], used_bytes)
+        return list(reversed(output))
+
+    def get_stats(self) -> Dict[str, Any]:
+        requests = self.stats["requests"]
+        return {
+            **self.stats,
+            "avg_request_image_bytes": self.stats["image_bytes_sent"] // requests if requests else 0
+        }
@@ -0,0 +1,460 @@
+"""
+Local stand-in for the OpenAI-compatible chat API, for offline benchmarks.
+
+MockLLMServer speaks enough of the chat-completions protocol for GrokClient,
+GrokAgent and ProposalGeneratorAgent (tools, streaming with usage, errors
+with retry-after). It also speaks the Anthropic messages endpoint for
+ClaudeAgent. Responses are scripted by regex over the prompt. Latency
+distributions, error rates and throughput limits are configurable, so
+whole-swarm runs can be benchmarked without network or API credits.
+
+Script format (JSON):
+    {
+      "seed": 7,
+      "latency": {"dist": "lognormal", "median": 0.8, "sigma": 0.4},
+      "errors": {"429": 0.02, "500": 0.01, "timeout": 0.0},
+      "max_concurrency": 8,
+      "rpm": 600,
+      "tokens_per_second": 80,
+      "rules": [
+        {"pattern": "(?i)screenshot", "content": "I see a desktop.",
+         "latency": {"dist": "fixed", "value": 1.5}},
+        {"pattern": "(?i)open notepad", "tool_calls": [
+            {"name": "bash", "arguments": {"command": "notepad"}}]},
+        {"pattern": ".*", "scope": "all", "content": "Done."}
+      ]
+    }
+
+Rules match the last message by default ("scope": "all" searches the whole
+conversation). The first matching rule wins; unmatched prompts get
+"default_content".
+
+Usage:
+    XAI_API_KEY=mock python -m src.llm.mock_server --script bench.json --port 8765
+    XAI_BASE_URL=http://127.0.0.1:8765/v1 ANTHROPIC_BASE_URL=http://127.0.0.1:8765 python main.py ...
+
+Or in-process:
+    with MockLLMServer(script) as server:
+        client = GrokClient(base_url=server.url)
+"""
+
+import argparse
+import json
+import logging
+import random
+import re
+import threading
+import time
+import uuid
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyModel:
+    """
+    Samples response latency (seconds) from a configured distribution.
+
+    Specs: {"dist": "fixed", "value": s}, {"dist": "uniform", "low": a, "high": b},
+    {"dist": "normal", "mean": m, "stddev": s}, {"dist": "lognormal", "median": m, "sigma": s},
+    {"dist": "exponential", "mean": m}. A bare number means fixed.
+    """
+
+    def __init__(self, spec: Union[None, float, Dict[str, Any]] = None, rng: Optional[random.Random] = None):
+        if spec is None:
+            spec = {"dist": "fixed", "value": 0.0}
+        elif isinstance(spec, (int, float)):
+            spec = {"dist": "fixed", "value": float(spec)}
+        self.spec = spec
+        self.rng = rng or random.Random()
+
+        if spec.get("dist", "fixed") not in ("fixed", "uniform", "normal", "lognormal", "exponential"):
+            raise ValueError(f"Unknown latency distribution: {spec.get('dist')}")
+
+    def sample(self) -> float:
+        spec, rng = self.spec, self.rng
+        dist = spec.get("dist", "fixed")
+
+        if dist == "fixed":
+            value = spec.get("value", 0.0)
+        elif dist == "uniform":
+            value = rng.uniform(spec.get("low", 0.0), spec.get("high", 1.0))
+        elif dist == "normal":
+            value = rng.gauss(spec.get("mean", 0.5), spec.get("stddev", 0.1))
+        elif dist == "lognormal":
+            value = spec.get("median", 0.5) * rng.lognormvariate(0.0, spec.get("sigma", 0.5))
+        else:
+            value = rng.expovariate(1.0 / max(spec.get("mean", 0.5), 1e-6))
+
+        return max(0.0, min(value, spec.get("max", float("inf"))))
+
+
+class MockRule:
+    """One scripted response, selected by regex over the prompt."""
+
+    def __init__(self, spec: Dict[str, Any], rng: random.Random):
+        self.pattern = re.compile(spec.get("pattern", ".*"), re.DOTALL)
+        self.scope = spec.get("scope", "last")
+        self.model = spec.get("model")
+        self.content = spec.get("content")
+        self.tool_calls = spec.get("tool_calls") or []
+        self.finish_reason = spec.get("finish_reason") or ("tool_calls" if self.tool_calls else "stop")
+        self.latency = LatencyModel(spec["latency"], rng) if "latency" in spec else None
+        self.errors = spec.get("errors")
+        self.hits = 0
+
+    def matches(self, model: str, messages: List[Dict[str, Any]]) -> bool:
+        if self.model and self.model != model:
+            return False
+        selected = messages if self.scope == "all" else messages[-1:]
+        return any(self.pattern.search(_message_text(m)) for m in selected)
+
+
+def _message_text(message: Dict[str, Any]) -> str:
+    content = message.get("content") or ""
+    if isinstance(content, list):
+        # Content parts: keep text, skip images
+        content = " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return str(content)
+
+
+def _estimate_tokens(text: str) -> int:
+    return (len(text) + 3) // 4
+
+
+class MockLLMServer:
+    """
+    Threaded HTTP server implementing the scripted mock API.
+    """
+
+    def __init__(
+        self,
+        script: Union[None, str, Path, Dict[str, Any]] = None,
+        host: str = "127.0.0.1",
+        port: int = 0
+    ):
+        """
+        Initialize the server (call start() or use as a context manager).
+
+        Args:
+            script: Script dict or path to a JSON script file
+            host: Bind address
+            port: Bind port (0 = pick a free port)
+        """
+        if isinstance(script, (str, Path)):
+            script = json.loads(Path(script).read_text(encoding="utf-8"))
+        script = script or {}
+
+        self.rng = random.Random(script.get("seed"))
+        self.latency = LatencyModel(script.get("latency"), self.rng)
+        self.errors: Dict[str, float] = script.get("errors", {})
+        self.rules = [MockRule(spec, self.rng) for spec in script.get("rules", [])]
+        self.default_content = script.get("default_content", "OK")
+        self.tokens_per_second = script.get("tokens_per_second")
+        self.rpm = script.get("rpm")
+        self.timeout_hang = script.get("timeout_hang", 120.0)
+        self._concurrency = threading.BoundedSemaphore(script.get("max_concurrency", 64))
+
+        self._recent = deque()
+        self._lock = threading.Lock()
+        self.stats = {
+            "requests": 0,
+            "streamed": 0,
+            "errors": {},
+            "unmatched": 0,
+            "total_latency": 0.0
+        }
+
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """OpenAI-style base URL (use as XAI_BASE_URL)."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    @property
+    def root_url(self) -> str:
+        """Server root (use as ANTHROPIC_BASE_URL)."""
+        return self.url[:-len("/v1")]
+
+    def start(self) -> "MockLLMServer":
+        """Serve in a background thread."""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="mock-llm", daemon=True)
+        self._thread.start()
+        logger.info(f"[MockLLMServer] Listening on {self.url}")
+        return self
+
+    def stop(self):
+        """Stop serving."""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> "MockLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ---- Behaviour ----------------------------------------------------------
+
+    def select_rule(self, model: str, messages: List[Dict[str, Any]]) -> Optional[MockRule]:
+        for rule in self.rules:
+            if rule.matches(model, messages):
+                rule.hits += 1
+                return rule
+        with self._lock:
+            self.stats["unmatched"] += 1
+        return None
+
+    def sample_error(self, rule: Optional[MockRule]) -> Optional[str]:
+        """Pick an injected failure ("429", "500", "timeout", ...) or None."""
+        rates = rule.errors if rule and rule.errors is not None else self.errors
+        roll = self.rng.random()
+        for kind, rate in rates.items():
+            if roll < rate:
+                return kind
+            roll -= rate
+        return None
+
+    def over_rpm(self) -> bool:
+        """Sliding one-minute request window."""
+        if not self.rpm:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            while self._recent and now - self._recent[0] > 60.0:
+                self._recent.popleft()
+            if len(self._recent) >= self.rpm:
+                return True
+            self._recent.append(now)
+            return False
+
+    def _record(self, key: str, value=1):
+        with self._lock:
+            if key == "errors":
+                self.stats["errors"][value] = self.stats["errors"].get(value, 0) + 1
+            else:
+                self.stats[key] += value
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get request/error counts and per-rule hits."""
+        return {
+            **self.stats,
+            "rule_hits": {rule.pattern.pattern: rule.hits for rule in self.rules}
+        }
+
+    # ---- HTTP ---------------------------------------------------------------
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                logger.debug(f"[MockLLMServer] {format % args}")
+
+            def do_GET(self):
+                if self.path.rstrip("/").endswith("/models"):
+                    self._json(200, {"object": "list", "data": [{"id": "mock", "object": "model"}]})
+                else:
+                    self._json(404, {"error": {"message": "not found"}})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                try:
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    self._json(400, {"error": {"message": "invalid JSON"}})
+                    return
+
+                if self.path.endswith("/chat/completions"):
+                    anthropic = False
+                elif self.path.endswith("/messages"):
+                    anthropic = True
+                else:
+                    self._json(404, {"error": {"message": f"unknown path {self.path}"}})
+                    return
+
+                with server._concurrency:
+                    server._record("requests")
+                    self._serve(body, anthropic)
+
+            def _serve(self, body: Dict[str, Any], anthropic: bool):
+                model = body.get("model", "mock")
+                messages = body.get("messages", [])
+                rule = server.select_rule(model, messages)
+
+                if server.over_rpm():
+                    server._record("errors", "429")
+                    self._json(429, {"error": {"message": "rate limit (rpm)", "type": "rate_limit"}},
+                               headers={"retry-after": "1"})
+                    return
+
+                error = server.sample_error(rule)
+                latency = (rule.latency if rule and rule.latency else server.latency).sample()
+                time.sleep(latency)
+                server._record("total_latency", latency)
+
+                if error == "timeout":
+                    server._record("errors", "timeout")
+                    time.sleep(server.timeout_hang)
+                    self.close_connection = True
+                    return
+                if error:
+                    server._record("errors", error)
+                    headers = {"retry-after": "1"} if error == "429" else {}
+                    self._json(int(error), {"error": {"message": f"injected {error}", "type": "mock_error"}},
+                               headers=headers)
+                    return
+
+                content = rule.content if rule else server.default_content
+                tool_calls = [
+                    {
+                        "id": f"call_{uuid.uuid4().hex[:12]}",
+                        "type": "function",
+                        "function": {
+                            "name": call["name"],
+                            "arguments": json.dumps(call.get("arguments", {}))
+                        }
+                    }
+                    for call in (rule.tool_calls if rule else [])
+                ]
+                finish_reason = rule.finish_reason if rule else "stop"
+                prompt_tokens = sum(_estimate_tokens(_message_text(m)) for m in messages)
+                completion_tokens = _estimate_tokens((content or "") + json.dumps(tool_calls))
+
+                if anthropic:
+                    self._pace(completion_tokens)
+                    self._json(200, {
+                        "id": f"msg_{uuid.uuid4().hex[:12]}",
+                        "type": "message",
+                        "role": "assistant",
+                        "model": model,
+                        "content": [{"type": "text", "text": content or ""}],
+                        "stop_reason": "end_turn",
+                        "usage": {"input_tokens": prompt_tokens, "output_tokens": completion_tokens}
+                    })
+                    return
+
+                usage = {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                    "prompt_tokens_details": {"cached_tokens": 0}
+                }
+                response_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+
+                if body.get("stream"):
+                    server._record("streamed")
+                    self._stream(response_id, model, content, tool_calls, finish_reason,
+                                 usage if (body.get("stream_options") or {}).get("include_usage") else None)
+                    return
+
+                self._pace(completion_tokens)
+                message = {"role": "assistant", "content": content}
+                if tool_calls:
+                    message["tool_calls"] = tool_calls
+                self._json(200, {
+                    "id": response_id,
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+                    "usage": usage
+                })
+
+            def _pace(self, tokens: int):
+                if server.tokens_per_second:
+                    time.sleep(tokens / server.tokens_per_second)
+
+            def _stream(self, response_id, model, content, tool_calls, finish_reason, usage):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+
+                def send(delta=None, finish=None, usage_block=None):
+                    chunk = {
+                        "id": response_id,
+                        "object": "chat.completion.chunk",
+                        "created": int(time.time()),
+                        "model": model,
+                        "choices": [] if delta is None else [
+                            {"index": 0, "delta": delta, "finish_reason": finish}
+                        ]
+                    }
+                    if usage_block is not None:
+                        chunk["usage"] = usage_block
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+
+                send({"role": "assistant", "content": ""})
+
+                # Content in word-sized pieces, paced by tokens_per_second
+                for piece in re.findall(r"\S+\s*|\s+", content or ""):
+                    self._pace(_estimate_tokens(piece))
+                    send({"content": piece})
+
+                # Tool calls: header first, then arguments in two fragments
+                for index, call in enumerate(tool_calls):
+                    send({"tool_calls": [{"index": index, "id": call["id"], "type": "function",
+                                          "function": {"name": call["function"]["name"], "arguments": ""}}]})
+                    arguments = call["function"]["arguments"]
+                    middle = len(arguments) // 2
+                    for fragment in (arguments[:middle], arguments[middle:]):
+                        self._pace(_estimate_tokens(fragment))
+                        send({"tool_calls": [{"index": index, "function": {"arguments": fragment}}]})
+
+                send({}, finish=finish_reason)
+                if usage is not None:
+                    send(usage_block=usage)
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+
+            def _json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the offline mock LLM server.")
+    parser.add_argument("--script", help="JSON script file (responses, latency, errors, limits)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    server = MockLLMServer(args.script, host=args.host, port=args.port)
+    print(f"Mock LLM server on {server.url}")
+    print(f"  export XAI_BASE_URL={server.url}")
+    print(f"  export ANTHROPIC_BASE_URL={server.root_url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+        print(f"Stats: {json.dumps(server.get_stats(), indent=2)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+Latency-aware model routing.
+
+Not every request needs the strongest model: "has the screen changed"
+checks and tool follow-ups are fine on a fast non-reasoning model, while
+planning needs the full one. ModelRouter classifies each request by task
+class and prompt size and picks the cheapest (or fastest) model in the
+catalog whose quality meets the class threshold.
+
+Routing learns from outcomes. Each (model, task class, size) route keeps
+an EWMA of latency and success. A route that breaks its class latency SLO
+or starts failing is marked degraded. It is skipped in favour of the next
+candidate and re-probed after a cooldown (circuit-breaker half-open).
+
+Usage:
+    router = get_model_router()
+    decision = router.route("tool_followup", estimated_tokens=1800)
+    for model in decision.candidates:
+        ...call model...
+        router.record(model, decision, latency, success)
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Tuple
+
+from src import config
+
+logger = logging.getLogger(__name__)
+
+# Prompt size buckets (estimated input tokens)
+SIZE_BUCKETS = [(2000, "small"), (16000, "medium"), (float("inf"), "large")]
+
+
+def size_class(estimated_tokens: int) -> str:
+    """Bucket a prompt by estimated input tokens."""
+    for limit, name in SIZE_BUCKETS:
+        if estimated_tokens <= limit:
+            return name
+    return "large"
+
+
+@dataclass
+class RouteDecision:
+    """Chosen model plus ordered fallbacks for one request."""
+    task_class: str
+    size: str
+    model: str
+    fallbacks: List[str] = field(default_factory=list)
+
+    @property
+    def candidates(self) -> List[str]:
+        return [self.model] + self.fallbacks
+
+
+@dataclass
+class RouteStats:
+    """Learned outcome statistics for one (model, task class, size) route."""
+    samples: int = 0
+    latency: float = 0.0
+    success: float = 1.0
+    degraded_until: float = 0.0
+
+
+class ModelRouter:
+    """
+    Picks a model per request from a catalog, learning from outcomes.
+    """
+
+    def __init__(
+        self,
+        catalog: Optional[Dict[str, Dict[str, Any]]] = None,
+        thresholds: Optional[Dict[str, float]] = None,
+        slos: Optional[Dict[str, float]] = None,
+        default_model: str = None,
+        objective: str = None,
+        alpha: float = 0.2,
+        min_samples: int = 5,
+        min_success: float = 0.8,
+        cooldown: float = 60.0
+    ):
+        """
+        Initialize the router.
+
+        Args:
+            catalog: model -> {"quality": 0-1, "cost": relative, "max_context": tokens}
+                (defaults to config.LLM_MODEL_CATALOG)
+            thresholds: task class -> minimum quality (defaults to config.LLM_ROUTE_QUALITY)
+            slos: task class -> latency SLO in seconds (defaults to config.LLM_ROUTE_SLOS)
+            default_model: Model for unknown classes and the last-resort fallback
+            objective: "cost" (cheapest) or "latency" (fastest observed) among qualifying models
+            alpha: EWMA weight for new observations
+            min_samples: Observations before a route can be judged degraded
+            min_success: Success EWMA below which a route is degraded
+            cooldown: Seconds a degraded route is skipped before being re-probed
+        """
+        self.catalog = catalog if catalog is not None else config.LLM_MODEL_CATALOG
+        self.thresholds = thresholds if thresholds is not None else config.LLM_ROUTE_QUALITY
+        self.slos = slos if slos is not None else config.LLM_ROUTE_SLOS
+        self.default_model = default_model or config.GROK_MODEL
+        self.objective = objective or config.LLM_ROUTE_OBJECTIVE
+        self.alpha = alpha
+        self.min_samples = min_samples
+        self.min_success = min_success
+        self.cooldown = cooldown
+
+        self._routes: Dict[Tuple[str, str, str], RouteStats] = {}
+        self._lock = threading.Lock()
+
+        self.stats = {
+            "decisions": 0,
+            "fallbacks_used": 0,
+            "degradations": 0,
+            "by_model": {}
+        }
+
+    def _stats(self, model: str, task_class: str, size: str) -> RouteStats:
+        return self._routes.setdefault((model, task_class, size), RouteStats())
+
+    def _qualifying(self, task_class: str, estimated_tokens: int) -> List[str]:
+        threshold = self.thresholds.get(task_class, self.thresholds.get("default", 0.0))
+        return [
+            model for model, spec in self.catalog.items()
+            if spec.get("quality", 0.0) >= threshold
+            and estimated_tokens <= spec.get("max_context", float("inf"))
+        ]
+
+    def _sort_key(self, model: str, task_class: str, size: str):
+        stats = self._routes.get((model, task_class, size))
+        if self.objective == "latency" and stats and stats.samples:
+            return (stats.latency, self.catalog[model].get("cost", 1.0))
+        return (self.catalog[model].get("cost", 1.0), -self.catalog[model].get("quality", 0.0))
+
+    def route(self, task_class: str, estimated_tokens: int = 0) -> RouteDecision:
+        """
+        Choose a model for a request.
+
+        Args:
+            task_class: Request class (e.g. "screen_check", "vision", "tool_followup", "reasoning", "planning")
+            estimated_tokens: Estimated prompt size
+
+        Returns:
+            RouteDecision with the preferred model first, then fallbacks
+        """
+        size = size_class(estimated_tokens)
+        now = time.time()
+
+        with self._lock:
+            qualifying = sorted(
+                self._qualifying(task_class, estimated_tokens),
+                key=lambda m: self._sort_key(m, task_class, size)
+            )
+            healthy = [m for m in qualifying if self._stats(m, task_class, size).degraded_until <= now]
+            degraded = [m for m in qualifying if m not in healthy]
+
+            # Degraded routes stay as late fallbacks; the default model is the last resort
+            ordered = healthy + degraded
+            if self.default_model not in ordered:
+                ordered.append(self.default_model)
+
+            self.stats["decisions"] += 1
+            by_model = self.stats["by_model"]
+            by_model[ordered[0]] = by_model.get(ordered[0], 0) + 1
+
+        decision = RouteDecision(task_class, size, ordered[0], ordered[1:])
+        logger.debug(f"[ModelRouter] {task_class}/{size} -> {decision.model} (fallbacks: {decision.fallbacks})")
+        return decision
+
+    def record(self, model: str, decision: RouteDecision, latency: float, success: bool):
+        """Feed back the outcome of a call made on behalf of `decision`."""
+        with self._lock:
+            stats = self._stats(model, decision.task_class, decision.size)
+            if stats.samples == 0:
+                stats.latency = latency
+            else:
+                stats.latency += self.alpha * (latency - stats.latency)
+            stats.success += self.alpha * ((1.0 if success else 0.0) - stats.success)
+            stats.samples += 1
+
+            if model != decision.model:
+                self.stats["fallbacks_used"] += 1
+
+            slo = self.slos.get(decision.task_class)
+            too_slow = slo is not None and stats.latency > slo
+            failing = stats.success < self.min_success
+            if stats.samples >= self.min_samples and (too_slow or failing):
+                if stats.degraded_until <= time.time():
+                    self.stats["degradations"] += 1
+                    logger.warning(
+                        f"[ModelRouter] {model} degraded for {decision.task_class}/{decision.size} "
+                        f"(latency {stats.latency:.2f}s, success {stats.success:.2f})"
+                    )
+                stats.degraded_until = time.time() + self.cooldown
+                # Half-open: one good probe after the cooldown clears the EWMA's memory of the outage
+                stats.samples = 0
+                stats.success = 1.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get routing decisions and learned per-route statistics."""
+        now = time.time()
+        with self._lock:
+            routes = {
+                f"{model}|{task_class}|{size}": {
+                    "samples": stats.samples,
+                    "latency": round(stats.latency, 3),
+                    "success": round(stats.success, 3),
+                    "degraded": stats.degraded_until > now
+                }
+                for (model, task_class, size), stats in self._routes.items()
+            }
+        return {**self.stats, "routes": routes}
+
+
+_router: Optional[ModelRouter] = None
+_router_lock = threading.Lock()
+
+
+def get_model_router() -> ModelRouter:
+    """Get the process-wide model router."""
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = ModelRouter()
+        return _router
@@ -0,0 +1,177 @@
+"""
+Prefix-stable prompt assembly.
+
+Provider-side prompt caching only kicks in when the start of a request is
+byte-identical to an earlier one. PromptBuilder therefore computes the
+static prefix once - system prompt, pinned context (e.g. memory) and tool
+schemas with recursively sorted keys - and every call site reuses those
+exact objects, followed by the dynamic suffix (history + new user turn).
+
+It also records `usage.prompt_tokens_details.cached_tokens` from responses
+so the effect is visible in stats.
+
+Usage:
+    builder = get_prompt_builder()
+    messages = builder.build([{"role": "user", "content": "Task: ..."}])
+    response = await client.chat.completions.create(messages=messages, tools=builder.tools, ...)
+    builder.record_usage(response.usage)
+"""
+
+import copy
+import hashlib
+import json
+import logging
+import threading
+from typing import Dict, Any, List, Optional
+
+from src import config
+
+logger = logging.getLogger(__name__)
+
+
+def _canonical(value: Any) -> Any:
+    """Deep copy with dict keys sorted, so serialization order is fixed."""
+    if isinstance(value, dict):
+        return {key: _canonical(value[key]) for key in sorted(value)}
+    if isinstance(value, list):
+        return [_canonical(item) for item in value]
+    return copy.deepcopy(value)
+
+
+class PromptBuilder:
+    """
+    Builds message lists as [static prefix] + [dynamic suffix].
+    """
+
+    def __init__(self, system_prompt: str = None, tools: Optional[List[Dict[str, Any]]] = None):
+        """
+        Initialize the builder.
+
+        Args:
+            system_prompt: Static system prompt (defaults to config.SYSTEM_PROMPT)
+            tools: Tool schemas (defaults to config.TOOLS)
+        """
+        self._system_prompt = (system_prompt if system_prompt is not None else config.SYSTEM_PROMPT).strip()
+        self._tools = _canonical(tools if tools is not None else config.TOOLS) or None
+        self._pinned: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+        self.stats = {
+            "requests": 0,
+            "prompt_tokens": 0,
+            "cached_prompt_tokens": 0,
+            "prefix_rebuilds": 0
+        }
+
+        self._prefix: List[Dict[str, Any]] = []
+        self.prefix_hash = ""
+        self._rebuild_prefix()
+
+    @property
+    def tools(self) -> Optional[List[Dict[str, Any]]]:
+        """Tool schemas in canonical order (same object on every call)."""
+        return self._tools
+
+    @property
+    def system_prompt(self) -> str:
+        return self._system_prompt
+
+    def pin(self, name: str, text: str):
+        """
+        Pin slow-changing context (e.g. memory) into the static prefix.
+
+        Changing pinned context invalidates the provider cache, so pin only
+        things that stay fixed for many calls.
+        """
+        with self._lock:
+            if self._pinned.get(name) == text:
+                return
+            self._pinned[name] = text
+            self._rebuild_prefix()
+
+    def unpin(self, name: str):
+        """Remove pinned context."""
+        with self._lock:
+            if self._pinned.pop(name, None) is not None:
+                self._rebuild_prefix()
+
+    def _rebuild_prefix(self):
+        content = self._system_prompt
+        for name in sorted(self._pinned):
+            content += f"\n\n## {name}\n{self._pinned[name].strip()}"
+
+        self._prefix = [{"role": "system", "content": content}]
+        serialized = json.dumps(
+            {"messages": self._prefix, "tools": self._tools},
+            sort_keys=True, separators=(",", ":")
+        )
+        self.prefix_hash = hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+        self.stats["prefix_rebuilds"] += 1
+        logger.debug(f"[PromptBuilder] Prefix rebuilt: {self.prefix_hash[:12]}...")
+
+    def build(self, dynamic_messages: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+        """
+        Assemble the full message list.
+
+        Args:
+            dynamic_messages: History and new turns (system messages among
+                them are kept, but after the prefix)
+
+        Returns:
+            Prefix messages followed by the dynamic messages
+        """
+        return list(self._prefix) + list(dynamic_messages or [])
+
+    def record_usage(self, usage: Any) -> Dict[str, int]:
+        """
+        Record prompt/cached token counts from a response's usage block.
+
+        Accepts SDK usage objects or plain dicts. Returns the extracted counts.
+        """
+        if usage is None:
+            return {}
+
+        def field(obj, name):
+            if obj is None:
+                return None
+            return obj.get(name) if isinstance(obj, dict) else getattr(obj, name, None)
+
+        prompt_tokens = field(usage, "prompt_tokens") or 0
+        details = field(usage, "prompt_tokens_details")
+        cached_tokens = field(details, "cached_tokens") or 0
+
+        self.stats["requests"] += 1
+        self.stats["prompt_tokens"] += prompt_tokens
+        self.stats["cached_prompt_tokens"] += cached_tokens
+
+        return {
+            "prompt_tokens": prompt_tokens,
+            "cached_prompt_tokens": cached_tokens,
+            "completion_tokens": field(usage, "completion_tokens") or 0
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get prefix and provider-cache statistics."""
+        prompt_tokens = self.stats["prompt_tokens"]
+        return {
+            **self.stats,
+            "prefix_hash": self.prefix_hash[:12],
+            "pinned": sorted(self._pinned),
+            "cached_prompt_ratio": (
+                f"{self.stats['cached_prompt_tokens'] / prompt_tokens * 100:.1f}%"
+                if prompt_tokens > 0 else "N/A"
+            )
+        }
+
+
+_builder: Optional[PromptBuilder] = None
+_builder_lock = threading.Lock()
+
+
+def get_prompt_builder() -> PromptBuilder:
+    """Get the process-wide prompt builder for config.SYSTEM_PROMPT/config.TOOLS."""
+    global _builder
+    with _builder_lock:
+        if _builder is None:
+            _builder = PromptBuilder()
+        return _builder
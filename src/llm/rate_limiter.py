@@ -0,0 +1,346 @@
+"""
+Process-wide adaptive rate limiter and retry scheduler for LLM calls.
+
+All agents share one pair of token buckets - requests per minute and
+tokens per minute - so a burst from one agent can't push the whole process
+into 429s. Waiting calls are released in MessagePriority order (FIFO within
+a priority), so critical-path agents (Observer, Actor, the main loop) go
+ahead of background ones (Learner, Improver, Analyzer).
+
+Failures are retried with full-jitter exponential backoff. A provider
+retry-after header pauses every caller, not just the one that got the 429,
+and the request rate is halved on each 429 and recovers gradually on
+success (AIMD).
+
+The budgets are process-wide and loop-agnostic. The wait queue and its
+release timer hold loop-bound futures, so they are kept per event loop
+(like the pools in src.llm.client_registry): main.py and the daemon run
+each task under a fresh asyncio.run, and a waiter or timer from a finished
+loop must not wedge the next one.
+
+This only works if the limiter sees every attempt: the shared clients from
+src.llm.client_registry are built with max_retries=0, so one limiter
+attempt is exactly one HTTP request. Don't pass an SDK client that retries
+on its own to run().
+
+Usage:
+    limiter = get_rate_limiter()
+    response = await limiter.run(
+        lambda: client.chat.completions.create(...),
+        priority=MessagePriority.HIGH,
+        estimated_tokens=1200
+    )
+    limiter.record_usage(estimated_tokens=1200, actual_tokens=response.usage.total_tokens)
+"""
+
+import asyncio
+import email.utils
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+import weakref
+from typing import Dict, Any, Awaitable, Callable, List, Optional, TypeVar
+
+import openai
+
+from src import config
+from src.core.message_bus import MessagePriority
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Default scheduling priority by agent id (unlisted agents are NORMAL)
+AGENT_PRIORITIES = {
+    "grokputer": MessagePriority.HIGH,
+    "observer": MessagePriority.HIGH,
+    "actor": MessagePriority.HIGH,
+    "coordinator": MessagePriority.HIGH,
+    "learner": MessagePriority.LOW,
+    "improver": MessagePriority.LOW,
+    "analyzer": MessagePriority.LOW,
+    "proposer": MessagePriority.LOW,
+}
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+
+def priority_for_agent(agent_id: str) -> MessagePriority:
+    """Get the default scheduling priority for an agent."""
+    return AGENT_PRIORITIES.get(agent_id, MessagePriority.NORMAL)
+
+
+def parse_retry_after(error: Exception) -> Optional[float]:
+    """Extract a retry-after delay (seconds) from an API error, if present."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000.0
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return float(retry_after)
+    except ValueError:
+        parsed = email.utils.parsedate_to_datetime(retry_after)
+        return max(0.0, parsed.timestamp() - time.time()) if parsed else None
+
+
+def is_retryable(error: Exception) -> bool:
+    """Whether an API error is worth retrying."""
+    if isinstance(error, (openai.APITimeoutError, openai.APIConnectionError, asyncio.TimeoutError)):
+        return True
+    return getattr(error, "status_code", None) in RETRYABLE_STATUS_CODES
+
+
+class TokenBucket:
+    """Continuous-refill token bucket sized per minute."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.updated = time.monotonic()
+
+    def refill(self, scale: float = 1.0):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.capacity * scale / 60.0)
+        self.updated = now
+
+    def wait_time(self, amount: float, scale: float = 1.0) -> float:
+        """Seconds until `amount` is available (requests larger than capacity wait for a full bucket)."""
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) * 60.0 / (self.capacity * scale)
+
+    def consume(self, amount: float):
+        self.tokens -= min(amount, self.capacity)
+
+
+class _LoopQueue:
+    """Waiters (and their release timer) that belong to one event loop."""
+
+    def __init__(self):
+        # (priority, seq, tokens, future)
+        self.waiters: List[tuple] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class RateLimiter:
+    """
+    Priority-ordered RPM/TPM limiter with retry-after handling and backoff.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int = None,
+        tokens_per_minute: int = None,
+        max_retries: int = None,
+        backoff_base: float = None,
+        backoff_max: float = None
+    ):
+        """
+        Initialize the limiter.
+
+        Args:
+            requests_per_minute: Request budget (defaults to config.LLM_RPM)
+            tokens_per_minute: Token budget (defaults to config.LLM_TPM)
+            max_retries: Retries per call on retryable errors (defaults to config.LLM_MAX_RETRIES)
+            backoff_base: First backoff ceiling in seconds
+            backoff_max: Backoff ceiling cap in seconds
+        """
+        self.requests = TokenBucket(requests_per_minute or config.LLM_RPM)
+        self.tokens = TokenBucket(tokens_per_minute or config.LLM_TPM)
+        self.max_retries = config.LLM_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_base = backoff_base or config.LLM_BACKOFF_BASE
+        self.backoff_max = backoff_max or config.LLM_BACKOFF_MAX
+
+        # AIMD rate scale: halved on 429, slowly restored on success
+        self.scale = 1.0
+        self.blocked_until = 0.0
+
+        self._queues: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopQueue]" = weakref.WeakKeyDictionary()
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+        self.stats = {
+            "acquired": 0,
+            "queued": 0,
+            "total_wait_time": 0.0,
+            "retries": 0,
+            "rate_limited": 0,
+            "failures": 0,
+            "acquired_by_priority": {p.name: 0 for p in MessagePriority}
+        }
+
+    # ---- Admission ----------------------------------------------------------
+
+    async def acquire(self, estimated_tokens: int = 0, priority: MessagePriority = MessagePriority.NORMAL):
+        """Wait until the call may proceed under the RPM/TPM budget."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        start = time.monotonic()
+
+        with self._lock:
+            queue = self._queues.get(loop)
+            if queue is None:
+                queue = self._queues[loop] = _LoopQueue()
+            heapq.heappush(queue.waiters, (int(priority), next(self._seq), estimated_tokens, future))
+        self._pump(queue)
+
+        if not future.done():
+            self.stats["queued"] += 1
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                queue.waiters = [w for w in queue.waiters if w[3] is not future]
+                heapq.heapify(queue.waiters)
+            self._pump(queue)
+            raise
+
+        self.stats["acquired"] += 1
+        self.stats["acquired_by_priority"][MessagePriority(priority).name] += 1
+        self.stats["total_wait_time"] += time.monotonic() - start
+
+    def _pump(self, queue: _LoopQueue):
+        """Release a loop's waiters in priority order while budget allows; otherwise arm a timer."""
+        with self._lock:
+            if queue.timer is not None:
+                queue.timer.cancel()
+                queue.timer = None
+
+            while queue.waiters:
+                priority, seq, tokens, future = queue.waiters[0]
+                if future.done():
+                    heapq.heappop(queue.waiters)
+                    continue
+
+                now = time.time()
+                self.requests.refill(self.scale)
+                self.tokens.refill(self.scale)
+                delay = max(
+                    self.blocked_until - now,
+                    self.requests.wait_time(1, self.scale),
+                    self.tokens.wait_time(tokens, self.scale)
+                )
+                if delay > 0:
+                    # Head of line waits; lower priorities must not overtake it
+                    queue.timer = asyncio.get_running_loop().call_later(delay, self._pump, queue)
+                    return
+
+                heapq.heappop(queue.waiters)
+                self.requests.consume(1)
+                self.tokens.consume(tokens)
+                future.set_result(None)
+
+    # ---- Feedback -----------------------------------------------------------
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: Optional[int]):
+        """Reconcile the TPM bucket once the real token count is known."""
+        if actual_tokens is None:
+            return
+        self.tokens.tokens -= actual_tokens - estimated_tokens
+
+    def on_rate_limited(self, retry_after: Optional[float]):
+        """Pause all callers and cut the request rate after a 429."""
+        self.stats["rate_limited"] += 1
+        self.scale = max(0.1, self.scale * 0.5)
+        if retry_after:
+            self.blocked_until = max(self.blocked_until, time.time() + retry_after)
+        logger.warning(
+            f"[RateLimiter] Rate limited (retry_after={retry_after}); rate scale now {self.scale:.2f}"
+        )
+
+    def on_success(self):
+        """Gradually restore the request rate."""
+        if self.scale < 1.0:
+            self.scale = min(1.0, self.scale + 0.05)
+
+    def backoff_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Full-jitter exponential backoff, never shorter than retry-after."""
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return max(retry_after or 0.0, random.uniform(0, ceiling))
+
+    # ---- Scheduling ---------------------------------------------------------
+
+    async def run(
+        self,
+        call: Callable[[], Awaitable[T]],
+        priority: MessagePriority = MessagePriority.NORMAL,
+        estimated_tokens: int = 0,
+        max_retries: Optional[int] = None
+    ) -> T:
+        """
+        Run an API call under the limiter, retrying retryable failures.
+
+        Args:
+            call: Zero-arg factory returning a fresh awaitable per attempt
+            priority: Scheduling priority while waiting for budget
+            estimated_tokens: Expected token usage for the TPM bucket
+            max_retries: Override the default retry count
+
+        Returns:
+            Result of the call
+
+        Raises:
+            The last error once retries are exhausted or it isn't retryable
+        """
+        retries = self.max_retries if max_retries is None else max_retries
+        attempt = 0
+
+        while True:
+            await self.acquire(estimated_tokens, priority)
+            try:
+                result = await call()
+                self.on_success()
+                return result
+            except Exception as e:
+                retry_after = parse_retry_after(e)
+                if getattr(e, "status_code", None) == 429:
+                    self.on_rate_limited(retry_after)
+
+                if attempt >= retries or not is_retryable(e):
+                    self.stats["failures"] += 1
+                    raise
+
+                delay = self.backoff_delay(attempt, retry_after)
+                attempt += 1
+                self.stats["retries"] += 1
+                logger.warning(
+                    f"[RateLimiter] Retry {attempt}/{retries} in {delay:.2f}s after: {e}"
+                )
+                await asyncio.sleep(delay)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get limiter statistics."""
+        return {
+            **self.stats,
+            "waiting": sum(len(queue.waiters) for queue in list(self._queues.values())),
+            "rate_scale": round(self.scale, 2),
+            "blocked_for": max(0.0, round(self.blocked_until - time.time(), 2))
+        }
+
+
+_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Get the process-wide rate limiter."""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter()
+        return _limiter
@@ -0,0 +1,236 @@
+"""
+Two-tier cache for LLM responses.
+
+Identical requests (same model, messages, tools and temperature class) are
+answered from an in-memory LRU first, then from a persistent SQLite tier
+that survives restarts. Entries expire after a TTL, and callers can opt
+out per call.
+
+Keys are a SHA-256 over a canonical JSON encoding (sorted keys, no
+whitespace), so dict ordering and formatting differences between call
+sites don't cause misses. Temperature is bucketed into a class rather than
+used verbatim: 0.7 and 0.75 are the same request for caching purposes.
+
+Replaying a sampled response that carries tool calls would re-run stale
+actions, so requests with tools are only cacheable at temperature 0 (see
+is_cacheable). The cache itself is opt-in (config.LLM_CACHE_ENABLED).
+
+Usage:
+    cache = get_response_cache()
+    key = cache.make_key(model, messages, tools, temperature)
+    cached = cache.get(key)
+    if cached is None:
+        ...call API...
+        cache.put(key, parsed_response, latency)
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Union
+
+from src import config
+
+logger = logging.getLogger(__name__)
+
+
+def temperature_class(temperature: Optional[float]) -> str:
+    """Bucket a sampling temperature into a cache class."""
+    if temperature is None:
+        return "default"
+    if temperature <= 0.2:
+        return "deterministic"
+    if temperature <= 0.8:
+        return "balanced"
+    return "creative"
+
+
+def is_cacheable(temperature: Optional[float], tools: Optional[List[Dict[str, Any]]] = None) -> bool:
+    """Whether a request may be served from the cache (tool calls only when deterministic)."""
+    return not tools or temperature == 0
+
+
+class ResponseCache:
+    """
+    LRU + SQLite response cache with TTLs and hit/latency accounting.
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[Union[str, Path]] = None,
+        max_entries: int = None,
+        default_ttl: float = None
+    ):
+        """
+        Initialize the response cache.
+
+        Args:
+            db_path: SQLite file for the persistent tier (None = memory only)
+            max_entries: In-memory LRU capacity (defaults to config.LLM_CACHE_SIZE)
+            default_ttl: Seconds before an entry expires (defaults to config.LLM_CACHE_TTL)
+        """
+        self.max_entries = max_entries or config.LLM_CACHE_SIZE
+        self.default_ttl = default_ttl if default_ttl is not None else config.LLM_CACHE_TTL
+
+        # key -> (expires_at, latency, response)
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._db: Optional[sqlite3.Connection] = None
+        if db_path:
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(db_path), check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " response TEXT NOT NULL,"
+                " latency REAL NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " expires_at REAL NOT NULL)"
+            )
+            self._db.commit()
+
+        self.stats = {
+            "hits": 0,
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "writes": 0,
+            "saved_latency": 0.0
+        }
+
+    @staticmethod
+    def make_key(
+        model: str,
+        messages: List[Dict[str, Any]],
+        tools: Optional[List[Dict[str, Any]]] = None,
+        temperature: Optional[float] = None,
+        **params
+    ) -> str:
+        """Build the canonical cache key for a request."""
+        payload = {
+            "model": model,
+            "messages": messages,
+            "tools": tools or [],
+            "temperature": temperature_class(temperature),
+            "params": params
+        }
+        canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a cached response, or None on miss/expiry."""
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, latency, response = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self._record_hit("memory_hits", latency)
+                    return response
+                del self._memory[key]
+                self.stats["expired"] += 1
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT response, latency, expires_at FROM responses WHERE key = ?",
+                    (key,)
+                ).fetchone()
+                if row is not None:
+                    response_json, latency, expires_at = row
+                    if expires_at > now:
+                        response = json.loads(response_json)
+                        self._remember(key, expires_at, latency, response)
+                        self._record_hit("disk_hits", latency)
+                        return response
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._db.commit()
+                    self.stats["expired"] += 1
+
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, key: str, response: Dict[str, Any], latency: float, ttl: Optional[float] = None):
+        """Store a response with the latency it took to produce."""
+        ttl = self.default_ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+
+        now = time.time()
+        expires_at = now + ttl
+
+        with self._lock:
+            self._remember(key, expires_at, latency, response)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, response, latency, created_at, expires_at)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (key, json.dumps(response, default=str), latency, now, expires_at)
+                )
+                self._db.commit()
+            self.stats["writes"] += 1
+
+    def _remember(self, key: str, expires_at: float, latency: float, response: Dict[str, Any]):
+        self._memory[key] = (expires_at, latency, response)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _record_hit(self, tier: str, latency: float):
+        self.stats["hits"] += 1
+        self.stats[tier] += 1
+        self.stats["saved_latency"] += latency
+
+    def purge_expired(self) -> int:
+        """Drop expired entries from both tiers. Returns rows removed from disk."""
+        now = time.time()
+        with self._lock:
+            for key in [k for k, (exp, _, _) in self._memory.items() if exp <= now]:
+                del self._memory[key]
+            if self._db is None:
+                return 0
+            cursor = self._db.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+            self._db.commit()
+            return cursor.rowcount
+
+    def clear(self):
+        """Clear all cached responses."""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+        logger.info("[ResponseCache] Cache cleared")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics including hit rate and saved latency."""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "saved_latency": round(self.stats["saved_latency"], 3),
+            "hit_rate": f"{self.stats['hits'] / lookups * 100:.1f}%" if lookups > 0 else "N/A",
+            "memory_entries": len(self._memory),
+            "persistent": self._db is not None
+        }
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Get the process-wide response cache (persistent tier at config.LLM_CACHE_PATH)."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache(db_path=config.LLM_CACHE_PATH)
+        return _cache
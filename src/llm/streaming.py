@@ -0,0 +1,111 @@
+"""
+Incremental tool-call parsing for streamed chat completions.
+
+OpenAI-compatible streams deliver tool calls as fragments: the id and
+function name arrive first, then the JSON arguments in arbitrary pieces,
+keyed by the call's index. ToolCallAccumulator stitches the fragments
+together and releases each tool call the moment its arguments form a
+complete JSON value, so execution can start while the model is still
+generating later calls.
+
+Stream events (as yielded by GrokClient.stream_message):
+    {"type": "content", "delta": "..."}
+    {"type": "tool_call", "tool_call": {"id", "type", "function": {...}}}
+    {"type": "done", "response": {...same shape as GrokClient._parse_response...}}
+    {"type": "error", "error": "..."}
+"""
+
+import json
+import logging
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ToolCallAccumulator:
+    """
+    Assembles streamed tool-call fragments into complete tool calls.
+    """
+
+    def __init__(self):
+        # index -> {"id", "type", "name", "arguments"}
+        self._pending: Dict[int, Dict[str, Any]] = {}
+        self._completed: Dict[int, Dict[str, Any]] = {}
+
+    @staticmethod
+    def _get(obj: Any, name: str) -> Any:
+        """Read a field from an SDK object or a plain dict."""
+        if isinstance(obj, dict):
+            return obj.get(name)
+        return getattr(obj, name, None)
+
+    def feed(self, tool_call_deltas: Optional[List[Any]]) -> List[Dict[str, Any]]:
+        """
+        Add one chunk's tool-call deltas.
+
+        Returns:
+            Tool calls that became complete with this chunk
+        """
+        ready = []
+
+        for delta in tool_call_deltas or []:
+            index = self._get(delta, "index") or 0
+            entry = self._pending.setdefault(
+                index, {"id": "", "type": "function", "name": "", "arguments": ""}
+            )
+
+            if self._get(delta, "id"):
+                entry["id"] = self._get(delta, "id")
+            if self._get(delta, "type"):
+                entry["type"] = self._get(delta, "type")
+
+            function = self._get(delta, "function")
+            if function is not None:
+                if self._get(function, "name"):
+                    entry["name"] += self._get(function, "name")
+                if self._get(function, "arguments"):
+                    entry["arguments"] += self._get(function, "arguments")
+
+            if index not in self._completed and self._is_complete(entry):
+                ready.append(self._emit(index))
+
+        return ready
+
+    def flush(self) -> List[Dict[str, Any]]:
+        """
+        Release any calls still pending at end of stream.
+
+        Calls whose arguments never parsed are released as-is; ToolExecutor
+        already treats unparseable arguments as empty.
+        """
+        return [self._emit(index) for index in sorted(self._pending) if index not in self._completed]
+
+    @property
+    def completed(self) -> List[Dict[str, Any]]:
+        """All released tool calls in the model's original order."""
+        return [self._completed[index] for index in sorted(self._completed)]
+
+    @staticmethod
+    def _is_complete(entry: Dict[str, Any]) -> bool:
+        if not entry["name"] or not entry["arguments"].strip():
+            return False
+        try:
+            # Arguments are always an object; a bare number may still be growing
+            return isinstance(json.loads(entry["arguments"]), dict)
+        except ValueError:
+            return False
+
+    def _emit(self, index: int) -> Dict[str, Any]:
+        entry = self._pending[index]
+
+        tool_call = {
+            "id": entry["id"],
+            "type": entry["type"],
+            "function": {
+                "name": entry["name"],
+                "arguments": entry["arguments"] or "{}"
+            }
+        }
+        self._completed[index] = tool_call
+        logger.debug(f"[ToolCallAccumulator] Tool call ready: {entry['name']} (index {index})")
+        return tool_call
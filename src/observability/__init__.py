@@ -3,11 +3,21 @@ Observability components for monitoring and tracking agent swarm behavior.
 """
 
 from .deadlock_detector import DeadlockDetector, DeadlockError
+from .event_stream import EVENT_SCHEMA_VERSION, read_events
+from .frame_store import FrameStore
+from .log_writer import BufferedLogWriter
+from .session_catalog import SessionCatalog, get_session_catalog
 from .session_logger import SessionLogger, SwarmMetrics
 
 __all__ = [
+    "BufferedLogWriter",
     "DeadlockDetector",
     "DeadlockError",
+    "EVENT_SCHEMA_VERSION",
+    "FrameStore",
+    "SessionCatalog",
     "SessionLogger",
-    "SwarmMetrics"
+    "read_events",
+    "SwarmMetrics",
+    "get_session_catalog"
 ]
@@ -0,0 +1,126 @@
+"""
+Schema-versioned JSONL session event stream.
+
+Each session appends one JSON object per line to events.jsonl:
+
+    {"v": 1, "type": "tool", "ts": 1700000000.0, "tool": "bash", ...}
+
+Every record carries the schema version ("v") and an event type; readers
+should skip types they don't know. The logging thread only takes a cheap
+structural snapshot (snapshot_value); records are encoded on the log
+writer thread, not by the agent that logged them. Large fields are
+bounded while encoding: strings are cut to max_chars, containers to max_items entries
+and max_depth levels, and unknown objects are repr()'d only up to the
+limit. A screenshot or a megabyte of tool output therefore costs a few KB
+in the stream.
+
+Only the last unwritten batch can be lost in a crash, and read_events()
+tolerates the torn final line that may leave behind.
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+EVENT_SCHEMA_VERSION = 1
+
+MAX_FIELD_CHARS = int(os.getenv("SESSION_LOG_MAX_FIELD_CHARS", "2000"))
+MAX_FIELD_ITEMS = 50
+MAX_FIELD_DEPTH = 4
+
+
+def _cut(text: str, max_chars: Optional[int]) -> str:
+    if max_chars is None or len(text) <= max_chars:
+        return text
+    return text[:max_chars] + f"... [{len(text) - max_chars} chars omitted]"
+
+
+def bound_value(
+    value: Any,
+    max_chars: Optional[int] = MAX_FIELD_CHARS,
+    max_items: int = MAX_FIELD_ITEMS,
+    max_depth: int = MAX_FIELD_DEPTH
+) -> Any:
+    """
+    Copy a value into JSON-safe form, bounding its size.
+
+    Args:
+        value: Any object
+        max_chars: Longest string kept (longer ones are cut with a marker;
+            None keeps strings whole)
+        max_items: Most entries kept per dict/list
+        max_depth: Deepest nesting kept (deeper containers become summaries)
+
+    Returns:
+        JSON-serializable value
+    """
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, str):
+        return _cut(value, max_chars)
+    if isinstance(value, (bytes, bytearray)):
+        return f"<{len(value)} bytes>"
+
+    if isinstance(value, dict):
+        if max_depth <= 0:
+            return f"<dict with {len(value)} keys>"
+        bounded = {}
+        for i, (key, item) in enumerate(value.items()):
+            if i >= max_items:
+                bounded["..."] = f"{len(value) - max_items} more keys"
+                break
+            bounded[_cut(str(key), 200)] = bound_value(item, max_chars, max_items, max_depth - 1)
+        return bounded
+
+    if isinstance(value, (list, tuple, set, frozenset)):
+        if max_depth <= 0:
+            return f"<{type(value).__name__} of {len(value)}>"
+        bounded = []
+        for i, item in enumerate(value):
+            if i >= max_items:
+                bounded.append(f"... {len(value) - max_items} more items")
+                break
+            bounded.append(bound_value(item, max_chars, max_items, max_depth - 1))
+        return bounded
+
+    # repr() of some objects is itself huge; only keep the prefix
+    return _cut(repr(value), max_chars or MAX_FIELD_CHARS)
+
+
+def snapshot_value(value: Any) -> Any:
+    """
+    Copy a value on the logging thread, before it is queued.
+
+    Containers are copied (bounded like bound_value) so later mutation by
+    the caller can't change or break the logged event. Strings are
+    immutable and kept whole, since screenshots must reach the frame store
+    intact; they are cut when the event is encoded.
+    """
+    return bound_value(value, max_chars=None)
+
+
+def encode_event(event: Dict[str, Any]) -> str:
+    """Encode one event as a bounded, versioned JSONL line."""
+    record = {"v": EVENT_SCHEMA_VERSION}
+    record.update(bound_value(event))
+    return json.dumps(record, ensure_ascii=False) + "\n"
+
+
+def read_events(path: Union[str, Path]) -> Iterator[Dict[str, Any]]:
+    """
+    Iterate the events of a session stream.
+
+    Lines that don't parse (a batch torn by a crash) are skipped.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                logger.warning(f"[EventStream] Skipping unreadable line {number} of {path}")
@@ -0,0 +1,202 @@
+"""
+Content-addressed blob store for screenshot frames.
+
+Frames are keyed by the SHA-256 of their decoded image bytes, so the same
+screen captured in different sessions is stored exactly once. Blobs are
+compressed with zstd when `zstandard` is installed (zlib otherwise) and read
+back through mmap, which keeps large frames out of JSON logs, bus messages
+and in-memory caches - those carry only the hash.
+
+Layout:
+    <root>/ab/abcdef...zst   (first two hex chars shard the directory)
+"""
+
+import base64
+import binascii
+import hashlib
+import logging
+import mmap
+import os
+import re
+import threading
+import zlib
+from pathlib import Path
+from typing import Dict, Any, Optional, Union
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Keys whose values are raw base64 screenshots throughout the codebase
+FRAME_KEYS = ("screenshot", "screenshot_b64", "screenshot_base64")
+
+# Hashes arrive in bus messages; anything else must never reach a path
+_FRAME_HASH = re.compile(r"[0-9a-f]{64}")
+
+
+def is_frame_hash(value: Any) -> bool:
+    """Whether a value is a well-formed frame hash (64 lowercase hex chars)."""
+    return isinstance(value, str) and _FRAME_HASH.fullmatch(value) is not None
+
+
+class FrameStore:
+    """
+    Deduplicating on-disk store for screenshot frames.
+
+    Usage:
+        store = FrameStore(Path("logs/frames"))
+        frame_hash = store.put_base64(screenshot_b64)
+        ...
+        screenshot_b64 = store.get_base64(frame_hash)
+    """
+
+    def __init__(self, root: Union[str, Path], compression_level: int = 3):
+        """
+        Initialize the frame store.
+
+        Args:
+            root: Directory holding the blobs (shared across sessions)
+            compression_level: zstd/zlib compression level
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.compression_level = compression_level
+        self._lock = threading.Lock()
+
+        self.stats = {
+            "frames_written": 0,
+            "frames_deduplicated": 0,
+            "frames_read": 0,
+            "bytes_in": 0,
+            "bytes_stored": 0
+        }
+
+    @staticmethod
+    def compute_hash(data: bytes) -> str:
+        """Return the content address for raw frame bytes."""
+        return hashlib.sha256(data).hexdigest()
+
+    def _path_for(self, frame_hash: str, suffix: str) -> Path:
+        return self.root / frame_hash[:2] / f"{frame_hash}{suffix}"
+
+    def _find(self, frame_hash: str) -> Optional[Path]:
+        """Locate an existing blob regardless of which codec wrote it (None for malformed hashes)."""
+        if not is_frame_hash(frame_hash):
+            return None
+        for suffix in (".zst", ".zz"):
+            path = self._path_for(frame_hash, suffix)
+            if path.exists():
+                return path
+        return None
+
+    def _compress(self, data: bytes) -> tuple:
+        if ZSTD_AVAILABLE:
+            compressor = zstandard.ZstdCompressor(level=self.compression_level)
+            return compressor.compress(data), ".zst"
+        return zlib.compress(data, self.compression_level), ".zz"
+
+    def put(self, data: bytes) -> str:
+        """
+        Store raw frame bytes and return their hash.
+
+        Writing a frame that already exists is a no-op (deduplication).
+        """
+        frame_hash = self.compute_hash(data)
+        self.stats["bytes_in"] += len(data)
+
+        with self._lock:
+            if self._find(frame_hash):
+                self.stats["frames_deduplicated"] += 1
+                return frame_hash
+
+            payload, suffix = self._compress(data)
+            path = self._path_for(frame_hash, suffix)
+            path.parent.mkdir(exist_ok=True)
+
+            # Write-then-rename so readers never see a partial blob
+            tmp_path = path.with_suffix(suffix + ".tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+
+            self.stats["frames_written"] += 1
+            self.stats["bytes_stored"] += len(payload)
+
+        logger.debug(f"[FrameStore] Stored {frame_hash[:12]}... ({len(data)} -> {len(payload)} bytes)")
+        return frame_hash
+
+    def put_base64(self, frame_b64: str) -> str:
+        """
+        Store a base64-encoded frame and return its hash.
+
+        Raises:
+            ValueError: If the string is not valid base64
+        """
+        try:
+            data = base64.b64decode(frame_b64, validate=True)
+        except (binascii.Error, ValueError) as e:
+            raise ValueError(f"Invalid base64 frame: {e}")
+        return self.put(data)
+
+    def get(self, frame_hash: str) -> Optional[bytes]:
+        """Load raw frame bytes by hash, or None if unknown or malformed."""
+        path = self._find(frame_hash)
+        if path is None:
+            return None
+
+        with open(path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                if path.suffix == ".zst":
+                    if not ZSTD_AVAILABLE:
+                        raise RuntimeError("Frame stored with zstd but zstandard is not installed")
+                    data = zstandard.ZstdDecompressor().decompress(mapped, max_output_size=1 << 30)
+                else:
+                    data = zlib.decompress(mapped)
+
+        self.stats["frames_read"] += 1
+        return data
+
+    def get_base64(self, frame_hash: str) -> Optional[str]:
+        """Load a frame by hash as a base64 string, or None if unknown."""
+        data = self.get(frame_hash)
+        return base64.b64encode(data).decode("utf-8") if data is not None else None
+
+    def __contains__(self, frame_hash: str) -> bool:
+        return self._find(frame_hash) is not None
+
+    def externalize(self, value: Any) -> Any:
+        """
+        Return a copy of `value` with base64 screenshots replaced by frame refs.
+
+        Walks dicts and lists; any key in FRAME_KEYS holding a string is
+        stored and swapped for {"frame_ref": <hash>}. Values that are not
+        valid base64 are left untouched.
+        """
+        if isinstance(value, dict):
+            result = {}
+            for key, item in value.items():
+                if key in FRAME_KEYS and isinstance(item, str) and item:
+                    try:
+                        result[key] = {"frame_ref": self.put_base64(item)}
+                        continue
+                    except ValueError:
+                        pass
+                result[key] = self.externalize(item)
+            return result
+        if isinstance(value, list):
+            return [self.externalize(item) for item in value]
+        return value
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get store statistics including compression ratio."""
+        ratio = self.stats["bytes_stored"] / self.stats["bytes_in"] if self.stats["bytes_in"] else 0.0
+        return {
+            **self.stats,
+            "codec": "zstd" if ZSTD_AVAILABLE else "zlib",
+            "compression_ratio": round(ratio, 3)
+        }
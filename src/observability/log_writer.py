@@ -0,0 +1,244 @@
+"""
+Buffered background writer for session logs.
+
+SessionLogger is called from agent hot paths (every state change, wait and
+handoff). Opening, appending and closing the log file on each call put a
+syscall round trip and the filesystem lock on those paths. With this
+writer, the calling thread only enqueues the line. A daemon thread drains
+the queue and writes in batches: a batch closes when it reaches batch_size
+lines or flush_interval seconds after its first line.
+
+The queue is bounded. When it is full, callers block until the writer
+catches up (counted in stats["full"]), so a stalled disk slows agents
+down instead of growing memory without limit.
+
+Sync policies (durability of a written batch):
+    none   leave data in the file object's buffer; it reaches the OS on
+           flush(), close() or when the buffer fills
+    batch  flush every batch to the OS (survives a process crash; default)
+    fsync  flush and fsync every batch (survives power loss)
+
+Like process_runner, this module reads its defaults from the environment
+rather than src.config.
+
+With an encoder, callers may queue arbitrary objects; they are turned into
+text on the writer thread (SessionLogger uses this for its JSONL event
+stream, so agents never pay for serialization).
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+import weakref
+from pathlib import Path
+from typing import Dict, Any, Callable, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+SYNC_POLICIES = ("none", "batch", "fsync")
+
+DEFAULT_SYNC_POLICY = os.getenv("SESSION_LOG_SYNC", "batch")
+DEFAULT_QUEUE_SIZE = int(os.getenv("SESSION_LOG_QUEUE_SIZE", "10000"))
+DEFAULT_BATCH_SIZE = int(os.getenv("SESSION_LOG_BATCH_SIZE", "256"))
+DEFAULT_FLUSH_INTERVAL = float(os.getenv("SESSION_LOG_FLUSH_INTERVAL", "0.2"))
+
+_STOP = object()
+
+# Drained at interpreter exit so a session that never reaches finalize() keeps its tail
+_open_writers: "weakref.WeakSet[BufferedLogWriter]" = weakref.WeakSet()
+
+
+class _FlushMarker:
+    __slots__ = ("done",)
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+class BufferedLogWriter:
+    """
+    Append-only text file fed through a bounded queue by a background thread.
+
+    Usage:
+        writer = BufferedLogWriter(Path("logs/s1/session.log"))
+        writer.write("[12:00:00.000] [AGENT START] observer\\n")
+        writer.flush()     # block until everything queued so far is written
+        writer.close()     # drain and stop the thread
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        sync: str = DEFAULT_SYNC_POLICY,
+        max_queue: int = DEFAULT_QUEUE_SIZE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        encoder: Optional[Callable[[Any], str]] = None
+    ):
+        """
+        Initialize the writer (the thread starts on the first write).
+
+        Args:
+            path: File to append to
+            sync: Sync policy ("none", "batch" or "fsync")
+            max_queue: Lines buffered before callers block
+            batch_size: Lines per write batch
+            flush_interval: Seconds a batch may wait for more lines
+            encoder: Turns queued non-str items into text (on the writer thread)
+
+        Raises:
+            ValueError: If sync is not a known policy
+        """
+        if sync not in SYNC_POLICIES:
+            raise ValueError(f"Unknown sync policy {sync!r} (expected one of {SYNC_POLICIES})")
+
+        self.path = Path(path)
+        self.sync = sync
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.encoder = encoder
+
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, max_queue))
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._closed = False
+
+        self.stats = {
+            "lines": 0,
+            "batches": 0,
+            "bytes": 0,
+            "full": 0,
+            "write_errors": 0,
+            "encode_errors": 0,
+            "write_time": 0.0
+        }
+
+    def _ensure_thread(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name=f"log-writer-{self.path.parent.name}", daemon=True
+                )
+                self._thread.start()
+                _open_writers.add(self)
+
+    def _put(self, item: Any):
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.stats["full"] += 1
+            self._queue.put(item)
+
+    def write(self, item: Any):
+        """
+        Queue text (or an object for the encoder) for appending.
+
+        Blocks only while the queue is full. After close() the item is
+        appended synchronously.
+        """
+        if self._closed:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(self._encode(item))
+            return
+        self._ensure_thread()
+        self._put(item)
+
+    def _encode(self, item: Any) -> str:
+        if isinstance(item, str) or self.encoder is None:
+            return str(item)
+        return self.encoder(item)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until everything queued before this call is written and synced.
+
+        Returns:
+            False if the timeout expired first
+        """
+        if self._thread is None or self._closed:
+            return True
+        marker = _FlushMarker()
+        self._put(marker)
+        return marker.done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = None):
+        """Drain the queue, sync and stop the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread is not None:
+            self._put(_STOP)
+            self._thread.join(timeout)
+        _open_writers.discard(self)
+
+    def _run(self):
+        with open(self.path, "a", encoding="utf-8") as f:
+            running = True
+            while running:
+                item = self._queue.get()
+                batch = []
+                markers = []
+                deadline = time.monotonic() + self.flush_interval
+                while True:
+                    if item is _STOP:
+                        running = False
+                        break
+                    if isinstance(item, _FlushMarker):
+                        markers.append(item)
+                        break
+                    batch.append(item)
+                    if len(batch) >= self.batch_size:
+                        break
+                    try:
+                        item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        break
+
+                self._write_batch(f, batch, force=bool(markers) or not running)
+                for marker in markers:
+                    marker.done.set()
+
+    def _write_batch(self, f, batch, force: bool):
+        start = time.time()
+        try:
+            if batch:
+                text = "".join(self._encode_safely(item) for item in batch)
+                f.write(text)
+                self.stats["lines"] += len(batch)
+                self.stats["batches"] += 1
+                self.stats["bytes"] += len(text)
+            if self.sync != "none" or force:
+                f.flush()
+                if self.sync == "fsync":
+                    os.fsync(f.fileno())
+        except (OSError, ValueError) as e:
+            self.stats["write_errors"] += 1
+            logger.error(f"[BufferedLogWriter] Write to {self.path} failed: {e}")
+        self.stats["write_time"] += time.time() - start
+
+    def _encode_safely(self, item: Any) -> str:
+        try:
+            return self._encode(item)
+        except Exception as e:
+            self.stats["encode_errors"] += 1
+            logger.error(f"[BufferedLogWriter] Could not encode {type(item).__name__}: {e}")
+            return ""
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "write_time": round(self.stats["write_time"], 4),
+            "queued": self._queue.qsize(),
+            "sync": self.sync
+        }
+
+
+@atexit.register
+def _drain_open_writers():
+    for writer in list(_open_writers):
+        writer.close(timeout=5.0)
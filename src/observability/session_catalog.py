@@ -0,0 +1,371 @@
+"""
+SQLite catalog of sessions with full-text search.
+
+Session discovery used to rescan logs/ everywhere: sort every directory,
+glob and stat every session.json, open every session file. The catalog
+is one row per session in <logs_dir>/sessions.db:
+
+- indexed columns: start time, mode, status, duration, error count
+- an FTS5 table over task text and error messages (when the SQLite build
+  lacks FTS5, search falls back to LIKE)
+
+SessionLogger registers a session when it starts and updates it from
+save_metrics()/finalize(). Readers (the MCP server's list/search tools,
+SessionImprover, OfflineCache and superagent's SessionIndex) query it
+instead of walking the filesystem. When a catalog is created next to
+existing logs, those sessions are imported once from their session.json
+files (and superagent's session_index.json).
+
+This module only uses the standard library so that the MCP server and
+superagent can load it without src.config.
+
+Usage:
+    catalog = get_session_catalog(Path("logs"))
+    catalog.upsert("swarm_20250101_120000", task="scan vault", mode="swarm", status="running")
+    catalog.recent(10, mode="swarm")
+    catalog.search("vault timeout")
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+CATALOG_FILENAME = "sessions.db"
+SCHEMA_VERSION = 1
+
+COLUMNS = (
+    "session_id", "path", "task", "mode", "status", "model", "started_at", "ended_at",
+    "duration", "iterations", "tool_count", "api_calls", "error_count", "tools", "errors", "extra"
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    path TEXT,
+    task TEXT NOT NULL DEFAULT '',
+    mode TEXT,
+    status TEXT,
+    model TEXT,
+    started_at REAL,
+    ended_at REAL,
+    duration REAL,
+    iterations INTEGER NOT NULL DEFAULT 0,
+    tool_count INTEGER NOT NULL DEFAULT 0,
+    api_calls INTEGER NOT NULL DEFAULT 0,
+    error_count INTEGER NOT NULL DEFAULT 0,
+    tools TEXT NOT NULL DEFAULT '',
+    errors TEXT NOT NULL DEFAULT '',
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_started ON sessions(started_at);
+CREATE INDEX IF NOT EXISTS idx_sessions_mode ON sessions(mode, started_at);
+CREATE INDEX IF NOT EXISTS idx_sessions_status ON sessions(status, started_at);
+CREATE INDEX IF NOT EXISTS idx_sessions_duration ON sessions(duration);
+CREATE INDEX IF NOT EXISTS idx_sessions_errors ON sessions(error_count);
+"""
+
+# External-content FTS table kept in sync by triggers
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS sessions_fts USING fts5(
+    task, errors, content='sessions', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS sessions_ai AFTER INSERT ON sessions BEGIN
+    INSERT INTO sessions_fts(rowid, task, errors) VALUES (new.rowid, new.task, new.errors);
+END;
+CREATE TRIGGER IF NOT EXISTS sessions_ad AFTER DELETE ON sessions BEGIN
+    INSERT INTO sessions_fts(sessions_fts, rowid, task, errors) VALUES ('delete', old.rowid, old.task, old.errors);
+END;
+CREATE TRIGGER IF NOT EXISTS sessions_au AFTER UPDATE OF task, errors ON sessions BEGIN
+    INSERT INTO sessions_fts(sessions_fts, rowid, task, errors) VALUES ('delete', old.rowid, old.task, old.errors);
+    INSERT INTO sessions_fts(rowid, task, errors) VALUES (new.rowid, new.task, new.errors);
+END;
+"""
+
+
+def _fts_query(query: str) -> str:
+    """Turn free text into an FTS5 query: every word must match (as a prefix)."""
+    terms = [term.replace('"', '""') for term in query.split()]
+    return " ".join(f'"{term}"*' for term in terms if term)
+
+
+def _timestamp(value: Any) -> Optional[float]:
+    """Epoch seconds from a number or an ISO string."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value).timestamp()
+        except ValueError:
+            return None
+    return None
+
+
+class SessionCatalog:
+    """
+    Thread-safe SQLite index of sessions.
+    """
+
+    def __init__(self, db_path: Union[str, Path], backfill_dir: Optional[Union[str, Path]] = None):
+        """
+        Open (or create) a catalog.
+
+        Args:
+            db_path: SQLite database file
+            backfill_dir: Logs directory to import existing sessions from
+                when the catalog is first created
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=10.0)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+
+        with self._lock, self._conn:
+            created = self._conn.execute("PRAGMA user_version").fetchone()[0] == 0
+            self._conn.executescript(_SCHEMA)
+            try:
+                self._conn.executescript(_FTS_SCHEMA)
+                self.fts_available = True
+            except sqlite3.OperationalError:
+                logger.warning("[SessionCatalog] SQLite has no FTS5, search falls back to LIKE")
+                self.fts_available = False
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+        if created and backfill_dir is not None:
+            imported = self.import_directory(backfill_dir)
+            if imported:
+                logger.info(f"[SessionCatalog] Imported {imported} existing sessions from {backfill_dir}")
+
+    def upsert(self, session_id: str, **fields):
+        """
+        Insert or update a session; only the given fields change.
+
+        Args:
+            session_id: Session identifier
+            **fields: Any of COLUMNS. started_at/ended_at accept epoch
+                seconds or ISO strings; tools and errors accept lists; extra
+                accepts a dict.
+        """
+        unknown = set(fields) - set(COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown catalog fields: {sorted(unknown)}")
+
+        for key in ("started_at", "ended_at"):
+            if key in fields:
+                fields[key] = _timestamp(fields[key])
+        if isinstance(fields.get("tools"), (list, tuple, set, frozenset)):
+            fields["tools"] = ",".join(sorted(fields["tools"]))
+        if isinstance(fields.get("errors"), (list, tuple)):
+            fields["errors"] = "\n".join(str(error) for error in fields["errors"])
+        if isinstance(fields.get("extra"), dict):
+            fields["extra"] = json.dumps(fields["extra"])
+
+        names = ["session_id"] + list(fields)
+        updates = ", ".join(f"{name} = excluded.{name}" for name in fields) or "session_id = session_id"
+        sql = (
+            f"INSERT INTO sessions ({', '.join(names)}) VALUES ({', '.join('?' * len(names))}) "
+            f"ON CONFLICT(session_id) DO UPDATE SET {updates}"
+        )
+        with self._lock, self._conn:
+            self._conn.execute(sql, [session_id] + list(fields.values()))
+
+    def delete(self, session_id: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def _rows(self, sql: str, params: Iterable[Any] = ()) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(sql, tuple(params)).fetchall()
+        sessions = []
+        for row in rows:
+            session = dict(row)
+            session["tools"] = [tool for tool in session["tools"].split(",") if tool]
+            session["extra"] = json.loads(session["extra"]) if session["extra"] else {}
+            sessions.append(session)
+        return sessions
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        rows = self._rows("SELECT * FROM sessions WHERE session_id = ?", (session_id,))
+        return rows[0] if rows else None
+
+    def recent(
+        self,
+        limit: int = 10,
+        mode: Optional[str] = None,
+        status: Optional[str] = None,
+        prefix: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Most recently started sessions, newest first.
+
+        Args:
+            limit: Maximum rows
+            mode: Only this mode (single, swarm, pantheon, ...)
+            status: Only this status (running, completed, ...)
+            prefix: Only session ids starting with this
+        """
+        clauses, params = [], []
+        if mode is not None:
+            clauses.append("mode = ?")
+            params.append(mode)
+        if status is not None:
+            clauses.append("status = ?")
+            params.append(status)
+        if prefix is not None:
+            clauses.append("substr(session_id, 1, ?) = ?")
+            params.extend([len(prefix), prefix])
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return self._rows(
+            f"SELECT * FROM sessions {where} ORDER BY started_at DESC, session_id DESC LIMIT ?",
+            params + [limit]
+        )
+
+    def latest(self, **filters) -> Optional[Dict[str, Any]]:
+        """The most recently started session matching the recent() filters."""
+        rows = self.recent(1, **filters)
+        return rows[0] if rows else None
+
+    def search(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Full-text search over task descriptions and error messages.
+
+        Returns:
+            Matching sessions, best match first (newest first without FTS5)
+        """
+        if not query.strip():
+            return []
+        if self.fts_available:
+            return self._rows(
+                "SELECT s.* FROM sessions_fts JOIN sessions s ON s.rowid = sessions_fts.rowid "
+                "WHERE sessions_fts MATCH ? ORDER BY bm25(sessions_fts) LIMIT ?",
+                (_fts_query(query), limit)
+            )
+
+        clauses, params = [], []
+        for term in query.split():
+            clauses.append("(task LIKE ? OR errors LIKE ?)")
+            params.extend([f"%{term}%"] * 2)
+        return self._rows(
+            f"SELECT * FROM sessions WHERE {' AND '.join(clauses)} ORDER BY started_at DESC LIMIT ?",
+            params + [limit]
+        )
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def import_directory(self, logs_dir: Union[str, Path]) -> int:
+        """
+        Import sessions from the session.json files under logs_dir.
+
+        Returns:
+            Number of sessions imported
+        """
+        logs_dir = Path(logs_dir)
+        if not logs_dir.is_dir():
+            return 0
+
+        imported = 0
+        for entry in os.scandir(logs_dir):
+            session_file = Path(entry.path) / "session.json"
+            if not entry.is_dir() or not session_file.is_file():
+                continue
+            try:
+                with open(session_file, "r") as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.debug(f"[SessionCatalog] Skipping {session_file}: {e}")
+                continue
+            if isinstance(data, dict):
+                self.upsert(entry.name, **session_fields(data, entry.name, session_file))
+                imported += 1
+
+        index_file = logs_dir / "session_index.json"
+        if index_file.is_file():
+            try:
+                with open(index_file, "r") as f:
+                    index = json.load(f)
+            except (OSError, ValueError):
+                index = {}
+            for session_id, info in index.items():
+                if self.get(session_id) is None:
+                    self.upsert(
+                        session_id,
+                        path=str(logs_dir / session_id),
+                        task=info.get("task", ""),
+                        model=info.get("model"),
+                        started_at=info.get("start_time"),
+                        extra={"debug_mode": info.get("debug_mode")}
+                    )
+                    imported += 1
+        return imported
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def session_fields(data: Dict[str, Any], session_id: str, session_file: Path) -> Dict[str, Any]:
+    """Catalog fields for a session.json written by any Grokputer session logger."""
+    errors = data.get("errors", [])
+    iterations = data.get("iterations", 0)
+    counts = data.get("counts", {})
+
+    tools = set()
+    for execution in data.get("tool_executions", []) if isinstance(data.get("tool_executions"), list) else []:
+        if isinstance(execution, dict) and execution.get("tool"):
+            tools.add(execution["tool"])
+    for iteration in iterations if isinstance(iterations, list) else []:
+        for tool_call in iteration.get("tool_calls", []):
+            tools.add(tool_call.get("function", {}).get("name", "unknown"))
+
+    # Written by SessionLogger (counts + recent lists) or older loggers (full lists)
+    metadata = data.get("metadata") or {}
+    started_at = _timestamp(data.get("start_time") or data.get("timestamp") or metadata.get("start_time"))
+    if started_at is None:
+        started_at = session_file.stat().st_mtime
+
+    return {
+        "path": str(session_file.parent),
+        "task": data.get("task") or metadata.get("task") or "",
+        "mode": data.get("mode") or (session_id.split("_", 1)[0] if "_" in session_id else None),
+        "status": data.get("status"),
+        "model": data.get("model") or metadata.get("model"),
+        "started_at": started_at,
+        "duration": data.get("duration_seconds"),
+        "iterations": len(iterations) if isinstance(iterations, list) else int(iterations or 0),
+        "tool_count": counts.get("tool_executions", len(data.get("tool_executions") or [])),
+        "api_calls": counts.get("api_calls", len(data.get("api_calls") or [])),
+        "error_count": counts.get("errors", len(errors) if isinstance(errors, list) else 0),
+        "tools": tools,
+        "errors": [e.get("error", "") if isinstance(e, dict) else str(e) for e in errors] if isinstance(errors, list) else []
+    }
+
+
+_catalogs: Dict[str, SessionCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_session_catalog(logs_dir: Union[str, Path] = "logs") -> SessionCatalog:
+    """
+    Get the process-wide catalog for a logs directory (<logs_dir>/sessions.db).
+
+    Existing sessions under logs_dir are imported the first time the
+    catalog file is created.
+    """
+    logs_dir = Path(logs_dir).resolve()
+    key = str(logs_dir)
+    with _catalogs_lock:
+        if key not in _catalogs:
+            _catalogs[key] = SessionCatalog(logs_dir / CATALOG_FILENAME, backfill_dir=logs_dir)
+        return _catalogs[key]
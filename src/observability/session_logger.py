@@ -3,34 +3,105 @@ Session logging with swarm metrics support.
 
 Tracks execution details, agent interactions, performance metrics,
 and swarm-specific data for multi-agent tasks.
+
+Per session directory:
+    events.jsonl   append-only, schema-versioned event stream (the record
+                   of the session; see event_stream)
+    session.log    human-readable log
+    metrics.json   fixed-size metrics snapshot, built from running counters
+    session.json   metrics plus the most recent tool calls, API calls and errors
+
+Each session is also registered in the SQLite session catalog of its log
+directory (see session_catalog) and updated whenever metrics are saved.
+
+Both streams are appended through BufferedLogWriters, so logging from
+agent threads costs a structural copy of the event's containers and an
+enqueue; events are serialized (and their large fields bounded) on the
+writer thread. Events that can't be copied or encoded are dropped and
+counted in metrics["dropped_events"]. Call flush() before reading the
+files mid-session. Memory stays flat: only counters and the last
+RECENT_EVENTS entries of each kind are kept in memory.
 """
 
+import copy
 import json
 import logging
+import math
+import os
+import random
+import re
+import sqlite3
 import time
+from collections import deque
 from pathlib import Path
 from typing import Dict, Any, List, Optional
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field, fields
 from datetime import datetime
 
+from .event_stream import EVENT_SCHEMA_VERSION, bound_value, encode_event, snapshot_value
+from .frame_store import FrameStore
+from .log_writer import BufferedLogWriter, DEFAULT_SYNC_POLICY
+from .session_catalog import get_session_catalog
+
 logger = logging.getLogger(__name__)
 
+# Entries of each kind kept in memory (and in session.json)
+RECENT_EVENTS = int(os.getenv("SESSION_LOG_RECENT_EVENTS", "100"))
+
+# SwarmMetrics bounds
+LATENCY_RESERVOIR_SIZE = 1024
+MAX_RECENT_ERRORS = 20
+TOP_ERROR_SIGNATURES = 20
+
+
+_QUOTED = re.compile(r"'[^']*'|\"[^\"]*\"")
+_HEX = re.compile(r"\b0x[0-9a-fA-F]+\b|\b[0-9a-fA-F]{8,}\b")
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+
+
+def error_signature(error: str) -> str:
+    """
+    Normalize an error message so repeats of the same failure group together.
+
+    Numbers, hex ids and quoted values are replaced by placeholders, e.g.
+    "Timeout after 30s on 'abc'" -> "Timeout after <n>s on <str>".
+    """
+    signature = _QUOTED.sub("<str>", error)
+    signature = _HEX.sub("<hex>", signature)
+    signature = _NUMBER.sub("<n>", signature)
+    return signature[:200]
+
 
 @dataclass
 class SwarmMetrics:
-    """Metrics specific to multi-agent swarm execution."""
+    """
+    Metrics specific to multi-agent swarm execution.
+
+    Every update is O(1) and memory is bounded however long the session
+    runs:
+    - handoff latency mean/variance are Welford running aggregates and the
+      max is a running max;
+    - handoff_latencies is a uniform reservoir sample (at most
+      LATENCY_RESERVOIR_SIZE values) used for quantiles;
+    - agent_errors keeps each agent's last MAX_RECENT_ERRORS messages, and
+      agent_error_counts its top TOP_ERROR_SIGNATURES error signatures
+      (space-saving counts; see error_signature).
+    """
 
     # Agent performance
     agent_states: Dict[str, str] = field(default_factory=dict)  # agent_id -> state
     agent_message_counts: Dict[str, int] = field(default_factory=dict)
-    agent_errors: Dict[str, List[str]] = field(default_factory=lambda: {})
+    agent_errors: Dict[str, List[str]] = field(default_factory=lambda: {})  # most recent per agent
+    agent_error_counts: Dict[str, Dict[str, int]] = field(default_factory=dict)  # agent -> signature -> count
+    total_errors: int = 0
 
     # Communication metrics
     total_handoffs: int = 0
-    handoff_latencies: List[float] = field(default_factory=list)  # milliseconds
+    handoff_latencies: List[float] = field(default_factory=list)  # milliseconds, reservoir sample
     message_count: int = 0
     avg_handoff_latency: float = 0.0
     max_handoff_latency: float = 0.0
+    handoff_latency_m2: float = 0.0  # Welford sum of squared deviations
 
     # Coordination metrics
     coordinator_decisions: int = 0
@@ -43,12 +114,46 @@ class SwarmMetrics:
     deadlocks_detected: int = 0
     agent_restarts: int = 0
 
+    _rng: random.Random = field(default_factory=lambda: random.Random(0), repr=False, compare=False)
+
     def add_handoff(self, latency_ms: float):
         """Record a handoff between agents."""
         self.total_handoffs += 1
-        self.handoff_latencies.append(latency_ms)
-        self.avg_handoff_latency = sum(self.handoff_latencies) / len(self.handoff_latencies)
-        self.max_handoff_latency = max(self.handoff_latencies)
+        delta = latency_ms - self.avg_handoff_latency
+        self.avg_handoff_latency += delta / self.total_handoffs
+        self.handoff_latency_m2 += delta * (latency_ms - self.avg_handoff_latency)
+        if self.total_handoffs == 1 or latency_ms > self.max_handoff_latency:
+            self.max_handoff_latency = latency_ms
+
+        # Algorithm R: every handoff so far is in the sample with equal probability
+        if len(self.handoff_latencies) < LATENCY_RESERVOIR_SIZE:
+            self.handoff_latencies.append(latency_ms)
+        else:
+            slot = self._rng.randrange(self.total_handoffs)
+            if slot < LATENCY_RESERVOIR_SIZE:
+                self.handoff_latencies[slot] = latency_ms
+
+    @property
+    def handoff_latency_variance(self) -> float:
+        """Sample variance of all handoff latencies."""
+        if self.total_handoffs < 2:
+            return 0.0
+        return self.handoff_latency_m2 / (self.total_handoffs - 1)
+
+    def handoff_latency_quantile(self, q: float) -> float:
+        """
+        Estimate a handoff latency quantile from the reservoir.
+
+        Args:
+            q: Quantile in [0, 1] (0.95 = p95)
+
+        Returns:
+            Latency in milliseconds (0.0 before any handoff)
+        """
+        if not self.handoff_latencies:
+            return 0.0
+        ordered = sorted(self.handoff_latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
 
     def increment_agent_messages(self, agent_id: str):
         """Increment message count for agent."""
@@ -57,13 +162,44 @@ class SwarmMetrics:
 
     def add_agent_error(self, agent_id: str, error: str):
         """Record agent error."""
-        if agent_id not in self.agent_errors:
-            self.agent_errors[agent_id] = []
-        self.agent_errors[agent_id].append(error)
+        self.total_errors += 1
+
+        recent = self.agent_errors.setdefault(agent_id, [])
+        recent.append(error)
+        if len(recent) > MAX_RECENT_ERRORS:
+            del recent[0]
+
+        # Space-saving: a new signature replaces the rarest one, inheriting its count
+        counts = self.agent_error_counts.setdefault(agent_id, {})
+        signature = error_signature(error)
+        if signature in counts or len(counts) < TOP_ERROR_SIGNATURES:
+            counts[signature] = counts.get(signature, 0) + 1
+        else:
+            rarest = min(counts, key=counts.get)
+            counts[signature] = counts.pop(rarest) + 1
+
+    def top_errors(self, k: int = 5) -> List[Dict[str, Any]]:
+        """The k most frequent error signatures across agents."""
+        ranked = sorted(
+            ((count, agent_id, signature)
+             for agent_id, counts in self.agent_error_counts.items()
+             for signature, count in counts.items()),
+            reverse=True
+        )
+        return [{"agent": agent_id, "signature": signature, "count": count}
+                for count, agent_id, signature in ranked[:k]]
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization."""
-        return asdict(self)
+        data = {f.name: copy.deepcopy(getattr(self, f.name)) for f in fields(self) if not f.name.startswith("_")}
+        data.update({
+            "handoff_latency_stddev": math.sqrt(self.handoff_latency_variance),
+            "handoff_latency_p50": self.handoff_latency_quantile(0.50),
+            "handoff_latency_p95": self.handoff_latency_quantile(0.95),
+            "handoff_latency_p99": self.handoff_latency_quantile(0.99),
+            "top_errors": self.top_errors()
+        })
+        return data
 
 
 class SessionLogger:
@@ -75,7 +211,7 @@ class SessionLogger:
     - Iteration details (screenshots, API calls, tool executions)
     - Swarm metrics (handoffs, agent states, communication)
     - Performance data (latency, throughput, errors)
-    - Structured logs (JSON + human-readable)
+    - Structured logs (JSONL event stream + human-readable)
     """
 
     def __init__(
@@ -83,7 +219,10 @@ class SessionLogger:
         session_id: str,
         task: str,
         log_dir: Path,
-        swarm_mode: bool = False
+        swarm_mode: bool = False,
+        frame_store: Optional[FrameStore] = None,
+        sync_policy: str = DEFAULT_SYNC_POLICY,
+        mode: Optional[str] = None
     ):
         """
         Initialize session logger.
@@ -93,10 +232,18 @@ class SessionLogger:
             task: Task description
             log_dir: Directory to store logs
             swarm_mode: Enable swarm metrics tracking
+            frame_store: Screenshot blob store (defaults to <log_dir>/frames,
+                shared by all sessions in log_dir)
+            sync_policy: Log durability: "none", "batch" (default, from
+                SESSION_LOG_SYNC) or "fsync" - see log_writer
+            mode: Mode recorded in the session catalog (defaults to
+                "swarm" or "single" from swarm_mode)
         """
         self.session_id = session_id
         self.task = task
         self.swarm_mode = swarm_mode
+        self.mode = mode or ("swarm" if swarm_mode else "single")
+        self.status = "running"
 
         # Create session directory
         self.session_dir = log_dir / session_id
@@ -104,21 +251,36 @@ class SessionLogger:
 
         # Log files
         self.log_file = self.session_dir / "session.log"
+        self.events_file = self.session_dir / "events.jsonl"
         self.json_file = self.session_dir / "session.json"
         self.metrics_file = self.session_dir / "metrics.json"
 
-        # Session data
+        # Session data: running counts plus a bounded window of recent entries
         self.start_time = time.time()
         self.iterations = 0
-        self.tool_executions = []
-        self.api_calls = []
-        self.errors = []
+        self.counts = {"tool_executions": 0, "api_calls": 0, "errors": 0}
+        self.dropped_events = 0
+        self.tool_executions = deque(maxlen=RECENT_EVENTS)
+        self.api_calls = deque(maxlen=RECENT_EVENTS)
+        self.errors = deque(maxlen=RECENT_EVENTS)
+        self.tools_used = set()
 
         # Swarm metrics
         self.swarm_metrics = SwarmMetrics() if swarm_mode else None
 
+        # Screenshots are persisted by hash instead of inlined into logs
+        self.frame_store = frame_store or FrameStore(log_dir / "frames")
+
         # Initialize log files
         self._init_logs()
+        self._writer = BufferedLogWriter(self.log_file, sync=sync_policy)
+        self._events = BufferedLogWriter(self.events_file, sync=sync_policy, encoder=self._encode_event)
+        self._emit("session_start", session_id=session_id, task=task, swarm_mode=swarm_mode, mode=self.mode)
+
+        self.catalog = get_session_catalog(log_dir)
+        self._update_catalog(
+            started_at=self.start_time, path=str(self.session_dir), task=task, mode=self.mode, status=self.status
+        )
 
         logger.info(f"[SessionLogger] Started session: {session_id}")
 
@@ -131,10 +293,26 @@ class SessionLogger:
             f.write(f"Swarm Mode: {self.swarm_mode}\n")
             f.write("-" * 80 + "\n\n")
 
+    def _emit(self, event_type: str, **fields):
+        """Queue an event for events.jsonl (snapshotted here, serialized on the writer thread)."""
+        try:
+            event = snapshot_value({"type": event_type, "ts": time.time(), **fields})
+        except Exception as e:
+            # e.g. another thread resized a dict while we copied it
+            self.dropped_events += 1
+            logger.warning(f"[SessionLogger] Dropped {event_type} event: {e}")
+            return
+        self._events.write(event)
+
+    def _encode_event(self, event: Dict[str, Any]) -> str:
+        # Swap inline screenshots for frame refs, then bound what's left
+        return encode_event(self.frame_store.externalize(event))
+
     def log_agent_start(self, agent_id: str):
         """Log agent startup."""
         msg = f"[AGENT START] {agent_id}"
         self._log(msg)
+        self._emit("agent_start", agent=agent_id)
 
         if self.swarm_metrics:
             self.swarm_metrics.agent_states[agent_id] = "started"
@@ -143,6 +321,7 @@ class SessionLogger:
         """Log agent shutdown."""
         msg = f"[AGENT STOP] {agent_id}"
         self._log(msg)
+        self._emit("agent_stop", agent=agent_id)
 
         if self.swarm_metrics:
             self.swarm_metrics.agent_states[agent_id] = "stopped"
@@ -151,7 +330,9 @@ class SessionLogger:
         """Log agent error."""
         msg = f"[AGENT ERROR] {agent_id}: {error}"
         self._log(msg)
-        self.errors.append({"agent": agent_id, "error": error, "timestamp": time.time()})
+        self._emit("agent_error", agent=agent_id, error=error)
+        self.counts["errors"] += 1
+        self.errors.append({"agent": agent_id, "error": bound_value(error, max_chars=500), "timestamp": time.time()})
 
         if self.swarm_metrics:
             self.swarm_metrics.add_agent_error(agent_id, error)
@@ -160,6 +341,7 @@ class SessionLogger:
         """Log agent activity/state change."""
         msg = f"[AGENT ACTIVITY] {agent_id} -> {state}"
         self._log(msg)
+        self._emit("agent_state", agent=agent_id, state=state)
 
         if self.swarm_metrics:
             self.swarm_metrics.agent_states[agent_id] = state
@@ -168,6 +350,7 @@ class SessionLogger:
         """Log agent waiting."""
         msg = f"[AGENT WAIT] {agent_id}"
         self._log(msg)
+        self._emit("agent_wait", agent=agent_id)
 
     def log_heartbeat(self, agent_id: str):
         """Log agent heartbeat."""
@@ -178,6 +361,7 @@ class SessionLogger:
         """Log message handoff between agents."""
         msg = f"[HANDOFF] {from_agent} -> {to_agent} ({latency_ms:.2f}ms)"
         self._log(msg)
+        self._emit("handoff", source=from_agent, target=to_agent, latency_ms=latency_ms)
 
         if self.swarm_metrics:
             self.swarm_metrics.add_handoff(latency_ms)
@@ -186,6 +370,7 @@ class SessionLogger:
         """Log message sent between agents."""
         msg = f"[MESSAGE] {from_agent} -> {to_agent}: {message_type}"
         self._log(msg)
+        self._emit("message", source=from_agent, target=to_agent, message_type=message_type)
 
         if self.swarm_metrics:
             self.swarm_metrics.increment_agent_messages(from_agent)
@@ -193,19 +378,21 @@ class SessionLogger:
     def log_iteration(self, iteration: int, data: Dict[str, Any]):
         """Log iteration details."""
         self.iterations = iteration
-        msg = f"\n[ITERATION {iteration}]\n{json.dumps(data, indent=2)}"
+        self._emit("iteration", iteration=iteration, data=data)
+        msg = f"\n[ITERATION {iteration}]\n{json.dumps(bound_value(data, max_chars=200), indent=2)}"
         self._log(msg)
 
     def log_tool_execution(self, tool_name: str, params: Dict, result: Any, status: str):
         """Log tool execution."""
-        execution = {
+        # Full (bounded) params and result go to the event stream only
+        self._emit("tool", tool=tool_name, params=params, result=result, status=status)
+        self.counts["tool_executions"] += 1
+        self.tools_used.add(tool_name)
+        self.tool_executions.append({
             "tool": tool_name,
-            "params": params,
-            "result": str(result)[:200],  # Truncate long results
             "status": status,
             "timestamp": time.time()
-        }
-        self.tool_executions.append(execution)
+        })
 
         msg = f"[TOOL] {tool_name} -> {status}"
         self._log(msg)
@@ -218,6 +405,8 @@ class SessionLogger:
             "success": success,
             "timestamp": time.time()
         }
+        self._emit("api_call", duration=duration, model=model, success=success)
+        self.counts["api_calls"] += 1
         self.api_calls.append(call)
 
         msg = f"[API] {model} ({duration:.2f}s) -> {'OK' if success else 'FAIL'}"
@@ -227,6 +416,7 @@ class SessionLogger:
         """Log safety confirmation."""
         msg = f"[CONFIRM] {agent_id}: {action} (score={score}) -> {'APPROVED' if approved else 'DENIED'}"
         self._log(msg)
+        self._emit("confirmation", agent=agent_id, action=action, score=score, approved=approved)
 
         if self.swarm_metrics:
             self.swarm_metrics.confirmations_requested += 1
@@ -234,48 +424,92 @@ class SessionLogger:
                 self.swarm_metrics.confirmations_approved += 1
 
     def _log(self, message: str):
-        """Write message to log file."""
+        """Queue message for the log file."""
         timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
-        with open(self.log_file, "a") as f:
-            f.write(f"[{timestamp}] {message}\n")
+        self._writer.write(f"[{timestamp}] {message}\n")
 
-    def save_metrics(self):
-        """Save final metrics to JSON."""
-        duration = time.time() - self.start_time
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until every message and event logged so far is on disk.
+
+        Returns:
+            False if the timeout expired first
+        """
+        return self._writer.flush(timeout) and self._events.flush(timeout)
 
+    def get_metrics(self) -> Dict[str, Any]:
+        """Current metrics (constant size, computed from running counters)."""
         metrics = {
             "session_id": self.session_id,
             "task": self.task,
-            "duration_seconds": duration,
+            "mode": self.mode,
+            "status": self.status,
+            "start_time": datetime.fromtimestamp(self.start_time).isoformat(),
+            "schema_version": EVENT_SCHEMA_VERSION,
+            "duration_seconds": time.time() - self.start_time,
             "iterations": self.iterations,
-            "tool_executions": len(self.tool_executions),
-            "api_calls": len(self.api_calls),
-            "errors": len(self.errors),
+            **self.counts,
+            "dropped_events": self.dropped_events + self._events.stats["encode_errors"],
             "swarm_mode": self.swarm_mode
         }
 
         if self.swarm_metrics:
             metrics["swarm"] = self.swarm_metrics.to_dict()
+        return metrics
+
+    def _write_json(self, path: Path, data: Dict[str, Any]):
+        # Write-then-rename: a crash never leaves a half-written file behind
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
 
-        with open(self.metrics_file, "w") as f:
-            json.dump(metrics, f, indent=2)
+    def save_metrics(self):
+        """Write the current metrics snapshot (safe to call at any time)."""
+        metrics = self.get_metrics()
+        self._write_json(self.metrics_file, metrics)
 
-        # Also save full session data
+        # Summary for session browsers; the complete record is events.jsonl
         session_data = {
             **metrics,
-            "tool_executions": self.tool_executions,
-            "api_calls": self.api_calls,
-            "errors": self.errors
+            "counts": dict(self.counts),
+            "events_file": self.events_file.name,
+            "tool_executions": list(self.tool_executions),
+            "api_calls": list(self.api_calls),
+            "errors": list(self.errors)
         }
-
-        with open(self.json_file, "w") as f:
-            json.dump(session_data, f, indent=2)
+        self._write_json(self.json_file, session_data)
+
+        self._update_catalog(
+            status=self.status,
+            duration=metrics["duration_seconds"],
+            iterations=self.iterations,
+            tool_count=self.counts["tool_executions"],
+            api_calls=self.counts["api_calls"],
+            error_count=self.counts["errors"],
+            tools=self.tools_used,
+            errors=[error["error"] for error in self.errors],
+            **({"ended_at": time.time()} if self.status != "running" else {})
+        )
 
         logger.info(f"[SessionLogger] Saved metrics to {self.metrics_file}")
 
-    def finalize(self):
-        """Finalize session and save all data."""
+    def _update_catalog(self, **fields):
+        # The catalog is an index; losing an update must never break a session
+        try:
+            self.catalog.upsert(self.session_id, **fields)
+        except sqlite3.Error as e:
+            logger.warning(f"[SessionLogger] Could not update session catalog: {e}")
+
+    def finalize(self, status: str = "completed"):
+        """
+        Finalize session and save all data.
+
+        Args:
+            status: Final status recorded in session.json and the catalog
+        """
         duration = time.time() - self.start_time
+        self.status = status
 
         summary = [
             "\n" + "=" * 80,
@@ -284,9 +518,9 @@ class SessionLogger:
             f"Task: {self.task}",
             f"Duration: {duration:.2f}s",
             f"Iterations: {self.iterations}",
-            f"Tool Executions: {len(self.tool_executions)}",
-            f"API Calls: {len(self.api_calls)}",
-            f"Errors: {len(self.errors)}",
+            f"Tool Executions: {self.counts['tool_executions']}",
+            f"API Calls: {self.counts['api_calls']}",
+            f"Errors: {self.counts['errors']}",
         ]
 
         if self.swarm_metrics:
@@ -295,6 +529,7 @@ class SessionLogger:
                 "Swarm Metrics:",
                 f"  Handoffs: {self.swarm_metrics.total_handoffs}",
                 f"  Avg Latency: {self.swarm_metrics.avg_handoff_latency:.2f}ms",
+                f"  P95 Latency: {self.swarm_metrics.handoff_latency_quantile(0.95):.2f}ms",
                 f"  Messages: {self.swarm_metrics.message_count}",
                 f"  Heartbeats: {self.swarm_metrics.heartbeats_received}",
                 f"  Agents: {len(self.swarm_metrics.agent_states)}",
@@ -304,6 +539,9 @@ class SessionLogger:
 
         summary_text = "\n".join(summary)
         self._log(summary_text)
+        self._emit("session_end", duration_seconds=duration, iterations=self.iterations, **self.counts)
+        self._writer.close()
+        self._events.close()
         self.save_metrics()
 
         logger.info(f"[SessionLogger] Finalized session: {self.session_id}")
@@ -9,8 +9,13 @@ from pathlib import Path
 from typing import Dict, List, Optional
 import hashlib
 
+from src.observability.session_catalog import get_session_catalog
+
 logger = logging.getLogger(__name__)
 
+# Most recent sessions the knowledge base is built from
+KNOWLEDGE_BASE_SESSIONS = 10000
+
 
 class OfflineCache:
     """
@@ -42,20 +47,22 @@ class OfflineCache:
 
         logs_dir = Path("logs")
         if logs_dir.exists():
-            for session_file in logs_dir.glob("*/session.json"):
-                try:
-                    with open(session_file, 'r') as f:
-                        data = json.load(f)
-                        task = data.get("task", "")
-                        if task:
-                            task_hash = hashlib.md5(task.encode()).hexdigest()
-                            kb["common_tasks"][task_hash] = {
-                                "task": task,
-                                "tools_used": self._extract_tools(data),
-                                "success": data.get("status") == "completed"
-                            }
-                except Exception as e:
-                    self.logger.debug(f"Skipping session: {e}")
+            # One catalog query instead of opening every session.json;
+            # oldest first so the newest run of a task wins
+            try:
+                sessions = get_session_catalog(logs_dir).recent(KNOWLEDGE_BASE_SESSIONS)
+            except Exception as e:
+                self.logger.debug(f"Session catalog unavailable: {e}")
+                sessions = []
+            for session in reversed(sessions):
+                task = session.get("task", "")
+                if task:
+                    task_hash = hashlib.md5(task.encode()).hexdigest()
+                    kb["common_tasks"][task_hash] = {
+                        "task": task,
+                        "tools_used": session["tools"],
+                        "success": session.get("status") == "completed"
+                    }
 
         # Save KB
         try:
@@ -66,14 +73,6 @@ class OfflineCache:
 
         return kb
 
-    def _extract_tools(self, session_data: Dict) -> List[str]:
-        """Extract tool names from session."""
-        tools = set()
-        for iteration in session_data.get("iterations", []):
-            for tool_call in iteration.get("tool_calls", []):
-                tools.add(tool_call.get("function", {}).get("name", "unknown"))
-        return list(tools)
-
     def find_similar_task(self, task: str) -> Optional[Dict]:
         """Find similar cached task."""
         task_hash = hashlib.md5(task.encode()).hexdigest()
@@ -0,0 +1,292 @@
+"""
+Shared asyncio subprocess runner.
+
+Every place that shells out (ToolExecutor, the Actor agent, generated-code
+execution, the MCP server) goes through this module instead of
+`subprocess.run(capture_output=True)`, which buffers unbounded output in
+memory and parks a thread for the whole timeout.
+
+- Output is read incrementally from both pipes. Each stream keeps at most
+  max_output bytes: the first half and the most recent half (head/tail),
+  with a marker for what was dropped in between.
+- Partial output is available while the command runs (RunningProcess.stdout
+  / .stderr, or an on_output callback per chunk).
+- The child runs in its own process group/session. On timeout the whole
+  group gets SIGTERM and then SIGKILL, so grandchildren don't outlive it.
+
+This module deliberately doesn't import src.config (the MCP server and
+generated-code tools run without an API key); its defaults come straight
+from the environment.
+
+Usage:
+    result = await run_process(["ls", "-la"], timeout=10)
+    result = run_process_sync(["ls", "-la"])       # from sync code / worker threads only
+"""
+
+import asyncio
+import logging
+import os
+import signal
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Any, Callable, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = float(os.getenv("PROCESS_TIMEOUT", "30"))
+DEFAULT_MAX_OUTPUT_BYTES = int(os.getenv("PROCESS_MAX_OUTPUT_BYTES", "65536"))
+KILL_GRACE_PERIOD = 2.0
+READ_CHUNK = 4096
+
+# on_output(stream_name, text_chunk), stream_name is "stdout" or "stderr"
+OutputCallback = Callable[[str, str], None]
+
+
+class OutputBuffer:
+    """Byte-bounded capture keeping the head and the tail of a stream."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_OUTPUT_BYTES):
+        self.head_limit = max_bytes // 2
+        self.tail_limit = max_bytes - self.head_limit
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.total_bytes = 0
+
+    def feed(self, chunk: bytes):
+        self.total_bytes += len(chunk)
+        if len(self.head) < self.head_limit:
+            take = self.head_limit - len(self.head)
+            self.head += chunk[:take]
+            chunk = chunk[take:]
+        if chunk:
+            self.tail += chunk
+            if len(self.tail) > self.tail_limit:
+                del self.tail[:len(self.tail) - self.tail_limit]
+
+    @property
+    def omitted_bytes(self) -> int:
+        return self.total_bytes - len(self.head) - len(self.tail)
+
+    @property
+    def truncated(self) -> bool:
+        return self.omitted_bytes > 0
+
+    def text(self) -> str:
+        if not self.truncated:
+            return bytes(self.head + self.tail).decode("utf-8", errors="replace")
+        return (
+            bytes(self.head).decode("utf-8", errors="replace")
+            + f"\n... [{self.omitted_bytes} bytes omitted] ...\n"
+            + bytes(self.tail).decode("utf-8", errors="replace")
+        )
+
+
+@dataclass
+class ProcessResult:
+    """Outcome of a finished (or killed) command."""
+    command: Union[str, List[str]]
+    returncode: int
+    stdout: str
+    stderr: str
+    timed_out: bool = False
+    duration: float = 0.0
+    stdout_bytes: int = 0
+    stderr_bytes: int = 0
+    truncated: bool = False
+
+
+class RunningProcess:
+    """
+    Handle to a started command whose output is being captured.
+
+    Reading `stdout`/`stderr` before `wait()` returns gives the output so far.
+    """
+
+    def __init__(
+        self,
+        process: asyncio.subprocess.Process,
+        command: Union[str, List[str]],
+        timeout: Optional[float],
+        max_output: int,
+        on_output: Optional[OutputCallback] = None
+    ):
+        self.process = process
+        self.command = command
+        self.timeout = timeout
+        self.on_output = on_output
+        self.started = time.time()
+        self.timed_out = False
+
+        self._stdout = OutputBuffer(max_output)
+        self._stderr = OutputBuffer(max_output)
+        self._task = asyncio.ensure_future(self._supervise())
+
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+
+    @property
+    def stdout(self) -> str:
+        return self._stdout.text()
+
+    @property
+    def stderr(self) -> str:
+        return self._stderr.text()
+
+    @property
+    def done(self) -> bool:
+        return self._task.done()
+
+    async def _pump(self, stream: Optional[asyncio.StreamReader], buffer: OutputBuffer, name: str):
+        if stream is None:
+            return
+        while True:
+            chunk = await stream.read(READ_CHUNK)
+            if not chunk:
+                return
+            buffer.feed(chunk)
+            if self.on_output is not None:
+                try:
+                    self.on_output(name, chunk.decode("utf-8", errors="replace"))
+                except Exception as e:
+                    logger.warning(f"[ProcessRunner] on_output callback failed: {e}")
+
+    async def _supervise(self) -> ProcessResult:
+        readers = asyncio.gather(
+            self._pump(self.process.stdout, self._stdout, "stdout"),
+            self._pump(self.process.stderr, self._stderr, "stderr"),
+            self.process.wait()
+        )
+        try:
+            await asyncio.wait_for(asyncio.shield(readers), self.timeout)
+        except asyncio.TimeoutError:
+            self.timed_out = True
+            logger.warning(f"[ProcessRunner] Timed out after {self.timeout}s, killing process group {self.pid}")
+            await self.kill()
+            try:
+                # Pipes close once the whole group is dead
+                await asyncio.wait_for(readers, KILL_GRACE_PERIOD)
+            except asyncio.TimeoutError:
+                readers.cancel()
+        except asyncio.CancelledError:
+            await self.kill()
+            readers.cancel()
+            raise
+
+        return ProcessResult(
+            command=self.command,
+            returncode=self.process.returncode if self.process.returncode is not None else -1,
+            stdout=self.stdout,
+            stderr=self.stderr,
+            timed_out=self.timed_out,
+            duration=time.time() - self.started,
+            stdout_bytes=self._stdout.total_bytes,
+            stderr_bytes=self._stderr.total_bytes,
+            truncated=self._stdout.truncated or self._stderr.truncated
+        )
+
+    def _signal_group(self, sig: int):
+        try:
+            if os.name == "posix":
+                os.killpg(self.process.pid, sig)
+            elif sig == signal.SIGTERM:
+                self.process.terminate()
+            else:
+                self.process.kill()
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    async def kill(self):
+        """Terminate the process group, escalating to SIGKILL after a grace period."""
+        self._signal_group(signal.SIGTERM)
+        try:
+            await asyncio.wait_for(self.process.wait(), KILL_GRACE_PERIOD)
+        except asyncio.TimeoutError:
+            pass
+        # Children may ignore SIGTERM even if the leader exited
+        self._signal_group(getattr(signal, "SIGKILL", signal.SIGTERM))
+
+    async def wait(self) -> ProcessResult:
+        """Wait for the command to finish (or be killed on timeout)."""
+        return await asyncio.shield(self._task)
+
+
+async def start_process(
+    command: Union[str, List[str]],
+    shell: bool = False,
+    timeout: Optional[float] = DEFAULT_TIMEOUT,
+    cwd: Optional[str] = None,
+    env: Optional[Dict[str, str]] = None,
+    max_output: int = DEFAULT_MAX_OUTPUT_BYTES,
+    on_output: Optional[OutputCallback] = None
+) -> RunningProcess:
+    """
+    Start a command in its own process group and begin capturing its output.
+
+    Args:
+        command: argv list (shell=False) or command string (shell=True)
+        shell: Run through the system shell
+        timeout: Seconds before the process group is killed (None = no limit)
+        cwd: Working directory
+        env: Environment (defaults to the current one)
+        max_output: Bytes retained per stream (head + tail)
+        on_output: Called with (stream_name, text) for each chunk as it arrives
+
+    Returns:
+        RunningProcess handle
+
+    Raises:
+        FileNotFoundError: If the program doesn't exist (shell=False)
+    """
+    kwargs: Dict[str, Any] = {
+        "stdin": asyncio.subprocess.DEVNULL,
+        "stdout": asyncio.subprocess.PIPE,
+        "stderr": asyncio.subprocess.PIPE,
+        "cwd": cwd,
+        "env": env
+    }
+    if os.name == "posix":
+        kwargs["start_new_session"] = True
+    else:
+        kwargs["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP
+
+    if shell:
+        process = await asyncio.create_subprocess_shell(command, **kwargs)
+    else:
+        process = await asyncio.create_subprocess_exec(*command, **kwargs)
+
+    return RunningProcess(process, command, timeout, max_output, on_output)
+
+
+async def run_process(
+    command: Union[str, List[str]],
+    shell: bool = False,
+    timeout: Optional[float] = DEFAULT_TIMEOUT,
+    cwd: Optional[str] = None,
+    env: Optional[Dict[str, str]] = None,
+    max_output: int = DEFAULT_MAX_OUTPUT_BYTES,
+    on_output: Optional[OutputCallback] = None
+) -> ProcessResult:
+    """Run a command to completion (see start_process for arguments)."""
+    running = await start_process(command, shell, timeout, cwd, env, max_output, on_output)
+    return await running.wait()
+
+
+def run_process_sync(command: Union[str, List[str]], **kwargs) -> ProcessResult:
+    """
+    Blocking wrapper around run_process for synchronous callers.
+
+    Meant for sync code and worker threads. Called on an event loop's
+    thread it still works (the command runs on a private loop in a helper
+    thread) but blocks that loop until the command exits, so async code
+    should await run_process or move the caller into asyncio.to_thread.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(run_process(command, **kwargs))
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, run_process(command, **kwargs)).result()
@@ -0,0 +1,236 @@
+"""
+Compiled command-safety policy.
+
+Every safety decision about a shell command goes through one engine:
+risk score, confirmation, shell-metacharacter rejection, network and
+destructive-command blocking. The callers are config.get_command_safety_score,
+config.requires_confirmation, ToolExecutor, the Actor, ToolAgent and the
+Coordinator. Before, each of them scanned the string its own way.
+
+A command is evaluated in a single pass:
+
+- One combined regex (alternation with a named group per rule) finds every
+  raw-string hazard: shell metacharacters, writes into system directories,
+  `dd if=`, fork bombs.
+- The tokenized argv is checked with O(1) table lookups: the program's base
+  score (config.SAFETY_SCORES), privilege escalation, network programs,
+  and force/recursive flags.
+
+Flag scoring keeps the original textual rule, applied to flag tokens only:
+a flag adds the force penalty if it contains "-f" and the recursive one if
+it contains "-r"/"-R" (so -xzf, -lR and -rf don't count as force, just as
+before). Only rm's recursive force delete reads combined short flags
+(-rf, -fR, -r -f). Filenames that merely contain "-f" no longer count.
+
+Verdicts are memoized per command string, and evaluate_many() scores a
+whole plan at once, so re-validating a 100-step plan is mostly cache hits.
+
+Usage:
+    policy = get_safety_policy()
+    verdict = policy.evaluate("rm -rf build")
+    verdict.score, verdict.risk_level, verdict.requires_confirmation, verdict.reasons
+"""
+
+import logging
+import os
+import re
+import shlex
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Raw-string rules, compiled into one alternation (group name = rule name)
+PATTERN_RULES = {
+    "fork_bomb": r":\s*\(\s*\)\s*\{",
+    "dd_input": r"\bdd\s+if=",
+    "system_path": r"/(?:etc|boot|sys|dev)/",
+    "command_substitution": r"\$\(|`",
+    "redirect": r">",
+    "metachar": r"[;&|<$\\\n]",
+}
+
+SHELL_METACHAR_RULES = {"command_substitution", "redirect", "metachar"}
+
+NETWORK_PROGRAMS = {"curl", "wget", "nc", "netcat", "ncat", "telnet", "ssh", "scp", "ftp"}
+PRIVILEGE_PROGRAMS = {"sudo", "su", "doas"}
+DESTRUCTIVE_PROGRAMS = {"mkfs", "fdisk", "parted", "format", "shutdown", "reboot", "halt", "poweroff"}
+
+DEFAULT_SCORE = 50
+CONFIRM_THRESHOLD = 70
+MAX_SCORE = 100
+
+
+def risk_level(score: int) -> str:
+    """Map a 0-100 score to LOW/MEDIUM/HIGH."""
+    return "LOW" if score <= 30 else "MEDIUM" if score <= CONFIRM_THRESHOLD else "HIGH"
+
+
+@dataclass(frozen=True)
+class Verdict:
+    """
+    Policy outcome for one command.
+
+    requires_confirmation is score-based; callers apply the global
+    config.REQUIRE_CONFIRMATION switch on top.
+    """
+    command: str
+    score: int
+    risk_level: str
+    requires_confirmation: bool
+    shell_metachars: bool = False
+    network: bool = False
+    destructive: bool = False
+    reasons: Tuple[str, ...] = ()
+
+    @property
+    def allowed_unattended(self) -> bool:
+        """Safe to run without a human: no shell syntax, network access or destructive effect."""
+        return not (self.shell_metachars or self.network or self.destructive)
+
+
+def _flags(tokens: List[str]) -> Tuple[bool, bool]:
+    """(force, recursive) score penalties: the original "-f"/"-r"/"-R" substring rule on flag tokens."""
+    force = recursive = False
+    for token in tokens:
+        if token.startswith("-"):
+            force = force or "-f" in token
+            recursive = recursive or "-r" in token or "-R" in token
+    return force, recursive
+
+
+def _rm_flags(tokens: List[str]) -> Tuple[bool, bool]:
+    """(force, recursive) for rm, understanding combined short flags like -rf."""
+    force = recursive = False
+    for token in tokens:
+        if token == "--force":
+            force = True
+        elif token == "--recursive":
+            recursive = True
+        elif token.startswith("-") and not token.startswith("--") and token[1:].isalpha():
+            force = force or "f" in token
+            recursive = recursive or "r" in token or "R" in token
+    return force, recursive
+
+
+class SafetyPolicy:
+    """
+    Single-pass, memoized command safety evaluation.
+    """
+
+    def __init__(self, scores: Optional[Dict[str, int]] = None, cache_size: int = 4096):
+        """
+        Initialize the policy.
+
+        Args:
+            scores: Program -> base risk score (defaults to config.SAFETY_SCORES)
+            cache_size: Memoized verdicts
+        """
+        if scores is None:
+            from src import config
+            scores = config.SAFETY_SCORES
+        self.scores = dict(scores)
+        self._pattern = re.compile("|".join(f"(?P<{name}>{rule})" for name, rule in PATTERN_RULES.items()))
+        self._evaluate_cached = lru_cache(maxsize=cache_size)(self._evaluate)
+
+    def _evaluate(self, command: str) -> Verdict:
+        hits = {match.lastgroup for match in self._pattern.finditer(command)}
+        try:
+            tokens = shlex.split(command)
+        except ValueError:
+            tokens = command.split()
+            hits.add("unbalanced_quotes")
+
+        if not tokens:
+            return Verdict(command, DEFAULT_SCORE, risk_level(DEFAULT_SCORE), False, reasons=("empty command",))
+
+        programs = [os.path.basename(token).lower() for token in tokens]
+        program = programs[0]
+        force, recursive = _flags(tokens[1:])
+        reasons = []
+
+        privileged = program in PRIVILEGE_PROGRAMS
+        target = programs[1] if privileged and len(programs) > 1 else program
+        recursive_delete = target == "rm" and all(_rm_flags(tokens[1:]))
+
+        if recursive_delete or (privileged and target == "rm"):
+            score = MAX_SCORE
+            reasons.append("recursive force delete" if recursive_delete else "privileged delete")
+        elif "redirect" in hits and "system_path" in hits:
+            score = 95
+            reasons.append("writes into a system directory")
+        elif privileged:
+            score = 95
+            reasons.append("privilege escalation")
+        else:
+            score = self.scores.get(program, self.scores.get(tokens[0], DEFAULT_SCORE))
+            if force:
+                score += 20
+                reasons.append("force flag")
+            if recursive:
+                score += 15
+                reasons.append("recursive flag")
+        score = min(MAX_SCORE, score)
+
+        network = any(name in NETWORK_PROGRAMS for name in programs)
+        destructive = (
+            score >= MAX_SCORE
+            or target in DESTRUCTIVE_PROGRAMS
+            or target.startswith("mkfs")
+            or bool(hits & {"fork_bomb", "dd_input"})
+        )
+        shell_metachars = bool(hits & SHELL_METACHAR_RULES)
+
+        if network:
+            reasons.append("network access")
+        if destructive and not reasons:
+            reasons.append("destructive command")
+        if shell_metachars:
+            reasons.append("shell metacharacters")
+        if "unbalanced_quotes" in hits:
+            reasons.append("unbalanced quotes")
+
+        return Verdict(
+            command=command,
+            score=score,
+            risk_level=risk_level(score),
+            requires_confirmation=score > CONFIRM_THRESHOLD,
+            shell_metachars=shell_metachars,
+            network=network,
+            destructive=destructive,
+            reasons=tuple(reasons)
+        )
+
+    def evaluate(self, command: str) -> Verdict:
+        """Evaluate one command (memoized)."""
+        return self._evaluate_cached(command or "")
+
+    def evaluate_many(self, commands: Iterable[str]) -> List[Verdict]:
+        """Evaluate every command of a plan, in order."""
+        return [self.evaluate(command) for command in commands]
+
+    def score(self, command: str) -> int:
+        return self.evaluate(command).score
+
+    # ToolAgent scorer interface
+    score_command = score
+
+    def get_stats(self) -> Dict[str, int]:
+        info = self._evaluate_cached.cache_info()
+        return {"hits": info.hits, "misses": info.misses, "cached": info.currsize}
+
+
+_policy: Optional[SafetyPolicy] = None
+_policy_lock = threading.Lock()
+
+
+def get_safety_policy() -> SafetyPolicy:
+    """Get the process-wide safety policy built from config."""
+    global _policy
+    with _policy_lock:
+        if _policy is None:
+            from src import config
+            _policy = SafetyPolicy(config.SAFETY_SCORES)
+        return _policy
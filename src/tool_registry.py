@@ -0,0 +1,281 @@
+"""
+Lazy-loading tool registry.
+
+Each tool is declared once, as a name, a JSON-schema description and an
+entry point. The entry point is a "module:attribute" string that is only
+imported the first time the tool is called, so heavy dependencies
+(pyautogui, psutil, selenium, cv2, ...) are never imported by a session
+that doesn't use them. Dispatch is a dict lookup plus a memoized resolve.
+
+config.TOOLS (the schema list sent to Grok) is generated from the
+registry, so adding a tool means adding one ToolSpec here.
+
+Tools with no entry point are executed by ToolExecutor itself. bash and
+computer need its confirmation state; the vault tools use its custom-tool
+hook.
+
+Usage:
+    registry = get_tool_registry()
+    registry.schemas()                     # -> config.TOOLS
+    registry.dispatch("invoke_prayer")     # imports src.tools on first call
+"""
+
+import importlib
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Any, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ToolSpec:
+    """Declaration of one tool."""
+    name: str
+    description: str
+    parameters: Dict[str, Any] = field(default_factory=lambda: {"type": "object", "properties": {}})
+    entry_point: Optional[str] = None  # "package.module:function"
+
+    def schema(self) -> Dict[str, Any]:
+        """OpenAI-style function tool schema."""
+        return {
+            "type": "function",
+            "function": {
+                "name": self.name,
+                "description": self.description,
+                "parameters": self.parameters
+            }
+        }
+
+
+class ToolRegistry:
+    """
+    Name -> ToolSpec mapping with lazily imported handlers.
+    """
+
+    def __init__(self, specs: Optional[List[ToolSpec]] = None):
+        """
+        Initialize the registry.
+
+        Args:
+            specs: Tools to register up front
+        """
+        self._specs: Dict[str, ToolSpec] = {}
+        self._handlers: Dict[str, Callable[..., Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+        self.stats = {
+            "calls": 0,
+            "imports": 0,
+            "import_time": 0.0,
+            "unknown": 0
+        }
+
+        for spec in specs or []:
+            self.register(spec)
+
+    def register(self, spec: ToolSpec, handler: Optional[Callable[..., Dict[str, Any]]] = None):
+        """
+        Register a tool (replacing any tool with the same name).
+
+        Args:
+            spec: Tool declaration
+            handler: Already-imported callable (skips lazy resolution of spec.entry_point)
+        """
+        with self._lock:
+            self._specs[spec.name] = spec
+            self._handlers.pop(spec.name, None)
+            if handler is not None:
+                self._handlers[spec.name] = handler
+
+    def tool(self, name: str, description: str, parameters: Optional[Dict[str, Any]] = None):
+        """Decorator registering a function as a tool."""
+        def decorator(func: Callable[..., Dict[str, Any]]):
+            spec = ToolSpec(name, description, parameters or {"type": "object", "properties": {}},
+                            f"{func.__module__}:{func.__qualname__}")
+            self.register(spec, func)
+            return func
+        return decorator
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._specs
+
+    def names(self) -> List[str]:
+        return list(self._specs)
+
+    def get(self, name: str) -> Optional[ToolSpec]:
+        return self._specs.get(name)
+
+    def schemas(self) -> List[Dict[str, Any]]:
+        """Tool schemas in registration order (the format of config.TOOLS)."""
+        return [spec.schema() for spec in self._specs.values()]
+
+    def handler(self, name: str) -> Optional[Callable[..., Dict[str, Any]]]:
+        """
+        Resolve a tool's callable, importing its module on first use.
+
+        Returns:
+            The callable, or None for unknown tools and tools without an entry point
+        """
+        handler = self._handlers.get(name)
+        if handler is not None:
+            return handler
+
+        spec = self._specs.get(name)
+        if spec is None or not spec.entry_point:
+            return None
+
+        with self._lock:
+            if name not in self._handlers:
+                module_name, _, attribute = spec.entry_point.partition(":")
+                start = time.time()
+                target: Any = importlib.import_module(module_name)
+                for part in attribute.split("."):
+                    target = getattr(target, part)
+                elapsed = time.time() - start
+                self.stats["imports"] += 1
+                self.stats["import_time"] += elapsed
+                logger.debug(f"[ToolRegistry] Loaded {spec.entry_point} in {elapsed * 1000:.1f}ms")
+                self._handlers[name] = target
+            return self._handlers[name]
+
+    def dispatch(self, name: str, **kwargs) -> Dict[str, Any]:
+        """
+        Execute a tool by name.
+
+        Args:
+            name: Tool name
+            **kwargs: Tool arguments
+
+        Returns:
+            Tool result, or an error dict for unknown/failed tools
+        """
+        self.stats["calls"] += 1
+        try:
+            handler = self.handler(name)
+        except (ImportError, AttributeError) as e:
+            logger.error(f"[ToolRegistry] Could not load tool {name}: {e}")
+            return {"status": "error", "error": f"Tool {name} unavailable: {e}", "tool": name}
+
+        if handler is None:
+            self.stats["unknown"] += 1
+            return {"status": "error", "error": f"Unknown tool: {name}", "available_tools": self.names()}
+
+        try:
+            return handler(**kwargs)
+        except Exception as e:
+            logger.error(f"[ToolRegistry] Error executing tool {name}: {e}")
+            return {"status": "error", "error": str(e), "tool": name}
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "import_time": round(self.stats["import_time"], 4),
+            "registered": len(self._specs),
+            "loaded": len(self._handlers)
+        }
+
+
+BUILTIN_TOOLS = [
+    ToolSpec(
+        name="bash",
+        description="Execute a bash shell command. Use for system operations, file management, and running programs.",
+        parameters={
+            "type": "object",
+            "properties": {
+                "command": {
+                    "type": "string",
+                    "description": "The bash command to execute"
+                }
+            },
+            "required": ["command"]
+        }
+    ),
+    ToolSpec(
+        name="computer",
+        description="Control the computer: mouse movements, clicks, keyboard input, screenshots.",
+        parameters={
+            "type": "object",
+            "properties": {
+                "action": {
+                    "type": "string",
+                    "enum": ["mouse_move", "left_click", "right_click", "double_click",
+                             "type", "key", "screenshot", "scroll"],
+                    "description": "The action to perform"
+                },
+                "coordinate": {
+                    "type": "array",
+                    "items": {"type": "integer"},
+                    "description": "X,Y coordinates for mouse actions (e.g., [100, 200])"
+                },
+                "text": {
+                    "type": "string",
+                    "description": "Text to type (for 'type' action)"
+                }
+            },
+            "required": ["action"]
+        }
+    ),
+    ToolSpec(
+        name="scan_vault",
+        description="Scan the meme vault directory and return file paths matching a pattern.",
+        parameters={
+            "type": "object",
+            "properties": {
+                "pattern": {
+                    "type": "string",
+                    "description": "Glob pattern to match files (e.g., '*.jpg', '*.png')"
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Maximum number of files to return",
+                    "default": 100
+                }
+            },
+            "required": ["pattern"]
+        }
+    ),
+    ToolSpec(
+        name="invoke_prayer",
+        description="Display the server prayer/mantra. Use on initialization.",
+        entry_point="src.tools:invoke_prayer"
+    ),
+    ToolSpec(
+        name="get_vault_stats",
+        description="Get statistics about vault contents including total files, images, videos, and other file types."
+    ),
+    ToolSpec(
+        name="mcp_vault_operation",
+        description="Execute advanced vault operations via MCP server: list files, read files, search content, or edit files.",
+        parameters={
+            "type": "object",
+            "properties": {
+                "operation": {
+                    "type": "string",
+                    "enum": ["list_vault_files", "read_vault_file", "search_vault", "edit_vault_file"],
+                    "description": "MCP operation to perform"
+                },
+                "arguments": {
+                    "type": "object",
+                    "description": "Operation-specific arguments (e.g., {pattern:'*.md'} for list, {query:'search term'} for search)"
+                }
+            },
+            "required": ["operation"]
+        }
+    ),
+]
+
+
+_registry: Optional[ToolRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_tool_registry() -> ToolRegistry:
+    """Get the process-wide tool registry (builtin tools pre-registered)."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ToolRegistry(BUILTIN_TOOLS)
+        return _registry
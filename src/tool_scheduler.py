@@ -0,0 +1,265 @@
+"""
+Conflict-aware scheduling for tool calls.
+
+A Grok response often carries several independent tool calls (a few
+read-only `bash` commands, a vault scan). Running them one after another
+makes a turn take the sum of their latencies. The scheduler classifies
+each call by the resources it touches:
+
+- screen/input: exclusive - never overlaps with anything
+- filesystem: read and write path sets - writes conflict with any
+  overlapping read or write (a path overlaps its ancestors/descendants)
+- pure compute: no resources, always free to run
+
+A call waits only for *earlier* calls it conflicts with, so conflicting
+calls keep the model's order while independent ones run concurrently
+under a concurrency cap. Results are always returned in the original order.
+Anything the classifier doesn't recognize is treated as exclusive, and so
+is any bash command with shell operators (&&, |, >, ...), command
+substitution, a wrapper program (env, xargs, timeout, ...) or a flag that
+makes a read-only program write or run something (find -delete/-exec,
+sort -o, ...).
+"""
+
+import logging
+import os
+import shlex
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Dict, Any, Callable, FrozenSet, List
+
+from src import config
+
+logger = logging.getLogger(__name__)
+
+# Commands that only read the paths they are given
+READ_ONLY_COMMANDS = {
+    "cat", "head", "tail", "less", "more", "ls", "dir", "tree", "find", "grep", "egrep", "fgrep",
+    "rg", "wc", "stat", "file", "du", "df", "diff", "cmp", "md5sum", "sha256sum", "sort", "uniq",
+    "pwd", "echo", "which", "whereis", "whoami", "date", "uname", "hostname", "env", "printenv",
+    "ps", "id", "uptime", "free", "basename", "dirname", "realpath", "readlink", "type"
+}
+
+# Programs that run another command given in their arguments
+WRAPPER_COMMANDS = {
+    "env", "xargs", "nice", "timeout", "nohup", "sudo", "doas", "time", "stdbuf", "ionice",
+    "command", "exec", "watch", "strace", "chroot", "setsid", "unbuffer", "parallel"
+}
+
+# Shell control/redirection tokens (split out by shlex with punctuation_chars)
+SHELL_OPERATORS = {"&&", "||", "|", "|&", ";", ";;", "&", ">", ">>", "<", "<<", "<<<", ">&", "<&", "&>", ">|", "(", ")"}
+
+# find actions that delete, run commands or write files
+FIND_WRITE_ACTIONS = {"-delete", "-exec", "-execdir", "-ok", "-okdir", "-fprint", "-fprint0", "-fprintf", "-fls"}
+
+# git subcommands that only read the repository (the working directory)
+GIT_READ_ONLY = {"status", "log", "diff", "show", "rev-parse", "ls-files", "blame", "describe"}
+
+# Commands that modify the paths they are given
+WRITE_COMMANDS = {
+    "cp", "mv", "rm", "rmdir", "mkdir", "touch", "tee", "chmod", "chown", "ln", "truncate",
+    "tar", "zip", "unzip", "gzip", "gunzip"
+}
+
+# Commands that open windows or otherwise drive the desktop
+GUI_COMMANDS = {"notepad", "notepad.exe", "xdg-open", "open", "start", "explorer", "gedit", "code", "firefox"}
+
+# Custom tools: name -> (reads vault, writes vault)
+VAULT_TOOLS = {
+    "scan_vault": (True, False),
+    "get_vault_stats": (True, False),
+    "mcp_vault_operation": (True, True),
+}
+PURE_TOOLS = {"invoke_prayer"}
+
+
+@dataclass(frozen=True)
+class ResourceSet:
+    """Resources a tool call touches."""
+    exclusive: bool = False
+    reads: FrozenSet[str] = field(default_factory=frozenset)
+    writes: FrozenSet[str] = field(default_factory=frozenset)
+    label: str = "compute"
+
+    def conflicts_with(self, other: "ResourceSet") -> bool:
+        if self.exclusive or other.exclusive:
+            return True
+        return (
+            _overlaps(self.writes, other.reads | other.writes)
+            or _overlaps(other.writes, self.reads)
+        )
+
+
+EXCLUSIVE = ResourceSet(exclusive=True, label="exclusive")
+SCREEN = ResourceSet(exclusive=True, label="screen")
+PURE = ResourceSet()
+
+
+def _overlaps(paths_a: FrozenSet[str], paths_b: FrozenSet[str]) -> bool:
+    for a in paths_a:
+        for b in paths_b:
+            if a == b or a.startswith(b.rstrip(os.sep) + os.sep) or b.startswith(a.rstrip(os.sep) + os.sep):
+                return True
+    return False
+
+
+def _normalize(path: str) -> str:
+    return os.path.abspath(os.path.expanduser(path))
+
+
+def _shell_tokens(command: str) -> List[str]:
+    """Split a command like the shell would, with operators as separate tokens."""
+    lexer = shlex.shlex(command, posix=True, punctuation_chars=True)
+    lexer.whitespace_split = True
+    return list(lexer)
+
+
+def has_write_args(program: str, args: List[str]) -> bool:
+    """Whether flags/arguments make an otherwise read-only program write or run commands."""
+    if program == "find":
+        return any(arg in FIND_WRITE_ACTIONS for arg in args)
+    if program == "sort":
+        return any(arg.startswith("-o") or arg.startswith("--output") for arg in args)
+    if program == "tree":
+        return "-o" in args
+    if program == "uniq":
+        # uniq INPUT OUTPUT
+        return len([arg for arg in args if not arg.startswith("-")]) > 1
+    if program == "rg":
+        return any(arg.startswith("--pre") for arg in args)
+    if program == "date":
+        return any(arg in ("-s", "--set") or arg.startswith("--set=") for arg in args)
+    if program == "hostname":
+        return any(not arg.startswith("-") for arg in args)
+    if program == "git":
+        return any(arg.startswith("--output") or arg.startswith("--ext-diff") for arg in args)
+    return False
+
+
+def classify_bash(command: str) -> ResourceSet:
+    """Infer the resources a bash command touches from its argv."""
+    try:
+        tokens = _shell_tokens(command)
+        argv = shlex.split(command)
+    except ValueError:
+        return EXCLUSIVE
+    if not argv:
+        return PURE
+
+    # Pipelines, lists, redirections and substitutions can do anything
+    if any(token in SHELL_OPERATORS for token in tokens) or "$(" in command or "`" in command:
+        return EXCLUSIVE
+
+    program = os.path.basename(argv[0]).lower()
+    paths = frozenset(_normalize(arg) for arg in argv[1:] if not arg.startswith("-"))
+
+    if program in WRAPPER_COMMANDS and len(argv) > 1:
+        return EXCLUSIVE
+    if has_write_args(program, argv[1:]):
+        return EXCLUSIVE
+    if program in GUI_COMMANDS:
+        return SCREEN
+    if program in READ_ONLY_COMMANDS:
+        # Bare `ls`/`find` read the working directory
+        return ResourceSet(reads=paths or frozenset({_normalize(".")}), label="fs-read")
+    if program == "git" and len(argv) > 1 and argv[1] in GIT_READ_ONLY:
+        return ResourceSet(reads=frozenset({_normalize(".")}), label="git-read")
+    if program in WRITE_COMMANDS:
+        return ResourceSet(writes=paths or frozenset({_normalize(".")}), label="fs-write")
+    return EXCLUSIVE
+
+
+def classify_tool_call(name: str, arguments: Dict[str, Any]) -> ResourceSet:
+    """
+    Classify a tool call by the resources it touches.
+
+    Args:
+        name: Tool function name
+        arguments: Parsed tool arguments
+
+    Returns:
+        ResourceSet (unknown tools are exclusive)
+    """
+    if name == "computer":
+        return SCREEN
+    if name == "bash":
+        return classify_bash(arguments.get("command", ""))
+    if name in PURE_TOOLS:
+        return PURE
+    if name in VAULT_TOOLS:
+        reads_vault, writes_vault = VAULT_TOOLS[name]
+        vault = frozenset({_normalize(str(config.VAULT_DIR))})
+        return ResourceSet(
+            reads=vault if reads_vault else frozenset(),
+            writes=vault if writes_vault else frozenset(),
+            label="vault-write" if writes_vault else "vault-read"
+        )
+    return EXCLUSIVE
+
+
+def dependencies(resources: List[ResourceSet]) -> List[List[int]]:
+    """For each call, the indices of earlier calls it must wait for."""
+    return [
+        [j for j in range(i) if resources[i].conflicts_with(resources[j])]
+        for i in range(len(resources))
+    ]
+
+
+class ToolScheduler:
+    """
+    Runs tool calls concurrently where their resources don't conflict.
+    """
+
+    def __init__(self, max_concurrency: int = None):
+        """
+        Initialize the scheduler.
+
+        Args:
+            max_concurrency: Max tool calls running at once (defaults to config.TOOL_MAX_CONCURRENCY)
+        """
+        self.max_concurrency = max_concurrency or config.TOOL_MAX_CONCURRENCY
+        self._pool = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="tool")
+
+        self.stats = {
+            "turns": 0,
+            "calls": 0,
+            "parallel_turns": 0,
+            "max_parallelism": 0
+        }
+
+    def run(self, items: List[Any], resources: List[ResourceSet], execute: Callable[[Any], Any]) -> List[Any]:
+        """
+        Execute items respecting conflicts, returning results in input order.
+
+        Args:
+            items: Work items (e.g. tool calls)
+            resources: ResourceSet per item
+            execute: Function run for each item (must not raise)
+
+        Returns:
+            execute(item) results, in the order of `items`
+        """
+        deps = dependencies(resources)
+        self.stats["turns"] += 1
+        self.stats["calls"] += len(items)
+
+        independent = sum(1 for d in deps if not d)
+        if len(items) > 1 and independent > 1:
+            self.stats["parallel_turns"] += 1
+        self.stats["max_parallelism"] = max(self.stats["max_parallelism"], min(independent, self.max_concurrency))
+
+        futures: List[Future] = []
+
+        def run_after(item: Any, before: List[Future]) -> Any:
+            # Earlier items were queued first, so they are running or done: no pool deadlock
+            if before:
+                wait(before)
+            return execute(item)
+
+        for item, item_deps in zip(items, deps):
+            futures.append(self._pool.submit(run_after, item, [futures[j] for j in item_deps]))
+
+        return [future.result() for future in futures]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats)
@@ -4,11 +4,13 @@ Tools for Grokputer - Including dynamic code generation and execution.
 """
 
 import ast
-import subprocess
 import sys
 from pathlib import Path
 from typing import Dict, Any, List
 
+from src.process_runner import run_process_sync
+from src.worker_pool import WORKER_POOL_ENABLED, get_worker_pool
+
 def invoke_prayer() -> Dict[str, Any]:
     """
     Invoke the server prayer.
@@ -69,13 +71,25 @@ def execute_generated_code(filename: str, sandbox_dir: str = "outputs") -> Dict[
         if not file_path.exists():
             return {"status": "error", "message": f"Script {file_path} not found"}
         
-        # Run the script, capture stdout/stderr
-        result = subprocess.run(
-            [sys.executable, str(file_path)],
-            capture_output=True,
-            text=True,
-            timeout=30  # 30s timeout for safety
-        )
+        # Run the script on a warm interpreter when possible, else a fresh one;
+        # stdout/stderr capture is bounded and the worker/process group is killed on timeout
+        result = None
+        if WORKER_POOL_ENABLED:
+            try:
+                result = get_worker_pool().run_script(str(file_path), timeout=30)  # 30s timeout for safety
+            except RuntimeError:
+                result = None
+        if result is None:
+            result = run_process_sync(
+                [sys.executable, str(file_path)],
+                timeout=30  # 30s timeout for safety
+            )
+        if result.timed_out:
+            return {
+                "status": "error",
+                "output": result.stdout,
+                "message": "Script execution timed out (30s limit)"
+            }
         
         output = result.stdout if result.stdout else "No output."
         error = result.stderr if result.stderr else None
@@ -93,7 +107,5 @@ def execute_generated_code(filename: str, sandbox_dir: str = "outputs") -> Dict[
                 "error": error,
                 "message": f"Script failed with code {result.returncode}"
             }
-    except subprocess.TimeoutExpired:
-        return {"status": "error", "message": "Script execution timed out (30s limit)"}
     except Exception as e:
         return {"status": "error", "message": f"Failed to execute script: {e}"}
@@ -0,0 +1,520 @@
+"""
+Pool of warm Python worker processes.
+
+Running a generated script (or `python foo.py` from a bash tool call)
+normally costs a process spawn plus interpreter startup and imports -
+hundreds of milliseconds before the first line of user code runs.
+WarmWorkerPool keeps a few interpreters running with common modules
+already imported and hands them jobs over a line-delimited JSON protocol,
+so a short script returns in tens of milliseconds.
+
+Workers are sandboxed and recycled:
+
+- Each worker runs in its own process group, stdin from /dev/null and,
+  where supported, an address-space limit. It starts with a minimal
+  environment; each job then runs with the environment its caller passes
+  (the same one a cold `python` would get), restored afterwards.
+- Jobs run as `__main__` in a fresh namespace with the script's directory
+  (or the cwd, for -c) first on sys.path, like a fresh interpreter. Both
+  Python-level output and anything written to fds 1/2 - C extensions,
+  os.system, subprocesses - is captured into the same bounded head/tail
+  buffers as src.process_runner.
+- A worker is retired after max_jobs jobs, or once its RSS has grown more
+  than max_rss_growth_mb above its post-startup baseline. Retiring also
+  clears any state a script left behind (monkeypatches, sys.modules entries).
+- A job that exceeds its timeout gets its worker's process group killed and
+  a replacement spawned.
+
+Like src.process_runner, this module reads its settings straight from the
+environment so tools that run without an API key can use it.
+
+Only interpreter-level settings can't change per job: the PYTHON*
+variables the worker started with, and the interpreter itself. Callers
+check can_run() and fall back to a cold process when they differ.
+
+Usage:
+    pool = get_worker_pool()
+    result = pool.run_script("outputs/season_haiku.py", timeout=30)   # ProcessResult
+"""
+
+import io
+import json
+import logging
+import os
+import queue
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Sequence
+
+from src.process_runner import DEFAULT_MAX_OUTPUT_BYTES, OutputBuffer, ProcessResult
+
+logger = logging.getLogger(__name__)
+
+WORKER_POOL_ENABLED = os.getenv("WORKER_POOL_ENABLED", "true").lower() == "true"
+WORKER_POOL_SIZE = int(os.getenv("WORKER_POOL_SIZE", "2"))
+WORKER_POOL_MAX_JOBS = int(os.getenv("WORKER_POOL_MAX_JOBS", "50"))
+WORKER_POOL_MAX_RSS_GROWTH_MB = int(os.getenv("WORKER_POOL_MAX_RSS_GROWTH_MB", "200"))
+WORKER_POOL_MEMORY_LIMIT_MB = int(os.getenv("WORKER_POOL_MEMORY_LIMIT_MB", "2048"))
+WORKER_POOL_PRELOAD = [
+    name.strip() for name in os.getenv(
+        "WORKER_POOL_PRELOAD",
+        "json,re,math,random,datetime,time,collections,itertools,functools,pathlib,string,textwrap,csv"
+    ).split(",") if name.strip()
+]
+
+# Environment workers start with (jobs bring their own); PYTHON* variables are
+# copied too, since they configure the interpreter at startup
+SAFE_ENV_KEYS = ("PATH", "HOME", "LANG", "LC_ALL", "TMPDIR", "TEMP", "TMP", "SYSTEMROOT", "TZ")
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+STARTUP_TIMEOUT = 30.0
+
+# The project root is only on the worker's sys.path while it imports this module
+_BOOTSTRAP = (
+    "import json, sys; sys.path.insert(0, json.loads(sys.argv[1])['root']); "
+    "from src.worker_pool import _worker_main; _worker_main()"
+)
+
+
+def _startup_env(env) -> Dict[str, str]:
+    """Environment variables the interpreter reads at startup."""
+    return {key: value for key, value in env.items() if key.startswith("PYTHON")}
+
+
+def python_job(argv: Sequence[str]) -> Optional[Dict[str, Any]]:
+    """
+    Recognize argv that a warm worker can run instead of a fresh interpreter.
+
+    Handles `python[3] script.py [args...]` and `python[3] -c "code" [args...]`.
+
+    Returns:
+        Job dict for WarmWorkerPool.run_job, or None if argv isn't a plain Python invocation
+    """
+    if len(argv) < 2 or Path(argv[0]).name.lower() not in ("python", "python3", "python.exe", "python3.exe"):
+        return None
+    if argv[1] == "-c" and len(argv) >= 3:
+        return {"code": argv[2], "args": list(argv[3:])}
+    if argv[1].endswith(".py") and not argv[1].startswith("-"):
+        return {"path": os.path.abspath(argv[1]), "args": list(argv[2:])}
+    return None
+
+
+class _Worker:
+    """One warm interpreter and its reply channel."""
+
+    def __init__(self, process: subprocess.Popen, baseline_rss: int):
+        self.process = process
+        self.baseline_rss = baseline_rss
+        self.rss = baseline_rss
+        self.jobs = 0
+        self.replies: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        threading.Thread(target=self._read_replies, daemon=True).start()
+
+    def _read_replies(self):
+        for line in self.process.stdout:
+            try:
+                self.replies.put(json.loads(line))
+            except ValueError:
+                logger.warning(f"[WarmWorkerPool] Malformed reply from worker {self.process.pid}")
+        self.replies.put(None)  # EOF: worker died
+
+    def send(self, job: Dict[str, Any]):
+        self.process.stdin.write(json.dumps(job) + "\n")
+        self.process.stdin.flush()
+
+    def kill(self):
+        try:
+            if os.name == "posix":
+                os.killpg(self.process.pid, signal.SIGKILL)
+            else:
+                self.process.kill()
+        except (ProcessLookupError, PermissionError, OSError):
+            pass
+        self.process.wait()
+
+
+class WarmWorkerPool:
+    """
+    Pre-started Python interpreters that run scripts without startup cost.
+    """
+
+    def __init__(
+        self,
+        size: int = None,
+        max_jobs: int = None,
+        max_rss_growth_mb: int = None,
+        preload: Optional[List[str]] = None,
+        max_output: int = DEFAULT_MAX_OUTPUT_BYTES
+    ):
+        """
+        Initialize the pool (workers start in the background).
+
+        Args:
+            size: Number of warm workers (defaults to WORKER_POOL_SIZE)
+            max_jobs: Jobs per worker before it is recycled (defaults to WORKER_POOL_MAX_JOBS)
+            max_rss_growth_mb: RSS growth over baseline that triggers recycling
+                (defaults to WORKER_POOL_MAX_RSS_GROWTH_MB)
+            preload: Modules imported at worker startup (defaults to WORKER_POOL_PRELOAD)
+            max_output: Bytes of stdout/stderr retained per job (head + tail)
+        """
+        self.size = size or WORKER_POOL_SIZE
+        self.max_jobs = max_jobs or WORKER_POOL_MAX_JOBS
+        self.max_rss_growth = (max_rss_growth_mb or WORKER_POOL_MAX_RSS_GROWTH_MB) * 1024 * 1024
+        self.preload = preload if preload is not None else WORKER_POOL_PRELOAD
+        self.max_output = max_output
+        self.startup_env = _startup_env(os.environ)
+
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._closed = False
+
+        self.stats = {
+            "jobs": 0,
+            "timeouts": 0,
+            "worker_crashes": 0,
+            "spawned": 0,
+            "recycled_jobs": 0,
+            "recycled_memory": 0,
+            "total_job_time": 0.0
+        }
+
+        for _ in range(self.size):
+            self._spawn_async()
+
+    def _worker_env(self) -> Dict[str, str]:
+        env = {key: os.environ[key] for key in SAFE_ENV_KEYS if key in os.environ}
+        env.update(self.startup_env)
+        return env
+
+    def can_run(self, interpreter: str, env: Dict[str, str]) -> bool:
+        """
+        Whether a job for `interpreter` with `env` behaves like a cold start here.
+
+        Args:
+            interpreter: argv[0] of the requested command (e.g. "python3")
+            env: Environment the command would run with
+
+        Returns:
+            True if interpreter resolves to this pool's interpreter and the
+            startup-time PYTHON* variables match the workers'
+        """
+        resolved = shutil.which(interpreter, path=env.get("PATH"))
+        if resolved is None or os.path.realpath(resolved) != os.path.realpath(sys.executable):
+            return False
+        return _startup_env(env) == self.startup_env
+
+    def _spawn(self) -> _Worker:
+        kwargs: Dict[str, Any] = {}
+        if os.name == "posix":
+            kwargs["start_new_session"] = True
+        else:
+            kwargs["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP
+
+        process = subprocess.Popen(
+            [sys.executable, "-c", _BOOTSTRAP,
+             json.dumps({"preload": self.preload, "max_output": self.max_output, "root": str(PROJECT_ROOT)})],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            bufsize=1,
+            env=self._worker_env(),
+            **kwargs
+        )
+        worker = _Worker(process, 0)
+        try:
+            ready = worker.replies.get(timeout=STARTUP_TIMEOUT)
+        except queue.Empty:
+            ready = None
+        if not ready or not ready.get("ready"):
+            worker.kill()
+            raise RuntimeError("Warm worker failed to start")
+
+        worker.baseline_rss = worker.rss = ready.get("rss", 0)
+        self.stats["spawned"] += 1
+        return worker
+
+    def _spawn_async(self):
+        def spawn():
+            try:
+                worker = self._spawn()
+            except (OSError, RuntimeError) as e:
+                logger.error(f"[WarmWorkerPool] Could not start worker: {e}")
+                return
+            if self._closed:
+                worker.kill()
+            else:
+                self._idle.put(worker)
+
+        threading.Thread(target=spawn, daemon=True).start()
+
+    def _retire(self, worker: _Worker, reason: str):
+        logger.debug(f"[WarmWorkerPool] Retiring worker {worker.process.pid} ({reason})")
+        worker.kill()
+        self._spawn_async()
+
+    def run_job(self, job: Dict[str, Any], timeout: Optional[float] = 30.0) -> ProcessResult:
+        """
+        Run a job on a warm worker.
+
+        Args:
+            job: {"path": script} or {"code": source}, plus optional "args", "cwd"
+                and "env" (defaults to the current environment)
+            timeout: Seconds before the worker is killed (None = no limit)
+
+        Returns:
+            ProcessResult (returncode from SystemExit, 1 on an uncaught exception)
+
+        Raises:
+            RuntimeError: If the pool is closed or no worker became available
+        """
+        if self._closed:
+            raise RuntimeError("Worker pool is closed")
+
+        job = {**job, "cwd": job.get("cwd") or os.getcwd(), "env": job.get("env") or dict(os.environ)}
+        command = job.get("path") or ["-c", job.get("code", "")]
+        try:
+            worker = self._idle.get(timeout=STARTUP_TIMEOUT)
+        except queue.Empty:
+            raise RuntimeError("No warm worker available")
+
+        start = time.time()
+        try:
+            worker.send(job)
+            reply = worker.replies.get(timeout=timeout)
+        except queue.Empty:
+            self.stats["timeouts"] += 1
+            self._retire(worker, "timeout")
+            return ProcessResult(command=command, returncode=-1, stdout="", stderr="",
+                                 timed_out=True, duration=time.time() - start)
+        except (OSError, ValueError) as e:
+            reply = None
+            logger.warning(f"[WarmWorkerPool] Lost worker {worker.process.pid}: {e}")
+
+        duration = time.time() - start
+        if reply is None:
+            self.stats["worker_crashes"] += 1
+            self._retire(worker, "crashed")
+            return ProcessResult(command=command, returncode=-1, stdout="",
+                                 stderr="Worker process exited unexpectedly", duration=duration)
+
+        worker.jobs += 1
+        worker.rss = reply.get("rss", worker.rss)
+        self.stats["jobs"] += 1
+        self.stats["total_job_time"] += duration
+
+        if worker.jobs >= self.max_jobs:
+            self.stats["recycled_jobs"] += 1
+            self._retire(worker, f"{worker.jobs} jobs")
+        elif worker.rss - worker.baseline_rss > self.max_rss_growth:
+            self.stats["recycled_memory"] += 1
+            self._retire(worker, f"RSS grew {(worker.rss - worker.baseline_rss) // (1024 * 1024)}MB")
+        else:
+            self._idle.put(worker)
+
+        return ProcessResult(
+            command=command,
+            returncode=reply.get("returncode", 1),
+            stdout=reply.get("stdout", ""),
+            stderr=reply.get("stderr", ""),
+            duration=duration,
+            stdout_bytes=reply.get("stdout_bytes", 0),
+            stderr_bytes=reply.get("stderr_bytes", 0),
+            truncated=reply.get("truncated", False)
+        )
+
+    def run_script(self, path: str, args: Sequence[str] = (), timeout: Optional[float] = 30.0,
+                   cwd: Optional[str] = None) -> ProcessResult:
+        """Run a Python script file as __main__ on a warm worker."""
+        return self.run_job({"path": os.path.abspath(path), "args": list(args), "cwd": cwd}, timeout)
+
+    def run_code(self, code: str, args: Sequence[str] = (), timeout: Optional[float] = 30.0,
+                 cwd: Optional[str] = None) -> ProcessResult:
+        """Run Python source as __main__ on a warm worker."""
+        return self.run_job({"code": code, "args": list(args), "cwd": cwd}, timeout)
+
+    def shutdown(self):
+        """Stop all idle workers; busy ones are stopped when they finish."""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().kill()
+            except queue.Empty:
+                break
+
+    def get_stats(self) -> Dict[str, Any]:
+        jobs = self.stats["jobs"]
+        return {
+            **self.stats,
+            "total_job_time": round(self.stats["total_job_time"], 3),
+            "avg_job_time": round(self.stats["total_job_time"] / jobs, 4) if jobs else 0.0,
+            "idle_workers": self._idle.qsize()
+        }
+
+
+_pool: Optional[WarmWorkerPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_worker_pool() -> WarmWorkerPool:
+    """Get the process-wide warm worker pool (started on first use)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = WarmWorkerPool()
+        return _pool
+
+
+# ---------------------------------------------------------------------------
+# Worker side
+# ---------------------------------------------------------------------------
+
+def _current_rss() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        # ru_maxrss is KB on Linux, bytes on macOS; peak is a fine proxy here
+        scale = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    except ImportError:
+        return 0
+
+
+def _drain(capture, buffer: OutputBuffer):
+    capture.seek(0)
+    for chunk in iter(lambda: capture.read(65536), b""):
+        buffer.feed(chunk)
+
+
+def _run_worker_job(job: Dict[str, Any], max_output: int, base_path: List[str]) -> Dict[str, Any]:
+    import runpy
+    import traceback
+
+    stdout, stderr = OutputBuffer(max_output), OutputBuffer(max_output)
+    saved = (sys.stdout, sys.stderr, sys.argv, os.getcwd(), dict(os.environ))
+    saved_fds = (os.dup(1), os.dup(2))
+    saved_modules = set(sys.modules)
+    path = job.get("path")
+    returncode = 0
+
+    # fds 1/2 go to per-job files so child processes and C code are captured too;
+    # sys.stdout/err write through to the same files, keeping the order
+    captures = (tempfile.TemporaryFile(), tempfile.TemporaryFile())
+    os.dup2(captures[0].fileno(), 1)
+    os.dup2(captures[1].fileno(), 2)
+    job_streams = tuple(
+        io.TextIOWrapper(open(fd, "wb", closefd=False), encoding="utf-8", errors="replace", write_through=True)
+        for fd in (1, 2)
+    )
+    sys.stdout, sys.stderr = job_streams
+    try:
+        os.environ.clear()
+        os.environ.update(job.get("env") or saved[4])
+        os.chdir(job.get("cwd") or saved[3])
+        sys.argv = [path or "-c"] + list(job.get("args", []))
+        # Like a fresh interpreter: the script's directory (or "" for -c) comes first
+        sys.path[:] = [os.path.dirname(path) if path else ""] + base_path
+        if path:
+            runpy.run_path(path, run_name="__main__")
+        else:
+            exec(compile(job.get("code", ""), "<string>", "exec"), {"__name__": "__main__"})
+    except SystemExit as e:
+        if e.code is None:
+            returncode = 0
+        elif isinstance(e.code, int):
+            returncode = e.code
+        else:
+            print(e.code, file=sys.stderr)
+            returncode = 1
+    except BaseException:
+        traceback.print_exc()
+        returncode = 1
+    finally:
+        for stream in job_streams:
+            try:
+                stream.close()
+            except (OSError, ValueError):
+                pass
+        os.dup2(saved_fds[0], 1)
+        os.dup2(saved_fds[1], 2)
+        for fd in saved_fds:
+            os.close(fd)
+        sys.stdout, sys.stderr, sys.argv = saved[0], saved[1], saved[2]
+        sys.path[:] = base_path
+        os.chdir(saved[3])
+        os.environ.clear()
+        os.environ.update(saved[4])
+        # Modules imported from the script's directory must not leak into the next job
+        _forget_modules_under(os.path.dirname(path) if path else job.get("cwd") or saved[3], saved_modules)
+
+    for capture, buffer in zip(captures, (stdout, stderr)):
+        _drain(capture, buffer)
+        capture.close()
+
+    return {
+        "returncode": returncode,
+        "stdout": stdout.text(),
+        "stderr": stderr.text(),
+        "stdout_bytes": stdout.total_bytes,
+        "stderr_bytes": stderr.total_bytes,
+        "truncated": stdout.truncated or stderr.truncated,
+        "rss": _current_rss()
+    }
+
+
+def _forget_modules_under(directory: str, keep: set):
+    prefix = os.path.abspath(directory).rstrip(os.sep) + os.sep
+    for name in set(sys.modules) - keep:
+        module_file = getattr(sys.modules.get(name), "__file__", None) or ""
+        if os.path.abspath(module_file).startswith(prefix):
+            del sys.modules[name]
+
+
+def _worker_main():
+    """Entry point of a worker process: preload, then serve jobs from stdin."""
+    import importlib
+
+    options = json.loads(sys.argv[1]) if len(sys.argv) > 1 else {}
+
+    if WORKER_POOL_MEMORY_LIMIT_MB > 0:
+        try:
+            import resource
+            limit = WORKER_POOL_MEMORY_LIMIT_MB * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ImportError, ValueError, OSError):
+            pass
+
+    for name in options.get("preload", []):
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+
+    # Keep the protocol channel private: scripts (and C code writing to fd 1) can't corrupt it
+    channel = os.fdopen(os.dup(1), "w", buffering=1, encoding="utf-8")
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 1)
+    sys.stdin = open(os.devnull)
+    jobs = os.fdopen(os.dup(0), "r", encoding="utf-8")
+    os.dup2(devnull, 0)
+
+    # sys.path as a fresh interpreter has it, minus the bootstrap's project root and -c's ""
+    base_path = list(sys.path)
+    for entry in (options.get("root"), ""):
+        if entry in base_path:
+            base_path.remove(entry)
+
+    channel.write(json.dumps({"ready": True, "pid": os.getpid(), "rss": _current_rss()}) + "\n")
+    max_output = options.get("max_output", DEFAULT_MAX_OUTPUT_BYTES)
+    for line in jobs:
+        if line.strip():
+            channel.write(json.dumps(_run_worker_job(json.loads(line), max_output, base_path)) + "\n")
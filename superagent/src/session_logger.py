@@ -5,8 +5,10 @@ Tracks execution sessions with structured data, metrics, and searchable logs.
 Useful for both Claude and Grok to review what happened during task execution.
 """
 
+import importlib.util
 import json
 import logging
+import sys
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Any, Optional
@@ -14,6 +16,25 @@ from dataclasses import dataclass, asdict
 import time
 
 
+def _session_catalog(logs_dir: Path):
+    """
+    Get Grokputer's SQLite session catalog for logs_dir.
+
+    superagent has its own `src` package, so the shared module
+    (src/observability/session_catalog.py at the repository root) is
+    loaded by path.
+    """
+    name = "grokputer_session_catalog"
+    module = sys.modules.get(name)
+    if module is None:
+        path = Path(__file__).resolve().parents[2] / "src" / "observability" / "session_catalog.py"
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        sys.modules[name] = module
+    return module.get_session_catalog(logs_dir)
+
+
 @dataclass
 class SessionMetadata:
     """Metadata for a Grokputer execution session."""
@@ -235,6 +256,22 @@ class SessionLogger:
         # Write summary
         self._write_summary()
 
+        # Record the outcome in the session catalog
+        errors = [error for it in self.iterations for error in it.errors]
+        try:
+            _session_catalog(self.logs_dir).upsert(
+                self.session_id,
+                status=reason,
+                ended_at=time.time(),
+                duration=total_duration,
+                iterations=len(self.iterations),
+                tool_count=sum(it.tool_calls_count for it in self.iterations),
+                error_count=len(errors),
+                errors=errors[-100:]
+            )
+        except Exception as e:
+            self.logger.warning(f"Could not update session catalog: {e}")
+
     def _save_json_log(self):
         """Save session data to JSON file."""
         session_data = {
@@ -324,6 +361,9 @@ class SessionLogger:
 class SessionIndex:
     """
     Index of all sessions for easy searching and comparison.
+
+    Backed by the SQLite session catalog (<logs_dir>/sessions.db); an
+    existing session_index.json is imported when the catalog is created.
     """
 
     def __init__(self, logs_dir: Path):
@@ -334,7 +374,7 @@ class SessionIndex:
             logs_dir: Directory containing session logs
         """
         self.logs_dir = Path(logs_dir)
-        self.index_path = self.logs_dir / "session_index.json"
+        self.catalog = _session_catalog(self.logs_dir)
 
     def add_session(self, session_id: str, metadata: SessionMetadata):
         """
@@ -344,16 +384,16 @@ class SessionIndex:
             session_id: Session ID
             metadata: Session metadata
         """
-        index = self._load_index()
-
-        index[session_id] = {
-            "task": metadata.task,
-            "model": metadata.model,
-            "start_time": metadata.start_time,
-            "debug_mode": metadata.debug_mode
-        }
-
-        self._save_index(index)
+        self.catalog.upsert(
+            session_id,
+            path=str(self.logs_dir / session_id),
+            task=metadata.task,
+            model=metadata.model,
+            mode="single",
+            status="running",
+            started_at=metadata.start_time,
+            extra={"debug_mode": metadata.debug_mode}
+        )
 
     def get_recent_sessions(self, limit: int = 10) -> List[Dict[str, Any]]:
         """
@@ -365,18 +405,11 @@ class SessionIndex:
         Returns:
             List of session info dictionaries
         """
-        index = self._load_index()
-        sessions = sorted(
-            index.items(),
-            key=lambda x: x[1]["start_time"],
-            reverse=True
-        )
-
-        return [{"session_id": sid, **info} for sid, info in sessions[:limit]]
+        return [self._info(session) for session in self.catalog.recent(limit)]
 
     def search_sessions(self, query: str) -> List[Dict[str, Any]]:
         """
-        Search sessions by task description.
+        Search sessions by task description (and error messages).
 
         Args:
             query: Search query
@@ -384,24 +417,16 @@ class SessionIndex:
         Returns:
             List of matching session info
         """
-        index = self._load_index()
-        matches = []
-
-        query_lower = query.lower()
-        for sid, info in index.items():
-            if query_lower in info["task"].lower():
-                matches.append({"session_id": sid, **info})
-
-        return matches
-
-    def _load_index(self) -> Dict[str, Any]:
-        """Load the session index."""
-        if self.index_path.exists():
-            with open(self.index_path, 'r') as f:
-                return json.load(f)
-        return {}
-
-    def _save_index(self, index: Dict[str, Any]):
-        """Save the session index."""
-        with open(self.index_path, 'w') as f:
-            json.dump(index, f, indent=2)
+        return [self._info(session) for session in self.catalog.search(query, limit=100)]
+
+    def _info(self, session: Dict[str, Any]) -> Dict[str, Any]:
+        """Catalog row -> the index entry format."""
+        started_at = session.get("started_at")
+        return {
+            "session_id": session["session_id"],
+            "task": session["task"],
+            "model": session.get("model"),
+            "start_time": datetime.fromtimestamp(started_at).isoformat() if started_at else "",
+            "debug_mode": session["extra"].get("debug_mode", False),
+            "status": session.get("status")
+        }
@@ -1,6 +1,8 @@
 import os
 from typing import Dict, Any
 
+from src.tools import TOOL_REGISTRY
+
 def file_op(path: str, op: str = 'read', content: str = None, mode: str = 'w') -> Dict[str, Any]:
     """
     Safe file read/write for .txt/.md vaults—Grokputer's eternal fs layer.
@@ -45,13 +45,13 @@ def mock_grok_client():
     """Mock GrokClient to avoid actual API calls."""
     with patch('src.agents.observer.GrokClient') as mock:
         instance = mock.return_value
-        instance.create_message = Mock(return_value={
+        instance.create_message = AsyncMock(return_value={
             "status": "success",
             "content": "This is a test screen showing desktop.",
             "model": "grok-vision-beta",
             "finish_reason": "stop"
         })
-        instance.test_connection = Mock(return_value=True)
+        instance.test_connection = AsyncMock(return_value=True)
         yield instance
 
 
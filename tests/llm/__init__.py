@@ -0,0 +1 @@
+"""LLM infrastructure tests."""
@@ -0,0 +1,94 @@
+"""
+Unit tests for the shared LLM client registry.
+"""
+
+import asyncio
+import pytest
+
+from src.llm.client_registry import ClientRegistry
+
+
+def test_registry_reuses_clients():
+    """Test same (base_url, key, model) returns the same client."""
+    registry = ClientRegistry()
+
+    client1 = registry.get_async_client("key", "http://localhost:1/v1", "model-a")
+    client2 = registry.get_async_client("key", "http://localhost:1/v1", "model-a")
+    client3 = registry.get_async_client("key", "http://localhost:1/v1", "model-b")
+
+    assert client1 is client2
+    assert client1 is not client3
+    assert registry.stats["clients_created"] == 2
+    assert registry.stats["client_reuses"] == 1
+
+    # Different models still share one connection pool
+    assert client1._client is client3._client
+
+
+@pytest.mark.asyncio
+async def test_registry_agent_quota():
+    """Test per-agent quota caps concurrent slots."""
+    registry = ClientRegistry(max_concurrency=4)
+    registry.set_quota("learner", 1)
+
+    active = 0
+    peak = 0
+
+    async def call():
+        nonlocal active, peak
+        async with registry.slot("learner"):
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+    await asyncio.gather(*(call() for _ in range(3)))
+
+    assert peak == 1
+    assert registry.stats["in_flight"] == 0
+    assert registry.stats["slot_waits"] >= 1
+
+
+@pytest.mark.asyncio
+async def test_registry_global_limit():
+    """Test global concurrency limit applies across agents."""
+    registry = ClientRegistry(max_concurrency=2)
+
+    async def call(agent_id):
+        async with registry.slot(agent_id):
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(call(f"agent{i}") for i in range(5)))
+
+    assert registry.stats["peak_in_flight"] == 2
+
+
+def test_registry_clients_disable_sdk_retries():
+    """Test SDK retries are off so only the rate limiter retries."""
+    registry = ClientRegistry(timeout=12.5)
+
+    async_client = registry.get_async_client(api_key="k", base_url="https://a.example/v1", model="m")
+    sync_client = registry.get_sync_client(api_key="k", base_url="https://a.example/v1", model="m")
+
+    for client in (async_client, sync_client):
+        assert client.max_retries == 0
+        assert client.timeout == 12.5
+
+
+def test_registry_async_state_per_event_loop():
+    """Test each event loop gets its own async pool, client and semaphore."""
+    registry = ClientRegistry(max_concurrency=2)
+
+    async def use():
+        client = registry.get_async_client(api_key="k", base_url="https://a.example/v1", model="m")
+        async with registry.slot("agent"):
+            await asyncio.sleep(0)
+        return client
+
+    client1 = asyncio.run(use())
+    client2 = asyncio.run(use())
+
+    # A second asyncio.run() must not reuse the first loop's pool or semaphore
+    assert client1 is not client2
+    assert client1._client is not client2._client
+    assert registry.stats["in_flight"] == 0
@@ -0,0 +1,97 @@
+"""
+Unit tests for LLM request hedging.
+"""
+
+import asyncio
+import pytest
+
+from src.llm.hedging import Hedger, LatencyTracker
+
+
+def _warm(hedger: Hedger, route, latency: float, n: int = 10):
+    for _ in range(n):
+        hedger.latencies.record(route, latency)
+
+
+def test_latency_tracker_quantile():
+    """Test quantiles over the sliding window."""
+    tracker = LatencyTracker(window=100)
+    for i in range(1, 101):
+        tracker.record("r", i / 100)
+
+    assert tracker.quantile("r", 0.95) == pytest.approx(0.96)
+    assert tracker.quantile("missing", 0.95) is None
+
+
+@pytest.mark.asyncio
+async def test_hedge_wins_and_loser_cancelled():
+    """Test a stalled call is hedged and the slow attempt cancelled."""
+    hedger = Hedger(quantile=0.95, budget=1.0, min_samples=5)
+    _warm(hedger, "route", 0.02)
+
+    attempts = []
+    cancelled = []
+
+    async def call():
+        attempt = len(attempts)
+        attempts.append(attempt)
+        try:
+            await asyncio.sleep(5.0 if attempt == 0 else 0.01)
+        except asyncio.CancelledError:
+            cancelled.append(attempt)
+            raise
+        return attempt
+
+    result = await asyncio.wait_for(hedger.run(call, route="route"), timeout=1.0)
+    await asyncio.sleep(0)
+
+    assert result == 1
+    assert cancelled == [0]
+    assert hedger.stats["hedged"] == 1
+    assert hedger.stats["hedge_wins"] == 1
+
+
+@pytest.mark.asyncio
+async def test_no_hedge_without_samples_or_budget():
+    """Test cold routes and an exhausted budget never duplicate calls."""
+    attempts = 0
+
+    async def call():
+        nonlocal attempts
+        attempts += 1
+        await asyncio.sleep(0.05)
+        return "ok"
+
+    cold = Hedger(budget=1.0, min_samples=5)
+    assert await cold.run(call, route="route") == "ok"
+    assert attempts == 1
+
+    broke = Hedger(budget=0.0, min_samples=5)
+    _warm(broke, "route", 0.001)
+    assert await broke.run(call, route="route") == "ok"
+    assert attempts == 2
+    assert broke.stats["budget_denied"] == 1
+
+
+@pytest.mark.asyncio
+async def test_queue_time_neither_hedges_nor_counts_as_latency():
+    """Test latency is measured from dispatch, not from submission."""
+    hedger = Hedger(quantile=0.95, budget=1.0, min_samples=5)
+    _warm(hedger, "route", 0.02)
+    attempts = 0
+
+    def call(on_dispatch):
+        async def queued_then_sent():
+            nonlocal attempts
+            attempts += 1
+            await asyncio.sleep(0.2)   # waiting for the limiter / a slot
+            on_dispatch()
+            await asyncio.sleep(0.01)  # the request itself
+            return "ok"
+        return queued_then_sent()
+
+    assert await hedger.run(call, route="route", track_dispatch=True) == "ok"
+
+    assert attempts == 1
+    assert hedger.stats["hedged"] == 0
+    assert max(hedger.latencies._samples["route"]) < 0.1
@@ -0,0 +1,157 @@
+"""
+Unit tests for token-aware conversation history.
+"""
+
+from src.llm.history import ConversationHistory, TokenCounter, truncate_middle
+
+
+def _turn(i, tool_output="x" * 2000):
+    return [
+        {"role": "assistant", "content": f"Step {i}: running tool",
+         "tool_calls": [{"id": f"c{i}", "function": {"name": "bash", "arguments": "{}"}}]},
+        {"role": "tool", "tool_call_id": f"c{i}", "content": tool_output},
+    ]
+
+
+def test_window_stays_under_budget():
+    """Test the window, summary included, stays within budget over a long task."""
+    history = ConversationHistory(token_budget=1500, keep_recent_turns=2)
+    counter = TokenCounter()
+
+    for i in range(1000):
+        history.extend(_turn(i))
+        window = history.get_window()
+        if i % 50 == 0 or i == 999:
+            assert history.last_window_tokens <= 1500, i
+            assert sum(counter.count(m) for m in window) <= 1500, i
+
+    rolled_up = history.last_summarized_turns
+    summary = window[0]["content"]
+    assert summary.startswith(f"Summary of {rolled_up} earlier turn(s)")
+    assert "oldest omitted" in summary
+    # The newest rolled-up turns are the ones kept in the summary
+    assert f"Step {rolled_up - 1}:" in summary and "Step 0:" not in summary
+
+
+def test_window_keeps_tool_results_with_their_turn():
+    """Test tool messages never appear without their assistant turn."""
+    history = ConversationHistory(token_budget=500, keep_recent_turns=1)
+    for i in range(5):
+        history.extend(_turn(i))
+
+    window = history.get_window()
+
+    assert window[0]["content"].startswith("Summary of")
+    for index, message in enumerate(window):
+        if message["role"] == "tool":
+            assert window[index - 1]["role"] in ("assistant", "tool")
+    # Newest turn is always present
+    assert window[-1]["tool_call_id"] == "c4"
+
+
+def test_old_tool_results_truncated_more():
+    """Test older tool results are cut harder than recent ones."""
+    history = ConversationHistory(token_budget=10000, keep_recent_turns=1,
+                                  recent_tool_chars=1000, old_tool_chars=100)
+    history.extend(_turn(0))
+    history.extend(_turn(1))
+
+    window = history.get_window()
+    old_result, new_result = window[1]["content"], window[3]["content"]
+
+    assert len(old_result) < 200
+    assert 900 < len(new_result) < 1100
+
+
+def test_token_counter_caches():
+    """Test repeated counts hit the cache."""
+    counter = TokenCounter()
+    message = {"role": "user", "content": "hello world" * 10}
+
+    first = counter.count(message)
+    second = counter.count(dict(message))
+
+    assert first == second
+    assert counter.hits == 1
+
+
+def test_truncate_middle():
+    """Test head/tail retention."""
+    text = "A" * 500 + "B" * 500
+    result = truncate_middle(text, 200)
+
+    assert result.startswith("A")
+    assert result.endswith("B")
+    assert "elided" in result
+
+
+def test_agent_context_window_summary_within_budget():
+    """Test collaboration context (summary included) stays within budget."""
+    from src.agents.base_llm_agent import BaseLLMAgent
+    from src.collaboration.message_models import AgentRole, CollaborationMessage, MessageType
+
+    class Agent(BaseLLMAgent):
+        async def generate_response(self, *args, **kwargs):
+            raise NotImplementedError
+
+        async def call_api(self, *args, **kwargs):
+            raise NotImplementedError
+
+    agent = Agent(role=AgentRole.GROK, model="m", api_key="k")
+    counter = TokenCounter()
+
+    for i in range(500):
+        agent.add_to_history(CollaborationMessage(
+            message_id=f"m{i}", correlation_id="c", message_type=MessageType.PROPOSAL,
+            sender=AgentRole.CLAUDE if i % 2 else AgentRole.GROK, round_number=i + 1,
+            content=f"Proposal {i}\n" + "detail " * 100
+        ))
+
+    window = agent.get_context_window(token_budget=1000)
+    tokens = sum(counter.count({"role": m.sender.value, "content": m.content}) for m in window)
+
+    assert tokens <= 1000
+    assert window[0].metadata == {"summary": True}
+    assert "oldest omitted" in window[0].content
+    assert window[-1].message_id == "m499"
+
+
+class _ToolExecutor:
+    """Stands in for ToolExecutor: every call succeeds with a long output."""
+
+    def execute_tool_calls(self, tool_calls):
+        return [{"tool_call_id": c["id"], "function_name": c["function"]["name"],
+                 "result": {"status": "success", "output": "".join(f"file_{i}.txt\n" for i in range(600))}} for c in tool_calls]
+
+
+def test_main_loop_compacts_history():
+    """Test the observe-reason-act loop records every turn and compacts its requests."""
+    import logging
+    from main import Grokputer
+    from src.grok_client import GrokClient
+    from src.llm.mock_server import MockLLMServer
+
+    script = {"rules": [
+        {"pattern": "^Task:", "content": "Listing", "tool_calls": [{"name": "bash", "arguments": {"command": "ls"}}]},
+        {"pattern": ".*", "content": "Next step"}
+    ]}
+    with MockLLMServer(script) as server:
+        grokputer = Grokputer.__new__(Grokputer)
+        grokputer.logger = logging.getLogger("test_history")
+        grokputer.grok_client = GrokClient(base_url=server.url, route=False, hedge=False)
+        grokputer.screen_observer = None  # capture fails -> text-only observations
+        grokputer.executor = _ToolExecutor()
+        grokputer.conversation_history = ConversationHistory(token_budget=500)
+        grokputer.stream_responses = False
+
+        grokputer.run_task("list files", max_iterations=6, output=lambda text: None)
+
+    history = grokputer.conversation_history
+    roles = [m["role"] for m in history.messages]
+    assert roles[:4] == ["user", "assistant", "tool", "assistant"]
+    assert roles.count("tool") == 6
+    call_ids = [m["tool_calls"][0]["id"] for m in history.messages if m.get("tool_calls")]
+    assert [m["tool_call_id"] for m in history.messages if m["role"] == "tool"] == call_ids
+
+    assert history.last_summarized_turns > 0
+    assert history.last_window_tokens <= 500
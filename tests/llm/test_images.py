@@ -0,0 +1,126 @@
+"""
+Unit tests for vision image parts (encoding, dedupe and byte budget).
+"""
+
+import base64
+import io
+
+from PIL import Image
+
+from src.llm.images import ImageBudget, ImageEncoder, image_part, is_image_part
+
+
+def _screenshot_b64(width=2400, height=1600, color=(30, 120, 200)) -> str:
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), color).save(buffer, format="PNG")
+    return base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
+def _user(text, url=None):
+    content = [{"type": "text", "text": text}]
+    if url:
+        content.append(image_part(url))
+    return {"role": "user", "content": content}
+
+
+def test_encoder_downscales_and_memoizes():
+    """Test frames are downscaled to JPEG and re-encoding is memoized."""
+    encoder = ImageEncoder(max_side=800, quality=60)
+    source = _screenshot_b64()
+
+    data_url = encoder.encode(source)
+    assert data_url.startswith("data:image/jpeg;base64,")
+    image = Image.open(io.BytesIO(base64.b64decode(data_url.split(",", 1)[1])))
+    assert max(image.size) == 800
+
+    assert encoder.encode(source) is data_url
+    assert encoder.stats["encoded"] == 1
+    assert encoder.stats["memo_hits"] == 1
+
+
+def test_budget_dedupes_and_caps_images():
+    """Test repeated images become references and old ones fall outside the budget."""
+    budget = ImageBudget(byte_budget=250, max_images=2)
+    frame_a = "data:image/jpeg;base64," + "A" * 100
+    frame_b = "data:image/jpeg;base64," + "B" * 100
+    frame_c = "data:image/jpeg;base64," + "C" * 100
+
+    messages = [
+        _user("turn 1", frame_a),
+        {"role": "assistant", "content": "ok"},
+        _user("turn 2", frame_b),
+        _user("turn 3", frame_c),
+        _user("turn 4", frame_c),
+    ]
+    result = budget.apply(messages)
+
+    def images(message):
+        return [p for p in message["content"] if p["type"] == "image_url"]
+
+    # Newest frame kept; the identical earlier copy replaced by a reference
+    assert images(result[4])[0]["image_url"]["url"] == frame_c
+    assert not images(result[3]) and "same as the later image" in result[3]["content"][1]["text"]
+    # One more distinct image fits, the oldest is dropped
+    assert images(result[2])
+    assert not images(result[0]) and "omitted" in result[0]["content"][1]["text"]
+
+    assert budget.stats["images_sent"] == 2
+    assert budget.stats["images_deduped"] == 1
+    assert budget.stats["images_dropped"] == 1
+    # Input untouched
+    assert images(messages[0])
+
+
+def test_grok_client_sends_image_part():
+    """Test create_message's user turn carries a real image content part."""
+    from src.grok_client import GrokClient
+
+    client = GrokClient()
+    messages = client._build_messages("Open notepad", _screenshot_b64(400, 300))
+
+    content = messages[-1]["content"]
+    assert content[0] == {"type": "text", "text": "Task: Open notepad"}
+    assert content[1]["image_url"]["url"].startswith("data:image/jpeg;base64,")
+
+
+def test_main_loop_dedupes_repeated_frames():
+    """Test an unchanged screen across loop iterations is sent as one image."""
+    import logging
+    from main import Grokputer
+    from src.grok_client import GrokClient
+    from src.llm.history import ConversationHistory
+    from src.llm.mock_server import MockLLMServer
+
+    class Screen:
+        def screenshot_to_base64(self):
+            return _screenshot_b64(400, 300)
+
+    class Executor:
+        def execute_tool_calls(self, tool_calls):
+            return [{"tool_call_id": c["id"], "function_name": "bash", "result": {"status": "success"}}
+                    for c in tool_calls]
+
+    script = {"rules": [
+        {"pattern": "Task:", "content": "Looking", "tool_calls": [{"name": "bash", "arguments": {"command": "ls"}}]},
+        {"pattern": ".*", "content": "Next step"}
+    ]}
+    with MockLLMServer(script) as server:
+        grokputer = Grokputer.__new__(Grokputer)
+        grokputer.logger = logging.getLogger("test_images")
+        grokputer.grok_client = GrokClient(base_url=server.url, route=False, hedge=False)
+        grokputer.screen_observer = Screen()
+        grokputer.executor = Executor()
+        grokputer.conversation_history = ConversationHistory()
+        grokputer.stream_responses = False
+
+        grokputer.run_task("watch the screen", max_iterations=3, output=lambda text: None)
+
+    # Every observation is an image part in the history...
+    observations = [m for m in grokputer.conversation_history.messages if m["role"] == "user"]
+    assert len(observations) == 3
+    assert all(any(is_image_part(p) for p in m["content"]) for m in observations)
+
+    # ...but each request carries the unchanged frame once
+    stats = grokputer.grok_client.image_budget.get_stats()
+    assert stats["images_deduped"] > 0
+    assert stats["images_sent"] == stats["requests"]
@@ -0,0 +1,72 @@
+"""
+Unit tests for the offline mock LLM server.
+"""
+
+import pytest
+import openai
+
+from src.llm.mock_server import LatencyModel, MockLLMServer
+
+
+SCRIPT = {
+    "seed": 1,
+    "rules": [
+        {"pattern": "(?i)open notepad", "tool_calls": [
+            {"name": "bash", "arguments": {"command": "notepad"}}
+        ]},
+        {"pattern": "(?i)fail", "errors": {"503": 1.0}},
+        {"pattern": ".*", "content": "Hello from the mock."}
+    ]
+}
+
+
+def test_latency_model_distributions():
+    """Test latency specs sample within their bounds."""
+    assert LatencyModel(0.25).sample() == 0.25
+    uniform = LatencyModel({"dist": "uniform", "low": 0.1, "high": 0.2})
+    assert all(0.1 <= uniform.sample() <= 0.2 for _ in range(50))
+    capped = LatencyModel({"dist": "lognormal", "median": 1.0, "sigma": 2.0, "max": 3.0})
+    assert all(0.0 <= capped.sample() <= 3.0 for _ in range(50))
+
+    with pytest.raises(ValueError):
+        LatencyModel({"dist": "pareto"})
+
+
+@pytest.mark.asyncio
+async def test_scripted_completion_and_tool_stream():
+    """Test scripted content, tool calls and streaming through the OpenAI SDK."""
+    with MockLLMServer(SCRIPT) as server:
+        client = openai.AsyncOpenAI(api_key="mock", base_url=server.url, max_retries=0)
+
+        response = await client.chat.completions.create(
+            model="mock", messages=[{"role": "user", "content": "say hi"}]
+        )
+        assert response.choices[0].message.content == "Hello from the mock."
+        assert response.usage.total_tokens > 0
+
+        stream = await client.chat.completions.create(
+            model="mock", messages=[{"role": "user", "content": "Open Notepad please"}],
+            stream=True, stream_options={"include_usage": True}
+        )
+        arguments = ""
+        usage = None
+        async for chunk in stream:
+            if chunk.usage:
+                usage = chunk.usage
+            for choice in chunk.choices:
+                for delta in choice.delta.tool_calls or []:
+                    arguments += delta.function.arguments or ""
+        assert arguments == '{"command": "notepad"}'
+        assert usage is not None
+
+        with pytest.raises(openai.InternalServerError):
+            await client.chat.completions.create(
+                model="mock", messages=[{"role": "user", "content": "please fail"}]
+            )
+
+        await client.close()
+
+    stats = server.get_stats()
+    assert stats["requests"] == 3
+    assert stats["streamed"] == 1
+    assert stats["errors"] == {"503": 1}
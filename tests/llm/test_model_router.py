@@ -0,0 +1,70 @@
+"""
+Unit tests for latency-aware model routing.
+"""
+
+import pytest
+
+from src.llm.model_router import ModelRouter, size_class
+from src.llm.mock_server import MockLLMServer
+
+
+CATALOG = {
+    "fast": {"quality": 0.7, "cost": 1.0, "max_context": 4000},
+    "balanced": {"quality": 0.85, "cost": 2.0},
+    "strong": {"quality": 1.0, "cost": 10.0},
+}
+THRESHOLDS = {"screen_check": 0.6, "reasoning": 0.85, "planning": 0.95}
+
+
+def _router(**kwargs) -> ModelRouter:
+    return ModelRouter(catalog=CATALOG, thresholds=THRESHOLDS, slos={"screen_check": 1.0},
+                       default_model="balanced", **kwargs)
+
+
+def test_cheapest_qualifying_model_by_class_and_size():
+    """Test class thresholds and context limits pick the model."""
+    router = _router()
+
+    assert router.route("screen_check", 500).model == "fast"
+    assert router.route("reasoning", 500).model == "balanced"
+    assert router.route("planning", 500).model == "strong"
+
+    # Too big for the fast model's context
+    decision = router.route("screen_check", 10000)
+    assert decision.model == "balanced"
+    assert decision.size == size_class(10000) == "medium"
+
+
+def test_slo_breach_degrades_route_and_falls_back():
+    """Test a model breaking its SLO is demoted behind healthy candidates."""
+    router = _router(min_samples=3, cooldown=60)
+    decision = router.route("screen_check", 100)
+
+    for _ in range(3):
+        router.record("fast", decision, latency=5.0, success=True)
+
+    rerouted = router.route("screen_check", 100)
+    assert rerouted.model == "balanced"
+    assert rerouted.fallbacks[-1] == "fast"
+    assert router.stats["degradations"] == 1
+
+
+@pytest.mark.asyncio
+async def test_grok_client_falls_back_on_model_failure():
+    """Test GrokClient retries the next candidate when the routed model fails."""
+    from src.grok_client import GrokClient
+
+    script = {"rules": [
+        {"pattern": ".*", "model": "fast", "errors": {"400": 1.0}},
+        {"pattern": ".*", "content": "fallback answer"}
+    ]}
+    with MockLLMServer(script) as server:
+        client = GrokClient(base_url=server.url, route=True)
+        client.router = _router()
+        client.cache = None
+
+        result = await client.create_message("is the screen unchanged?", task_class="screen_check")
+
+    assert result["status"] == "success"
+    assert result["content"] == "fallback answer"
+    assert client.router.stats["fallbacks_used"] == 1
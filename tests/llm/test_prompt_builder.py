@@ -0,0 +1,66 @@
+"""
+Unit tests for prefix-stable prompt assembly.
+"""
+
+import json
+
+from src.llm.prompt_builder import PromptBuilder
+
+
+TOOLS_A = [{"type": "function", "function": {"name": "bash", "parameters": {"type": "object", "properties": {}}}}]
+TOOLS_B = [{"function": {"parameters": {"properties": {}, "type": "object"}, "name": "bash"}, "type": "function"}]
+
+
+def _prefix_bytes(builder, messages):
+    return json.dumps({"messages": messages[:1], "tools": builder.tools})
+
+
+def test_prefix_is_byte_identical_across_calls():
+    """Test the prefix serializes the same regardless of dynamic suffix."""
+    builder = PromptBuilder(system_prompt="You are Grokputer\n", tools=TOOLS_A)
+
+    first = builder.build([{"role": "user", "content": "Task: a"}])
+    second = builder.build([{"role": "assistant", "content": "x"}, {"role": "user", "content": "Task: b"}])
+
+    assert _prefix_bytes(builder, first) == _prefix_bytes(builder, second)
+    assert first[0]["content"] == "You are Grokputer"
+    assert first[-1]["content"] == "Task: a"
+
+
+def test_tool_key_order_does_not_change_prefix():
+    """Test tool schemas are canonicalized."""
+    builder_a = PromptBuilder(system_prompt="sys", tools=TOOLS_A)
+    builder_b = PromptBuilder(system_prompt="sys", tools=TOOLS_B)
+
+    assert builder_a.prefix_hash == builder_b.prefix_hash
+    assert json.dumps(builder_a.tools) == json.dumps(builder_b.tools)
+
+
+def test_pinned_context_changes_prefix_once():
+    """Test pinning rebuilds the prefix only when content changes."""
+    builder = PromptBuilder(system_prompt="sys", tools=TOOLS_A)
+    original = builder.prefix_hash
+
+    builder.pin("memory", "User prefers dark mode")
+    pinned = builder.prefix_hash
+    builder.pin("memory", "User prefers dark mode")
+
+    assert pinned != original
+    assert builder.prefix_hash == pinned
+    assert "User prefers dark mode" in builder.build()[0]["content"]
+
+    builder.unpin("memory")
+    assert builder.prefix_hash == original
+
+
+def test_record_usage_reports_cached_tokens():
+    """Test cached prompt tokens are tracked from usage blocks."""
+    builder = PromptBuilder(system_prompt="sys", tools=TOOLS_A)
+
+    builder.record_usage({"prompt_tokens": 1000, "completion_tokens": 50,
+                          "prompt_tokens_details": {"cached_tokens": 800}})
+    builder.record_usage({"prompt_tokens": 1000, "completion_tokens": 50})
+
+    stats = builder.get_stats()
+    assert stats["cached_prompt_tokens"] == 800
+    assert stats["cached_prompt_ratio"] == "40.0%"
@@ -0,0 +1,172 @@
+"""
+Unit tests for the global LLM rate limiter and retry scheduler.
+"""
+
+import asyncio
+import time
+
+import pytest
+import httpx
+import openai
+
+from src.core.message_bus import MessagePriority
+from src.llm.rate_limiter import RateLimiter, parse_retry_after
+
+
+def _rate_limit_error(retry_after: str = None) -> openai.RateLimitError:
+    headers = {"retry-after": retry_after} if retry_after else {}
+    request = httpx.Request("POST", "http://localhost/v1/chat/completions")
+    response = httpx.Response(429, headers=headers, request=request)
+    return openai.RateLimitError("rate limited", response=response, body=None)
+
+
+@pytest.mark.asyncio
+async def test_waiters_released_in_priority_order():
+    """Test HIGH waiters go before LOW ones queued earlier."""
+    # 600 RPM with one token left: each further request waits ~0.1s
+    limiter = RateLimiter(requests_per_minute=600)
+    limiter.requests.tokens = 0
+
+    order = []
+
+    async def call(name, priority):
+        await limiter.acquire(priority=priority)
+        order.append(name)
+
+    tasks = [asyncio.create_task(call(f"low{i}", MessagePriority.LOW)) for i in range(2)]
+    await asyncio.sleep(0)
+    tasks.append(asyncio.create_task(call("high", MessagePriority.HIGH)))
+
+    await asyncio.gather(*tasks)
+
+    assert order == ["high", "low0", "low1"]
+    assert limiter.stats["acquired_by_priority"]["HIGH"] == 1
+
+
+@pytest.mark.asyncio
+async def test_retry_honors_retry_after():
+    """Test 429s are retried, not shorter than retry-after, and cut the rate."""
+    limiter = RateLimiter(requests_per_minute=600, max_retries=2, backoff_base=0.01, backoff_max=0.01)
+    attempts = 0
+
+    async def call():
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            raise _rate_limit_error("0.2")
+        return "ok"
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    result = await limiter.run(call)
+
+    assert result == "ok"
+    assert attempts == 2
+    assert loop.time() - start >= 0.19
+    assert limiter.stats["rate_limited"] == 1
+    assert limiter.stats["retries"] == 1
+    assert limiter.scale < 1.0
+
+
+@pytest.mark.asyncio
+async def test_non_retryable_errors_raise_immediately():
+    """Test client errors are not retried."""
+    limiter = RateLimiter(max_retries=3)
+    attempts = 0
+
+    async def call():
+        nonlocal attempts
+        attempts += 1
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        await limiter.run(call)
+
+    assert attempts == 1
+    assert limiter.stats["failures"] == 1
+
+
+def test_parse_retry_after():
+    """Test retry-after header parsing."""
+    assert parse_retry_after(_rate_limit_error("3")) == 3.0
+    assert parse_retry_after(_rate_limit_error()) is None
+    assert parse_retry_after(ValueError("no response")) is None
+
+
+@pytest.mark.asyncio
+async def test_one_http_attempt_per_limiter_attempt(monkeypatch):
+    """Test registry clients don't retry underneath the limiter."""
+    from src.llm import client_registry
+
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        if len(requests) < 3:
+            return httpx.Response(429, headers={"retry-after": "0"}, json={"error": {"message": "slow down"}})
+        return httpx.Response(200, json={
+            "id": "c1", "object": "chat.completion", "created": 0, "model": "m",
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": "ok"}}],
+        })
+
+    class MockAsyncClient(httpx.AsyncClient):
+        def __init__(self, **kwargs):
+            super().__init__(transport=httpx.MockTransport(handler), **kwargs)
+
+    monkeypatch.setattr(client_registry.httpx, "AsyncClient", MockAsyncClient)
+
+    registry = client_registry.ClientRegistry()
+    client = registry.get_async_client(api_key="k", base_url="http://llm.test/v1", model="m")
+    limiter = RateLimiter(requests_per_minute=6000, max_retries=2, backoff_base=0.01, backoff_max=0.01)
+
+    response = await limiter.run(
+        lambda: client.chat.completions.create(model="m", messages=[{"role": "user", "content": "hi"}])
+    )
+
+    assert response.choices[0].message.content == "ok"
+    assert limiter.stats["retries"] == 2
+    assert len(requests) == 3
+
+    # Exhausted retries: still one request per limiter attempt
+    requests.clear()
+    limiter = RateLimiter(requests_per_minute=6000, max_retries=1, backoff_base=0.01, backoff_max=0.01)
+    with pytest.raises(openai.RateLimitError):
+        await limiter.run(
+            lambda: client.chat.completions.create(model="m", messages=[{"role": "user", "content": "hi"}])
+        )
+    assert len(requests) == 2
+
+
+def test_waiter_abandoned_with_its_loop_does_not_wedge_next_loop():
+    """Test a fresh event loop is served after an earlier loop died with a queued waiter."""
+    limiter = RateLimiter(requests_per_minute=600)
+    limiter.blocked_until = time.time() + 0.2
+
+    old_loop = asyncio.new_event_loop()
+    old_loop.create_task(limiter.acquire())
+    old_loop.run_until_complete(asyncio.sleep(0.01))
+    old_loop.close()
+
+    async def acquire():
+        await asyncio.wait_for(limiter.acquire(), timeout=2)
+
+    asyncio.run(acquire())
+    assert limiter.stats["acquired"] == 1
+
+
+@pytest.mark.asyncio
+async def test_proposer_calls_go_through_limiter():
+    """Test the proposer's sync-client completions are admitted by the shared limiter."""
+    from src.autonomous.proposer import ProposalGeneratorAgent
+    from src.llm.mock_server import MockLLMServer
+
+    with MockLLMServer({"rules": [{"pattern": ".*", "content": "proposal"}]}) as server:
+        agent = ProposalGeneratorAgent(api_key="test", base_url=server.url)
+        agent.rate_limiter = RateLimiter(requests_per_minute=600)
+
+        content = await agent._send([{"role": "user", "content": "fix it"}], temperature=0.3)
+
+    assert content == "proposal"
+    assert agent.rate_limiter.stats["acquired"] == 1
+    assert agent.rate_limiter.stats["acquired_by_priority"]["LOW"] == 1
@@ -0,0 +1,147 @@
+"""
+Unit tests for the LLM response cache.
+"""
+
+import base64
+import io
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from src.llm.mock_server import MockLLMServer
+from src.llm.response_cache import ResponseCache, is_cacheable
+
+
+MESSAGES = [
+    {"role": "system", "content": "You are Grokputer"},
+    {"role": "user", "content": "Task: list files"}
+]
+
+
+def test_cache_key_is_canonical():
+    """Test key ignores dict ordering and buckets temperature."""
+    reordered = [{"content": m["content"], "role": m["role"]} for m in MESSAGES]
+
+    key1 = ResponseCache.make_key("grok", MESSAGES, temperature=0.7)
+    key2 = ResponseCache.make_key("grok", reordered, temperature=0.75)
+    key3 = ResponseCache.make_key("grok", MESSAGES, temperature=0.1)
+
+    assert key1 == key2
+    assert key1 != key3
+
+
+def test_cache_memory_hit_and_stats():
+    """Test memory tier hit records saved latency."""
+    cache = ResponseCache(max_entries=2, default_ttl=60)
+    key = cache.make_key("grok", MESSAGES)
+
+    assert cache.get(key) is None
+    cache.put(key, {"status": "success", "content": "ok"}, latency=1.5)
+
+    assert cache.get(key)["content"] == "ok"
+
+    stats = cache.get_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["saved_latency"] == 1.5
+    assert stats["hit_rate"] == "50.0%"
+
+
+def test_cache_persistent_tier():
+    """Test entries survive a new cache instance via SQLite."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = Path(tmpdir) / "cache.sqlite3"
+        key = ResponseCache.make_key("grok", MESSAGES)
+
+        ResponseCache(db_path=db_path).put(key, {"content": "persisted"}, latency=2.0)
+
+        restarted = ResponseCache(db_path=db_path)
+        assert restarted.get(key)["content"] == "persisted"
+        assert restarted.stats["disk_hits"] == 1
+
+
+def test_cache_ttl_expiry():
+    """Test expired entries are not returned."""
+    cache = ResponseCache(default_ttl=60)
+    key = cache.make_key("grok", MESSAGES)
+
+    cache.put(key, {"content": "short-lived"}, latency=1.0, ttl=0.01)
+    time.sleep(0.02)
+
+    assert cache.get(key) is None
+    assert cache.stats["expired"] == 1
+
+
+def test_cache_lru_eviction():
+    """Test memory tier evicts least recently used entries."""
+    cache = ResponseCache(max_entries=2, default_ttl=60)
+
+    cache.put("a", {"content": "a"}, latency=0.1)
+    cache.put("b", {"content": "b"}, latency=0.1)
+    cache.get("a")
+    cache.put("c", {"content": "c"}, latency=0.1)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+
+
+def test_only_deterministic_tool_calls_are_cacheable():
+    """Test sampled responses that can carry tool calls are never cached."""
+    tools = [{"type": "function", "function": {"name": "bash"}}]
+
+    assert is_cacheable(0.7)
+    assert is_cacheable(0, tools)
+    assert not is_cacheable(0.7, tools)
+
+
+def test_grok_client_keys_name_the_latest_frame():
+    """Test follow-up turns acting on different frames get different keys."""
+    from src.grok_client import GrokClient
+
+    client = GrokClient(base_url="http://127.0.0.1:9/v1")
+    cache = ResponseCache(max_entries=8, default_ttl=60)
+
+    def follow_up(frame_url):
+        return [
+            {"role": "user", "content": [
+                {"type": "text", "text": "Task: click OK"},
+                {"type": "image_url", "image_url": {"url": frame_url}}
+            ]},
+            {"role": "assistant", "content": "clicking"},
+            {"role": "tool", "tool_call_id": "1", "content": "done"}
+        ]
+
+    key1 = client._cache_key(cache, "m", follow_up("data:image/jpeg;base64,AAAA"), None, 0, 100, None)
+    key2 = client._cache_key(cache, "m", follow_up("data:image/jpeg;base64,BBBB"), None, 0, 100, None)
+    other_model = client._cache_key(cache, "n", follow_up("data:image/jpeg;base64,AAAA"), None, 0, 100, None)
+
+    assert len({key1, key2, other_model}) == 3
+    assert client._cache_key(cache, "m", follow_up("data:image/jpeg;base64,AAAA"), [{"type": "function"}], 0.7, 100, None) is None
+
+
+@pytest.mark.asyncio
+async def test_grok_client_analysis_call_hits_cache():
+    """Test a tool-free, temperature-0 vision call on the same frame is served from the cache."""
+    from src.grok_client import GrokClient
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (320, 200), (30, 120, 200)).save(buffer, format="PNG")
+    screenshot = base64.b64encode(buffer.getvalue()).decode("ascii")
+
+    with MockLLMServer({"rules": [{"pattern": ".*", "content": "a desktop"}]}) as server:
+        client = GrokClient(base_url=server.url, route=False, hedge=False)
+        client.cache = ResponseCache(max_entries=8, default_ttl=60)
+
+        first = await client.create_message("Describe the screen", screenshot, temperature=0, use_tools=False)
+        second = await client.create_message("Describe the screen", screenshot, temperature=0, use_tools=False)
+        # The agent loop's sampled, tool-offering call is never cached
+        await client.create_message("Describe the screen", screenshot)
+
+        requests = server.get_stats()["requests"]
+
+    assert first["content"] == second["content"] == "a desktop"
+    assert second.get("cached") is True
+    assert requests == 2
@@ -0,0 +1,53 @@
+"""
+Unit tests for incremental tool-call parsing.
+"""
+
+import json
+
+from src.llm.streaming import ToolCallAccumulator
+
+
+def _delta(index, id=None, name=None, arguments=None):
+    return {"index": index, "id": id, "type": "function",
+            "function": {"name": name, "arguments": arguments}}
+
+
+def test_tool_call_released_when_arguments_complete():
+    """Test a tool call is emitted on the chunk that closes its JSON."""
+    acc = ToolCallAccumulator()
+
+    assert acc.feed([_delta(0, id="call_1", name="bash")]) == []
+    assert acc.feed([_delta(0, arguments='{"comm')]) == []
+    ready = acc.feed([_delta(0, arguments='and": "ls"}')])
+
+    assert len(ready) == 1
+    assert ready[0]["id"] == "call_1"
+    assert ready[0]["function"]["name"] == "bash"
+    assert json.loads(ready[0]["function"]["arguments"]) == {"command": "ls"}
+
+
+def test_first_call_released_before_second_finishes():
+    """Test earlier calls don't wait for later ones."""
+    acc = ToolCallAccumulator()
+
+    ready = acc.feed([
+        _delta(0, id="a", name="bash", arguments='{"command": "pwd"}'),
+        _delta(1, id="b", name="scan_vault", arguments='{"pattern": '),
+    ])
+    assert [c["id"] for c in ready] == ["a"]
+
+    ready = acc.feed([_delta(1, arguments='"*.png"}')])
+    assert [c["id"] for c in ready] == ["b"]
+    assert acc.flush() == []
+    assert [c["id"] for c in acc.completed] == ["a", "b"]
+
+
+def test_flush_releases_incomplete_calls():
+    """Test calls without parseable arguments are released at end of stream."""
+    acc = ToolCallAccumulator()
+
+    acc.feed([_delta(0, id="p", name="invoke_prayer")])
+    flushed = acc.flush()
+
+    assert len(flushed) == 1
+    assert flushed[0]["function"]["arguments"] == "{}"
@@ -0,0 +1,57 @@
+"""
+Unit tests for the JSONL session event stream.
+"""
+
+import base64
+import json
+
+from src.observability.event_stream import EVENT_SCHEMA_VERSION, bound_value, encode_event, read_events
+from src.observability.session_logger import SessionLogger
+
+
+def test_bound_value_limits_size():
+    """Test strings, containers and depth are bounded."""
+    value = {"text": "x" * 5000, "items": list(range(100)), "deep": {"a": {"b": {"c": {"d": 1}}}}}
+    bounded = bound_value(value, max_chars=100, max_items=10, max_depth=3)
+
+    assert bounded["text"].startswith("x" * 100) and "4900 chars omitted" in bounded["text"]
+    assert len(bounded["items"]) == 11 and bounded["items"][-1] == "... 90 more items"
+    assert bounded["deep"]["a"]["b"] == "<dict with 1 keys>"
+    assert bound_value(b"\x00" * 10) == "<10 bytes>"
+
+
+def test_encode_and_read_events_skip_torn_line(tmp_path):
+    """Test encoded events round-trip and a torn last line is skipped."""
+    path = tmp_path / "events.jsonl"
+    path.write_text(encode_event({"type": "tool", "result": object()}) + '{"v": 1, "type": "to')
+
+    events = list(read_events(path))
+    assert len(events) == 1
+    assert events[0]["v"] == EVENT_SCHEMA_VERSION
+    assert events[0]["result"].startswith("<object object")
+
+
+def test_session_logger_streams_bounded_events(tmp_path):
+    """Test tool results are streamed bounded, screenshots by reference, memory capped."""
+    logger = SessionLogger("s1", "Test task", tmp_path)
+    screenshot = base64.b64encode(b"\x89PNG" + b"\x00" * 4096).decode()
+
+    for _ in range(150):
+        logger.log_tool_execution("bash", {"command": "cat big"}, {"stdout": "y" * 100000}, "success")
+    logger.log_iteration(1, {"screenshot": screenshot})
+    logger.finalize()
+
+    events = list(read_events(tmp_path / "s1" / "events.jsonl"))
+    types = [e["type"] for e in events]
+    assert types[0] == "session_start" and types[-1] == "session_end"
+    assert types.count("tool") == 150
+
+    tool = next(e for e in events if e["type"] == "tool")
+    assert len(tool["result"]["stdout"]) < 3000
+    iteration = next(e for e in events if e["type"] == "iteration")
+    assert "frame_ref" in iteration["data"]["screenshot"]
+
+    assert len(logger.tool_executions) == 100
+    metrics = json.loads((tmp_path / "s1" / "metrics.json").read_text())
+    assert metrics["tool_executions"] == 150
+    assert events[-1]["tool_executions"] == 150
@@ -0,0 +1,76 @@
+"""
+Unit tests for FrameStore.
+"""
+
+import base64
+import tempfile
+from pathlib import Path
+
+from src.observability.frame_store import FrameStore
+
+
+def test_frame_store_roundtrip():
+    """Test storing and loading a frame by hash."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        store = FrameStore(Path(tmpdir))
+        data = b"\x89PNG fake frame bytes" * 100
+
+        frame_hash = store.put(data)
+
+        assert frame_hash in store
+        assert store.get(frame_hash) == data
+        assert store.get("0" * 64) is None
+
+
+def test_frame_store_deduplicates():
+    """Test identical frames are written once across store instances."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        frame_b64 = base64.b64encode(b"same screen" * 50).decode()
+
+        first = FrameStore(Path(tmpdir))
+        second = FrameStore(Path(tmpdir))  # e.g. a later session
+
+        hash1 = first.put_base64(frame_b64)
+        hash2 = second.put_base64(frame_b64)
+
+        assert hash1 == hash2
+        assert first.stats["frames_written"] == 1
+        assert second.stats["frames_deduplicated"] == 1
+        assert second.get_base64(hash2) == frame_b64
+
+
+def test_frame_store_externalize():
+    """Test screenshots in nested results are replaced by frame refs."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        store = FrameStore(Path(tmpdir))
+        frame_b64 = base64.b64encode(b"pixels" * 20).decode()
+
+        result = store.externalize({
+            "status": "success",
+            "screenshot_b64": frame_b64,
+            "steps": [{"screenshot": frame_b64}]
+        })
+
+        frame_hash = result["screenshot_b64"]["frame_ref"]
+        assert result["status"] == "success"
+        assert result["steps"][0]["screenshot"]["frame_ref"] == frame_hash
+        assert store.get_base64(frame_hash) == frame_b64
+
+
+def test_frame_store_rejects_malformed_hashes():
+    """Test hashes that aren't 64 lowercase hex chars never become paths."""
+    import zlib
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir) / "x" / "y" / "frames"
+        store = FrameStore(root)
+        # What "../../evil" would resolve to under the sharded layout
+        (Path(tmpdir) / "evil.zz").write_bytes(zlib.compress(b"secret"))
+
+        assert store.get("../../evil") is None
+        assert store.get_base64("../../evil") is None
+        assert "../../evil" not in store
+        assert store.get("A" * 64) is None
+
+        frame_hash = store.put(b"frame")
+        assert store.get(frame_hash) == b"frame"
@@ -0,0 +1,58 @@
+"""
+Unit tests for BufferedLogWriter.
+"""
+
+import threading
+
+import pytest
+
+from src.observability.log_writer import BufferedLogWriter
+
+
+def test_writer_batches_and_flushes(tmp_path):
+    """Test queued lines land in order after flush, in few batches."""
+    path = tmp_path / "session.log"
+    writer = BufferedLogWriter(path, batch_size=50, flush_interval=1.0)
+
+    for i in range(120):
+        writer.write(f"line {i}\n")
+    assert writer.flush(timeout=5)
+
+    assert path.read_text().splitlines() == [f"line {i}" for i in range(120)]
+    assert writer.stats["lines"] == 120
+    assert writer.stats["batches"] <= 4
+    writer.close()
+
+
+def test_writer_close_drains_and_falls_back_to_sync(tmp_path):
+    """Test close drains the queue and later writes still land."""
+    path = tmp_path / "session.log"
+    writer = BufferedLogWriter(path, sync="none", flush_interval=10.0)
+    writer.write("a\n")
+    writer.close()
+    assert path.read_text() == "a\n"
+
+    writer.write("b\n")
+    assert path.read_text() == "a\nb\n"
+
+
+def test_writer_bounded_queue_blocks(tmp_path):
+    """Test a full queue makes writers wait instead of growing."""
+    path = tmp_path / "session.log"
+    writer = BufferedLogWriter(path, max_queue=2, batch_size=1, flush_interval=0.0)
+
+    threads = [threading.Thread(target=lambda: [writer.write("x\n") for _ in range(200)]) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    writer.close()
+
+    assert path.read_text().count("x\n") == 800
+    assert writer._queue.maxsize == 2
+
+
+def test_writer_rejects_unknown_sync_policy(tmp_path):
+    """Test sync policy validation."""
+    with pytest.raises(ValueError):
+        BufferedLogWriter(tmp_path / "session.log", sync="sometimes")
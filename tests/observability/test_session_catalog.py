@@ -0,0 +1,73 @@
+"""
+Unit tests for the SQLite session catalog.
+"""
+
+import json
+
+from src.observability.session_catalog import SessionCatalog, get_session_catalog
+from src.observability.session_logger import SessionLogger
+
+
+def test_catalog_recent_filters_and_updates(tmp_path):
+    """Test upserts merge fields and recent() orders and filters."""
+    catalog = SessionCatalog(tmp_path / "sessions.db")
+    catalog.upsert("swarm_1", task="scan vault", mode="swarm", status="running", started_at=100.0)
+    catalog.upsert("single_2", task="type hello", mode="single", status="completed", started_at=200.0)
+    catalog.upsert("swarm_1", status="completed", error_count=2)
+
+    assert [s["session_id"] for s in catalog.recent(10)] == ["single_2", "swarm_1"]
+    assert [s["session_id"] for s in catalog.recent(10, mode="swarm")] == ["swarm_1"]
+    swarm = catalog.get("swarm_1")
+    assert swarm["status"] == "completed" and swarm["task"] == "scan vault" and swarm["error_count"] == 2
+    assert catalog.latest(prefix="swarm_")["session_id"] == "swarm_1"
+    assert catalog.count() == 2
+
+
+def test_catalog_full_text_search(tmp_path):
+    """Test search covers tasks and errors, with prefix matching."""
+    catalog = SessionCatalog(tmp_path / "sessions.db")
+    catalog.upsert("a", task="label memes in the vault", started_at=1.0)
+    catalog.upsert("b", task="write a report", errors=["Connection timeout after 30s"], started_at=2.0)
+    catalog.upsert("b", task="write a weekly report")
+
+    assert [s["session_id"] for s in catalog.search("meme")] == ["a"]
+    assert [s["session_id"] for s in catalog.search("timeout")] == ["b"]
+    assert [s["session_id"] for s in catalog.search("weekly report")] == ["b"]
+    assert catalog.search('unbalanced "quote') == []
+
+
+def test_catalog_imports_existing_sessions_once(tmp_path):
+    """Test a new catalog imports session.json files and session_index.json."""
+    (tmp_path / "swarm_old").mkdir()
+    (tmp_path / "swarm_old" / "session.json").write_text(json.dumps({
+        "task": "old task", "status": "completed", "errors": [{"error": "boom"}],
+        "iterations": [{"tool_calls": [{"function": {"name": "bash"}}]}]
+    }))
+    (tmp_path / "session_index.json").write_text(json.dumps({
+        "session_20240101_000000": {"task": "indexed task", "model": "grok", "start_time": "2024-01-01T00:00:00",
+                                    "debug_mode": True}
+    }))
+
+    catalog = get_session_catalog(tmp_path)
+    assert get_session_catalog(tmp_path) is catalog
+
+    old = catalog.get("swarm_old")
+    assert old["mode"] == "swarm" and old["tools"] == ["bash"] and old["error_count"] == 1
+    assert catalog.get("session_20240101_000000")["extra"] == {"debug_mode": True}
+    assert [s["session_id"] for s in catalog.search("boom")] == ["swarm_old"]
+
+
+def test_session_logger_registers_in_catalog(tmp_path):
+    """Test SessionLogger records start and final metrics in the catalog."""
+    logger = SessionLogger("pantheon_1", "validate plan", tmp_path, swarm_mode=True, mode="pantheon")
+    catalog = get_session_catalog(tmp_path)
+    assert catalog.get("pantheon_1")["status"] == "running"
+
+    logger.log_tool_execution("bash", {"command": "ls"}, "ok", "success")
+    logger.log_agent_error("actor", "Invalid command")
+    logger.finalize()
+
+    session = catalog.get("pantheon_1")
+    assert session["mode"] == "pantheon" and session["status"] == "completed"
+    assert session["tool_count"] == 1 and session["error_count"] == 1 and session["tools"] == ["bash"]
+    assert [s["session_id"] for s in catalog.search("invalid")] == ["pantheon_1"]
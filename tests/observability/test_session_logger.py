@@ -6,7 +6,10 @@ import pytest
 import json
 import tempfile
 from pathlib import Path
-from src.observability.session_logger import SessionLogger, SwarmMetrics
+from src.observability.event_stream import read_events
+from src.observability.session_logger import (
+    LATENCY_RESERVOIR_SIZE, TOP_ERROR_SIGNATURES, SessionLogger, SwarmMetrics, error_signature
+)
 
 
 def test_swarm_metrics_initialization():
@@ -60,6 +63,42 @@ def test_swarm_metrics_agent_errors():
     assert "Connection timeout" in metrics.agent_errors["observer"]
 
 
+def test_swarm_metrics_streaming_latency_stats():
+    """Test Welford mean/variance, running max and bounded reservoir."""
+    import statistics
+
+    metrics = SwarmMetrics()
+    latencies = [float((i * 37) % 101) for i in range(5000)]
+    for latency in latencies:
+        metrics.add_handoff(latency)
+
+    assert metrics.total_handoffs == 5000
+    assert metrics.avg_handoff_latency == pytest.approx(statistics.mean(latencies))
+    assert metrics.handoff_latency_variance == pytest.approx(statistics.variance(latencies))
+    assert metrics.max_handoff_latency == max(latencies)
+    assert len(metrics.handoff_latencies) == LATENCY_RESERVOIR_SIZE
+    assert metrics.handoff_latency_quantile(0.5) == pytest.approx(50, abs=10)
+
+    data = metrics.to_dict()
+    json.dumps(data)
+    assert data["handoff_latency_p99"] >= data["handoff_latency_p50"]
+
+
+def test_swarm_metrics_error_signatures_bounded():
+    """Test errors are grouped by signature and memory stays bounded."""
+    metrics = SwarmMetrics()
+    for i in range(1000):
+        metrics.add_agent_error("actor", f"Timeout after {i}ms")
+    for i in range(100):
+        metrics.add_agent_error("actor", f"unique failure kind {chr(65 + i % 26)}{chr(97 + i // 26)}")
+
+    assert metrics.total_errors == 1100
+    assert len(metrics.agent_errors["actor"]) <= 20
+    assert len(metrics.agent_error_counts["actor"]) <= TOP_ERROR_SIGNATURES
+    assert metrics.top_errors(1) == [{"agent": "actor", "signature": "Timeout after <n>ms", "count": 1000}]
+    assert error_signature("id 0xdeadbeef in 'file.txt'") == "id <hex> in <str>"
+
+
 def test_session_logger_initialization():
     """Test SessionLogger initialization."""
     with tempfile.TemporaryDirectory() as tmpdir:
@@ -103,6 +142,7 @@ def test_session_logger_agent_logging():
         assert logger.swarm_metrics.agent_errors["observer"][0] == "Test error"
 
         # Check log file
+        logger.flush()
         log_content = (log_dir / "test_session_002" / "session.log").read_text()
         assert "AGENT START" in log_content
         assert "AGENT ERROR" in log_content
@@ -172,6 +212,41 @@ def test_session_logger_tool_execution():
         assert logger.tool_executions[0]["status"] == "success"
 
 
+def test_session_logger_snapshots_events_at_log_time():
+    """Mutating logged params afterwards doesn't change or drop the event."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        logger = SessionLogger(session_id="test_session_snap", task="Test task", log_dir=Path(tmpdir))
+
+        params = {"command": "ls -la", "env": {"A": "1"}}
+        logger.log_tool_execution(tool_name="bash", params=params, result=["a"], status="success")
+        params["command"] = "rm -rf /"
+        params["env"]["B"] = "2"
+        for i in range(100):
+            params[f"extra_{i}"] = i
+        logger.flush()
+
+        tool_events = [e for e in read_events(logger.events_file) if e["type"] == "tool"]
+        assert tool_events[0]["params"] == {"command": "ls -la", "env": {"A": "1"}}
+        assert logger.get_metrics()["dropped_events"] == 0
+        logger.finalize()
+
+
+def test_session_logger_counts_dropped_events():
+    """Events that fail to encode are counted in metrics."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        logger = SessionLogger(session_id="test_session_drop", task="Test task", log_dir=Path(tmpdir))
+
+        def broken_externalize(value):
+            raise RuntimeError("dictionary changed size during iteration")
+
+        logger.flush()
+        logger.frame_store.externalize = broken_externalize
+        logger.log_tool_execution(tool_name="bash", params={}, result="", status="success")
+        logger.flush()
+
+        assert logger.get_metrics()["dropped_events"] == 1
+
+
 def test_session_logger_confirmation():
     """Test confirmation logging."""
     with tempfile.TemporaryDirectory() as tmpdir:
@@ -0,0 +1,94 @@
+"""
+Unit tests for the read-only tool result cache.
+"""
+
+import os
+
+import pytest
+
+from src.command_cache import ToolResultCache
+from src.tool_scheduler import ResourceSet
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "notes.txt").write_text("v1")
+    return tmp_path
+
+
+def bash(command):
+    return {"command": command}
+
+
+def ok(stdout):
+    return {"status": "success", "stdout": stdout, "returncode": 0}
+
+
+def test_read_only_commands_are_cached(workdir):
+    """Test read-only commands hit and unknown/time-dependent ones don't."""
+    cache = ToolResultCache(ttl=60)
+    cache.record("bash", bash("python run.py"), ok("ran"))
+    cache.record("bash", bash("cat notes.txt"), ok("v1"))
+    cache.record("bash", bash("date"), ok("today"))
+
+    hit = cache.get("bash", bash("cat  notes.txt"))  # normalized argv
+    assert hit["stdout"] == "v1" and hit["cached"]
+    assert cache.get("bash", bash("date")) is None
+    assert cache.get("bash", bash("python run.py")) is None
+
+
+def test_commands_with_write_args_are_never_cached(workdir):
+    """Test a repeated write is re-run rather than answered from the cache."""
+    cache = ToolResultCache(ttl=60)
+    cache.record("bash", bash("cat notes.txt"), ok("v1"))
+
+    for command in ("find . -delete", "find . -exec rm {} ;", "sort -o out.txt notes.txt", "env rm -rf x"):
+        cache.record("bash", bash(command), ok(""))
+        assert cache.get("bash", bash(command)) is None, command
+        # Even if a classifier ever labels it a read, the argv check refuses it
+        assert cache._plan("bash", bash(command), ResourceSet(reads=frozenset({str(workdir)}), label="fs-read")) is None
+
+    # Unknown writes also dropped the earlier read
+    assert cache.get("bash", bash("cat notes.txt")) is None
+
+
+def test_fingerprint_detects_external_changes(workdir):
+    """Test a file changed behind the cache's back is not served stale."""
+    cache = ToolResultCache(ttl=60)
+    cache.record("bash", bash("cat notes.txt"), ok("v1"))
+
+    (workdir / "notes.txt").write_text("version 2")
+    os.utime(workdir / "notes.txt", ns=(1, 1))
+    assert cache.get("bash", bash("cat notes.txt")) is None
+    assert cache.get_stats()["stale"] == 1
+
+
+def test_writes_invalidate_overlapping_entries(workdir):
+    """Test writes through tools drop overlapping reads and keep the rest."""
+    (workdir / "sub").mkdir()
+    cache = ToolResultCache(ttl=60)
+    cache.record("bash", bash("ls sub"), ok("a"))
+    cache.record("bash", bash("cat notes.txt"), ok("v1"))
+
+    cache.record("bash", bash("touch sub/new.txt"), ok(""))
+    assert cache.get("bash", bash("ls sub")) is None
+    assert cache.get("bash", bash("cat notes.txt")) is not None
+
+    cache.record("bash", bash("make build"), ok(""))  # unknown command: everything goes
+    assert cache.get("bash", bash("cat notes.txt")) is None
+
+
+def test_ttl_and_vault_tools(workdir):
+    """Test vault tools are cached by arguments and TTL=0 disables storage."""
+    cache = ToolResultCache(ttl=60)
+    cache.record("scan_vault", {"pattern": "*.md"}, ok("files"))
+    assert cache.get("scan_vault", {"pattern": "*.md"}) is not None
+    assert cache.get("scan_vault", {"pattern": "*.txt"}) is None
+
+    cache.record("mcp_vault_operation", {"operation": "write"}, ok(""))
+    assert cache.get("scan_vault", {"pattern": "*.md"}) is None
+
+    expired = ToolResultCache(ttl=0)
+    expired.record("bash", bash("cat notes.txt"), ok("v1"))
+    assert expired.get("bash", bash("cat notes.txt")) is None
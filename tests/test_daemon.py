@@ -0,0 +1,222 @@
+"""
+Unit tests for the resident Grokputer daemon.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from grokputer_daemon import GrokputerDaemon, GrokputerDaemonClient, ProgressStream
+
+
+class FakeHistory(list):
+    def clear(self):
+        super().clear()
+
+
+class FakeGrokputer:
+    """Prints like Grokputer.run_task and remembers what it saw."""
+
+    def __init__(self):
+        self.conversation_history = FakeHistory()
+        self.history_lengths = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def run_task(self, task, max_iterations=10, output=print):
+        self.history_lengths.append(len(self.conversation_history))
+        self.conversation_history.append(task)
+        output(f"[TASK] {task}")
+        print("server-side noise")
+        self.release.wait(5)
+        output(f"iterations={max_iterations}")
+        if task == "explode":
+            raise RuntimeError("boom")
+
+
+def test_progress_stream_splits_lines():
+    """Test only complete lines are emitted until flush."""
+    lines = []
+    stream = ProgressStream(lines.append)
+    stream.write("a\nb")
+    stream.write("c\n\nd")
+    assert lines == ["a", "bc", ""]
+    stream.flush()
+    assert lines == ["a", "bc", "", "d"]
+
+
+@pytest.mark.asyncio
+async def test_daemon_streams_task_output(tmp_path):
+    """Test tasks stream their output and start with a fresh history."""
+    grokputer = FakeGrokputer()
+    daemon = GrokputerDaemon(grokputer, address=str(tmp_path / "gp.sock"))
+    await daemon.start()
+    try:
+        client = GrokputerDaemonClient(daemon.address, timeout=5)
+        assert await asyncio.to_thread(client.is_running)
+
+        events = []
+        result = await asyncio.to_thread(client.run, "scan vault", 3, events.append)
+        second = await asyncio.to_thread(client.run, "explode", 1)
+        stats = (await asyncio.to_thread(client.request, {"op": "stats"}))["stats"]
+    finally:
+        await daemon.stop()
+
+    assert result["success"]
+    assert [e["line"] for e in events if e["event"] == "output"] == ["[TASK] scan vault", "iterations=3"]
+    assert events[0]["event"] == "started"
+    assert not second["success"] and second["error"] == "boom"
+    assert grokputer.history_lengths == [0, 0]
+    assert stats["tasks"] == 2 and stats["failed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_daemon_queues_concurrent_tasks(tmp_path):
+    """Test a second task waits for the running one."""
+    grokputer = FakeGrokputer()
+    grokputer.release.clear()
+    daemon = GrokputerDaemon(grokputer, address=str(tmp_path / "gp.sock"))
+    await daemon.start()
+    try:
+        client = GrokputerDaemonClient(daemon.address, timeout=5)
+        first_events, second_events = [], []
+        first = asyncio.ensure_future(asyncio.to_thread(client.run, "one", 1, first_events.append))
+        while not first_events:
+            await asyncio.sleep(0.01)
+        second = asyncio.ensure_future(asyncio.to_thread(client.run, "two", 1, second_events.append))
+        while not second_events:
+            await asyncio.sleep(0.01)
+        grokputer.release.set()
+        results = await asyncio.gather(first, second)
+    finally:
+        await daemon.stop()
+
+    assert all(r["success"] for r in results)
+    assert second_events[0]["event"] == "queued"
+    assert daemon.stats["queued"] == 1
+
+
+class FakeGrokClient:
+    """Async like GrokClient: requests one tool call, then says it's done."""
+
+    def __init__(self):
+        self.calls = []
+
+    RESPONSE = {"status": "success", "content": "Listing files", "tool_calls": [
+        {"id": "call_1", "type": "function", "function": {"name": "bash", "arguments": '{"command": "ls"}'}}
+    ]}
+
+    def user_message(self, task, screenshot_base64=None):
+        return {"role": "user", "content": f"Task: {task}"}
+
+    @staticmethod
+    def tool_messages(tool_results):
+        return [{"role": "tool", "tool_call_id": r["tool_call_id"], "content": str(r["result"])}
+                for r in tool_results]
+
+    async def create_message(self, task, screenshot_base64=None, conversation_history=None, task_class=None):
+        self.calls.append(("create", conversation_history[-1]["content"]))
+        return self.RESPONSE
+
+    async def stream_message(self, task, screenshot_base64=None, conversation_history=None, task_class=None):
+        self.calls.append(("stream", conversation_history[-1]["content"]))
+        yield {"type": "content", "delta": self.RESPONSE["content"]}
+        for tool_call in self.RESPONSE["tool_calls"]:
+            yield {"type": "tool_call", "tool_call": tool_call}
+        yield {"type": "done", "response": self.RESPONSE}
+
+    async def continue_conversation(self, tool_results, conversation_history):
+        answered = [m for m in conversation_history if m["role"] == "tool"]
+        self.calls.append(("continue", len(tool_results) + len(answered)))
+        return {"status": "success", "content": "Task complete"}
+
+    def get_stats(self):
+        return {}
+
+
+class FakeScreenObserver:
+    def screenshot_to_base64(self):
+        return "c2NyZWVu"
+
+
+class FakeExecutor:
+    def execute_tool_calls(self, tool_calls):
+        return [{"tool_call_id": c["id"], "function_name": c["function"]["name"],
+                 "result": {"status": "success", "output": "a.txt"}} for c in tool_calls]
+
+    async def execute_streamed_tool_calls(self, events):
+        response, tool_calls = None, []
+        async for event in events:
+            if event["type"] == "tool_call":
+                tool_calls.append(event["tool_call"])
+            elif event["type"] == "done":
+                response = event["response"]
+        return response, self.execute_tool_calls(tool_calls)
+
+
+def _real_grokputer(stream: bool):
+    """main.Grokputer with its I/O components replaced (no screen, API or shell)."""
+    import logging
+    from main import Grokputer
+    from src.llm.history import ConversationHistory
+
+    grokputer = Grokputer.__new__(Grokputer)
+    grokputer.logger = logging.getLogger("test_daemon")
+    grokputer.grok_client = FakeGrokClient()
+    grokputer.screen_observer = FakeScreenObserver()
+    grokputer.executor = FakeExecutor()
+    grokputer.conversation_history = ConversationHistory()
+    grokputer.stream_responses = stream
+    return grokputer
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("stream", [True, False])
+async def test_daemon_runs_real_grokputer_loop(tmp_path, stream):
+    """Test the daemon drives main.Grokputer's async client calls to completion."""
+    grokputer = _real_grokputer(stream)
+    daemon = GrokputerDaemon(grokputer, address=str(tmp_path / "gp.sock"))
+    await daemon.start()
+    try:
+        client = GrokputerDaemonClient(daemon.address, timeout=5)
+        events = []
+        result = await asyncio.to_thread(client.run, "list files", 3, events.append)
+    finally:
+        await daemon.stop()
+
+    lines = [e["line"] for e in events if e["event"] == "output"]
+    assert result["success"], result
+    assert grokputer.grok_client.calls == [("stream" if stream else "create", "Task: list files"), ("continue", 1)]
+    assert "[GROK] Listing files" in lines
+    assert "  • bash: success" in lines
+    assert "[DONE] Task complete" in lines
+
+
+class SlowExecutor(FakeExecutor):
+    def execute_tool_calls(self, tool_calls):
+        time.sleep(0.3)
+        return super().execute_tool_calls(tool_calls)
+
+
+@pytest.mark.asyncio
+async def test_grokputer_tools_do_not_block_event_loop():
+    """Test blocking tool execution runs off the loop that drives the task."""
+    grokputer = _real_grokputer(stream=False)
+    grokputer.executor = SlowExecutor()
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticking = asyncio.create_task(ticker())
+    try:
+        await grokputer.run_task_async("list files", max_iterations=1, output=lambda text: None)
+    finally:
+        ticking.cancel()
+
+    assert ticks >= 10
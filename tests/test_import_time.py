@@ -0,0 +1,67 @@
+"""
+Cold-start budget for the CLI entry point.
+
+Runs `python -X importtime main.py --help` in a fresh interpreter and fails
+if mode-specific dependencies are imported eagerly or if total import time
+exceeds the budget (override with GROKPUTER_IMPORT_BUDGET_MS on slow machines).
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("click")
+
+ROOT = Path(__file__).resolve().parent.parent
+IMPORT_BUDGET_MS = float(os.getenv("GROKPUTER_IMPORT_BUDGET_MS", "400"))
+
+# Only the mode that needs these may import them
+MODE_MODULES = [
+    "openai",
+    "pyautogui",
+    "src.grok_client",
+    "src.executor",
+    "src.screen_observer",
+    "src.collaboration",
+    "src.agents",
+    "src.core.action_executor",
+    "src.observability",
+]
+
+
+def _import_profile(*args):
+    """Return {module: cumulative microseconds} and the top-level total for a cold start."""
+    env = {**os.environ, "XAI_API_KEY": os.environ.get("XAI_API_KEY", "test")}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "main.py", *args],
+        cwd=ROOT, env=env, capture_output=True, text=True, timeout=60
+    )
+    # --syntax-check exits 1 when it finds errors; a traceback means the CLI itself broke
+    assert "Traceback" not in result.stderr, result.stderr[-2000:]
+
+    modules, total = {}, 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        modules[name.strip()] = int(cumulative)
+        if not name.startswith("  "):  # top-level import (nested ones are indented)
+            total += int(cumulative)
+    return modules, total
+
+
+@pytest.mark.parametrize("args", [("--help",), ("--syntax-check",)])
+def test_cli_does_not_import_mode_dependencies(args):
+    """Test --help and --syntax-check import no mode-specific stack."""
+    modules, _ = _import_profile(*args)
+    eager = [name for name in modules if any(name == m or name.startswith(m + ".") for m in MODE_MODULES)]
+    assert not eager, f"Imported eagerly: {eager}"
+
+
+def test_cli_import_budget():
+    """Test cold-start import time stays within budget."""
+    _, total_us = _import_profile("--help")
+    assert total_us / 1000 < IMPORT_BUDGET_MS, f"Cold start imports took {total_us / 1000:.0f}ms"
@@ -60,6 +60,29 @@ class TestSessionImprover:
 
             assert "error" in result
 
+    def test_analyze_long_session_counts_every_api_call(self):
+        """Test totals come from the event stream, not session.json's recent window."""
+        from src.agents.session_improver import SessionImprover
+        from src.observability import session_logger as session_logger_module
+        from src.observability.session_logger import SessionLogger
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            logs_dir = Path(tmpdir)
+            calls = session_logger_module.RECENT_EVENTS + 50
+
+            logger = SessionLogger(session_id="session_long", task="long task", log_dir=logs_dir)
+            for _ in range(calls):
+                logger.log_api_call(0.1, "grok", True)
+            logger.log_iteration(1, {"duration": 2.0, "status": "success"})
+            logger.log_agent_error("actor", "boom")
+            logger.finalize()
+
+            analysis = SessionImprover(logs_dir=logs_dir).analyze_session("session_long")
+
+            assert analysis["metrics"]["api_calls"] == calls
+            assert analysis["metrics"]["total_iterations"] == 1
+            assert "Total errors: 1" in analysis["issues"]
+
 
 class TestOfflineMode:
     """Tests for offline mode (mode 5)."""
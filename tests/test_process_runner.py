@@ -0,0 +1,75 @@
+"""
+Unit tests for the shared asyncio subprocess runner.
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+from src.process_runner import OutputBuffer, run_process, run_process_sync, start_process
+
+
+def test_output_buffer_keeps_head_and_tail():
+    """Test capture is bounded and keeps both ends of the stream."""
+    buffer = OutputBuffer(max_bytes=20)
+    for i in range(100):
+        buffer.feed(f"{i:03d}\n".encode())
+
+    text = buffer.text()
+    assert buffer.truncated
+    assert buffer.total_bytes == 400
+    assert text.startswith("000\n001\n")
+    assert text.endswith("098\n099\n")
+    assert "380 bytes omitted" in text
+
+
+@pytest.mark.asyncio
+async def test_partial_output_and_bounded_capture():
+    """Test output is visible while running and large output is capped."""
+    script = (
+        "import sys, time\n"
+        "print('started', flush=True)\n"
+        "time.sleep(0.3)\n"
+        "sys.stdout.write('x' * 500000)\n"
+    )
+    running = await start_process([sys.executable, "-c", script], max_output=1000)
+
+    deadline = time.time() + 5
+    while "started" not in running.stdout and time.time() < deadline:
+        await asyncio.sleep(0.02)
+    assert "started" in running.stdout
+    assert not running.done
+
+    result = await running.wait()
+    assert result.returncode == 0
+    assert result.truncated
+    assert result.stdout_bytes > 500000
+    assert len(result.stdout) < 1100
+
+
+@pytest.mark.skipif(os.name != "posix", reason="process groups are POSIX-only")
+@pytest.mark.asyncio
+async def test_timeout_kills_process_group(tmp_path):
+    """Test a timeout kills grandchildren too and returns partial output."""
+    marker = tmp_path / "survived"
+    command = f"echo begin; (sleep 1; touch {marker}) & sleep 10"
+
+    start = time.time()
+    result = await run_process(command, shell=True, timeout=0.3)
+    assert result.timed_out
+    assert "begin" in result.stdout
+    assert time.time() - start < 5
+
+    await asyncio.sleep(1.2)
+    assert not marker.exists()
+
+
+def test_run_process_sync():
+    """Test the blocking wrapper from plain sync code."""
+    result = run_process_sync([sys.executable, "-c", "import sys; sys.stderr.write('err')"])
+    assert result.returncode == 0
+    assert result.stderr == "err"
+    assert not result.timed_out
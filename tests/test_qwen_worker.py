@@ -0,0 +1,51 @@
+"""
+Unit tests for the persistent Qwen inference worker (with a fake engine).
+"""
+
+import asyncio
+import pytest
+
+from qwen_worker import QwenWorker, QwenWorkerClient, parse_address
+
+
+class FakeEngine:
+    """Records batch shapes instead of running a model."""
+
+    def __init__(self):
+        self.batches = []
+        self.prefix_hits = 0
+
+    def generate_batch(self, system, requests):
+        self.batches.append((system, len(requests)))
+        return [f"{system}|{r['prompt']}" for r in requests]
+
+
+@pytest.mark.asyncio
+async def test_worker_batches_concurrent_requests(tmp_path):
+    """Test concurrent clients share engine calls grouped by system prompt."""
+    engine = FakeEngine()
+    address = str(tmp_path / "qwen.sock")
+    worker = QwenWorker(engine, address=address, max_batch=8, batch_window=0.05)
+    await worker.start()
+
+    try:
+        client = QwenWorkerClient(address, timeout=5)
+        assert await asyncio.to_thread(client.is_running)
+
+        results = await asyncio.gather(
+            client.agenerate("a", system="sys1"),
+            client.agenerate("b", system="sys1"),
+            client.agenerate("c", system="sys2"),
+        )
+    finally:
+        await worker.stop()
+
+    assert [r["text"] for r in results] == ["sys1|a", "sys1|b", "sys2|c"]
+    assert sorted(engine.batches) == [("sys1", 2), ("sys2", 1)]
+    assert worker.stats["requests"] == 3
+    assert worker.stats["max_batch_seen"] == 2
+
+
+def test_parse_address():
+    """Test socket address parsing."""
+    assert parse_address("127.0.0.1:8766") == ("tcp", ("127.0.0.1", 8766))
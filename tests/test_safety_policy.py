@@ -0,0 +1,96 @@
+"""
+Unit tests for the compiled command-safety policy.
+"""
+
+import pytest
+
+from src.safety_policy import SafetyPolicy
+
+SCORES = {"ls": 10, "cat": 20, "git": 45, "rm": 90, "chmod": 80, "curl": 50}
+
+
+@pytest.fixture
+def policy():
+    return SafetyPolicy(SCORES)
+
+
+@pytest.mark.parametrize("command,score", [
+    ("ls -la", 10),
+    ("cat README.md", 20),
+    ("git status", 45),
+    ("rm file.txt", 90),
+    ("rm -rf /tmp/test", 100),
+    ("rm -r -f build", 100),
+    ("sudo apt-get install package", 95),
+    ("sudo rm file", 100),
+    ("echo x > /etc/passwd", 95),
+    ("unknown-tool", 50),
+    ("", 50),
+])
+def test_scores_match_rule_table(policy, command, score):
+    """Test scores for base programs, flags, privilege and system writes."""
+    assert policy.score(command) == score
+
+
+def test_unattended_checks(policy):
+    """Test shell syntax, network and destructive commands are flagged."""
+    assert policy.evaluate("ls -la").allowed_unattended
+    assert policy.evaluate("ls | grep x").shell_metachars
+    assert policy.evaluate("echo $(whoami)").shell_metachars
+    assert policy.evaluate("curl http://example.com").network
+    assert policy.evaluate("dd if=/dev/zero of=disk").destructive
+    assert policy.evaluate("mkfs.ext4 /dev/sda1").destructive
+    # Tokenized: a filename containing "-f" is not a force flag
+    assert policy.score("cat notes-f.txt") == 20
+
+
+def _legacy_score(command, scores):
+    """The pre-policy config.get_command_safety_score rules, verbatim."""
+    if not command or not command.strip():
+        return 50
+    first_word = command.strip().split()[0]
+    if 'rm -rf' in command or 'rm -fr' in command:
+        return 100
+    if 'sudo rm' in command:
+        return 100
+    if '>' in command and any(critical in command for critical in ['/etc/', '/boot/', '/sys/', '/dev/']):
+        return 95
+    if command.startswith('sudo '):
+        return 95
+    base_score = scores.get(first_word, 50)
+    if '-f' in command or '--force' in command:
+        base_score = min(100, base_score + 20)
+    if '-r' in command or '-R' in command or '--recursive' in command:
+        base_score = min(100, base_score + 15)
+    return base_score
+
+
+PARITY_CORPUS = [
+    "ls", "ls -la", "ls -lR", "ls -R /tmp", "pwd", "cat README.md", "head -n 5 a.txt",
+    "tail -f app.log", "grep -r TODO src", "grep -rf pats .", "grep -Rn x .", "find . -name x",
+    "tar -xzf a.tgz", "tar -cf out.tar dir", "cp a b", "cp -r src dst", "cp -rf src dst", "cp -f a b",
+    "mv -f a b", "chmod -R 755 dir", "chmod 644 f", "rm file.txt", "rm -r build", "rm -f x",
+    "rm -rf build", "rm -fr build", "rm -rfv build", "rm -r -f build", "rm --recursive --force build",
+    "git status", "git clean -fd", "git push --force", "git log -r", "docker rm -f web",
+    "pip install -r requirements.txt", "sudo apt-get install package", "sudo rm file",
+    "echo x > /etc/passwd", "unknown-tool", "unknown-tool -f", "", "   ",
+]
+
+
+@pytest.mark.parametrize("command", PARITY_CORPUS)
+def test_scores_match_legacy_rules(command):
+    """Test the policy scores the corpus exactly like the rules it replaced."""
+    from src import config
+
+    assert SafetyPolicy(config.SAFETY_SCORES).score(command) == _legacy_score(command, config.SAFETY_SCORES)
+
+
+def test_memoized_batch_evaluation(policy):
+    """Test a repeated plan is scored from the memo in one call."""
+    plan = ["ls -la", "cat a.txt", "rm -rf build"] * 50
+    verdicts = policy.evaluate_many(plan)
+
+    assert [v.requires_confirmation for v in verdicts[:3]] == [False, False, True]
+    stats = policy.get_stats()
+    assert stats["misses"] == 3
+    assert stats["hits"] == 147
@@ -0,0 +1,43 @@
+"""
+Unit tests for the lazy-loading tool registry.
+"""
+
+import sys
+
+from src import config
+from src.tool_registry import BUILTIN_TOOLS, ToolRegistry, ToolSpec
+
+
+def test_config_tools_generated_from_registry():
+    """Test config.TOOLS is exactly the builtin registry schemas."""
+    assert [tool["function"]["name"] for tool in config.TOOLS] == [spec.name for spec in BUILTIN_TOOLS]
+    assert config.TOOLS[0]["function"]["parameters"]["required"] == ["command"]
+
+
+def test_entry_point_imported_on_first_use():
+    """Test a tool's module is only imported when the tool is first called."""
+    sys.modules.pop("colorsys", None)
+    registry = ToolRegistry([ToolSpec("to_hsv", "RGB to HSV", entry_point="colorsys:rgb_to_hsv")])
+    assert "colorsys" not in sys.modules
+
+    assert registry.dispatch("to_hsv", r=1.0, g=0.0, b=0.0) == (0.0, 1.0, 1.0)
+    assert "colorsys" in sys.modules
+    registry.dispatch("to_hsv", r=0.0, g=1.0, b=0.0)
+
+    stats = registry.get_stats()
+    assert stats["imports"] == 1
+    assert stats["calls"] == 2
+
+
+def test_decorator_and_errors():
+    """Test decorator registration, unknown tools and broken entry points."""
+    registry = ToolRegistry([ToolSpec("broken", "Missing module", entry_point="no_such_module:run")])
+
+    @registry.tool("echo", "Echo text", {"type": "object", "properties": {"text": {"type": "string"}}})
+    def echo(text):
+        return {"status": "success", "text": text}
+
+    assert registry.dispatch("echo", text="hi")["text"] == "hi"
+    assert registry.schemas()[-1]["function"]["name"] == "echo"
+    assert registry.dispatch("missing")["error"] == "Unknown tool: missing"
+    assert "unavailable" in registry.dispatch("broken")["error"]
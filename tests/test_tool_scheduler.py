@@ -0,0 +1,93 @@
+"""
+Unit tests for conflict-aware tool call scheduling.
+"""
+
+import threading
+import time
+
+from src.tool_scheduler import ToolScheduler, classify_bash, classify_tool_call, dependencies
+
+
+def test_classification_and_conflicts():
+    """Test reads share, writes conflict with overlapping paths, screen is exclusive."""
+    read_a = classify_bash("cat /tmp/a/file.txt")
+    read_b = classify_bash("ls /tmp/b")
+    write_a = classify_bash("rm -rf /tmp/a")
+    screen = classify_tool_call("computer", {"action": "screenshot"})
+    pure = classify_tool_call("invoke_prayer", {})
+
+    assert not read_a.conflicts_with(read_b)
+    assert write_a.conflicts_with(read_a)  # parent directory overlaps the file
+    assert not write_a.conflicts_with(read_b)
+    assert screen.conflicts_with(pure)
+    assert classify_bash("python script.py").exclusive  # unknown commands are exclusive
+
+    assert dependencies([read_a, read_b, write_a, pure]) == [[], [], [0], []]
+
+
+def test_shell_operators_wrappers_and_write_flags_are_exclusive():
+    """Test commands that can write despite a read-only program name are exclusive."""
+    for command in (
+        "ls && rm -rf build",
+        "cat a | tee b",
+        "echo hi > out.txt",
+        "echo hi>out.txt",
+        "cat $(rm -rf x)",
+        "env rm -rf x",
+        "xargs rm",
+        "timeout 5 rm -rf x",
+        "find . -delete",
+        "find . -name '*.pyc' -exec rm {} ;",
+        "find . -fprint list.txt",
+        "sort -o out.txt in.txt",
+        "sort --output=out.txt in.txt",
+        "uniq in.txt out.txt",
+        "git diff --output=patch.txt",
+    ):
+        assert classify_bash(command).exclusive, command
+
+    # Quoted metacharacters are arguments, not operators
+    assert classify_bash("grep 'a|b' notes.txt").label == "fs-read"
+    assert classify_bash("find . -name '*.py'").label == "fs-read"
+    assert classify_bash("sort in.txt").label == "fs-read"
+
+
+def test_independent_calls_run_concurrently_in_order():
+    """Test independent calls overlap and results keep the input order."""
+    scheduler = ToolScheduler(max_concurrency=4)
+    items = [0.2, 0.1, 0.15]
+    resources = [classify_bash(f"cat /tmp/f{i}") for i in range(len(items))]
+
+    def execute(delay):
+        time.sleep(delay)
+        return delay
+
+    start = time.time()
+    results = scheduler.run(items, resources, execute)
+    elapsed = time.time() - start
+
+    assert results == items
+    assert elapsed < 0.35  # ~max(delays), not sum(delays)
+    assert scheduler.get_stats()["parallel_turns"] == 1
+
+
+def test_conflicting_calls_are_serialized():
+    """Test exclusive calls never overlap and run in the model's order."""
+    scheduler = ToolScheduler(max_concurrency=4)
+    running = []
+    order = []
+    lock = threading.Lock()
+
+    def execute(index):
+        with lock:
+            running.append(index)
+            assert len(running) == 1
+        time.sleep(0.02)
+        with lock:
+            running.remove(index)
+            order.append(index)
+        return index
+
+    resources = [classify_tool_call("computer", {}) for _ in range(4)]
+    assert scheduler.run(list(range(4)), resources, execute) == [0, 1, 2, 3]
+    assert order == [0, 1, 2, 3]
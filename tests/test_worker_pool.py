@@ -0,0 +1,116 @@
+"""
+Unit tests for the warm Python worker pool.
+"""
+
+import os
+import sys
+import time
+
+import pytest
+
+from src.worker_pool import WarmWorkerPool, python_job
+
+
+@pytest.fixture
+def pool():
+    pool = WarmWorkerPool(size=1, max_jobs=3)
+    yield pool
+    pool.shutdown()
+
+
+def test_python_job_recognizes_invocations():
+    """Test only plain Python invocations are routed to workers."""
+    assert python_job(["python3", "-c", "print(1)", "x"]) == {"code": "print(1)", "args": ["x"]}
+    assert python_job(["python", "script.py", "a"])["args"] == ["a"]
+    assert python_job(["python", "-m", "http.server"]) is None
+    assert python_job(["ls", "-la"]) is None
+
+
+def test_runs_scripts_with_output_and_exit_codes(pool, tmp_path):
+    """Test scripts run as __main__ with captured output, argv, cwd and exit codes."""
+    script = tmp_path / "hello.py"
+    script.write_text(
+        "import os, sys\n"
+        "if __name__ == '__main__':\n"
+        "    print('hi', sys.argv[1:], os.getcwd())\n"
+        "    sys.exit(3)\n"
+    )
+    result = pool.run_script(str(script), args=["a"], cwd=str(tmp_path), timeout=10)
+    assert result.returncode == 3
+    assert result.stdout.strip() == f"hi ['a'] {tmp_path}"
+
+    failed = pool.run_code("raise ValueError('boom')", timeout=10)
+    assert failed.returncode == 1
+    assert "ValueError: boom" in failed.stderr
+
+
+def test_warm_run_is_faster_than_cold_start(pool):
+    """Test a warm job beats spawning a fresh interpreter."""
+    pool.run_code("pass", timeout=10)  # wait for the worker to be ready
+
+    start = time.time()
+    assert pool.run_code("import json; print(json.dumps([1]))", timeout=10).stdout == "[1]\n"
+    warm = time.time() - start
+
+    import subprocess
+    start = time.time()
+    subprocess.run([sys.executable, "-c", "import json; print(json.dumps([1]))"], capture_output=True)
+    cold = time.time() - start
+
+    assert warm < cold
+
+
+def test_timeout_and_recycling(pool):
+    """Test a hung job is killed and workers are recycled after max_jobs."""
+    result = pool.run_code("import time; time.sleep(30)", timeout=0.5)
+    assert result.timed_out
+    assert pool.run_code("print('alive')", timeout=10).stdout == "alive\n"
+
+    # State leaks until the worker is recycled
+    pool.run_code("import builtins; builtins.LEAK = 1", timeout=10)
+    assert pool.run_code("print('LEAK' in dir(__import__('builtins')))", timeout=10).stdout == "True\n"
+    assert pool.run_code("print('LEAK' in dir(__import__('builtins')))", timeout=10).stdout == "False\n"
+
+    stats = pool.get_stats()
+    assert stats["timeouts"] == 1
+    assert stats["recycled_jobs"] == 1
+
+
+def test_jobs_behave_like_a_fresh_interpreter(tmp_path):
+    """Test sibling imports, child-process output and the job environment."""
+    pool = WarmWorkerPool(size=1, max_jobs=10)
+    try:
+        for name in ("one", "two"):
+            (tmp_path / name).mkdir()
+            (tmp_path / name / "helper_mod.py").write_text(f"VALUE = {name!r}\n")
+            (tmp_path / name / "main.py").write_text(
+                "import os, subprocess, sys\n"
+                "import helper_mod\n"
+                "print('helper', helper_mod.VALUE, flush=True)\n"
+                "os.system('echo from-shell')\n"
+                "subprocess.run([sys.executable, '-c', 'import sys; sys.stderr.write(\"child-err\\\\n\")'])\n"
+                "print('env', os.environ.get('WP_TEST_VAR'))\n"
+            )
+
+        first = pool.run_job({"path": str(tmp_path / "one" / "main.py"), "env": {"PATH": os.environ["PATH"], "WP_TEST_VAR": "set"}})
+        second = pool.run_script(str(tmp_path / "two" / "main.py"), timeout=10)
+    finally:
+        pool.shutdown()
+
+    assert first.returncode == 0, first.stderr
+    assert first.stdout.splitlines() == ["helper one", "from-shell", "env set"]
+    assert "child-err" in first.stderr
+    # The second script's own sibling module, not the first job's cached one
+    assert second.stdout.splitlines()[0] == "helper two"
+
+
+def test_can_run_requires_same_interpreter_and_startup_env():
+    """Test bash `python` calls only go warm when a cold start would match."""
+    pool = WarmWorkerPool(size=1)
+    try:
+        env = dict(os.environ)
+        assert pool.can_run(sys.executable, env)
+        assert not pool.can_run("definitely-not-a-python", env)
+        assert not pool.can_run(sys.executable, {**env, "PYTHONHASHSEED": "123"})
+    finally:
+        pool.shutdown()